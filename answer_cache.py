@@ -0,0 +1,179 @@
+"""
+ANSWER_CACHE.PY - ANLAMSAL (SEMANTIC) CEVAP ÖNBELLEĞİ
+
+Kullanıcılar aynı birkaç yüz soruyu küçük kelime farklarıyla tekrar tekrar
+soruyor. Bu önbellek soru embedding'lerini küçük bir bellek içi vektör
+indeksinde tutar; yeni soru önbellekteki bir soruya belirlenen kosinüs
+benzerliği eşiğinin üzerinde yakınsa, arama ve LLM üretimi yapılmadan
+önbellekteki cevap ve kaynaklar döndürülür.
+
+- TTL: süresi dolan kayıtlar kullanılmaz ve temizlenir
+- LRU: kayıt sınırı aşılınca en uzun süredir kullanılmayan silinir
+- Vektör indeksi veya embedding modeli değişince (index_version) tüm önbellek geçersiz olur;
+  sorgu vektörüyle boyutu uyuşmayan kayıtlar da atılır
+- Diske kaydedilir, yeniden başlatmalarda korunur
+"""
+
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+ANSWER_CACHE_FORMAT_VERSION = 1
+
+
+class SemanticAnswerCache:
+    def __init__(self, path=None, threshold=0.92, ttl_seconds=7 * 24 * 3600,
+                 max_entries=1000, index_version=None):
+        """
+        Args:
+            path: Kalıcı dosya yolu (None ise sadece bellekte tutulur)
+            threshold: Önbellek isabeti için minimum kosinüs benzerliği
+            ttl_seconds: Kaydın geçerlilik süresi
+            max_entries: Maksimum kayıt sayısı (LRU ile tahliye)
+            index_version: Vektör indeksinin sürümü; farklıysa diskteki kayıtlar atılır
+        """
+        self.path = path
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.index_version = index_version
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()   # kayıt no -> kayıt sözlüğü (LRU sırasıyla)
+        self._next_id = 0
+        self._matrix = None             # normalize edilmiş soru vektörleri
+        self._matrix_ids = []
+        self._lock = threading.Lock()
+
+        if path:
+            self._load()
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                payload = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return
+        if payload.get("version") != ANSWER_CACHE_FORMAT_VERSION:
+            return
+        if payload.get("index_version") != self.index_version:
+            print("ℹ️ Vektör indeksi değişmiş, cevap önbelleği sıfırlandı")
+            return
+        self._entries = payload["entries"]
+        self._next_id = payload["next_id"]
+        self._matrix = None
+
+    def save(self):
+        """Önbelleği atomik olarak diske yaz"""
+        if not self.path:
+            return
+        with self._lock:
+            payload = {
+                "version": ANSWER_CACHE_FORMAT_VERSION,
+                "index_version": self.index_version,
+                "entries": self._entries,
+                "next_id": self._next_id,
+            }
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path + ".tmp", "wb") as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(self.path + ".tmp", self.path)
+
+    def _rebuild_matrix(self, dim):
+        # Başka bir embedding modeliyle yazılmış kayıtlar (farklı boyut) karşılaştırılamaz
+        stale = [i for i, entry in self._entries.items() if len(entry["vector"]) != dim]
+        for entry_id in stale:
+            del self._entries[entry_id]
+        self._matrix_ids = list(self._entries)
+        if self._matrix_ids:
+            self._matrix = np.stack([self._entries[i]["vector"] for i in self._matrix_ids])
+        else:
+            self._matrix = None
+
+    def _purge_expired(self, now):
+        expired = [i for i, entry in self._entries.items()
+                   if now - entry["created_at"] > self.ttl_seconds]
+        for entry_id in expired:
+            del self._entries[entry_id]
+        if expired:
+            self._matrix = None
+
+    def lookup(self, query_vector):
+        """
+        En benzer önbellek kaydını bul.
+
+        Returns:
+            dict | None: {'question', 'answer', 'sources', 'similarity'} veya None
+        """
+        with self._lock:
+            self._purge_expired(time.time())
+            query_vector = self._normalize(query_vector)
+            if self._matrix is None or self._matrix.shape[1] != len(query_vector):
+                self._rebuild_matrix(len(query_vector))
+            if self._matrix is None:
+                self.misses += 1
+                return None
+
+            similarities = self._matrix @ query_vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            entry_id = self._matrix_ids[best]
+            self._entries.move_to_end(entry_id)
+            entry = self._entries[entry_id]
+            self.hits += 1
+            return {
+                "question": entry["question"],
+                "answer": entry["answer"],
+                "sources": entry["sources"],
+                "similarity": float(similarities[best]),
+            }
+
+    def put(self, question, query_vector, answer, sources=()):
+        """Yeni bir soru/cevap ekle ve diske kaydet"""
+        with self._lock:
+            self._entries[self._next_id] = {
+                "question": question,
+                "vector": self._normalize(query_vector),
+                "answer": answer,
+                "sources": list(sources),
+                "created_at": time.time(),
+            }
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+        self.save()
+
+    def invalidate(self, index_version=None):
+        """Tüm kayıtları sil; yeni indeks sürümü verilirse onu kaydet"""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+            if index_version is not None:
+                self.index_version = index_version
+        self.save()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -1,34 +1,48 @@
 """
 APP.PY - SUPPLY CHAIN MANAGEMENT AI CHATBOT
 Ana Streamlit uygulaması - Tedarik Zinciri Yönetimi için AI asistanı
+
+Pipeline tembel (lazy) başlatılan aşamalara bölünmüştür; dosyayı import etmek
+hiçbir ağır işlem yapmaz. Uygulama `python app.py` ile (veya Colab hücresinde)
+çalıştırıldığında main() tüm aşamaları sırasıyla kurar.
 """
 # ==============================================================================
 # BÖLÜM 0: GEREKLİ KÜTÜPHANELERİ YÜKLE
-# Colab ortamında bu hücreyi ilk çalıştırmalısın.
-# ==============================================================================
-print("0. Gerekli kütüphaneler yükleniyor...")
+# Colab ortamında aşağıdaki komutu ayrı bir hücrede ilk önce çalıştırmalısın:
+#
+#   !pip install -q transformers datasets langchain langchain-community faiss-cpu sentence-transformers pypdf chromadb gradio unstructured[pdf] huggingface_hub
+#
 # Langchain'in son sürümleriyle uyumluluk için bu paketleri güncel tutuyoruz.
 # Ayrıca PDF işleme için 'unstructured[pdf]' ve 'pypdf'nin doğru kurulduğundan emin olalım.
-!pip install -q transformers datasets langchain langchain-community faiss-cpu sentence-transformers pypdf chromadb gradio unstructured[pdf] huggingface_hub
-print("Kütüphaneler yüklendi.")
-
+# transformers, torch, gradio, datasets gibi ağır kütüphaneler ilk kullanıldıkları
+# aşamada import edilir.
+# ==============================================================================
 import os
-import requests
-import gradio as gr
-from datasets import load_dataset
-# langchain_community'den import etmemiz gereken modülleri güncelledik
-from langchain_community.document_loaders import TextLoader, PyPDFLoader, CSVLoader, UnstructuredFileLoader
-from langchain.schema import Document
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
-
-from langchain_community.llms import HuggingFacePipeline
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
-from langchain.chains import RetrievalQA
-from langchain.prompts import PromptTemplate
 import glob
+import queue
 import shutil
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from threading import Thread, Event
+
+from langchain.schema import Document
+from langchain.prompts import PromptTemplate
+from vector_index import build_or_update_index, embedding_name, index_fingerprint
+from sharded_index import build_sharded_index
+from embedding_cache import CachedEmbeddings, LazyEmbeddings
+from hybrid_retriever import HybridRetriever, load_or_build_bm25
+from glossary_index import GlossaryIndex
+from answer_cache import SemanticAnswerCache
+from batch_generator import MicroBatcher, Seq2SeqBatchGenerator, BatchedLLM
+from snapshot import save_snapshot, load_snapshot
+from chunk_store import ChunkStore
+from chunk_splitter import ChunkSplitter
+from reranker import CrossEncoderReranker, RerankingRetriever
+from context_compressor import CompressingRetriever, ContextCompressor
+from llm_runtime import load_seq2seq
+from dedup import deduplicate_chunks
+from metrics import METRICS, InstrumentedEmbeddings, MetricsCallbackHandler, start_metrics_server, start_json_log
 
 # ==============================================================================
 # BÖLÜM 1: YAPILANDIRMA AYARLARI
@@ -37,6 +51,11 @@ import shutil
 
 # 1. Hugging Face Veri Seti Adı (Terim/Tanım için)
 HUGGINGFACE_DATASET_NAME = "tutkuozdeniz0/tedarik-zinciri-terimleri" # Boş bırakmak istersen "" yapabilirsin.
+HUGGINGFACE_DATASET_REVISION = "" # Commit, branch veya tag; boşsa son commit çözülüp yerel anlık görüntüye sabitlenir
+# Veri seti DATASET_SNAPSHOT_DIR altına commit'iyle sabitlenir; sonraki açılışlar Arrow dosyasından, bellek eşlemeli okur.
+DATASET_SNAPSHOT = True
+DATASET_SNAPSHOT_DIR = ".cache/datasets"
+HF_OFFLINE = os.getenv("HF_HUB_OFFLINE", "0") == "1" # True ise Hub'a hiç gidilmez, son yerel anlık görüntü kullanılır
 
 # 2. Hugging Face API Token
 HUGGINGFACE_API_TOKEN = ""
@@ -44,6 +63,12 @@ HUGGINGFACE_API_TOKEN = ""
 # 3. Embeddings Modeli Adı (Metinleri vektörlere çevirmek için)
 EMBEDDINGS_MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2" # Türkçe destekli
 
+# Embedding önbelleği (boş bırakılırsa kapalı) ve modele tek seferde gönderilen metin sayısı
+EMBEDDING_CACHE_DIR = ".cache/embeddings"
+EMBEDDING_CACHE_DTYPE = "float32" # Disk/bellek için "float16" da seçilebilir
+EMBEDDING_BATCH_SIZE = 128
+EMBEDDING_QUERY_CACHE_SIZE = 1024 # Sorgu ve (bağlam sıkıştırmadaki) cümle vektörleri bellekte (LRU) tutulur, diske yazılmaz
+
 # 4. LLM (Büyük Dil Modeli) Adı (Cevap üretmek için)
 # Performans ve kalite dengesi için flan-t5-large'ı öneririm eğer GPU yeterliyse.
 # Eğer hala çok yavaşsa 'base' veya 'small' deneyebilirsiniz.
@@ -54,37 +79,195 @@ LLM_MODEL_NAME = "google/flan-t5-large" # Daha iyi kalite için 'large'
 LLM_TEMPERATURE = 0.4 # Daha tutarlı ve az spekülatif cevaplar için biraz düşürdük
 LLM_MAX_NEW_TOKENS = 700 # Cevap uzunluğunu artırdık, cümlelerin yarım kalmaması için
 # LLM_MAX_LENGTH, HuggingFaceHub ile kullanılıyordu. HuggingFacePipeline ile 'max_new_tokens' tercih edilir.
-
-# ChromaDB için kalıcı depolama dizini
+# Çalışma zamanı (bkz. llm_runtime.py): "torch" (fp32), "torch-int8", "onnx", "onnx-int8" veya
+# "auto" (GPU varsa torch, yoksa torch-int8). ONNX için optimum[onnxruntime] gerekir.
+# Varsayılan fp32 "torch"tur; kuantize çalışma zamanları cevap uyumu benchmarks/bench_llm_runtime.py
+# ile doğrulandıktan sonra isteğe bağlı olarak seçilir.
+LLM_RUNTIME = "torch"
+LLM_NUM_THREADS = os.cpu_count() # CPU'da üretim için thread sayısı
+ONNX_EXPORT_DIR = ".cache/onnx" # ONNX dışa aktarımları burada saklanır, sonraki açılışlarda yeniden kullanılır
+STREAMING_RESPONSES = True # Cevabı tamamlanmasını beklemeden token token göster
+STREAM_TOKEN_TIMEOUT_SECONDS = 120 # Akışta bir sonraki token için en fazla bekleme (model takılırsa istek düşer)
+
+# Mikro-batch: eşzamanlı sorular birkaç ms toplanıp modelden tek batch olarak geçirilir.
+# Akışlı cevaplarda da geçerlidir: batch tek generate() çağrısında üretilir, token'lar her isteğin akışına dağıtılır.
+MICRO_BATCHING = True
+MAX_BATCH_SIZE = 8
+MAX_BATCH_WAIT_MS = 15
+GRADIO_CONCURRENCY_LIMIT = 8 # Aynı anda işlenen istek sayısı (batch'in dolabilmesi için >= MAX_BATCH_SIZE)
+
+# Vektör veritabanı (ChromaDB veya FAISS) için kalıcı depolama dizini
 PERSIST_DIRECTORY = 'chroma_db'
+# True: sadece değişen parçaları embed et (manifest ile), False: her açılışta sıfırdan kur
+INCREMENTAL_INDEXING = True
+# Vektör veritabanı: "chroma" veya "faiss" (yerel FAISS indeksi, PERSIST_DIRECTORY içinde saklanır)
+VECTOR_BACKEND = "chroma" # FAISS isteğe bağlıdır; mevcut chroma_db dizinleri olduğu gibi kullanılır
+# "flat" (birebir arama), "hnsw" (en düşük gecikme), "ivfpq" (sıkıştırılmış vektörler, en az bellek)
+FAISS_INDEX_TYPE = "hnsw"
+FAISS_MMAP = True # İndeks diskten bellek eşlemeli okunur, vektörler RAM'e kopyalanmaz
+FAISS_EF_SEARCH = 64 # HNSW sorgu genişliği: büyüdükçe recall artar, sorgu yavaşlar
+# Sharding: parçalar SHARD_COUNT yerel indekse bölünür, shard'lar paralel process'lerde kurulur,
+# sorgular tüm shard'lara eşzamanlı gider ve top-k benzerliğe göre birleştirilir (bkz. sharded_index.py)
+SHARDED_INDEX = False
+SHARD_COUNT = 4 # Değiştirilince mevcut shard'lar yeniden dengelenir
+SHARD_PARTITION = "hash" # "hash" (parça ID'si) veya "source" (aynı dosyanın parçaları aynı shard'da)
+SHARD_BUILD_WORKERS = os.cpu_count() or 1
+
+# Sıcak açılış: önceki çalıştırmada kurulan korpus diskten okunur, HF indirme / PDF ayrıştırma / bölme atlanır.
+# Veri setinin commit'i veya yerel PDF'ler (yol, boyut, mtime) değişince anlık görüntü otomatik yenilenir;
+# REFRESH_SNAPSHOT = True yine de bir kez soğuk açılışı zorlar.
+WARM_SNAPSHOT = True
+REFRESH_SNAPSHOT = False
+SNAPSHOT_DIRECTORY = ".cache/snapshot"
+# LLM arka planda yüklenirken arayüz açılır; sözlük ve önbellekteki cevaplar hemen servis edilir
+BACKGROUND_LLM_LOADING = True
 
 # Metin parçalama ayarları (PDF'ler için daha büyük parçalar daha iyi olabilir)
 CHUNK_SIZE = 800 # PDF'lerde genelde daha uzun cümleler/paragraflar olur
 CHUNK_OVERLAP = 150 # Parçalar arası bağlamı korumak için üst üste binme
+# Boş değilse parçalar bu tokenizer'ın token'larıyla ölçülür (CHUNK_SIZE_TOKENS); flan-t5'in girdi sınırı token cinsindendir
+CHUNK_TOKENIZER = ""
+CHUNK_SIZE_TOKENS = 256
+CHUNK_OVERLAP_TOKENS = 48
+# HF PDF'leri, ZIP içerikleri ve /content kopyalarından gelen aynı/neredeyse aynı parçalar indekslenmeden elenir
+DEDUPLICATION = True
+DEDUP_THRESHOLD = 0.9 # Tahmini Jaccard benzerliği eşiği (MinHash/LSH)
+DEDUP_NUM_PERM = 128
 
 # Retriever (Parça çekici) ayarları
 SEARCH_K = 4 # Daha fazla ilgili parça çekmek için artırdık
+# Hibrit arama: BM25 (birebir terim eşleşmesi) + vektör araması (anlamsal) sonuçları RRF ile birleştirilir
+HYBRID_SEARCH = True
+HYBRID_CANDIDATES = 20 # Her arayıcıdan birleştirme öncesi alınan aday sayısı
+# Yeniden sıralama: RERANK_CANDIDATES aday çekilir, cross-encoder puanıyla en iyi SEARCH_K tanesi prompt'a girer
+RERANKING = True
+RERANK_MODEL = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1" # Çok dilli, CPU'da hızlı
+RERANK_CANDIDATES = 30
+RERANK_BATCH_SIZE = 16
+RERANK_LATENCY_BUDGET_MS = 400 # Bütçe aşılacaksa kalan adaylar puanlanmadan arayıcı sırasıyla kalır
+# Bağlam sıkıştırma: parçalar cümlelere bölünür, soruya en ilgili cümleler LLM'in girdi sınırına sığdırılır.
+# flan-t5'in encoder'ı 512 token'dan fazlasını keser; sıkıştırma olmadan k parçanın sonu sessizce kaybolur.
+CONTEXT_COMPRESSION = True
+LLM_MAX_INPUT_TOKENS = 512 # Şablon + soru + bağlam için token sınırı (tokenizer ile ölçülür)
+CONTEXT_CHUNK_WEIGHT = 0.3 # Cümle puanında parçanın soruya benzerliğinin ağırlığı
+
+# "X nedir?" tipi sorular sözlükteki terimle eşleşirse LLM'e gitmeden doğrudan tanımla cevaplanır
+GLOSSARY_FAST_PATH = True
+
+# Anlamsal cevap önbelleği: benzer bir soru daha önce cevaplandıysa cevap tekrar üretilmez
+ANSWER_CACHE_PATH = ".cache/answer_cache.pkl" # Boş bırakılırsa önbellek kapalı
+ANSWER_CACHE_THRESHOLD = 0.92 # Kosinüs benzerliği eşiği (1'e yaklaştıkça daha katı)
+ANSWER_CACHE_TTL_SECONDS = 7 * 24 * 3600
+ANSWER_CACHE_MAX_ENTRIES = 1000
+
+# Colab'de dosyaların yüklendiği varsayılan dizin
+LOCAL_DATA_DIR = "/content/"
+
+# Ölçümler: aşama süreleri, arama/üretim gecikmeleri ve sayaçlar
+METRICS_PORT = 9108 # http://127.0.0.1:9108/metrics (Prometheus) ve /metrics.json; 0 ile kapatılır
+METRICS_JSON_LOG = "" # Boş değilse ölçümler METRICS_LOG_INTERVAL_SECONDS'ta bir bu dosyaya eklenir
+METRICS_LOG_INTERVAL_SECONDS = 60
+
+# Daha iyi Türkçe kullanım, noktalama ve cümleleri kesmeme için detaylı prompt
+template = """Sen, tedarik zinciri derslerine yardımcı olan, bilgilendirici ve açıklayıcı bir asistansın.
+    Aşağıda sana verilen "Bağlam" kısmındaki bilgileri kullanarak kullanıcının sorusunu Türkçe olarak, detaylı, akıcı, dilbilgisi kurallarına ve noktalama işaretlerine uygun bir şekilde cevapla.
+    Cevaplarını her zaman tam cümlelerle ve ilgili bilgileri birleştirerek oluştur. Cümleleri asla yarıda kesme.
+    Eğer verilen bağlamda doğrudan bir cevap bulamıyorsan, kibarca "Üzgünüm, bu konu hakkında mevcut bilgilerimde yeterli detay bulunmuyor." şeklinde cevap ver. Bağlam dışından bilgi uydurma.
 
-# API token ayarı
-if HUGGINGFACE_API_TOKEN:
-    os.environ["HUGGINGFACEHUB_API_TOKEN"] = HUGGINGFACE_API_TOKEN
-    print("Hugging Face API token başarıyla ayarlandı.")
-else:
-    print("Uyarı: Hugging Face API token ayarlanmadı. Bazı Hugging Face Hub modelleri kısıtlı olabilir.")
+    Bağlam:
+    {context}
+
+    Soru: {question}
+    Cevap:"""
 
-print("\nYapılandırma ayarları tamamlandı.")
+QA_CHAIN_PROMPT = PromptTemplate.from_template(template)
+
+# Aşamalar tarafından doldurulan paylaşılan durum
+glossary_index = None
+embeddings = None
+vectordb = None
+retriever = None
+reranker = None
+answer_cache = None
+tokenizer = None
+context_tokenizer = None  # Bağlam sıkıştırmada token saymak için ayrı kopya (üretimdeki tokenizer ile aynı anda kullanılabilir)
+model = None
+batcher = None  # MICRO_BATCHING açıkken hem RetrievalQA hem akışlı cevaplar bunun üzerinden üretilir
+qa_chain = None
+llm_ready = Event()  # LLM yüklemesi bittiğinde (başarılı veya hatalı) işaretlenir
+metrics_callback = MetricsCallbackHandler()  # RetrievalQA'nın retriever ve LLM sürelerini ölçer
+
+# Aşama adı -> saniye; açılışta her aşamanın süresi
+STARTUP_TIMINGS = {}
+
+
+@contextmanager
+def startup_stage(name):
+    """Bir açılış aşamasının süresini ölç ve STARTUP_TIMINGS'e kaydet."""
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS[name] = time.perf_counter() - start_time
+        METRICS.observe("chatbot_stage_seconds", STARTUP_TIMINGS[name], stage=name)
+        print(f"⏱️ {name}: {STARTUP_TIMINGS[name]:.2f} sn")
+
+
+def print_startup_timings():
+    print("\nAçılış süreleri:")
+    for name, seconds in STARTUP_TIMINGS.items():
+        print(f"  - {name}: {seconds:.2f} sn")
+
+
+def configure_environment():
+    # API token ayarı
+    if HUGGINGFACE_API_TOKEN:
+        os.environ["HUGGINGFACEHUB_API_TOKEN"] = HUGGINGFACE_API_TOKEN
+        print("Hugging Face API token başarıyla ayarlandı.")
+    else:
+        print("Uyarı: Hugging Face API token ayarlanmadı. Bazı Hugging Face Hub modelleri kısıtlı olabilir.")
+
+    print("\nYapılandırma ayarları tamamlandı.")
 
 # ==============================================================================
 # BÖLÜM 2: HUGGING FACE VERİ SETİNİ VE YEREL PDF/DİĞER DOSYALARI YÜKLE
 # ==============================================================================
-print(f"\n2. Veri kaynakları yükleniyor ve işleniyor...")
-all_documents = []
+@lru_cache(maxsize=None)
+def glossary_snapshot():
+    """Sözlük veri setinin sabitlenmiş anlık görüntüsü; açılış başına bir kez çözülür (yeni commit varsa indirilir)."""
+    from dataset_snapshot import ensure_snapshot
+
+    return ensure_snapshot(HUGGINGFACE_DATASET_NAME, DATASET_SNAPSHOT_DIR, HUGGINGFACE_DATASET_REVISION,
+                           offline=HF_OFFLINE)
 
-# --- Hugging Face Veri Setini Yükle (Terim/Tanım için) ---
-if HUGGINGFACE_DATASET_NAME:
+
+@lru_cache(maxsize=None)
+def glossary_revision():
+    """Sözlük veri setinin çözülmüş commit'i; çözülemezse None."""
     try:
-        dataset = load_dataset(HUGGINGFACE_DATASET_NAME)
-        print(f"Hugging Face veri seti '{HUGGINGFACE_DATASET_NAME}' başarıyla yüklendi.")
+        if DATASET_SNAPSHOT:
+            return glossary_snapshot().revision
+        from dataset_snapshot import resolve_revision
+
+        return resolve_revision(HUGGINGFACE_DATASET_NAME, HUGGINGFACE_DATASET_REVISION)
+    except Exception as e:
+        print(f"Uyarı: Hugging Face veri setinin sürümü çözülemedi ({type(e).__name__}: {e}).")
+        return None
+
+
+def load_glossary_dataset(all_documents, glossary_entries):
+    """Hugging Face terim/tanım veri setini Document'lara ve sözlük girdilerine çevir."""
+    try:
+        if DATASET_SNAPSHOT:
+            snapshot = glossary_snapshot()
+            dataset = {split: snapshot.split(split) for split in snapshot.splits}
+            print(f"Hugging Face veri seti '{HUGGINGFACE_DATASET_NAME}' yerel anlık görüntüden okundu "
+                  f"(commit {snapshot.revision[:8]}).")
+        else:
+            from datasets import load_dataset
+
+            dataset = load_dataset(HUGGINGFACE_DATASET_NAME)
+            print(f"Hugging Face veri seti '{HUGGINGFACE_DATASET_NAME}' başarıyla yüklendi.")
         print(f"Veri setindeki splitler: {list(dataset.keys())}")
 
         target_split = 'train'
@@ -98,13 +281,13 @@ if HUGGINGFACE_DATASET_NAME:
             for i, entry in enumerate(dataset[target_split]):
                 term = entry.get('term', '')
                 definition = entry.get('definition', '')
-                
+
                 document_content = ""
                 if term:
                     document_content += f"Terim: {term}\n"
                 if definition:
                     document_content += f"Tanım: {definition}\n"
-                
+
                 # Diğer sütunlar varsa buraya ekleyin:
                 # explanation = entry.get('explanation', '')
                 # if explanation:
@@ -119,227 +302,631 @@ if HUGGINGFACE_DATASET_NAME:
                         "term": term, # Terimi metadata olarak saklamak faydalı olabilir
                     }
                     all_documents.append(Document(page_content=document_content.strip(), metadata=metadata))
-        
+                    if term and definition:
+                        glossary_entries.append((term, definition, metadata["source"]))
+
     except Exception as e:
         print(f"Hugging Face veri seti yükleme veya işleme hatası: {e}")
         print("Lütfen HUGGINGFACE_DATASET_NAME'in doğru olduğundan ve erişilebilir olduğundan emin olun.")
 
-# --- Yerel PDF ve Diğer Dosyaları Yükle ---
-print("\nYerel PDF ve diğer ek dosyalar yükleniyor...")
-
-# Colab'e yüklediğiniz tüm PDF dosyalarının yollarını buraya ekleyin.
-# Colab'de dosya yükledikten sonra sol paneldeki dosya simgesine tıklayıp
-# dosya üzerinde sağ tıklayıp "Copy path" seçeneğini kullanabilirsiniz.
-# Veya tüm PDF'leri dinamik olarak bulabiliriz:
-local_data_dir = "/content/" # Colab'de dosyaların yüklendiği varsayılan dizin
-pdf_files = glob.glob(os.path.join(local_data_dir, '**', '*.pdf'), recursive=True)
-# .gitattributes ve .zip dosyalarını elemiyoruz
-pdf_files = [f for f in pdf_files if not os.path.basename(f).startswith('.git') and not f.endswith('.zip')]
-
-if not pdf_files:
-    print("Uyarı: Belirtilen dizinde hiç PDF dosyası bulunamadı. Lütfen yolları kontrol edin.")
-else:
-    print(f"Toplam {len(pdf_files)} PDF dosyası bulundu: {pdf_files}")
-
-# PDF yükleyicisi
-for file_path in pdf_files:
-    try:
-        # unstructured[pdf] kurulumu sayesinde UnstructuredFileLoader daha robusttur
-        loader = UnstructuredFileLoader(file_path)
-        docs = loader.load()
-        for doc in docs:
-            # Kaynak bilgisini daha açıklayıcı yapalım
-            doc.metadata['source'] = f"Yerel PDF: {os.path.basename(file_path)}"
-            all_documents.append(doc)
-        print(f"Yüklendi: {file_path}")
-    except Exception as e:
-        print(f"PDF yükleme hatası {file_path}: {e}")
 
-# Eğer Hugging Face'den veya yerel dosyalardan hiçbir belge yüklenememişse, manuel örnekleri ekle
-if not all_documents:
-    print("Önemli Uyarı: Hiçbir belge yüklenemedi. Chatbot boş bir bilgi tabanı ile çalışacaktır.")
-    print("Lütfen Hugging Face veri setinizi ve yerel dosyalarınızı kontrol edin.")
-    print("Test amacıyla manuel olarak örnek tedarik zinciri belgeleri ekleniyor...")
-    all_documents.append(Document(page_content="Tedarik zinciri, bir ürünün veya hizmetin ham maddeden son tüketiciye ulaşana kadar geçen tüm süreçlerini kapsar.", metadata={"source": "Manuel Eklenen Belge", "term": "Tedarik Zinciri"}))
-    all_documents.append(Document(page_content="Lojistik, ürünlerin ve hizmetlerin tedarik zinciri boyunca etkin ve verimli bir şekilde hareket etmesini yöneten süreçtir.", metadata={"source": "Manuel Eklenen Belge", "term": "Lojistik"}))
-    all_documents.append(Document(page_content="Envanter yönetimi, bir işletmenin stok seviyelerini optimize etme ve kontrol etme uygulamasıdır.", metadata={"source": "Manuel Eklenen Belge", "term": "Envanter Yönetimi"}))
-    all_documents.append(Document(page_content="Tedarik zinciri yönetiminin temel amacı, verimliliği artırmak ve maliyetleri düşürmektir.", metadata={"source": "Manuel Eklenen Belge", "term": "Tedarik Zinciri Amacı"}))
-    all_documents.append(Document(page_content="Yeşil tedarik zinciri yönetimi, çevresel sürdürülebilirliği tedarik zinciri süreçlerine entegre etmeyi hedefler.", metadata={"source": "Manuel Eklenen Belge", "term": "Yeşil Tedarik Zinciri"}))
+def find_local_pdfs():
+    """LOCAL_DATA_DIR altındaki PDF dosyaları (sıralı)."""
+    pdf_files = glob.glob(os.path.join(LOCAL_DATA_DIR, '**', '*.pdf'), recursive=True)
+    # .gitattributes ve .zip dosyalarını elemiyoruz
+    return sorted(f for f in pdf_files if not os.path.basename(f).startswith('.git') and not f.endswith('.zip'))
 
 
-print(f"Toplam {len(all_documents)} belge yüklendi.")
+def local_files_fingerprint():
+    """Yerel PDF'lerin [yol, boyut, mtime_ns] listesi; dosya eklenir, silinir veya değişirse değişir."""
+    fingerprint = []
+    for path in find_local_pdfs():
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        fingerprint.append([path, stat.st_size, stat.st_mtime_ns])
+    return fingerprint
+
+
+def load_local_pdfs(all_documents):
+    """
+    LOCAL_DATA_DIR altındaki PDF'leri sayfa sayfa yükle.
+
+    Çıkarma data_loader üzerinden yapılır: PyMuPDF -> pypdf -> PyPDF2 ->
+    unstructured sırasıyla denenir, dosyalar (büyük PDF'lerde sayfa aralıkları)
+    process havuzunda paralel işlenir ve sonuçlar önbelleğe alınır.
+    """
+    from data_loader import TutkuSupplyChainLoader, LocalFileDataset
+
+    print("\nYerel PDF ve diğer ek dosyalar yükleniyor...")
+
+    # Colab'e yüklediğiniz tüm PDF dosyalarının yollarını buraya ekleyin.
+    # Colab'de dosya yükledikten sonra sol paneldeki dosya simgesine tıklayıp
+    # dosya üzerinde sağ tıklayıp "Copy path" seçeneğini kullanabilirsiniz.
+    # Veya tüm PDF'leri dinamik olarak bulabiliriz:
+    pdf_files = find_local_pdfs()
+
+    if not pdf_files:
+        print("Uyarı: Belirtilen dizinde hiç PDF dosyası bulunamadı. Lütfen yolları kontrol edin.")
+    else:
+        print(f"Toplam {len(pdf_files)} PDF dosyası bulundu: {pdf_files}")
+
+    if not pdf_files:
+        return
+
+    # PDF yükleyicisi - her sayfa ayrı bir Document olur (metadata'da 'page')
+    loader = TutkuSupplyChainLoader()
+    loader.dataset = LocalFileDataset(pdf_files)
+    for doc in loader.process_dataset_files():
+        # Kaynak bilgisini daha açıklayıcı yapalım
+        metadata = doc.metadata
+        metadata['source'] = f"Yerel PDF: {os.path.basename(metadata['filename'])}"
+        all_documents.add(doc.page_content, metadata)
+    print(f"{len(pdf_files)} PDF dosyasından {len(loader.documents)} sayfa yüklendi.")
+
+
+def load_source_documents():
+    """
+    Tüm veri kaynaklarını yükle.
+
+    Returns:
+        tuple: (doküman deposu (ChunkStore), (terim, tanım, kaynak) listesi)
+    """
+    print(f"\n2. Veri kaynakları yükleniyor ve işleniyor...")
+    all_documents = ChunkStore()
+    glossary_entries = [] # (terim, tanım, kaynak) - sözlük hızlı yolu için
+
+    # --- Hugging Face Veri Setini Yükle (Terim/Tanım için) ---
+    if HUGGINGFACE_DATASET_NAME:
+        with startup_stage("HF veri seti"):
+            load_glossary_dataset(all_documents, glossary_entries)
+
+    # --- Yerel PDF ve Diğer Dosyaları Yükle ---
+    with startup_stage("Yerel PDF ayrıştırma"):
+        load_local_pdfs(all_documents)
+
+    # Eğer Hugging Face'den veya yerel dosyalardan hiçbir belge yüklenememişse, manuel örnekleri ekle
+    if not all_documents:
+        print("Önemli Uyarı: Hiçbir belge yüklenemedi. Chatbot boş bir bilgi tabanı ile çalışacaktır.")
+        print("Lütfen Hugging Face veri setinizi ve yerel dosyalarınızı kontrol edin.")
+        print("Test amacıyla manuel olarak örnek tedarik zinciri belgeleri ekleniyor...")
+        all_documents.append(Document(page_content="Tedarik zinciri, bir ürünün veya hizmetin ham maddeden son tüketiciye ulaşana kadar geçen tüm süreçlerini kapsar.", metadata={"source": "Manuel Eklenen Belge", "term": "Tedarik Zinciri"}))
+        all_documents.append(Document(page_content="Lojistik, ürünlerin ve hizmetlerin tedarik zinciri boyunca etkin ve verimli bir şekilde hareket etmesini yöneten süreçtir.", metadata={"source": "Manuel Eklenen Belge", "term": "Lojistik"}))
+        all_documents.append(Document(page_content="Envanter yönetimi, bir işletmenin stok seviyelerini optimize etme ve kontrol etme uygulamasıdır.", metadata={"source": "Manuel Eklenen Belge", "term": "Envanter Yönetimi"}))
+        all_documents.append(Document(page_content="Tedarik zinciri yönetiminin temel amacı, verimliliği artırmak ve maliyetleri düşürmektir.", metadata={"source": "Manuel Eklenen Belge", "term": "Tedarik Zinciri Amacı"}))
+        all_documents.append(Document(page_content="Yeşil tedarik zinciri yönetimi, çevresel sürdürülebilirliği tedarik zinciri süreçlerine entegre etmeyi hedefler.", metadata={"source": "Manuel Eklenen Belge", "term": "Yeşil Tedarik Zinciri"}))
+
+    print(f"Toplam {len(all_documents)} belge yüklendi.")
+    return all_documents, glossary_entries
 
 # ==============================================================================
 # BÖLÜM 3: METİNLERİ PARÇALARA BÖL (CHUNK ET)
 # Büyük metinleri daha küçük, yönetilebilir parçalara ayırma.
 # ==============================================================================
-print("\n3. Metinler parçalara bölünüyor...")
-text_splitter = RecursiveCharacterTextSplitter(
-    chunk_size=CHUNK_SIZE,
-    chunk_overlap=CHUNK_OVERLAP,
-    length_function=len,
-    add_start_index=True,
-)
-
-chunks = text_splitter.split_documents(all_documents)
-print(f"Toplam {len(chunks)} parça oluşturuldu.")
-print("İlk parça örneği:")
-if chunks:
-    print(chunks[0].page_content[:200] + "...")
-else:
-    print("Hiç parça oluşturulamadı. Lütfen belgelerinizi kontrol edin.")
+def split_into_chunks(all_documents):
+    print("\n3. Metinler parçalara bölünüyor...")
+    if CHUNK_TOKENIZER:
+        text_splitter = ChunkSplitter.from_tokenizer(
+            CHUNK_TOKENIZER,
+            chunk_size=CHUNK_SIZE_TOKENS,
+            chunk_overlap=CHUNK_OVERLAP_TOKENS,
+            add_start_index=True,
+        )
+    else:
+        text_splitter = ChunkSplitter(
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=CHUNK_OVERLAP,
+            add_start_index=True,
+        )
+
+    chunks = text_splitter.split_documents(all_documents)
+    print(f"Toplam {len(chunks)} parça oluşturuldu.")
+    print("İlk parça örneği:")
+    if chunks:
+        print(chunks[0].page_content[:200] + "...")
+    else:
+        print("Hiç parça oluşturulamadı. Lütfen belgelerinizi kontrol edin.")
+    return chunks
+
+
+def snapshot_settings():
+    """Korpusu etkileyen ayarlar; biri değişirse sıcak anlık görüntü kullanılmaz."""
+    settings = {
+        "hf_dataset": HUGGINGFACE_DATASET_NAME,
+        "local_data_dir": LOCAL_DATA_DIR,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "dedup": [DEDUP_THRESHOLD, DEDUP_NUM_PERM] if DEDUPLICATION else None,
+    }
+    # Kaynaklar değişince (yeni veri seti commit'i, eklenen/düzenlenen PDF) anlık görüntü kullanılmaz
+    if HUGGINGFACE_DATASET_NAME:
+        settings["hf_revision"] = glossary_revision()
+    settings["local_files"] = local_files_fingerprint()
+    if CHUNK_TOKENIZER:
+        settings["chunk_tokens"] = [CHUNK_TOKENIZER, CHUNK_SIZE_TOKENS, CHUNK_OVERLAP_TOKENS]
+    return settings
+
+
+def load_corpus():
+    """
+    Parçaları ve sözlük girdilerini hazırla: mümkünse sıcak anlık görüntüden,
+    değilse kaynaklardan yükleyip bölerek (ve anlık görüntüyü güncelleyerek).
+    """
+    if WARM_SNAPSHOT and not REFRESH_SNAPSHOT:
+        with startup_stage("Anlık görüntü okuma"):
+            snapshot = load_snapshot(SNAPSHOT_DIRECTORY, snapshot_settings())
+        if snapshot is not None:
+            age_hours = (time.time() - snapshot["created_at"]) / 3600
+            print(f"Sıcak açılış: {len(snapshot['chunks'])} parça anlık görüntüden okundu "
+                  f"({age_hours:.1f} saat önce oluşturulmuş).")
+            return snapshot["chunks"], snapshot["glossary_entries"]
+        print("Geçerli bir anlık görüntü bulunamadı, soğuk açılış yapılıyor.")
+
+    all_documents, glossary_entries = load_source_documents()
+    with startup_stage("Parçalama"):
+        chunks = split_into_chunks(all_documents)
+
+    if DEDUPLICATION:
+        with startup_stage("Tekrar eden parça eleme"):
+            chunks, dedup_stats = deduplicate_chunks(chunks, threshold=DEDUP_THRESHOLD, num_perm=DEDUP_NUM_PERM)
+        print(f"{dedup_stats['exact_duplicates']} birebir ve {dedup_stats['near_duplicates']} neredeyse aynı parça elendi; "
+              f"{dedup_stats['embeddings_saved']} embedding hesaplanmayacak. Kalan parça: {dedup_stats['kept']}.")
+
+    # Parçalar sütunsal depoya alınır; Document listesi ve kaynak dokümanlar bellekten bırakılır
+    chunks = ChunkStore.from_documents(chunks)
+    if WARM_SNAPSHOT:
+        with startup_stage("Anlık görüntü yazma"):
+            save_snapshot(SNAPSHOT_DIRECTORY, chunks, glossary_entries, snapshot_settings())
+    return chunks, glossary_entries
 
 # ==============================================================================
-# BÖLÜM 4: EMBEDDINGS OLUŞTUR VE VEKTÖR VERİTABANINA KAYDET (CHROMA)
+# BÖLÜM 4: EMBEDDINGS OLUŞTUR VE VEKTÖR VERİTABANINA KAYDET (CHROMA / FAISS)
 # Metin parçalarını vektörlere dönüştürme ve veritabanına indeksleme.
 # ==============================================================================
-print("\n4. Embeddings oluşturuluyor ve ChromaDB'ye kaydediliyor...")
-embeddings = HuggingFaceEmbeddings(model_name=EMBEDDINGS_MODEL_NAME)
-
-if os.path.exists(PERSIST_DIRECTORY):
-    print(f"Mevcut ChromaDB dizini '{PERSIST_DIRECTORY}' temizleniyor.")
-    shutil.rmtree(PERSIST_DIRECTORY)
-    
-if chunks:
-    vectordb = Chroma.from_documents(
-        documents=chunks,
-        embedding=embeddings,
-        persist_directory=PERSIST_DIRECTORY
+def create_embeddings():
+    """Embedding modelini tembel olarak sar; model ilk yeni metinde yüklenir."""
+    def load_model():
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+        with startup_stage("Embedding modeli yükleme"):
+            # Ölçüm sarmalayıcısı önbelleğin altında: sadece gerçek model çağrıları ölçülür
+            return InstrumentedEmbeddings(HuggingFaceEmbeddings(model_name=EMBEDDINGS_MODEL_NAME))
+
+    lazy_embeddings = LazyEmbeddings(load_model, EMBEDDINGS_MODEL_NAME, "HuggingFaceEmbeddings")
+    if not EMBEDDING_CACHE_DIR:
+        return lazy_embeddings
+    # Daha önce hesaplanan vektörler diskten okunur, sadece yeni metinler modele gider
+    return CachedEmbeddings(
+        lazy_embeddings,
+        cache_dir=EMBEDDING_CACHE_DIR,
+        dtype=EMBEDDING_CACHE_DTYPE,
+        batch_size=EMBEDDING_BATCH_SIZE,
+        query_cache_size=EMBEDDING_QUERY_CACHE_SIZE,
     )
-    vectordb.persist()
-    print(f"ChromaDB '{PERSIST_DIRECTORY}' dizinine kaydedildi. Toplam {len(chunks)} parça indekslendi.")
-else:
-    print("Uyarı: Hiç parça olmadığı için ChromaDB oluşturulamadı.")
-    # Hiç parça olmasa bile boş bir vektör veritabanı oluşturmak Gradio'nun çalışması için iyi.
-    vectordb = Chroma.from_documents(
-        documents=[Document(page_content="Genel bilgi için boş vektör veritabanı. Tedarik zinciri dersi asistanı için hazırlanmıştır.", metadata={"source": "Boş Veritabanı", "term": "Genel Bilgi"})],
-        embedding=embeddings,
-        persist_directory=PERSIST_DIRECTORY
+
+
+def vector_backend_options():
+    if VECTOR_BACKEND != "faiss":
+        return {}
+    return {"index_type": FAISS_INDEX_TYPE, "mmap": FAISS_MMAP, "ef_search": FAISS_EF_SEARCH}
+
+
+def build_vector_store(chunks):
+    backend_name = f"FAISS ({FAISS_INDEX_TYPE})" if VECTOR_BACKEND == "faiss" else "ChromaDB"
+    if SHARDED_INDEX:
+        backend_name += f", {SHARD_COUNT} shard"
+    print(f"\n4. Embeddings oluşturuluyor ve {backend_name} indeksine kaydediliyor...")
+    if not INCREMENTAL_INDEXING and os.path.exists(PERSIST_DIRECTORY):
+        print(f"Mevcut vektör veritabanı dizini '{PERSIST_DIRECTORY}' temizleniyor.")
+        shutil.rmtree(PERSIST_DIRECTORY)
+
+    # Sadece yeni/değişen parçalar embed edilir, silinenler indeksten çıkarılır.
+    if SHARDED_INDEX:
+        db, index_counts = build_sharded_index(
+            chunks, embeddings, PERSIST_DIRECTORY, SHARD_COUNT, partition=SHARD_PARTITION,
+            backend=VECTOR_BACKEND, backend_options=vector_backend_options(), workers=SHARD_BUILD_WORKERS,
+        )
+    else:
+        db, index_counts = build_or_update_index(
+            chunks, embeddings, PERSIST_DIRECTORY,
+            backend=VECTOR_BACKEND, backend_options=vector_backend_options(),
+        )
+    print(f"{backend_name} '{PERSIST_DIRECTORY}' güncellendi: {index_counts['added']} eklendi, "
+          f"{index_counts['deleted']} silindi, {index_counts['kept']} parça yeniden kullanıldı.")
+    if SHARDED_INDEX:
+        print(f"Shard başına parça: {index_counts['shards']} ({index_counts['moved']} parça yeniden dengelendi).")
+    return db
+
+
+def build_retriever(chunks):
+    global reranker
+
+    # Yeniden sıralama açıksa arayıcıdan SEARCH_K yerine RERANK_CANDIDATES aday istenir
+    candidate_k = RERANK_CANDIDATES if RERANKING else SEARCH_K
+    if HYBRID_SEARCH:
+        with startup_stage("BM25 indeksi"):
+            # BM25 indeksi chroma_db'nin yanında saklanır, parçalar değişmediyse diskten okunur
+            bm25_index = load_or_build_bm25(chunks, PERSIST_DIRECTORY)
+        print(f"BM25 indeksi hazır: {len(bm25_index)} parça, {len(bm25_index.postings)} terim.")
+        base_retriever = HybridRetriever(
+            vectorstore=vectordb,
+            bm25=bm25_index,
+            k=candidate_k,
+            dense_k=max(HYBRID_CANDIDATES, candidate_k),
+            sparse_k=max(HYBRID_CANDIDATES, candidate_k),
+        )
+    else:
+        base_retriever = vectordb.as_retriever(search_kwargs={"k": candidate_k})
+
+    if RERANKING:
+        # Cross-encoder ilk soruda (veya arka planda LLM'den önce) yüklenir
+        reranker = CrossEncoderReranker(
+            model_name=RERANK_MODEL,
+            batch_size=RERANK_BATCH_SIZE,
+            latency_budget_ms=RERANK_LATENCY_BUDGET_MS,
+        )
+        base_retriever = RerankingRetriever(base_retriever=base_retriever, reranker=reranker, top_n=SEARCH_K)
+
+    if not CONTEXT_COMPRESSION:
+        return base_retriever
+    compressor = ContextCompressor(
+        embeddings,
+        count_llm_tokens,
+        max_input_tokens=LLM_MAX_INPUT_TOKENS - 1, # Sondaki </s> token'ı
+        prompt=QA_CHAIN_PROMPT,
+        chunk_weight=CONTEXT_CHUNK_WEIGHT,
     )
-    vectordb.persist()
-    print("Boş bir ChromaDB oluşturuldu. Chatbot performansı etkilenebilir.")
+    return CompressingRetriever(base_retriever=base_retriever, compressor=compressor)
+
+
+def count_llm_tokens(text):
+    """Metnin LLM tokenizer'ındaki token sayısı; tokenizer yüklenene kadar kaba tahmin (~4 karakter/token)."""
+    if context_tokenizer is None:
+        return len(text) // 4 + 1
+    return len(context_tokenizer.encode(text, add_special_tokens=False))
+
+
+def initialize_retrieval():
+    """Bölüm 2-4: korpus, sözlük, embeddings, vektör indeksi, retriever ve cevap önbelleği."""
+    global glossary_index, embeddings, vectordb, retriever, answer_cache
+
+    chunks, glossary_entries = load_corpus()
+
+    if GLOSSARY_FAST_PATH and glossary_entries:
+        with startup_stage("Sözlük indeksi"):
+            glossary_index = GlossaryIndex(glossary_entries)
+        print(f"Sözlük hızlı yolu hazır: {len(glossary_index)} terim.")
+
+    if not chunks:
+        print("Uyarı: Hiç parça olmadığı için vektör veritabanı oluşturulamadı.")
+        # Hiç parça olmasa bile boş bir vektör veritabanı oluşturmak Gradio'nun çalışması için iyi.
+        chunks = [Document(page_content="Genel bilgi için boş vektör veritabanı. Tedarik zinciri dersi asistanı için hazırlanmıştır.", metadata={"source": "Boş Veritabanı", "term": "Genel Bilgi"})]
+        print("Boş bir vektör veritabanı oluşturuluyor. Chatbot performansı etkilenebilir.")
+
+    embeddings = create_embeddings()
+    with startup_stage("Vektör indeksi"):
+        vectordb = build_vector_store(chunks)
 
+    if ANSWER_CACHE_PATH:
+        with startup_stage("Cevap önbelleği"):
+            # İndeks, embedding modeli veya LLM değiştiyse eski cevaplar geçersiz olur
+            answer_cache = SemanticAnswerCache(
+                path=ANSWER_CACHE_PATH,
+                threshold=ANSWER_CACHE_THRESHOLD,
+                ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+                max_entries=ANSWER_CACHE_MAX_ENTRIES,
+                index_version=f"{index_fingerprint(chunks)}:{embedding_name(embeddings)}:{LLM_MODEL_NAME}",
+            )
+        print(f"Cevap önbelleği hazır: {answer_cache.stats()['entries']} kayıt.")
+
+    retriever = build_retriever(chunks)
 
 # ==============================================================================
 # BÖLÜM 5: CHATBOT ZİNCİRİNİ OLUŞTUR (RAG MİMARİSİ)
 # Kullanıcının sorusuna cevap verecek LLM ve Retriever'ı birleştirme.
 # ==============================================================================
-print("\n5. Chatbot zinciri oluşturuluyor...")
-
-try:
-    # Modelin Colab GPU'ya yüklendiğinden emin olmak için biraz daha verbose olalım
-    print(f"'{LLM_MODEL_NAME}' modeli ve tokenizer yükleniyor. Bu biraz zaman alabilir...")
-    tokenizer = AutoTokenizer.from_pretrained(LLM_MODEL_NAME)
-    model = AutoModelForSeq2SeqLM.from_pretrained(LLM_MODEL_NAME)
-    
-    # Modelin GPU'ya taşınması
-    if torch.cuda.is_available(): # PyTorch GPU kontrolü için 'import torch' gerekli
-        model.to("cuda")
-        print("Model GPU'ya taşındı.")
+def load_llm():
+    """LLM'i ve RetrievalQA zincirini kur; bittiğinde llm_ready işaretlenir."""
+    global tokenizer, context_tokenizer, model, batcher, qa_chain
+
+    print("\n5. Chatbot zinciri oluşturuluyor...")
+
+    try:
+        from transformers import AutoTokenizer, pipeline
+        from langchain.chains import RetrievalQA
+
+        # Embedding modeli küçüktür; önce onu ısıtmak yeni soruların önbellekte aranmasını hızlandırır
+        if isinstance(embeddings, CachedEmbeddings) and isinstance(embeddings.embeddings, LazyEmbeddings):
+            embeddings.embeddings.load()
+        if reranker is not None:
+            with startup_stage("Cross-encoder yükleme"):
+                reranker.load()
+
+        with startup_stage("LLM yükleme"):
+            # Modelin Colab GPU'ya yüklendiğinden emin olmak için biraz daha verbose olalım
+            print(f"'{LLM_MODEL_NAME}' modeli ve tokenizer yükleniyor. Bu biraz zaman alabilir...")
+            # GPU varsa model GPU'ya taşınır; LLM_RUNTIME ile CPU'da int8/ONNX çalışma zamanı seçilebilir
+            llm_tokenizer, llm_model, runtime = load_seq2seq(
+                LLM_MODEL_NAME, LLM_RUNTIME, num_threads=LLM_NUM_THREADS, export_dir=ONNX_EXPORT_DIR
+            )
+            if CONTEXT_COMPRESSION:
+                context_tokenizer = AutoTokenizer.from_pretrained(LLM_MODEL_NAME)
+
+            if llm_model.device.type == "cuda":
+                print("Model GPU'ya taşındı.")
+            else:
+                print(f"GPU bulunamadı veya kullanılamıyor, model CPU'da '{runtime}' çalışma zamanıyla "
+                      f"{LLM_NUM_THREADS} thread kullanarak çalışacak.")
+
+        if MICRO_BATCHING:
+            # Eşzamanlı istekler tek model çağrısında birleştirilir; sonuçlar çağıranlara dağıtılır
+            batcher = MicroBatcher(
+                Seq2SeqBatchGenerator(llm_model, llm_tokenizer, max_new_tokens=LLM_MAX_NEW_TOKENS, temperature=LLM_TEMPERATURE),
+                max_batch_size=MAX_BATCH_SIZE,
+                max_wait_ms=MAX_BATCH_WAIT_MS,
+            )
+            llm = BatchedLLM(batcher=batcher)
+            print(f"LLM modeli '{LLM_MODEL_NAME}' (mikro-batch, en fazla {MAX_BATCH_SIZE}) başarıyla yüklendi.")
+        else:
+            from langchain_community.llms import HuggingFacePipeline
+
+            pipe = pipeline(
+                "text2text-generation",
+                model=llm_model,
+                tokenizer=llm_tokenizer,
+                max_new_tokens=LLM_MAX_NEW_TOKENS, # Maksimum token sayısı
+                temperature=LLM_TEMPERATURE,
+                # num_beams=5, # Daha iyi sonuçlar için beam search eklenebilir, ama daha yavaş.
+                # early_stopping=True,
+                # device=0 if torch.cuda.is_available() else -1 # Pipeline'ı GPU'ya yönlendir
+            )
+            llm = HuggingFacePipeline(pipeline=pipe)
+            print(f"LLM modeli '{LLM_MODEL_NAME}' (HuggingFacePipeline ile) başarıyla yüklendi.")
+
+        chain = RetrievalQA.from_chain_type(
+            llm=llm,
+            chain_type="stuff", # 'stuff' yeterli gelmezse 'refine' veya 'map_reduce' deneyin.
+            retriever=retriever,
+            return_source_documents=True,
+            chain_type_kwargs={"prompt": QA_CHAIN_PROMPT}
+        )
+        tokenizer, model, qa_chain = llm_tokenizer, llm_model, chain
+        print("RetrievalQA zinciri başarıyla oluşturuldu.")
+
+    except Exception as e:
+        print(f"LLM veya RetrievalQA zinciri oluşturulurken bir hata oluştu: {e}")
+        print("Lütfen Hugging Face API anahtarınızın doğru olduğundan ve seçtiğiniz modelin erişilebilir olduğundan emin olun.")
+        print("Modelin Colab ortamında yeterli belleğe sahip olduğundan emin olun (GPU kullanımı).")
+        print("PyTorch'un (torch kütüphanesi) yüklü olduğundan emin olun.")
+        print("Devam etmek için dummy bir cevap fonksiyonu kullanılacaktır.")
+        qa_chain = None
+    finally:
+        llm_ready.set()
+
+    print("\nChatbot hazır.")
+
+
+def llm_unavailable_message():
+    if not llm_ready.is_set():
+        return "Dil modeli hâlâ yükleniyor. Tanım soruları ve daha önce sorulan sorular şimdiden cevaplanabilir; lütfen birkaç saniye sonra tekrar deneyin."
+    return "Chatbot başlatılamadı. Lütfen yapılandırma adımlarını kontrol edin ve tekrar deneyin."
+
+def get_glossary_response(question):
+    """Soru bilinen bir terimin tanımını soruyorsa cevabı doğrudan sözlükten döndür, yoksa None."""
+    if glossary_index is None:
+        return None
+    entry = glossary_index.lookup(question)
+    if entry is None:
+        return None
+    sources_info = "\n\n--- Kaynak Bilgileri ---\n"
+    sources_info += f"- {entry['term']} ({entry['source']})\n"
+    return f"{entry['term']}: {entry['definition']}" + sources_info
+
+def format_response(response_text, source_docs):
+    """Cevap metnine kaynak bilgilerini ekle."""
+    sources_info = ""
+    if source_docs:
+        sources_info = "\n\n--- Kaynak Bilgileri ---\n"
+        for i, doc in enumerate(source_docs):
+            source_name = doc.metadata.get('source', 'Bilinmiyor')
+            term_name = doc.metadata.get('term', None) # Metadata'daki terimi alıyoruz
+
+            # Kaynağı daha iyi temsil etmek için başlık/terim kullanıyoruz
+            source_display = f"{source_name}"
+            if term_name: # Eğer metadata'da terim varsa, onu da ekleyelim
+                source_display = f"{term_name} ({source_name})"
+            page = doc.metadata.get('page') # PDF sayfası (0 tabanlı)
+            if page is not None:
+                source_display += f", s. {page + 1}"
+
+            sources_info += f"- {source_display}\n"
+            # İlgili içeriğin tamamını değil, ilk 300 karakterini gösteriyoruz
+            # Kullanıcıya bir fikir vermesi için yeterli.
+            sources_info += f"  İlgili İçerik: {doc.page_content[:300]}...\n\n"
+
+    # Eğer model 'Üzgünüm' diye cevap verdiyse, kaynak göstermeyelim
+    if "üzgünüm" in response_text.lower() or "yeterli detay bulunmuyor" in response_text.lower():
+         return response_text
     else:
-        print("GPU bulunamadı veya kullanılamıyor, model CPU'da çalışacak. Bu yavaş olabilir.")
+         return response_text + sources_info
+
+def lookup_cached_answer(question):
+    """
+    Cevap önbelleğine bak.
+
+    Returns:
+        tuple: (soru vektörü veya None, önbellekteki biçimlenmiş cevap veya None)
+    """
+    if answer_cache is None:
+        return None, None
+    query_vector = embeddings.embed_query(question)
+    cached = answer_cache.lookup(query_vector)
+    if cached is None:
+        return query_vector, None
+    return query_vector, format_response(cached["answer"], cached["sources"])
 
+def get_chatbot_response(question):
+    # Tanım soruları için LLM'e gitmeden sözlükten cevap ver
+    glossary_answer = get_glossary_response(question)
+    if glossary_answer is not None:
+        METRICS.inc("chatbot_questions_total", path="glossary")
+        return glossary_answer
 
-    pipe = pipeline(
-        "text2text-generation",
-        model=model,
-        tokenizer=tokenizer,
-        max_new_tokens=LLM_MAX_NEW_TOKENS, # Maksimum token sayısı
+    try:
+        # Benzer bir soru daha önce cevaplandıysa önbellekten dön (LLM yüklenirken de çalışır)
+        query_vector, cached_answer = lookup_cached_answer(question)
+        if cached_answer is not None:
+            METRICS.inc("chatbot_questions_total", path="answer_cache")
+            return cached_answer
+
+        if not qa_chain:
+            METRICS.inc("chatbot_questions_total", path="unavailable")
+            return llm_unavailable_message()
+
+        METRICS.inc("chatbot_questions_total", path="llm")
+        # Callback retriever ve LLM alt çağrılarının sürelerini ölçer
+        result = qa_chain({"query": question}, callbacks=[metrics_callback])
+        response_text = result["result"].strip()
+        source_docs = result.get("source_documents", [])
+
+        if answer_cache is not None:
+            answer_cache.put(question, query_vector, response_text, source_docs)
+
+        return format_response(response_text, source_docs)
+    except Exception as e:
+        METRICS.inc("chatbot_errors_total", stage="answer")
+        return f"Cevap üretilirken bir hata oluştu: {e}"
+
+def stream_llm_answer(prompt):
+    """Yerel modelden üretilen metni parça parça döndüren generator (mikro-batch veya TextIteratorStreamer ile)."""
+    if batcher is not None:
+        # Eşzamanlı akışlı istekler aynı batch'te üretilir; her biri kendi token'larını alır
+        yield from batcher.stream(prompt)
+        return
+
+    from transformers import TextIteratorStreamer
+
+    inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True,
+                                    timeout=STREAM_TOKEN_TIMEOUT_SECONDS)
+    generation_kwargs = dict(
+        **inputs,
+        streamer=streamer,
+        max_new_tokens=LLM_MAX_NEW_TOKENS,
         temperature=LLM_TEMPERATURE,
-        # num_beams=5, # Daha iyi sonuçlar için beam search eklenebilir, ama daha yavaş.
-        # early_stopping=True,
-        # device=0 if torch.cuda.is_available() else -1 # Pipeline'ı GPU'ya yönlendir
     )
+    errors = []
 
-    llm = HuggingFacePipeline(pipeline=pipe)
-    print(f"LLM modeli '{LLM_MODEL_NAME}' (HuggingFacePipeline ile) başarıyla yüklendi.")
+    def generate():
+        try:
+            model.generate(**generation_kwargs)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            # generate() hata verse de akış sonlanır; aşağıdaki döngü sonsuza kadar beklemez
+            streamer.end()
+
+    # generate() ayrı thread'de çalışır, streamer ürettiği token'ları buraya aktarır
+    thread = Thread(target=generate, daemon=True)
+    thread.start()
+    try:
+        for new_text in streamer:
+            yield new_text
+    except queue.Empty:
+        raise TimeoutError(f"Model {STREAM_TOKEN_TIMEOUT_SECONDS} sn içinde yeni token üretmedi") from None
+    thread.join()
+    if errors:
+        raise errors[0]
+
+def stream_chatbot_response(question):
+    """get_chatbot_response'un akışlı hali: kısmi cevabı üretildikçe döndürür, kaynaklar en sonda eklenir."""
+    glossary_answer = get_glossary_response(question)
+    if glossary_answer is not None:
+        METRICS.inc("chatbot_questions_total", path="glossary")
+        yield glossary_answer
+        return
 
-    retriever = vectordb.as_retriever(search_kwargs={"k": SEARCH_K})
+    try:
+        query_vector, cached_answer = lookup_cached_answer(question)
+        if cached_answer is not None:
+            METRICS.inc("chatbot_questions_total", path="answer_cache")
+            yield cached_answer
+            return
+
+        if not qa_chain:
+            METRICS.inc("chatbot_questions_total", path="unavailable")
+            yield llm_unavailable_message()
+            return
+
+        METRICS.inc("chatbot_questions_total", path="llm")
+        with METRICS.time("chatbot_retrieval_seconds"):
+            source_docs = retriever.get_relevant_documents(question)
+        with METRICS.time("chatbot_prompt_seconds"):
+            # 'stuff' zincirinin yaptığı gibi parçaları art arda bağlama koy
+            context = "\n\n".join(doc.page_content for doc in source_docs)
+            prompt = QA_CHAIN_PROMPT.format(context=context, question=question)
+
+        start_time = time.perf_counter()
+        first_token_time = None
+        response_text = ""
+        for new_text in stream_llm_answer(prompt):
+            if first_token_time is None and new_text:
+                first_token_time = time.perf_counter() - start_time
+                METRICS.observe("chatbot_llm_ttft_seconds", first_token_time)
+                print(f"İlk token süresi (TTFT): {first_token_time * 1000:.0f} ms")
+            response_text += new_text
+            yield response_text
+        METRICS.observe("chatbot_llm_seconds", time.perf_counter() - start_time)
+        print(f"Cevap üretim süresi: {time.perf_counter() - start_time:.2f} sn")
+
+        response_text = response_text.strip()
+        if answer_cache is not None:
+            answer_cache.put(question, query_vector, response_text, source_docs)
+        yield format_response(response_text, source_docs)
+    except Exception as e:
+        METRICS.inc("chatbot_errors_total", stage="answer")
+        yield f"Cevap üretilirken bir hata oluştu: {e}"
 
-    # Daha iyi Türkçe kullanım, noktalama ve cümleleri kesmeme için detaylı prompt
-    template = """Sen, tedarik zinciri derslerine yardımcı olan, bilgilendirici ve açıklayıcı bir asistansın.
-    Aşağıda sana verilen "Bağlam" kısmındaki bilgileri kullanarak kullanıcının sorusunu Türkçe olarak, detaylı, akıcı, dilbilgisi kurallarına ve noktalama işaretlerine uygun bir şekilde cevapla.
-    Cevaplarını her zaman tam cümlelerle ve ilgili bilgileri birleştirerek oluştur. Cümleleri asla yarıda kesme.
-    Eğer verilen bağlamda doğrudan bir cevap bulamıyorsan, kibarca "Üzgünüm, bu konu hakkında mevcut bilgilerimde yeterli detay bulunmuyor." şeklinde cevap ver. Bağlam dışından bilgi uydurma.
+# ==============================================================================
+# BÖLÜM 6: BASİT BİR WEB ARAYÜZÜ OLUŞTUR (GRADIO)
+# Chatbot'u kullanıcı etkileşimine açmak için web arayüzü.
+# ==============================================================================
+def launch_ui():
+    import gradio as gr
 
-    Bağlam:
-    {context}
+    print("\n6. Gradio web arayüzü başlatılıyor...")
 
-    Soru: {question}
-    Cevap:"""
-    
-    QA_CHAIN_PROMPT = PromptTemplate.from_template(template)
-
-    qa_chain = RetrievalQA.from_chain_type(
-        llm=llm,
-        chain_type="stuff", # 'stuff' yeterli gelmezse 'refine' veya 'map_reduce' deneyin.
-        retriever=retriever,
-        return_source_documents=True,
-        chain_type_kwargs={"prompt": QA_CHAIN_PROMPT}
+    iface = gr.Interface(
+        fn=stream_chatbot_response if STREAMING_RESPONSES else get_chatbot_response,
+        inputs=gr.Textbox(lines=3, placeholder="Tedarik zinciri dersi hakkında bir soru sorun...", label="Sorunuz"),
+        outputs=gr.Textbox(lines=12, label="Chatbot Cevabı"), # Çıkış kutusunu biraz daha büyüttük
+        title="Tedarik Zinciri Dersi Asistanı Chatbot (RAG)",
+        description="Hugging Face veri setinden ve yerel PDF'lerden bilgi çeken bir RAG tabanlı tedarik zinciri dersi asistanı. Lütfen sorularınızı net ve Türkçe olarak sorun!"
     )
-    print("RetrievalQA zinciri başarıyla oluşturuldu.")
 
-except Exception as e:
-    print(f"LLM veya RetrievalQA zinciri oluşturulurken bir hata oluştu: {e}")
-    print("Lütfen Hugging Face API anahtarınızın doğru olduğundan ve seçtiğiniz modelin erişilebilir olduğundan emin olun.")
-    print("Modelin Colab ortamında yeterli belleğe sahip olduğundan emin olun (GPU kullanımı).")
-    print("PyTorch'un (torch kütüphanesi) yüklü olduğundan emin olun.")
-    print("Devam etmek için dummy bir cevap fonksiyonu kullanılacaktır.")
-    qa_chain = None
+    # Generator fonksiyonlarla akışlı çıktı ve mikro-batch'in dolması için Gradio kuyruğu gerekli
+    iface.queue(default_concurrency_limit=GRADIO_CONCURRENCY_LIMIT).launch(share=True)
+    print("\nGradio arayüzü başlatıldı. Lütfen yukarıdaki Public URL'yi kontrol edin.")
+    print("\nColab ortamında Gradio arayüzünü kapatmak için bu hücrenin çalışmasını durdurmanız yeterlidir.")
 
-def get_chatbot_response(question):
-    if qa_chain:
-        try:
-            result = qa_chain({"query": question})
-            response_text = result["result"].strip()
-            source_docs = result.get("source_documents", [])
-            
-            sources_info = ""
-            if source_docs:
-                sources_info = "\n\n--- Kaynak Bilgileri ---\n"
-                for i, doc in enumerate(source_docs):
-                    source_name = doc.metadata.get('source', 'Bilinmiyor')
-                    term_name = doc.metadata.get('term', None) # Metadata'daki terimi alıyoruz
-                    
-                    # Kaynağı daha iyi temsil etmek için başlık/terim kullanıyoruz
-                    source_display = f"{source_name}"
-                    if term_name: # Eğer metadata'da terim varsa, onu da ekleyelim
-                        source_display = f"{term_name} ({source_name})"
-                    
-                    sources_info += f"- {source_display}\n"
-                    # İlgili içeriğin tamamını değil, ilk 300 karakterini gösteriyoruz
-                    # Kullanıcıya bir fikir vermesi için yeterli.
-                    sources_info += f"  İlgili İçerik: {doc.page_content[:300]}...\n\n"
-            
-            # Eğer model 'Üzgünüm' diye cevap verdiyse, kaynak göstermeyelim
-            if "üzgünüm" in response_text.lower() or "yeterli detay bulunmuyor" in response_text.lower():
-                 return response_text
-            else:
-                 return response_text + sources_info
-        except Exception as e:
-            return f"Cevap üretilirken bir hata oluştu: {e}"
+
+def main():
+    configure_environment()
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT)
+    if METRICS_JSON_LOG:
+        start_json_log(METRICS_JSON_LOG, METRICS_LOG_INTERVAL_SECONDS)
+    initialize_retrieval()
+
+    if BACKGROUND_LLM_LOADING:
+        # Arayüz hemen açılır; LLM hazır olana kadar sözlük ve önbellek cevapları servis edilir
+        Thread(target=load_llm, name="llm-loader", daemon=True).start()
     else:
-        return "Chatbot başlatılamadı. Lütfen yapılandırma adımlarını kontrol edin ve tekrar deneyin."
+        load_llm()
 
-print("\nChatbot hazır.")
+    print_startup_timings()
+    launch_ui()
 
-# ==============================================================================
-# BÖLÜM 6: BASİT BİR WEB ARAYÜZÜ OLUŞTUR (GRADIO)
-# Chatbot'u kullanıcı etkileşimine açmak için web arayüzü.
-# ==============================================================================
-print("\n6. Gradio web arayüzü başlatılıyor...")
-
-iface = gr.Interface(
-    fn=get_chatbot_response,
-    inputs=gr.Textbox(lines=3, placeholder="Tedarik zinciri dersi hakkında bir soru sorun...", label="Sorunuz"),
-    outputs=gr.Textbox(lines=12, label="Chatbot Cevabı"), # Çıkış kutusunu biraz daha büyüttük
-    title="Tedarik Zinciri Dersi Asistanı Chatbot (RAG)",
-    description="Hugging Face veri setinden ve yerel PDF'lerden bilgi çeken bir RAG tabanlı tedarik zinciri dersi asistanı. Lütfen sorularınızı net ve Türkçe olarak sorun!"
-)
-
-iface.launch(share=True)
-print("\nGradio arayüzü başlatıldı. Lütfen yukarıdaki Public URL'yi kontrol edin.")
-print("\nColab ortamında Gradio arayüzünü kapatmak için bu hücrenin çalışmasını durdurmanız yeterlidir.")
-
-         
-          
+
+if __name__ == "__main__":
+    main()
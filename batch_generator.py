@@ -0,0 +1,233 @@
+"""
+BATCH_GENERATOR.PY - YEREL LLM İÇİN MİKRO-BATCH ZAMANLAYICI
+
+Gradio'ya aynı anda gelen soruları birkaç milisaniye boyunca toplar,
+padding ile tek bir batch haline getirip modelden tek seferde geçirir ve
+her sonucu kendi çağıranına geri verir. Tek tek üretime göre CPU/GPU
+çok daha verimli kullanılır.
+
+- MicroBatcher: modelden bağımsız kuyruk + arka plan thread'i
+- TextStream: akışlı isteklerin parça parça metnini çağırana taşıyan iterator
+- Seq2SeqBatchGenerator: flan-t5 gibi seq2seq modeller için batch üretimi
+  (istek başına TextStream'lerle akışlı da çalışır)
+- BatchedLLM: RetrievalQA'ya doğrudan verilebilen LangChain LLM sarmalayıcısı
+"""
+
+import inspect
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, List, Optional
+
+try:
+    from langchain_core.language_models.llms import LLM
+except ImportError:
+    from langchain.llms.base import LLM
+
+
+class MicroBatcher:
+    def __init__(self, generate_batch, max_batch_size=8, max_wait_ms=10):
+        """
+        Args:
+            generate_batch: prompt listesi alıp aynı sırada çıktı listesi döndüren fonksiyon
+            max_batch_size: Tek batch'teki maksimum prompt sayısı
+            max_wait_ms: İlk prompt geldikten sonra batch'i doldurmak için beklenecek süre
+        """
+        self.generate_batch = generate_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batch_sizes = []   # İstatistik: çalıştırılan batch boyutları
+
+        self._queue = queue.Queue()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._worker, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, prompt, stream=None):
+        """
+        Prompt'u kuyruğa ekle; sonucu taşıyan bir Future döndür.
+
+        stream (TextStream) verilirse üretilen metin, batch'teki diğer
+        isteklerle birlikte üretilirken bu akışa parça parça yazılır.
+        """
+        if self._stopped:
+            raise RuntimeError("MicroBatcher durduruldu")
+        future = Future()
+        self._queue.put((prompt, future, stream))
+        return future
+
+    def generate(self, prompt, timeout=None):
+        """Prompt'u kuyruğa ekle ve sonucu bekle"""
+        return self.submit(prompt).result(timeout=timeout)
+
+    def stream(self, prompt):
+        """Prompt'u kuyruğa ekle; üretilen metni parça parça döndüren generator"""
+        text_stream = TextStream()
+        future = self.submit(prompt, text_stream)
+        yield from text_stream
+        future.result()  # Batch hatası akış bittikten sonra da çağırana ulaşsın
+
+    def _collect_batch(self):
+        """İlk isteği bekle, sonra max_wait dolana veya batch dolana kadar topla"""
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # Durdurma sinyalini döngü için geri koy
+                break
+            batch.append(item)
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                return
+            prompts = [prompt for prompt, _, _ in batch]
+            streams = [stream for _, _, stream in batch]
+            self.batch_sizes.append(len(batch))
+            try:
+                if any(streams) and self._streams_supported():
+                    outputs = self.generate_batch(prompts, streams=streams)
+                else:
+                    outputs = self.generate_batch(prompts)
+                outputs = list(outputs)
+                if len(outputs) != len(batch):
+                    raise RuntimeError(f"Üretici {len(batch)} prompt için {len(outputs)} çıktı döndürdü")
+                for (_, future, stream), output in zip(batch, outputs):
+                    if stream is not None:
+                        # Akışsız üreticide cevap tek parça olarak gelir
+                        if not stream.written:
+                            stream.put(output)
+                        stream.end()
+                    future.set_result(output)
+            except Exception as e:
+                # Batch başarısızsa hata o batch'teki (henüz sonuç almamış) tüm çağıranlara iletilir;
+                # sonuçlanmış bir Future'a tekrar yazmak worker thread'ini öldürürdü
+                for _, future, stream in batch:
+                    if future.done():
+                        continue
+                    if stream is not None:
+                        stream.end()
+                    future.set_exception(e)
+
+    def _streams_supported(self):
+        """generate_batch 'streams' argümanını kabul ediyor mu (ör. Seq2SeqBatchGenerator)"""
+        try:
+            return "streams" in inspect.signature(self.generate_batch).parameters
+        except (TypeError, ValueError):
+            return False
+
+    def stop(self):
+        self._stopped = True
+        self._queue.put(None)
+        self._thread.join()
+
+
+class TextStream:
+    """Tek bir isteğin üretilen metin parçalarını taşıyan, thread'ler arası iterator"""
+
+    _END = object()
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self.written = False
+
+    def put(self, text):
+        if text:
+            self.written = True
+            self._queue.put(text)
+
+    def end(self):
+        self._queue.put(self._END)
+
+    def __iter__(self):
+        while True:
+            text = self._queue.get()
+            if text is self._END:
+                return
+            yield text
+
+
+class _BatchStreamer:
+    """
+    generate()'in streamer arayüzü (put/end): her adımda gelen batch token'larını
+    satır satır çözer ve ilgili isteğin TextStream'ine sadece yeni metni yazar.
+    """
+
+    def __init__(self, tokenizer, streams):
+        self.tokenizer = tokenizer
+        self.streams = streams
+        self.token_ids = [[] for _ in streams]
+        self.printed = [0] * len(streams)
+        self.started = False
+
+    def put(self, value):
+        if not self.started:
+            # İlk çağrı decoder'ın başlangıç token'larıdır, metin değildir
+            self.started = True
+            return
+        for row, token_id in enumerate(value.reshape(len(self.streams), -1)[:, -1].tolist()):
+            stream = self.streams[row]
+            if stream is None:
+                continue
+            self.token_ids[row].append(token_id)
+            text = self.tokenizer.decode(self.token_ids[row], skip_special_tokens=True)
+            # Yarım kalan çok baytlı karakter bir sonraki token'la tamamlanır
+            if len(text) > self.printed[row] and not text.endswith("\ufffd"):
+                stream.put(text[self.printed[row]:])
+                self.printed[row] = len(text)
+
+    def end(self):
+        for row, stream in enumerate(self.streams):
+            if stream is None:
+                continue
+            text = self.tokenizer.decode(self.token_ids[row], skip_special_tokens=True)
+            stream.put(text[self.printed[row]:])
+            self.printed[row] = len(text)
+
+
+class Seq2SeqBatchGenerator:
+    """Tokenizer + seq2seq model ile padding'li batch üretimi"""
+
+    def __init__(self, model, tokenizer, **generate_kwargs):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.generate_kwargs = generate_kwargs
+
+    def __call__(self, prompts, streams=None):
+        import torch
+
+        generate_kwargs = dict(self.generate_kwargs)
+        if streams is not None:
+            # Batch tek generate() çağrısında üretilir; token'lar istek başına akışlara dağıtılır
+            generate_kwargs["streamer"] = _BatchStreamer(self.tokenizer, streams)
+        inputs = self.tokenizer(prompts, padding=True, return_tensors="pt").to(self.model.device)
+        with torch.inference_mode():
+            output_ids = self.model.generate(**inputs, **generate_kwargs)
+        return self.tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+
+
+class BatchedLLM(LLM):
+    """Her çağrıyı MicroBatcher üzerinden geçiren LangChain LLM'i"""
+
+    batcher: Any
+    timeout: Optional[float] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "micro_batched"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> str:
+        return self.batcher.generate(prompt, timeout=self.timeout)
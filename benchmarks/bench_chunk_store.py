@@ -0,0 +1,144 @@
+"""
+BENCH_CHUNK_STORE.PY - DOCUMENT LİSTESİ VE SÜTUNSAL CHUNK STORE KARŞILAŞTIRMASI
+
+Aynı sentetik parçaları (sayfa başına bir PDF parçası gibi metadata ile)
+iki biçimde tutar ve raporlar:
+
+    Document listesi : Her parça ayrı Document + metadata sözlüğü (eski hal)
+    ChunkStore       : UTF-8 tamponu + ofsetler + intern'lenmiş kod sütunları
+    ChunkStore mmap  : save() + load(mmap_mode=True); metin heap'te değil
+
+Her biri için Python heap'inde tutulan bellek (tracemalloc), kurma/yükleme
+süresi, istatistik geçişi (dosya sayıları + toplam karakter) ve rastgele
+1000 parça okuma süresi ölçülür.
+
+Kullanım:
+    python benchmarks/bench_chunk_store.py --chunks 100000
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+from langchain.schema import Document  # noqa: E402
+
+from benchmarks.synthetic_data import WORDS  # noqa: E402
+from chunk_store import ChunkStore  # noqa: E402
+
+
+def make_chunks(n_chunks, chunk_chars, seed=3):
+    """(metin, metadata) üreteci; 40 sayfalık PDF'lerin sayfa parçaları gibi"""
+    rng = random.Random(seed)
+    for i in range(n_chunks):
+        words = []
+        while sum(len(word) + 1 for word in words) < chunk_chars:
+            words.append(rng.choice(WORDS))
+        file_number = i // 40
+        yield " ".join(words), {
+            "source": f"dataset_pdf_{file_number}",
+            "filename": f"ders_{file_number}.pdf",
+            "type": "pdf",
+            "page": i % 40,
+            "start_index": 0,
+        }
+
+
+def list_stats(documents):
+    """Eski get_dataset_stats: Python nesneleri üzerinde küme + toplam"""
+    files = {(d.metadata.get("type"), d.metadata.get("source"), d.metadata.get("filename")) for d in documents}
+    return len(files), sum(len(d.page_content) for d in documents)
+
+
+def store_stats(store):
+    files = store.distinct(("type", "source", "filename"))
+    return len(files), store.char_count()
+
+
+def measure(build):
+    """(sonuç, heap'te kalan MB, süre sn)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current / 2 ** 20, elapsed
+
+
+def timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def random_reads(collection, n_reads=1000, seed=5):
+    rng = random.Random(seed)
+    indices = [rng.randrange(len(collection)) for _ in range(n_reads)]
+    start = time.perf_counter()
+    for index in indices:
+        doc = collection[index]
+        doc.page_content, doc.metadata
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=50000)
+    parser.add_argument("--chunk-chars", type=int, default=800)
+    args = parser.parse_args()
+
+    text_mb = sum(len(text.encode("utf-8")) for text, _ in make_chunks(args.chunks, args.chunk_chars)) / 2 ** 20
+    print(f"📚 {args.chunks} parça, {text_mb:.1f} MB UTF-8 metin\n")
+    print(f"{'biçim':<18}{'heap (MB)':>11}{'kurma (sn)':>12}{'istatistik (ms)':>17}{'1000 okuma (ms)':>17}")
+
+    # Her iki biçim de üreteçten kurulur: heap ölçümüne metnin kendisi de girer
+    documents, heap, build_seconds = measure(
+        lambda: [Document(page_content=text, metadata=metadata)
+                 for text, metadata in make_chunks(args.chunks, args.chunk_chars)]
+    )
+    expected, stats_seconds = timed(lambda: list_stats(documents))
+    print(f"{'Document listesi':<18}{heap:>11.1f}{build_seconds:>12.2f}{stats_seconds * 1000:>17.1f}"
+          f"{random_reads(documents):>17.2f}")
+
+    def build_store():
+        store = ChunkStore()
+        for text, metadata in make_chunks(args.chunks, args.chunk_chars):
+            store.add(text, metadata)
+        return store
+
+    store, heap, build_seconds = measure(build_store)
+    result, stats_seconds = timed(lambda: store_stats(store))
+    assert result == expected, (result, expected)
+    print(f"{'ChunkStore':<18}{heap:>11.1f}{build_seconds:>12.2f}{stats_seconds * 1000:>17.1f}"
+          f"{random_reads(store):>17.2f}")
+    del documents
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store.save(tmp_dir)
+        del store
+        mapped, heap, load_seconds = measure(lambda: ChunkStore.load(tmp_dir))
+        result, stats_seconds = timed(lambda: store_stats(mapped))
+        assert result == expected, (result, expected)
+        print(f"{'ChunkStore mmap':<18}{heap:>11.1f}{load_seconds:>12.2f}{stats_seconds * 1000:>17.1f}"
+              f"{random_reads(mapped):>17.2f}")
+        codes_mb = sum(np.asarray(mapped.codes(key)).nbytes for key in mapped.keys) / 2 ** 20
+        print(f"\n(mmap: {mapped.text_bytes() / 2 ** 20:.1f} MB metin ve {codes_mb:.1f} MB kod sütunu "
+              f"sayfa önbelleğinden okunur, heap'e kopyalanmaz)")
+        del mapped
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+BENCH_CONTEXT_COMPRESSION.PY - BAĞLAM SIKIŞTIRMA: TOKEN, GECİKME VE CEVAP CÜMLESİ
+
+Her sözlük sorusu için k adet ~800 karakterlik parça üretilir; terimin tanım
+cümlesi (cevabı taşıyan cümle) rastgele bir parçanın rastgele bir yerine
+gömülür. İki kurulum karşılaştırılır:
+
+    kesme      : Parçalar olduğu gibi prompt'a girer, model girdi sınırından
+                 sonrasını keser (mevcut "stuff" davranışı)
+    sıkıştırma : ContextCompressor en ilgili cümleleri aynı sınıra sığdırır
+
+Her biri için prompt token sayısı ve tanım cümlesinin modelin gördüğü kısımda
+kalma oranı, sıkıştırma için de ek gecikme (p50/p95) yazdırılır. Token'lar
+--tokenizer ile verilen gerçek tokenizer ile sayılır (transformers yüklü
+değilse ~4 karakter/token tahminine düşülür). --model verilirse (örn.
+google/flan-t5-small) iki prompt'un üretim süresi de ölçülür.
+
+Kullanım:
+    python benchmarks/bench_context_compression.py --k 4
+    python benchmarks/bench_context_compression.py --model google/flan-t5-small --new-tokens 32
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.schema import Document  # noqa: E402
+
+from app import QA_CHAIN_PROMPT  # noqa: E402
+from benchmarks.eval_hybrid_retrieval import percentile  # noqa: E402
+from benchmarks.synthetic_data import GLOSSARY, WORDS, HashingEmbeddings  # noqa: E402
+from context_compressor import DOCUMENT_SEPARATOR, ContextCompressor  # noqa: E402
+
+
+def filler_sentence(rng, n_words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(n_words)).capitalize() + "."
+
+
+def make_case(rng, term, definition, k, chunk_chars):
+    """k parça; tanım cümlesi rastgele bir parçanın rastgele bir cümlesi olur"""
+    chunks = []
+    for _ in range(k):
+        sentences = []
+        while sum(len(s) + 1 for s in sentences) < chunk_chars:
+            sentences.append(filler_sentence(rng))
+        chunks.append(sentences)
+    answer = f"{term}: {definition}"
+    target = rng.randrange(k)
+    chunks[target].insert(rng.randrange(len(chunks[target]) + 1), answer)
+    documents = [Document(page_content=" ".join(sentences), metadata={"source": f"chunk_{i}"})
+                 for i, sentences in enumerate(chunks)]
+    return documents, answer
+
+
+def load_token_counter(name):
+    """(token sayan fonksiyon, encode/decode yapan tokenizer veya None)"""
+    try:
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(name)
+    except Exception as e:
+        print(f"⚠️ Tokenizer yüklenemedi ({e}); ~4 karakter/token tahmini kullanılacak.\n")
+        return lambda text: len(text) // 4 + 1, None
+    return lambda text: len(tokenizer.encode(text, add_special_tokens=False)), tokenizer
+
+
+def visible_prompt(prompt, tokenizer, max_tokens):
+    """Modelin girdi sınırından sonrasını kesince gördüğü prompt"""
+    if tokenizer is None:
+        return prompt[:max_tokens * 4]
+    ids = tokenizer.encode(prompt, add_special_tokens=False)[:max_tokens]
+    return tokenizer.decode(ids, skip_special_tokens=True)
+
+
+def load_generator(name, new_tokens):
+    import torch
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    model = AutoModelForSeq2SeqLM.from_pretrained(name)
+
+    def generate(prompt):
+        # app.py'deki gibi truncation yok: uzun prompt'un encode maliyeti tam ödenir
+        inputs = tokenizer(prompt, return_tensors="pt")
+        start = time.perf_counter()
+        with torch.no_grad():
+            model.generate(**inputs, max_new_tokens=new_tokens, do_sample=False)
+        return (time.perf_counter() - start) * 1000
+
+    return generate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=4, help="Prompt'a giren parça sayısı")
+    parser.add_argument("--chunk-chars", type=int, default=800)
+    parser.add_argument("--max-input-tokens", type=int, default=512)
+    parser.add_argument("--chunk-weight", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=3, help="Her sözlük terimi için üretilen vaka sayısı")
+    parser.add_argument("--tokenizer", default="google/flan-t5-large")
+    parser.add_argument("--model", default=None, help="Üretim süresi ölçülecek seq2seq model (örn. google/flan-t5-small)")
+    parser.add_argument("--new-tokens", type=int, default=32)
+    args = parser.parse_args()
+
+    count_tokens, tokenizer = load_token_counter(args.tokenizer)
+    compressor = ContextCompressor(HashingEmbeddings(), count_tokens, max_input_tokens=args.max_input_tokens - 1,
+                                   prompt=QA_CHAIN_PROMPT, chunk_weight=args.chunk_weight)
+    generate = load_generator(args.model, args.new_tokens) if args.model else None
+
+    rng = random.Random(13)
+    cases = []
+    for term, definition, paraphrase in GLOSSARY:
+        for query in (f"{term} nedir?", paraphrase):
+            for _ in range(args.repeat):
+                cases.append((query, *make_case(rng, term, definition, args.k, args.chunk_chars)))
+
+    results = {"kesme": {"tokens": [], "kept": 0, "gen_ms": []},
+               "sıkıştırma": {"tokens": [], "kept": 0, "gen_ms": [], "ms": []}}
+    for query, documents, answer in cases:
+        full_prompt = QA_CHAIN_PROMPT.format(
+            context=DOCUMENT_SEPARATOR.join(doc.page_content for doc in documents), question=query
+        )
+        start = time.perf_counter()
+        compressed = compressor.compress(query, documents)
+        results["sıkıştırma"]["ms"].append((time.perf_counter() - start) * 1000)
+        compressed_prompt = QA_CHAIN_PROMPT.format(
+            context=DOCUMENT_SEPARATOR.join(doc.page_content for doc in compressed), question=query
+        )
+
+        for name, prompt in (("kesme", full_prompt), ("sıkıştırma", compressed_prompt)):
+            stats = results[name]
+            stats["tokens"].append(count_tokens(prompt))
+            # Tanım cümlesinin kelimeleri modelin gördüğü kısımda mı (detokenize boşlukları değiştirebilir)
+            seen = " ".join(visible_prompt(prompt, tokenizer, args.max_input_tokens).split())
+            stats["kept"] += answer in seen
+            if generate is not None:
+                stats["gen_ms"].append(generate(prompt))
+
+    print(f"📚 {len(cases)} soru, soru başına {args.k} x ~{args.chunk_chars} karakter parça, "
+          f"girdi sınırı {args.max_input_tokens} token\n")
+    for name, stats in results.items():
+        line = (f"{name:<12} prompt: {statistics.mean(stats['tokens']):6.0f} token (en fazla {max(stats['tokens'])})   "
+                f"cevap cümlesi korundu: {stats['kept'] / len(cases):.3f}")
+        if stats["gen_ms"]:
+            line += f"   üretim p50: {statistics.median(stats['gen_ms']):7.1f} ms"
+        print(line)
+    overhead = results["sıkıştırma"]["ms"]
+    print(f"\nsıkıştırma ek gecikmesi p50: {statistics.median(overhead):.2f} ms   p95: {percentile(overhead, 95):.2f} ms")
+    before, after = statistics.mean(results["kesme"]["tokens"]), statistics.mean(results["sıkıştırma"]["tokens"])
+    print(f"prompt token'ları {before:.0f} -> {after:.0f} (%{(1 - after / before) * 100:.0f} azalma)")
+
+
+if __name__ == "__main__":
+    main()
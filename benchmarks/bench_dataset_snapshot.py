@@ -0,0 +1,215 @@
+"""
+BENCH_DATASET_SNAPSHOT.PY - HF DATASET SATIRLARI VS YEREL ARROW ANLIK GÖRÜNTÜSÜ
+
+Sentetik PDF/ZIP/TXT satırlarından (synthetic_data.make_dataset) iki sürüm
+üretilir: v2'de satırların --changed oranı değiştirilir, bir satır silinir ve
+iki satır eklenir.
+
+1) Satır erişimi (ayrı process'lerde):
+    hf        : load_dataset'in döndürdüğü gibi bellek eşlemeli HF Dataset
+                (load_from_disk); satırlar tam içerikli Python sözlükleri
+    snapshot  : dataset_snapshot.SnapshotSplit; satırlar tembel, 'content'
+                kopyalanmayan memoryview dilimi
+
+2) v1 işlendikten sonra v2'nin işlenmesi (aynı çıkarma önbelleğiyle):
+    hf        : Mevcut yol; her dosyanın içeriği okunup SHA-256'sı alınır,
+                değişmeyenler dosya önbelleğinden gelir
+    snapshot  : Satır özetleri v1 ile karşılaştırılır; değişmeyen satırların
+                içeriği hiç okunmaz, sadece yeni/değişen satırlar çıkarılır
+
+Her iki yolun v2 dokümanlarının önbelleksiz tam çıkarmayla birebir aynı
+olduğu ve satır farkının beklenen sayılarla eşleştiği doğrulanır; fark
+bulunursa çıkış kodu 1 olur.
+
+Kullanım:
+    python benchmarks/bench_dataset_snapshot.py --pdfs 300 --pages 20
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_data import make_dataset, make_pdf, random_text  # noqa: E402
+
+REVISIONS = ("1" * 40, "2" * 40)
+
+
+def make_versions(args):
+    rows = make_dataset(n_pdfs=args.pdfs, pages_per_pdf=args.pages, n_zips=args.zips, n_txts=args.txts)
+    rng = random.Random(7)
+    changed = rng.sample(range(len(rows)), max(1, int(len(rows) * args.changed)))
+    updated = [dict(row) for row in rows]
+    for index in changed:
+        if updated[index]["file_name"].endswith(".pdf"):
+            updated[index]["content"] = make_pdf([random_text(rng) for _ in range(args.pages)])
+        else:
+            updated[index]["content"] = updated[index]["content"] + b"\n"
+    removed = next(index for index in range(len(rows)) if index not in changed)
+    del updated[removed]
+    for i in range(2):
+        updated.append({"file_name": f"new_{i}.pdf",
+                        "content": make_pdf([random_text(rng) for _ in range(args.pages)])})
+    expected = {"added": 2, "changed": len(changed), "removed": 1}
+    return rows, updated, expected
+
+
+def to_dataset(rows):
+    from datasets import Dataset, Features, Value
+
+    features = Features({"file_name": Value("string"), "content": Value("binary")})
+    return Dataset.from_dict({"file_name": [row["file_name"] for row in rows],
+                              "content": [row["content"] for row in rows]}, features=features)
+
+
+def scan_rows(mode, path, results):
+    """Çocuk process: tüm satırları gez, dosya adı ve içerik uzunluğunu oku (açma, kütüphane importu dahil)"""
+    start = time.perf_counter()
+    if mode == "hf":
+        from datasets import load_from_disk
+        dataset = load_from_disk(path)
+    else:
+        from dataset_snapshot import open_snapshot
+        dataset = open_snapshot(path).split("train")
+    opened = time.perf_counter() - start
+    total = 0
+    for item in dataset:
+        total += len(item["file_name"]) + len(item["content"])
+    results.put({"open": opened, "scan": time.perf_counter() - start - opened, "bytes": total})
+
+
+def run_child(context, target, *args):
+    results = context.Queue()
+    process = context.Process(target=target, args=(*args, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def documents_of(loader):
+    return [(doc.page_content, doc.metadata) for doc in loader.documents]
+
+
+def process(dataset, cache_dir=None, snapshot=None):
+    from data_loader import TutkuSupplyChainLoader
+    from extraction_cache import ExtractionCache
+
+    cache = ExtractionCache(cache_dir, 1 << 40) if cache_dir else None
+    loader = TutkuSupplyChainLoader(cache=cache)
+    if snapshot is not None:
+        loader.snapshot = snapshot
+        loader.dataset = snapshot.split("train")
+        loader.row_changes = snapshot.changes("train")
+    else:
+        loader.dataset = dataset
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        loader.process_dataset_files(parallel=False, use_cache=cache is not None)
+    seconds = time.perf_counter() - start
+    misses = cache.misses if cache else None
+    if cache:
+        cache.close()
+    return loader, seconds, misses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdfs", type=int, default=300)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--zips", type=int, default=10)
+    parser.add_argument("--txts", type=int, default=50)
+    parser.add_argument("--changed", type=float, default=0.05, help="v2'de içeriği değişen satır oranı")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from dataset_snapshot import open_snapshot, snapshot_root, write_snapshot
+
+    rows_v1, rows_v2, expected = make_versions(args)
+    v1, v2 = to_dataset(rows_v1), to_dataset(rows_v2)
+    context = multiprocessing.get_context("spawn")
+    failed = False
+
+    with tempfile.TemporaryDirectory() as directory:
+        hf_path = os.path.join(directory, "hf_v2")
+        v2.save_to_disk(hf_path)
+        root = snapshot_root(os.path.join(directory, "datasets"), "tutkuozdeniz/supply-chain-management")
+        start = time.perf_counter()
+        write_snapshot(root, REVISIONS[0], {"train": v1}, key_column="file_name")
+        snapshot_v2 = write_snapshot(root, REVISIONS[1], {"train": v2}, key_column="file_name")
+        write_seconds = (time.perf_counter() - start) / 2
+        content_mb = sum(len(row["content"]) for row in rows_v2) / 1e6
+        print(f"📚 v2: {len(rows_v2)} satır, {content_mb:.1f} MB içerik; anlık görüntü yazma {write_seconds:.2f} sn\n")
+
+        print(f"{'satır erişimi':<14}{'açma (ms)':>11}{'gezinme (ms)':>14}")
+        scans = {}
+        for mode, path in (("hf", hf_path), ("snapshot", root)):
+            scans[mode] = result = run_child(context, scan_rows, mode, path)
+            print(f"{mode:<14}{result['open'] * 1000:>11.1f}{result['scan'] * 1000:>14.1f}")
+        if scans["hf"]["bytes"] != scans["snapshot"]["bytes"]:
+            print("❌ İki yolun okuduğu bayt sayısı farklı")
+            failed = True
+
+        # Satır farkı: v1 işlenmiş sayılır, v2 ona göre karşılaştırılır
+        snapshot_v1 = open_snapshot(root, REVISIONS[0])
+        snapshot_v1.mark_ingested("train")
+        changes = snapshot_v2.changes("train")
+        counts = {status: len(changes[status]) for status in ("added", "changed", "unchanged", "removed")}
+        print(f"\n📌 Satır farkı (v1 -> v2): {counts}")
+        if any(counts[status] != count for status, count in expected.items()):
+            print(f"❌ Beklenen: {expected}")
+            failed = True
+
+        reference, full_seconds, _ = process(v2)
+        hf_cache, snapshot_cache = os.path.join(directory, "cache_hf"), os.path.join(directory, "cache_snapshot")
+        process(v1, hf_cache)
+        process(None, snapshot_cache, snapshot_v1)
+
+        def incremental(cache_dir, snapshot=None):
+            """v1 ile doldurulmuş önbelleğin kopyasında v2'yi işle; en iyi süre"""
+            best = None
+            for attempt in range(args.repeat):
+                copy = f"{cache_dir}_{attempt}"
+                shutil.copytree(cache_dir, copy)
+                # Önceki deneme v2'yi işlenmiş olarak işaretledi; taban yine v1 olsun
+                snapshot_v1.mark_ingested("train")
+                result = process(v2, copy, open_snapshot(root) if snapshot else None)
+                best = result if best is None or result[1] < best[1] else best
+            return best
+
+        hf_loader, hf_seconds, hf_misses = incremental(hf_cache)
+        snapshot_loader, snapshot_seconds, snapshot_misses = incremental(snapshot_cache, snapshot=True)
+        read_mb = {
+            "hf": sum(len(row["content"]) for row in rows_v2) / 1e6,
+            "snapshot": sum(len(rows_v2[i]["content"]) for i in changes["added"] + changes["changed"]) / 1e6,
+        }
+
+        print(f"\n{'v2 işleme':<26}{'süre (sn)':>10}{'çıkarılan':>11}{'okunan içerik (MB)':>20}  eşdeğer")
+        expected_documents = documents_of(reference)
+        for name, loader, seconds, misses, read in (
+            ("önbelleksiz tam çıkarma", reference, full_seconds, None, read_mb["hf"]),
+            ("hf + dosya önbelleği", hf_loader, hf_seconds, hf_misses, read_mb["hf"]),
+            ("snapshot + satır farkı", snapshot_loader, snapshot_seconds, snapshot_misses, read_mb["snapshot"]),
+        ):
+            same = documents_of(loader) == expected_documents
+            failed |= not same
+            print(f"{name:<26}{seconds:>10.2f}{'-' if misses is None else misses:>11}{read:>20.1f}"
+                  f"  {'✅' if same else '❌'}")
+
+    print("\n('çıkarılan': önbellekte bulunmayıp yeniden ayrıştırılan dosya sayısı;")
+    print(" 'okunan içerik': satır farkına göre içeriğine dokunulan satırların toplam boyutu)")
+    if failed:
+        print("\n⚠️ Anlık görüntü yolu mevcut yolla aynı sonucu vermedi")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+BENCH_END_TO_END.PY - UÇTAN UCA, ÇEVRİMDIŞI VE TEKRARLANABİLİR BENCHMARK
+
+HF, Gemini veya flan-t5 indirmeden tüm pipeline'ı ölçer: sentetik PDF/ZIP/TXT
+dataset'i (synthetic_data.make_dataset), deterministik sahte embedder
+(WordHashingEmbeddings) ve sahte LLM'ler (FakeLLM / FakeChatModel) kullanılır.
+Her senaryo ayrı bir process'te çalışır (bellek ölçümleri birbirini etkilemesin):
+
+    ingest : process_dataset_files (sıralı) ve iter_page_documents -> sayfa/sn
+    chain  : SupplyChainChatbot (sahte modeller enjekte edilir): build_index,
+             ask() gecikmeleri ve stream_answer() ilk token süresi
+    app    : app.py aşamaları: split_into_chunks -> deduplicate_chunks ->
+             build_vector_store -> build_retriever -> RetrievalQA;
+             get_chatbot_response ve stream_chatbot_response gecikmeleri.
+             Yerel PDF yükleyicisi (unstructured) yerine aynı sentetik
+             dataset data_loader ile çıkarılır; akışlı üretimde sadece modele
+             özgü stream_llm_answer sahte LLM'e yönlendirilir.
+
+Sonuçlar düz bir JSON'a yazılır ({"meta": ..., "results": {"chain.ask_p95_ms": ...}})
+ve --baseline ile verilen kayıtlı sonuçla karşılaştırılır; --tolerance'tan
+fazla kötüleşen metrik varsa çıkış kodu 1 olur (CI'da gerileme yakalamak için).
+Sahte LLM gecikmesi (--llm-first-token-ms, --llm-token-ms) sabit olduğundan
+farklar pipeline'ın kendi maliyetinden gelir. Süreler makineye bağlıdır: baseline
+aynı makinede --save-baseline ile üretilmelidir.
+
+Kullanım:
+    python benchmarks/bench_end_to_end.py
+    python benchmarks/bench_end_to_end.py --scale 4 --output results.json
+    python benchmarks/bench_end_to_end.py --save-baseline
+    python benchmarks/bench_end_to_end.py --scenarios chain --backend chroma
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.eval_hybrid_retrieval import percentile  # noqa: E402
+from benchmarks.synthetic_data import WORDS  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline_end_to_end.json")
+SCENARIOS = ("ingest", "chain", "app")
+# Büyüdükçe iyileşen metrikler; diğer tüm metriklerde küçük olan iyidir
+HIGHER_IS_BETTER = ("pages_per_second",)
+# Karşılaştırmaya girmeyen bilgi amaçlı metrikler (sayılar, boyutlar)
+INFORMATIONAL = ("pages", "chunks", "queries")
+
+
+def dataset_params(scale):
+    """make_dataset argümanları; --scale sadece dosya sayılarını büyütür"""
+    return {
+        "n_pdfs": 40 * scale, "pages_per_pdf": 5, "n_zips": 4 * scale,
+        "pdfs_per_zip": 3, "n_txts": 10 * scale, "seed": 42,
+    }
+
+
+def dataset_pages(params):
+    """Dataset'teki sayfa sayısı (TXT dosyaları tek sayfa sayılır)"""
+    pdfs = params["n_pdfs"] + params["n_zips"] * params["pdfs_per_zip"]
+    return pdfs * params["pages_per_pdf"] + params["n_txts"]
+
+
+def make_queries(n_queries, seed=3):
+    """Sözlük/önbellek yollarına düşmeyen, birbirinden farklı sorular"""
+    import random
+    rng = random.Random(seed)
+    return [f"{rng.choice(WORDS)} ve {rng.choice(WORDS)} arasındaki ilişki nedir? ({i})"
+            for i in range(n_queries)]
+
+
+def make_loader(args):
+    """Sentetik dataset'i önceden yüklenmiş, çıkarma önbelleği kapalı loader"""
+    import data_loader
+    from benchmarks.synthetic_data import make_dataset
+
+    data_loader.EXTRACTION_CACHE_ENABLED = False  # Her çalıştırma dosyaları yeniden işlesin
+    loader = data_loader.TutkuSupplyChainLoader()
+    loader.dataset = make_dataset(**dataset_params(args.scale))
+    return loader
+
+
+def make_models(args):
+    from benchmarks.synthetic_data import FakeChatModel, FakeLLM, WordHashingEmbeddings
+
+    llm_settings = {
+        "n_tokens": args.llm_tokens,
+        "first_token_ms": args.llm_first_token_ms,
+        "token_ms": args.llm_token_ms,
+    }
+    return WordHashingEmbeddings(dim=args.dim), FakeLLM(**llm_settings), FakeChatModel(**llm_settings)
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def latency_metrics(prefix, latencies):
+    return {
+        f"{prefix}_p50_ms": percentile(latencies, 50),
+        f"{prefix}_p95_ms": percentile(latencies, 95),
+        f"{prefix}_p99_ms": percentile(latencies, 99),
+    }
+
+
+def timed_stream(stream):
+    """(ilk parça süresi ms, toplam süre ms) - generator sonuna kadar tüketilir"""
+    start = time.perf_counter()
+    first = None
+    for _ in stream:
+        if first is None:
+            first = (time.perf_counter() - start) * 1000
+    return first, (time.perf_counter() - start) * 1000
+
+
+def run_ingest(args, persist_directory):
+    """Sayfa çıkarma throughput'u: toplu (liste) ve akış (sayfa sayfa)"""
+    pages = dataset_pages(dataset_params(args.scale))
+    loader = make_loader(args)
+    baseline_rss = peak_rss_mb()
+
+    start = time.perf_counter()
+    documents = loader.process_dataset_files(parallel=False, use_cache=False)
+    batch_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    streamed = sum(1 for _ in loader.iter_page_documents(use_cache=False))
+    stream_seconds = time.perf_counter() - start
+
+    if streamed != pages:
+        raise RuntimeError(f"Beklenen {pages} sayfa, akışta {streamed} sayfa çıktı ({len(documents)} doküman)")
+    return {
+        "pages": pages,
+        "batch_seconds": batch_seconds,
+        "batch_pages_per_second": pages / batch_seconds,
+        "stream_seconds": stream_seconds,
+        "stream_pages_per_second": pages / stream_seconds,
+        "peak_rss_mb": peak_rss_mb(),
+        "rss_growth_mb": peak_rss_mb() - baseline_rss,
+    }
+
+
+def run_chain(args, persist_directory):
+    """SupplyChainChatbot: indeks kurma + ask/stream_answer gecikmeleri"""
+    import chain
+    from vector_backends import stored_ids
+
+    # Ağ, model indirme ve kalıcı önbellek gerektiren özellikler kapatılır
+    chain.VECTOR_DB_PATH = persist_directory
+    chain.RERANKING = False
+    chain.EMBEDDING_CACHE_DIR = ""
+    chain.METRICS_PORT = 0
+    chain.METRICS_JSON_LOG = ""
+    if args.backend:
+        chain.VECTOR_BACKEND = args.backend
+
+    embeddings, _, chat_model = make_models(args)
+    chatbot = chain.SupplyChainChatbot(embeddings=embeddings, llm=chat_model, loader=make_loader(args))
+    baseline_rss = peak_rss_mb()
+
+    start = time.perf_counter()
+    chatbot.build_index()
+    index_seconds = time.perf_counter() - start
+    chatbot.setup_qa_chain()
+
+    queries = make_queries(args.queries)
+    latencies = []
+    for question in queries:
+        start = time.perf_counter()
+        chatbot.ask(question)
+        latencies.append((time.perf_counter() - start) * 1000)
+    first_token = [timed_stream(chatbot.stream_answer(question))[0] for question in queries]
+
+    return {
+        "index_seconds": index_seconds,
+        "chunks": len(stored_ids(chatbot.vector_store)),
+        **latency_metrics("ask", latencies),
+        **latency_metrics("stream_first_chunk", first_token),
+        "peak_rss_mb": peak_rss_mb(),
+        "rss_growth_mb": peak_rss_mb() - baseline_rss,
+    }
+
+
+def run_app(args, persist_directory):
+    """app.py aşamaları: parçalama, tekrar eleme, indeks, retriever, cevaplama"""
+    import app
+    from langchain.chains import RetrievalQA
+    from dedup import deduplicate_chunks
+    from metrics import InstrumentedEmbeddings
+
+    app.PERSIST_DIRECTORY = persist_directory
+    app.RERANKING = False
+    app.ANSWER_CACHE_PATH = ""  # Her soru LLM yolundan geçsin
+    # Sahte LLM'in gecikmesi prompt uzunluğuna bağlı değil; sıkıştırma bench_context_compression.py'de ölçülür
+    app.CONTEXT_COMPRESSION = False
+    if args.backend:
+        app.VECTOR_BACKEND = args.backend
+
+    embeddings, llm, _ = make_models(args)
+    documents = make_loader(args).process_dataset_files(parallel=False, use_cache=False)
+    baseline_rss = peak_rss_mb()
+
+    start = time.perf_counter()
+    chunks = app.split_into_chunks(documents)
+    if app.DEDUPLICATION:
+        chunks, _ = deduplicate_chunks(chunks, threshold=app.DEDUP_THRESHOLD, num_perm=app.DEDUP_NUM_PERM)
+    split_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    app.embeddings = InstrumentedEmbeddings(embeddings)
+    app.vectordb = app.build_vector_store(chunks)
+    app.retriever = app.build_retriever(chunks)
+    index_seconds = time.perf_counter() - start
+
+    app.qa_chain = RetrievalQA.from_chain_type(
+        llm=llm, chain_type="stuff", retriever=app.retriever,
+        return_source_documents=True, chain_type_kwargs={"prompt": app.QA_CHAIN_PROMPT},
+    )
+    app.stream_llm_answer = llm.stream  # TextIteratorStreamer yerine sahte LLM'in akışı
+    app.llm_ready.set()
+
+    queries = make_queries(args.queries)
+    latencies = []
+    for question in queries:
+        start = time.perf_counter()
+        app.get_chatbot_response(question)
+        latencies.append((time.perf_counter() - start) * 1000)
+    first_token = [timed_stream(app.stream_chatbot_response(question))[0] for question in queries]
+
+    return {
+        "split_seconds": split_seconds,
+        "index_seconds": index_seconds,
+        "chunks": len(chunks),
+        **latency_metrics("answer", latencies),
+        **latency_metrics("stream_first_chunk", first_token),
+        "peak_rss_mb": peak_rss_mb(),
+        "rss_growth_mb": peak_rss_mb() - baseline_rss,
+    }
+
+
+RUNNERS = {"ingest": run_ingest, "chain": run_chain, "app": run_app}
+
+
+def run_scenario(name, args, results):
+    """Çocuk process: senaryoyu sessizce çalıştır, sonucu (veya hatayı) kuyruğa koy"""
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+            results.put({"metrics": RUNNERS[name](args, os.path.join(tmp_dir, "index"))})
+    except Exception as e:
+        results.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def run_child(context, name, args):
+    results = context.Queue()
+    process = context.Process(target=run_scenario, args=(name, args, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def is_regression(name, baseline, current, tolerance):
+    if name.rsplit(".", 1)[-1] in INFORMATIONAL or baseline <= 0:
+        return False
+    if name.endswith(HIGHER_IS_BETTER):
+        return current < baseline * (1 - tolerance)
+    return current > baseline * (1 + tolerance)
+
+
+def compare(results, baseline, tolerance):
+    """Baseline ile karşılaştırma tablosunu yazdır; gerileyen metrik adlarını döndür"""
+    regressions = []
+    print(f"\n📏 Baseline karşılaştırması (tolerans %{tolerance * 100:.0f}):")
+    print(f"{'metrik':<36}{'baseline':>12}{'şimdi':>12}{'değişim':>10}")
+    for name, current in results.items():
+        if name not in baseline:
+            print(f"{name:<36}{'-':>12}{current:>12.2f}{'yeni':>10}")
+            continue
+        previous = baseline[name]
+        change = (current - previous) / previous * 100 if previous else 0.0
+        flag = ""
+        if is_regression(name, previous, current, tolerance):
+            regressions.append(name)
+            flag = "  ❌ gerileme"
+        print(f"{name:<36}{previous:>12.2f}{current:>12.2f}{change:>+9.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--scale", type=int, default=1, help="Dataset boyutu çarpanı (1 = 270 sayfa)")
+    parser.add_argument("--queries", type=int, default=40)
+    parser.add_argument("--dim", type=int, default=128, help="Sahte embedding boyutu")
+    parser.add_argument("--backend", default="", help="Vektör arka ucu (boş: config'teki)")
+    parser.add_argument("--llm-tokens", type=int, default=32)
+    parser.add_argument("--llm-first-token-ms", type=float, default=20.0)
+    parser.add_argument("--llm-token-ms", type=float, default=1.0)
+    parser.add_argument("--output", default="", help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Sonuçları baseline olarak kaydet")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="İzin verilen kötüleşme oranı")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"📚 Sentetik dataset: {dataset_pages(dataset_params(args.scale))} sayfa, {args.queries} soru")
+    results = {}
+    failed = []
+    for name in args.scenarios.split(","):
+        start = time.perf_counter()
+        outcome = run_child(context, name, args)
+        if "error" in outcome:
+            failed.append(name)
+            print(f"❌ {name}: {outcome['error']}")
+            continue
+        print(f"✅ {name} ({time.perf_counter() - start:.1f} sn)")
+        for key, value in outcome["metrics"].items():
+            results[f"{name}.{key}"] = value
+            print(f"   {key:<32}{value:>12.2f}")
+
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {key: value for key, value in vars(args).items()
+                     if key not in ("output", "baseline", "save_baseline")},
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Sonuçlar yazıldı: {args.output}")
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Baseline güncellendi: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"]["args"] != report["meta"]["args"]:
+            print("⚠️ Baseline farklı ayarlarla üretilmiş; karşılaştırma yaklaşık olabilir")
+        if compare(results, baseline["results"], args.tolerance):
+            sys.exit(1)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+BENCH_LLM_RUNTIME.PY - YEREL LLM ÇALIŞMA ZAMANLARI: HIZ, BELLEK, AÇILIŞ VE CEVAP UYUMU
+
+llm_runtime.py'deki çalışma zamanlarını (torch fp32 = mevcut pipeline,
+torch-int8, onnx, onnx-int8) aynı sabit prompt setiyle karşılaştırır. Her
+çalışma zamanı ayrı bir process'te yüklenir (bellek ölçümleri birbirini
+etkilemesin) ve raporlanır:
+
+    açılış   : load_seq2seq süresi (ONNX için ilk dışa aktarım hariç; önce
+               ısınma process'inde yapılır ve ONNX_EXPORT_DIR'de saklanır)
+    bellek   : Model yüklendikten sonraki RSS artışı ve tepe RSS
+    token/sn : Greedy üretimde saniye başına üretilen token (tek istek)
+    uyum     : İlk çalışma zamanının (referans) cevaplarıyla birebir aynı
+               cevap oranı ve token düzeyinde ortalama benzerlik
+
+Prompt'lar app.py'nin QA_CHAIN_PROMPT'u ile sözlük tanımlarından kurulur.
+Ortalama benzerlik --parity-threshold'un altına düşen çalışma zamanı varsa
+çıkış kodu 1 olur.
+
+Kullanım:
+    python benchmarks/bench_llm_runtime.py --model google/flan-t5-small
+    python benchmarks/bench_llm_runtime.py --runtimes torch,onnx-int8 --threads 4 --new-tokens 128
+"""
+
+import argparse
+import difflib
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_data import GLOSSARY  # noqa: E402
+
+
+def make_prompts(n_prompts):
+    """Sabit prompt seti: bağlamda iki sözlük tanımı, soru birinin terimi"""
+    from app import QA_CHAIN_PROMPT
+
+    prompts = []
+    for i in range(n_prompts):
+        term, definition, _ = GLOSSARY[i % len(GLOSSARY)]
+        other_term, other_definition, _ = GLOSSARY[(i + 1) % len(GLOSSARY)]
+        context = f"{term}: {definition}\n\n{other_term}: {other_definition}"
+        prompts.append(QA_CHAIN_PROMPT.format(context=context, question=f"{term} nedir?"))
+    return prompts
+
+
+def current_rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def run_runtime(runtime, args, results):
+    """Çocuk process: modeli yükle, prompt'ları üret, ölçümleri kuyruğa koy"""
+    try:
+        import torch
+        from llm_runtime import load_seq2seq
+
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        tokenizer, model, _ = load_seq2seq(args.model, runtime, num_threads=args.threads,
+                                           export_dir=args.export_dir)
+        load_seconds = time.perf_counter() - start
+        rss_loaded = current_rss_mb()
+
+        def generate(prompt):
+            inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
+            with torch.inference_mode():
+                output_ids = model.generate(**inputs, max_new_tokens=args.new_tokens, do_sample=False, use_cache=True)
+            return output_ids[0]
+
+        generate(make_prompts(1)[0])  # Isınma (ONNX oturumları ve bellek ayırıcı ilk çağrıda hazırlanır)
+        answers, tokens, seconds = [], 0, 0.0
+        for prompt in make_prompts(args.prompts):
+            start = time.perf_counter()
+            output_ids = generate(prompt)
+            seconds += time.perf_counter() - start
+            tokens += len(output_ids) - 1  # Baştaki decoder başlangıç token'ı üretilmiş sayılmaz
+            answers.append(tokenizer.decode(output_ids, skip_special_tokens=True))
+        results.put({
+            "load_seconds": load_seconds,
+            "rss_growth_mb": rss_loaded - rss_before,
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "tokens_per_second": tokens / seconds,
+            "answers": answers,
+        })
+    except Exception as e:
+        results.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def run_child(context, runtime, args):
+    results = context.Queue()
+    process = context.Process(target=run_runtime, args=(runtime, args, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def export_only(model_name, export_dir, quantize):
+    from llm_runtime import export_onnx
+    export_onnx(model_name, export_dir, quantize=quantize)
+
+
+def token_similarity(reference, answer):
+    return difflib.SequenceMatcher(a=reference.split(), b=answer.split()).ratio()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="google/flan-t5-large")
+    parser.add_argument("--runtimes", default="torch,torch-int8,onnx,onnx-int8",
+                        help="Virgülle ayrılmış; ilki uyum karşılaştırmasında referanstır")
+    parser.add_argument("--threads", type=int, default=os.cpu_count())
+    parser.add_argument("--prompts", type=int, default=16)
+    parser.add_argument("--new-tokens", type=int, default=64)
+    parser.add_argument("--export-dir", default=".cache/onnx")
+    parser.add_argument("--parity-threshold", type=float, default=0.9,
+                        help="Referansa ortalama token benzerliği bunun altındaysa çıkış kodu 1")
+    parser.add_argument("--output", default=None, help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    runtimes = [name.strip() for name in args.runtimes.split(",")]
+    # Dışa aktarım açılış süresine karışmasın: önce ayrı process'te yapılıp diskte saklanır
+    for name in runtimes:
+        if name.startswith("onnx"):
+            export = context.Process(target=export_only, args=(args.model, args.export_dir, name == "onnx-int8"))
+            export.start()
+            export.join()
+
+    print(f"🧪 {args.model}, {args.prompts} prompt, en fazla {args.new_tokens} yeni token, {args.threads} thread\n")
+    print(f"{'çalışma zamanı':<16}{'açılış (sn)':>12}{'RSS artışı (MB)':>17}{'tepe RSS (MB)':>15}"
+          f"{'token/sn':>10}{'aynı cevap':>12}{'benzerlik':>11}")
+    results, reference, failed = {}, None, False
+    for name in runtimes:
+        result = run_child(context, name, args)
+        if "error" in result:
+            print(f"{name:<16}  ❌ {result['error']}")
+            failed = True
+            continue
+        reference = reference if reference is not None else result["answers"]
+        similarities = [token_similarity(ref, ans) for ref, ans in zip(reference, result["answers"])]
+        result["exact_match"] = sum(ref == ans for ref, ans in zip(reference, result["answers"])) / len(reference)
+        result["similarity"] = statistics.mean(similarities)
+        failed |= result["similarity"] < args.parity_threshold
+        results[name] = result
+        print(f"{name:<16}{result['load_seconds']:>12.1f}{result['rss_growth_mb']:>17.0f}{result['peak_rss_mb']:>15.0f}"
+              f"{result['tokens_per_second']:>10.1f}{result['exact_match']:>12.2f}{result['similarity']:>11.3f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Sonuçlar yazıldı: {args.output}")
+    if failed:
+        print(f"\n⚠️ Yüklenemeyen veya referansla ortalama benzerliği {args.parity_threshold} altında kalan "
+              f"çalışma zamanı var")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+BENCH_PARALLEL_EXTRACTION.PY - SERİ VS PROCESS HAVUZU ÇIKARMA KARŞILAŞTIRMASI
+
+Kullanım:
+    python benchmarks/bench_parallel_extraction.py --pdfs 200 --pages 8 --workers 4
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_loader import TutkuSupplyChainLoader  # noqa: E402
+from benchmarks.synthetic_data import make_dataset  # noqa: E402
+
+
+def run_once(rows, parallel, workers):
+    """Bir kez çıkarma yap, (süre, doküman listesi) döndür"""
+    loader = TutkuSupplyChainLoader()
+    loader.dataset = rows
+    start = time.perf_counter()
+    # Dosya başına log satırları ölçümü bozmasın
+    with contextlib.redirect_stdout(io.StringIO()):
+        documents = loader.process_dataset_files(parallel=parallel, max_workers=workers, use_cache=False)
+    return time.perf_counter() - start, documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pdfs", type=int, default=120)
+    parser.add_argument("--pages", type=int, default=6)
+    parser.add_argument("--zips", type=int, default=6)
+    parser.add_argument("--txts", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    rows = make_dataset(n_pdfs=args.pdfs, pages_per_pdf=args.pages, n_zips=args.zips, n_txts=args.txts)
+    print(f"📦 {len(rows)} satırlık sentetik dataset hazır")
+    
+    serial_times, parallel_times = [], []
+    for _ in range(args.repeat):
+        t, serial_docs = run_once(rows, parallel=False, workers=1)
+        serial_times.append(t)
+        t, parallel_docs = run_once(rows, parallel=True, workers=args.workers)
+        parallel_times.append(t)
+    
+    same = [(d.page_content, d.metadata) for d in serial_docs] == \
+           [(d.page_content, d.metadata) for d in parallel_docs]
+    serial_best, parallel_best = min(serial_times), min(parallel_times)
+    
+    print(f"📄 Doküman sayısı: {len(serial_docs)} (sıra ve metadata aynı: {same})")
+    print(f"🐢 Seri:            {serial_best:.3f} sn")
+    print(f"🚀 Havuz ({args.workers} process): {parallel_best:.3f} sn")
+    print(f"⚡ Hızlanma:        {serial_best / parallel_best:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
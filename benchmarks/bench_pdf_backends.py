@@ -0,0 +1,105 @@
+"""
+BENCH_PDF_BACKENDS.PY - PDF ARKA UÇLARININ ÇIKARMA HIZI
+
+Sentetik PDF'leri her arka uçla (pdf_backends.py) tek başına, tek process'te
+ayrıştırır ve sayfa/sn ile MB/sn raporlar. Metin uyumu, ilk arka ucun
+çıktısına göre kelime düzeyinde Jaccard benzerliğidir.
+
+Ardından büyük bir PDF'i process_dataset_files ile seri ve sayfa
+aralıklarına bölünmüş paralel modda çıkarır (bölme PDF_SPLIT_MIN_BYTES'ı
+aşan PDF'lerde devreye girer).
+
+Kullanım:
+    python benchmarks/bench_pdf_backends.py --pdfs 40 --pages 20
+    python benchmarks/bench_pdf_backends.py --backends pymupdf,pypdf --big-pages 400 --workers 4
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_loader  # noqa: E402
+from benchmarks.synthetic_data import make_pdf, random_text  # noqa: E402
+from config import PDF_BACKEND_ORDER  # noqa: E402
+from pdf_backends import get_backend  # noqa: E402
+
+
+def word_jaccard(a, b):
+    a, b = set(a.split()), set(b.split())
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def bench_backend(backend, pdfs, repeat):
+    """(en iyi süre sn, sayfa metinleri) - ilk tur ısınma sayılmaz"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pages = [page for pdf in pdfs for page in backend.extract_pages(pdf)]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, pages
+
+
+def bench_page_parallel(big_pdf, workers):
+    """Büyük PDF: seri ve sayfa aralığı paralel process_dataset_files süreleri"""
+    times = {}
+    for parallel in (False, True):
+        loader = data_loader.TutkuSupplyChainLoader()
+        loader.dataset = [{"file_name": "big.pdf", "content": big_pdf}]
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            documents = loader.process_dataset_files(parallel=parallel, max_workers=workers, use_cache=False)
+        times[parallel] = (time.perf_counter() - start, len(documents))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdfs", type=int, default=40)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--backends", default=",".join(PDF_BACKEND_ORDER))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--big-pages", type=int, default=400, help="Sayfa paralel testindeki PDF'in sayfa sayısı")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # pypdf'in sayfa başına uyarıları ölçümü bozmasın
+
+    rng = random.Random(5)
+    pdfs = [make_pdf([random_text(rng) for _ in range(args.pages)]) for _ in range(args.pdfs)]
+    total_pages = args.pdfs * args.pages
+    total_mb = sum(len(pdf) for pdf in pdfs) / 2 ** 20
+    print(f"📄 {args.pdfs} PDF, {total_pages} sayfa, {total_mb:.1f} MB\n")
+    print(f"{'arka uç':<14}{'sürüm':>10}{'süre (sn)':>11}{'sayfa/sn':>10}{'MB/sn':>8}{'metin uyumu':>13}")
+
+    reference = None
+    for name in args.backends.split(","):
+        backend = get_backend(name)
+        if backend is None:
+            print(f"{name:<14}{'yüklü değil':>10}")
+            continue
+        elapsed, pages = bench_backend(backend, pdfs, args.repeat)
+        text = "\n".join(pages)
+        reference = reference if reference is not None else text
+        print(f"{name:<14}{backend.version:>10}{elapsed:>11.3f}{total_pages / elapsed:>10.0f}"
+              f"{total_mb / elapsed:>8.1f}{word_jaccard(reference, text):>13.3f}")
+
+    big_pdf = make_pdf([random_text(rng) for _ in range(args.big_pages)])
+    data_loader.PDF_SPLIT_MIN_BYTES = min(data_loader.PDF_SPLIT_MIN_BYTES, len(big_pdf))
+    times = bench_page_parallel(big_pdf, args.workers)
+    (serial, n_serial), (parallel, n_parallel) = times[False], times[True]
+    print(f"\n📚 Büyük PDF ({args.big_pages} sayfa, {len(big_pdf) / 2 ** 20:.1f} MB, "
+          f"arka uç: {PDF_BACKEND_ORDER[0]}):")
+    print(f"   seri:                 {serial:.3f} sn ({n_serial} sayfa)")
+    print(f"   sayfa paralel ({args.workers} proc): {parallel:.3f} sn ({n_parallel} sayfa), "
+          f"hızlanma {serial / parallel:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
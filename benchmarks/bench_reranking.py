@@ -0,0 +1,118 @@
+"""
+BENCH_RERANKING.PY - CROSS-ENCODER YENİDEN SIRALAMA: GECİKME VE KALİTE
+
+Sentetik sözlük korpusunda üç kurulumu karşılaştırır:
+    - dense@k        : Chroma'dan doğrudan k parça (mevcut davranış)
+    - dense@N        : Chroma'dan N parça, hepsi prompt'a (recall yüksek, prompt şişkin)
+    - rerank N->k    : Chroma'dan N aday, cross-encoder ile en iyi k parça
+Her biri için recall@prompt, prompt'a giren bağlam uzunluğu (üretim süresinin
+vekili) ve yeniden sıralama gecikmesi (p50/p95, puanlanan aday sayısı) yazdırılır.
+Farklı gecikme bütçeleri bütçenin kaliteye etkisini gösterir.
+
+Varsayılan olarak ağ gerektirmeyen sözcük örtüşmesi puanlayıcısı, --pair-ms
+ile çift başına yapay model maliyeti eklenerek kullanılır; --model ile gerçek
+bir sentence-transformers CrossEncoder denenebilir.
+
+Kullanım:
+    python benchmarks/bench_reranking.py --pair-ms 4
+    python benchmarks/bench_reranking.py --model cross-encoder/mmarco-mMiniLMv2-L12-H384-v1
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.schema import Document  # noqa: E402
+from langchain.vectorstores import Chroma  # noqa: E402
+
+from benchmarks.eval_hybrid_retrieval import percentile  # noqa: E402
+from benchmarks.synthetic_data import HashingEmbeddings, glossary_corpus  # noqa: E402
+from reranker import CrossEncoderReranker  # noqa: E402
+from turkish_text import tokenize  # noqa: E402
+
+
+def overlap_scorer(pair_ms):
+    """Soru/parça kök örtüşmesiyle puanlayan, çift başına pair_ms bekleyen sahte cross-encoder"""
+    def score(pairs):
+        if pair_ms:
+            time.sleep(pair_ms * len(pairs) / 1000)
+        scores = []
+        for query, text in pairs:
+            query_tokens = set(tokenize(query))
+            text_tokens = set(tokenize(text))
+            scores.append(len(query_tokens & text_tokens) / (len(query_tokens) or 1))
+        return scores
+    return score
+
+
+def run(name, search, queries):
+    """search(sorgu) -> Document listesi; recall, bağlam uzunluğu ve gecikmeleri yazdır"""
+    hits = 0
+    context_chars = []
+    latencies = []
+    for query, expected_term in queries:
+        start = time.perf_counter()
+        docs = search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        context_chars.append(sum(len(doc.page_content) for doc in docs))
+        if any(doc.metadata.get("term") == expected_term for doc in docs):
+            hits += 1
+    print(f"{name:<22} recall: {hits / len(queries):.3f}   "
+          f"bağlam: {statistics.mean(context_chars):7.0f} karakter   "
+          f"p50: {statistics.median(latencies):7.2f} ms   p95: {percentile(latencies, 95):7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--k", type=int, default=4, help="Prompt'a giren parça sayısı")
+    parser.add_argument("--candidates", type=int, default=30)
+    parser.add_argument("--filler", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--budgets", default="none,400,100,25",
+                        help="Virgülle ayrılmış gecikme bütçeleri (ms), 'none' = sınırsız")
+    parser.add_argument("--pair-ms", type=float, default=4.0,
+                        help="Sahte puanlayıcıda çift başına yapay maliyet (ms)")
+    parser.add_argument("--model", default=None, help="CrossEncoder model adı")
+    args = parser.parse_args()
+
+    corpus, queries = glossary_corpus(n_filler=args.filler)
+    documents = [Document(page_content=text, metadata=meta) for text, meta in corpus]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        vectordb = Chroma.from_documents(documents, HashingEmbeddings(), persist_directory=tmp_dir)
+        print(f"📚 {len(documents)} parça, {len(queries)} sorgu, "
+              f"{args.candidates} aday -> {args.k} parça\n")
+
+        run(f"dense@{args.k}", lambda q: vectordb.similarity_search(q, k=args.k), queries)
+        run(f"dense@{args.candidates}",
+            lambda q: vectordb.similarity_search(q, k=args.candidates), queries)
+
+        for budget in args.budgets.split(","):
+            budget_ms = None if budget.strip() == "none" else float(budget)
+            if args.model:
+                reranker = CrossEncoderReranker(model_name=args.model, batch_size=args.batch_size,
+                                                latency_budget_ms=budget_ms)
+                reranker.load()
+            else:
+                reranker = CrossEncoderReranker(batch_size=args.batch_size, latency_budget_ms=budget_ms,
+                                                scorer=overlap_scorer(args.pair_ms))
+            scored = []
+
+            def search(query):
+                candidates = vectordb.similarity_search(query, k=args.candidates)
+                docs = reranker.rerank(query, candidates, args.k)
+                scored.append(reranker.last_stats["scored"])
+                return docs
+
+            run(f"rerank bütçe={budget.strip()}", search, queries)
+            print(f"{'':<22} ortalama puanlanan aday: {statistics.mean(scored):.1f}, "
+                  f"çift başı: {reranker.ms_per_pair:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+BENCH_SHARDED_RETRIEVAL.PY - SHARD SAYISINA GÖRE KURMA, SORGU VE YENİDEN DENGELEME
+
+Sentetik, kümelenmiş vektörlerden (bench_vector_backends.py ile aynı üretici)
+oluşan korpus 1, 2, 4 ve 8 shard'la build_sharded_index üzerinden kurulur ve
+her shard sayısı için raporlanır:
+
+    kurma (sn)    : Boş dizinden kurma (shard'lar paralel worker process'lerde)
+    dengeleme (sn): Bir önceki shard sayısıyla kurulmuş dizinin bu sayıya
+                    yeniden dengelenmesi ve taşınan parça oranı
+    p50/p95 (ms)  : Tek istemcili sorgu gecikmesi (dağıt-topla, metadata dahil)
+    sorgu/sn      : --clients eşzamanlı istemciyle toplam verim
+    recall@k      : numpy ile birebir kosinüs aramasının top-k'sına göre
+
+Embedding maliyeti ölçüme girmesin diye vektörler önceden üretilir ("vec-<no>"
+metinleri tablodan okunur). Paralel kurma ve eşzamanlı aramanın getirisi
+çekirdek sayısıyla sınırlıdır; çekirdek sayısı çıktının başında yazılır.
+
+Kullanım:
+    python benchmarks/bench_sharded_retrieval.py --size 100000
+    python benchmarks/bench_sharded_retrieval.py --shards 1,2,4,8 --backend faiss:flat --clients 16
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.schema import Document  # noqa: E402
+
+from benchmarks.bench_vector_backends import TableEmbeddings, make_vectors, split_backend  # noqa: E402
+from benchmarks.eval_hybrid_retrieval import percentile  # noqa: E402
+from sharded_index import ShardedVectorStore, build_sharded_index  # noqa: E402
+
+
+def build(chunks, embedding, directory, num_shards, backend, options, workers):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, counts = build_sharded_index(chunks, embedding, directory, num_shards, backend=backend,
+                                        backend_options=options, workers=workers)
+    return time.perf_counter() - start, counts
+
+
+def measure_queries(store, queries, truth, k):
+    latencies, hits = [], 0
+    for query_vector, expected in zip(queries, truth):
+        start = time.perf_counter()
+        docs = store.similarity_search_by_vector(query_vector.tolist(), k=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len({doc.metadata["row"] for doc in docs} & set(expected.tolist()))
+    return latencies, hits / (len(queries) * k)
+
+
+def measure_throughput(store, queries, k, clients):
+    """clients thread'i sorgu listesini paylaşarak tüketir; toplam sorgu/sn"""
+    vectors = [query_vector.tolist() for query_vector in queries]
+    position = iter(range(len(vectors)))
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            with lock:
+                index = next(position, None)
+            if index is None:
+                return
+            store.similarity_search_by_vector(vectors[index], k=k)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(vectors) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--shards", default="1,2,4,8")
+    parser.add_argument("--backend", default="faiss:hnsw", help="chroma, faiss:flat, faiss:hnsw veya faiss:ivfpq")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Paralel kurulan shard sayısı")
+    parser.add_argument("--clients", type=int, default=8, help="Verim ölçümündeki eşzamanlı istemci")
+    args = parser.parse_args()
+
+    vectors, queries = make_vectors(args.size, args.dim, args.queries)
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.k]
+    embedding = TableEmbeddings(vectors)
+    chunks = [Document(page_content=f"vec-{i}", metadata={"source": f"doc_{i // 50}", "row": i})
+              for i in range(args.size)]
+    backend, options = split_backend(args.backend)
+    shard_counts = [int(count) for count in args.shards.split(",")]
+
+    print(f"📚 {args.size} vektör x {args.dim} boyut, {args.backend}, {args.queries} sorgu, recall@{args.k}, "
+          f"{os.cpu_count()} CPU, {args.workers} kurma worker'ı, {args.clients} istemci\n")
+    print(f"{'shard':>6}{'kurma (sn)':>12}{'dengeleme (sn)':>16}{'taşınan':>9}"
+          f"{'p50 ms':>8}{'p95 ms':>8}{'sorgu/sn':>10}{'recall':>8}")
+    with tempfile.TemporaryDirectory() as rebalanced_dir:
+        previous = None
+        for num_shards in shard_counts:
+            with tempfile.TemporaryDirectory() as fresh_dir:
+                build_seconds, _ = build(chunks, embedding, fresh_dir, num_shards, backend, options, args.workers)
+
+                # Aynı korpus bir önceki shard sayısından bu sayıya yeniden dengelenir
+                rebalance = "-"
+                if previous is not None:
+                    rebalance_seconds, counts = build(chunks, embedding, rebalanced_dir, num_shards,
+                                                      backend, options, args.workers)
+                    rebalance = f"{rebalance_seconds:.1f}"
+                    moved = f"%{counts['moved'] / args.size * 100:.0f}"
+                else:
+                    build(chunks, embedding, rebalanced_dir, num_shards, backend, options, args.workers)
+                    moved = "-"
+                previous = num_shards
+
+                store = ShardedVectorStore(embedding, fresh_dir, num_shards, backend=backend, backend_options=options)
+                store.similarity_search_by_vector(queries[0].tolist(), k=args.k)  # Isınma (mmap sayfaları)
+                latencies, recall = measure_queries(store, queries, truth, args.k)
+                throughput = measure_throughput(store, queries, args.k, args.clients)
+                print(f"{num_shards:>6}{build_seconds:>12.1f}{rebalance:>16}{moved:>9}"
+                      f"{np.median(latencies):>8.2f}{percentile(latencies, 95):>8.2f}{throughput:>10.0f}{recall:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
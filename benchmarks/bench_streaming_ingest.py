@@ -0,0 +1,158 @@
+"""
+BENCH_STREAMING_INGEST.PY - TOPLU VS AKIŞ (STREAMING) İNDEKSLEME BELLEK ÖLÇÜMÜ
+
+Sentetik bir korpusu (varsayılan 10.000 sayfa; ZIP'ler önceki PDF'lerin
+kopyalarını içerir) iki yolla indeksler ve her birini ayrı bir process'te
+çalıştırıp tepe RSS'i ve süreyi raporlar:
+
+    batch  : process_dataset_files -> split_documents -> deduplicate_chunks
+             -> build_or_update_index (her şey aynı anda bellekte)
+    stream : iter_page_documents -> stream_into_index (sınırlı kuyruklar)
+
+Dataset satırları da tembel üretilir, böylece ölçülen bellek girdinin
+kendisini değil pipeline'ı yansıtır. Farklı korpus boyutlarında toplu
+modun metinle orantılı büyüdüğü, akış modunda ise sadece parça başına
+sabit küçük durumun (ID, MinHash imzası, HNSW) biriktiği görülür.
+
+Kullanım:
+    python benchmarks/bench_streaming_ingest.py --sizes 2500,10000
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_data import WordHashingEmbeddings, make_pdf, make_zip, random_text  # noqa: E402
+
+CHUNK_SIZE = 800
+CHUNK_OVERLAP = 150
+
+
+class LazyDataset:
+    """
+    HF dataset satırlarını istendikçe üreten iterable.
+
+    Her 10 PDF'ten sonra son iki PDF'i içeren bir ZIP gelir (tekrar eden içerik).
+    """
+
+    def __init__(self, total_pages, pages_per_pdf=20, seed=42):
+        self.total_pages = total_pages
+        self.pages_per_pdf = pages_per_pdf
+        self.seed = seed
+
+    def _pdf(self, number):
+        rng = random.Random(self.seed * 100003 + number)
+        return make_pdf([random_text(rng) for _ in range(self.pages_per_pdf)])
+
+    def __iter__(self):
+        for number in range(self.total_pages // self.pages_per_pdf):
+            yield {"file_name": f"doc_{number}.pdf", "content": self._pdf(number)}
+            if number % 10 == 9:
+                members = {f"copy_{n}.pdf": self._pdf(n) for n in (number - 1, number)}
+                yield {"file_name": f"archive_{number}.zip", "content": make_zip(members)}
+
+
+def current_rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def make_splitter():
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    return RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, length_function=len, add_start_index=True
+    )
+
+
+def run_batch(loader, embedding, persist_directory):
+    from dedup import deduplicate_chunks
+    from vector_index import build_or_update_index
+
+    documents = loader.process_dataset_files(parallel=False, use_cache=False)
+    chunks = make_splitter().split_documents(documents)
+    chunks, _ = deduplicate_chunks(chunks)
+    _, counts = build_or_update_index(chunks, embedding, persist_directory)
+    return counts
+
+
+def run_stream(loader, embedding, persist_directory):
+    from dedup import ChunkDeduplicator
+    from ingest_pipeline import stream_into_index
+
+    _, counts = stream_into_index(
+        loader.iter_page_documents(use_cache=False), make_splitter(), embedding,
+        persist_directory, deduplicator=ChunkDeduplicator(keep_metadata=False), batch_size=100,
+    )
+    return counts
+
+
+def measure(mode, total_pages, results):
+    """Çocuk process'te tek bir ölçüm yap; sonucu kuyruğa koy"""
+    from data_loader import TutkuSupplyChainLoader
+
+    samples = []
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(0.2):
+            samples.append(current_rss_mb())
+
+    baseline = current_rss_mb()
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+
+    loader = TutkuSupplyChainLoader()
+    loader.dataset = LazyDataset(total_pages)
+    runner = run_batch if mode == "batch" else run_stream
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        counts = runner(loader, WordHashingEmbeddings(), tmp_dir)
+    elapsed = time.perf_counter() - start
+    done.set()
+
+    results.put({
+        "mode": mode,
+        "pages": total_pages,
+        "seconds": elapsed,
+        "baseline_mb": baseline,
+        "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "samples": samples,
+        "chunks": counts["added"],
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="2500,10000", help="Virgülle ayrılmış sayfa sayıları")
+    parser.add_argument("--modes", default="batch,stream")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"{'mod':<8}{'sayfa':>8}{'parça':>9}{'süre (sn)':>12}{'başlangıç MB':>15}{'tepe MB':>10}   RSS seyri (çeyrekler)")
+    for total_pages in (int(size) for size in args.sizes.split(",")):
+        for mode in args.modes.split(","):
+            results = context.Queue()
+            process = context.Process(target=measure, args=(mode, total_pages, results))
+            process.start()
+            result = results.get()
+            process.join()
+
+            samples = result["samples"] or [result["peak_mb"]]
+            quartiles = [samples[min(len(samples) - 1, len(samples) * q // 4)] for q in (1, 2, 3, 4)]
+            print(f"{mode:<8}{total_pages:>8}{result['chunks']:>9}{result['seconds']:>12.1f}"
+                  f"{result['baseline_mb']:>15.0f}{result['peak_mb']:>10.0f}   "
+                  + " -> ".join(f"{value:.0f}" for value in quartiles))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+BENCH_TEXT_SPLITTER.PY - RecursiveCharacterTextSplitter VS ChunkSplitter: EŞDEĞERLİK VE HIZ
+
+Sentetik PDF sayfaları (paragraflar, satırlar, cümleler, boşluksuz uzun
+tablolar/URL'ler, tekrar eden başlıklar) ve uç durumlar (boş metin, sadece
+boşluk, "\\n\\n\\n" dizileri, tek parça uzun kelime) iki bölücüyle bölünür:
+
+    langchain : RecursiveCharacterTextSplitter (app.py / chain.py'deki mevcut hal)
+    chunk     : chunk_splitter.ChunkSplitter
+
+İki ayraç seti (app.py varsayılanı ve chain.py'nin PDF listesi) için hem
+karakter modunda (CHUNK_SIZE/CHUNK_OVERLAP) hem token modunda parça
+metinlerinin ve metadata'nın (start_index dahil) birebir aynı olduğu
+doğrulanır ve bölme süreleri karşılaştırılır. Token modunda langchain'e
+aynı tokenizer'ın tek metinlik sayacı length_function olarak verilir.
+--tokenizer yüklenemezse (transformers/ağ yoksa) korpus üzerinde eğitilen
+küçük bir BPE tokenizer'ı (tokenizers kütüphanesi) kullanılır.
+
+Herhangi bir fark bulunursa çıkış kodu 1 olur.
+
+Kullanım:
+    python benchmarks/bench_text_splitter.py --pages 2000
+    python benchmarks/bench_text_splitter.py --tokenizer google/flan-t5-large --token-chunk-size 256
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.schema import Document  # noqa: E402
+from langchain.text_splitter import RecursiveCharacterTextSplitter  # noqa: E402
+
+from benchmarks.synthetic_data import WORDS  # noqa: E402
+from chunk_splitter import ChunkSplitter, load_tokenizer, token_counter  # noqa: E402
+
+SEPARATOR_SETS = {
+    "app": None,  # RecursiveCharacterTextSplitter varsayılanı: ["\n\n", "\n", " ", ""]
+    "chain": ["\n\n", "\n", ". ", "! ", "? ", " ", ""],
+}
+
+
+def sentence(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randrange(4, 18))]
+    return " ".join(words).capitalize() + rng.choice([".", ".", ".", "!", "?", ":"])
+
+
+def make_page(rng, number):
+    paragraphs = [f"Ders Notları - Sayfa {number}"]  # Her sayfada tekrar eden başlık
+    for _ in range(rng.randrange(2, 9)):
+        lines = []
+        for _ in range(rng.randrange(1, 7)):
+            lines.append(" ".join(sentence(rng) for _ in range(rng.randrange(1, 4))))
+        if rng.random() < 0.08:
+            # PDF tablolarından/URL'lerden gelen boşluksuz uzun dizi
+            lines.append("-".join(rng.choice(WORDS).replace(" ", "_") for _ in range(rng.randrange(40, 200))))
+        paragraphs.append("\n".join(lines))
+    separator = rng.choice(["\n\n", "\n\n", "\n\n\n", " \n\n"])
+    return separator.join(paragraphs) + rng.choice(["", "\n", "  \n\n"])
+
+
+def edge_cases():
+    return [
+        "",
+        "   \n\n  ",
+        "a",
+        "x" * 3000,
+        ("aynı paragraf tekrar ediyor. " * 20 + "\n\n") * 6,
+        "\n\n\n\n" + "tedarik zinciri\n\n\n" * 50,
+        "satır\n" * 400,
+        " ".join(["envanter"] * 500),
+    ]
+
+
+def make_documents(n_pages, seed=11):
+    rng = random.Random(seed)
+    texts = [make_page(rng, number) for number in range(n_pages)] + edge_cases()
+    return [Document(page_content=text, metadata={"source": f"dataset_pdf_{i // 20}", "page": i % 20})
+            for i, text in enumerate(texts)]
+
+
+def train_fallback_tokenizer(documents, vocab_size=2000):
+    """transformers yoksa: korpus üzerinde küçük bir byte-level BPE (tokenizers, Rust)"""
+    from tokenizers import Tokenizer, models, pre_tokenizers, trainers
+
+    tokenizer = Tokenizer(models.BPE())
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    trainer = trainers.BpeTrainer(vocab_size=vocab_size, show_progress=False,
+                                  initial_alphabet=pre_tokenizers.ByteLevel.alphabet())
+    tokenizer.train_from_iterator((doc.page_content for doc in documents), trainer=trainer)
+    return tokenizer
+
+
+def best_of(func, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def first_difference(expected, actual):
+    if len(expected) != len(actual):
+        return f"parça sayısı {len(expected)} != {len(actual)}"
+    for index, (a, b) in enumerate(zip(expected, actual)):
+        if a.page_content != b.page_content or a.metadata != b.metadata:
+            return f"parça {index}: {a.metadata} {a.page_content[:60]!r} != {b.metadata} {b.page_content[:60]!r}"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=800)
+    parser.add_argument("--chunk-overlap", type=int, default=150)
+    parser.add_argument("--tokenizer", default="google/flan-t5-large")
+    parser.add_argument("--token-chunk-size", type=int, default=256)
+    parser.add_argument("--token-overlap", type=int, default=48)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    documents = make_documents(args.pages)
+    total_chars = sum(len(doc.page_content) for doc in documents)
+    print(f"📚 {len(documents)} sayfa, {total_chars / 1e6:.1f}M karakter\n")
+
+    try:
+        tokenizer = load_tokenizer(args.tokenizer)
+        tokenizer_name = args.tokenizer
+    except Exception as e:
+        print(f"⚠️ {args.tokenizer} yüklenemedi ({type(e).__name__}); korpus üzerinde eğitilmiş BPE kullanılacak.\n")
+        tokenizer = train_fallback_tokenizer(documents)
+        tokenizer_name = "yerel BPE"
+    count_tokens = token_counter(tokenizer)
+
+    print(f"{'mod':<28}{'parça':>8}{'langchain (sn)':>16}{'chunk (sn)':>12}{'hızlanma':>10}  eşdeğer")
+    failed = False
+    for set_name, separators in SEPARATOR_SETS.items():
+        modes = [
+            (f"karakter {args.chunk_size}/{args.chunk_overlap}", args.chunk_size, args.chunk_overlap, None),
+            (f"token {args.token_chunk_size}/{args.token_overlap}", args.token_chunk_size, args.token_overlap,
+             count_tokens),
+        ]
+        for mode_name, size, overlap, batch_length in modes:
+            kwargs = {"chunk_size": size, "chunk_overlap": overlap, "add_start_index": True}
+            if separators is not None:
+                kwargs["separators"] = separators
+            if batch_length is None:
+                reference = RecursiveCharacterTextSplitter(**kwargs)
+            else:
+                # Mevcut yol: her parça için ayrı tokenizer çağrısı
+                reference = RecursiveCharacterTextSplitter(length_function=lambda text: count_tokens([text])[0],
+                                                           **kwargs)
+            splitter = ChunkSplitter(batch_length_function=batch_length, **kwargs)
+
+            expected, reference_seconds = best_of(lambda: reference.split_documents(documents), args.repeat)
+            actual, seconds = best_of(lambda: splitter.split_documents(documents), args.repeat)
+            difference = first_difference(expected, actual)
+            failed |= difference is not None
+            print(f"{set_name + ' / ' + mode_name:<28}{len(actual):>8}{reference_seconds:>16.2f}{seconds:>12.2f}"
+                  f"{reference_seconds / seconds:>9.1f}x  {'✅' if difference is None else '❌ ' + difference}")
+
+    print(f"\n(token modu: {tokenizer_name}, özel token'lar hariç)")
+    if failed:
+        print("\n⚠️ ChunkSplitter çıktısı RecursiveCharacterTextSplitter ile aynı değil")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+BENCH_VECTOR_BACKENDS.PY - CHROMA VS FAISS (FLAT / HNSW / IVF-PQ)
+
+Sentetik, kümelenmiş vektörlerden (varsayılan 50.000 x 384, MiniLM boyutu)
+oluşan bir korpusu her arka uçla build_or_update_index üzerinden indeksler
+ve şunları raporlar:
+
+    kurma (sn)   : Boş dizinden indeks kurma süresi
+    disk (MB)    : Persist dizininin boyutu
+    anon/dosya MB: Yeni bir process'te indeks açılıp sorgular çalıştıktan
+                   sonraki özel (anonim) bellek ve bellek eşlemeli dosya
+                   sayfaları (page cache, geri alınabilir) artışı
+    p50/p95 (ms) : Tek sorgu gecikmesi (metadata okuma dahil)
+    recall@k     : numpy ile birebir kosinüs aramasının top-k'sına göre
+
+Embedding maliyeti ölçüme girmesin diye vektörler önceden üretilir; metin
+"vec-<no>" biçimindedir ve sahte embedder vektörü tablodan okur. Her ölçüm
+ayrı bir process'te yapılır (bellek ölçümü birbirini etkilemesin).
+
+Kullanım:
+    python benchmarks/bench_vector_backends.py --size 50000
+    python benchmarks/bench_vector_backends.py --backends faiss:hnsw,faiss:ivfpq --size 200000
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.eval_hybrid_retrieval import percentile  # noqa: E402
+
+DEFAULT_BACKENDS = "chroma,faiss:flat,faiss:hnsw,faiss:ivfpq"
+
+
+def make_vectors(size, dim, n_queries, seed=0, latent_dim=32):
+    """
+    Normalize vektörler ve korpus dışı (gürültülü) sorgular.
+
+    Cümle embedding'leri gibi düşük iç boyutlu olsun diye kümeler latent_dim
+    boyutlu bir uzayda üretilip rastgele bir izdüşümle dim boyuta taşınır.
+    """
+    rng = np.random.RandomState(seed)
+    projection = rng.normal(size=(latent_dim, dim)).astype(np.float32)
+    centers = rng.normal(size=(max(1, size // 100), latent_dim)).astype(np.float32)
+    latent = centers[rng.randint(0, len(centers), size)] + 0.5 * rng.normal(size=(size, latent_dim)).astype(np.float32)
+    vectors = latent @ projection + 0.5 * rng.normal(size=(size, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = vectors[rng.randint(0, size, n_queries)] + 0.02 * rng.normal(size=(n_queries, dim)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return vectors, queries
+
+
+class TableEmbeddings:
+    """'vec-<no>' metinlerini önceden üretilmiş vektör tablosundan okuyan sahte embedder"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.model_name = f"table-{vectors.shape[0]}x{vectors.shape[1]}"
+
+    def embed_documents(self, texts):
+        return [self.vectors[int(text.split("-")[1])].tolist() for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def memory_mb():
+    """(anonim, dosya) RSS, MB"""
+    values = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("RssAnon", "RssFile")):
+                key, value = line.split(":")
+                values[key] = int(value.split()[0]) / 1024
+    return values.get("RssAnon", 0.0), values.get("RssFile", 0.0)
+
+
+def directory_mb(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total / 2 ** 20
+
+
+def split_backend(spec):
+    backend, _, index_type = spec.partition(":")
+    return backend, ({"index_type": index_type} if index_type else {})
+
+
+def build(spec, args, persist_directory, results):
+    """Çocuk process: indeksi sıfırdan kur"""
+    from langchain.schema import Document
+    from vector_index import build_or_update_index
+
+    vectors, _ = make_vectors(args.size, args.dim, args.queries)
+    chunks = [Document(page_content=f"vec-{i}", metadata={"source": f"doc_{i // 50}", "row": i})
+              for i in range(args.size)]
+    backend, options = split_backend(spec)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        build_or_update_index(chunks, TableEmbeddings(vectors), persist_directory, batch_size=1000,
+                              backend=backend, backend_options=options)
+    results.put({
+        "build_seconds": time.perf_counter() - start,
+        "build_peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    })
+
+
+def query(spec, args, persist_directory, results):
+    """Çocuk process: kurulu indeksi aç, sorguları çalıştır"""
+    from vector_backends import open_vector_store
+
+    vectors, queries = make_vectors(args.size, args.dim, args.queries)
+    # Birebir (exact) top-k: doğruluk referansı
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.k]
+    embedding = TableEmbeddings(vectors)
+    backend, options = split_backend(spec)
+
+    anon_before, file_before = memory_mb()
+    vectordb = open_vector_store(backend, embedding, persist_directory, **options)
+    latencies = []
+    hits = 0
+    for query_vector, expected in zip(queries, truth):
+        start = time.perf_counter()
+        docs = vectordb.similarity_search_by_vector(query_vector.tolist(), k=args.k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len({doc.metadata["row"] for doc in docs} & set(expected.tolist()))
+    anon_after, file_after = memory_mb()
+
+    results.put({
+        "recall": hits / (len(queries) * args.k),
+        "p50": float(np.median(latencies)),
+        "p95": percentile(latencies, 95),
+        "anon_mb": anon_after - anon_before,
+        "file_mb": file_after - file_before,
+    })
+
+
+def run_child(context, target, *args):
+    results = context.Queue()
+    process = context.Process(target=target, args=(*args, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--backends", default=DEFAULT_BACKENDS)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"📚 {args.size} vektör x {args.dim} boyut, {args.queries} sorgu, recall@{args.k}\n")
+    print(f"{'arka uç':<14}{'kurma (sn)':>11}{'kurma tepe MB':>15}{'disk MB':>9}"
+          f"{'anon MB':>9}{'dosya MB':>10}{'p50 ms':>8}{'p95 ms':>8}{'recall':>8}")
+    for spec in args.backends.split(","):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            built = run_child(context, build, spec, args, tmp_dir)
+            queried = run_child(context, query, spec, args, tmp_dir)
+            print(f"{spec:<14}{built['build_seconds']:>11.1f}{built['build_peak_mb']:>15.0f}"
+                  f"{directory_mb(tmp_dir):>9.0f}{queried['anon_mb']:>9.0f}{queried['file_mb']:>10.0f}"
+                  f"{queried['p50']:>8.2f}{queried['p95']:>8.2f}{queried['recall']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
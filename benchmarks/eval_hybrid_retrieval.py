@@ -0,0 +1,87 @@
+"""
+EVAL_HYBRID_RETRIEVAL.PY - DENSE / BM25 / HİBRİT ARAMA DEĞERLENDİRMESİ
+
+Sentetik sözlük korpusu üzerinde her arayıcı için recall@k ve sorgu
+gecikmesini (p50/p95) raporlar. Varsayılan olarak ağ gerektirmeyen
+HashingEmbeddings kullanılır; --model ile gerçek bir sentence-transformers
+modeli denenebilir.
+
+Kullanım:
+    python benchmarks/eval_hybrid_retrieval.py --k 4
+    python benchmarks/eval_hybrid_retrieval.py --model sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.schema import Document  # noqa: E402
+from langchain.vectorstores import Chroma  # noqa: E402
+
+from benchmarks.synthetic_data import HashingEmbeddings, glossary_corpus  # noqa: E402
+from hybrid_retriever import BM25Index, HybridRetriever  # noqa: E402
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def evaluate(name, search, queries, k):
+    """search(sorgu) -> Document listesi; recall@k ve gecikmeleri yazdır"""
+    hits = 0
+    latencies = []
+    for query, expected_term in queries:
+        start = time.perf_counter()
+        docs = search(query)[:k]
+        latencies.append((time.perf_counter() - start) * 1000)
+        if any(doc.metadata.get("term") == expected_term for doc in docs):
+            hits += 1
+    print(f"{name:<8} recall@{k}: {hits / len(queries):.3f}   "
+          f"p50: {statistics.median(latencies):.2f} ms   p95: {percentile(latencies, 95):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--filler", type=int, default=500)
+    parser.add_argument("--model", default=None, help="HuggingFaceEmbeddings model adı")
+    args = parser.parse_args()
+
+    corpus, queries = glossary_corpus(n_filler=args.filler)
+    documents = [Document(page_content=text, metadata=meta) for text, meta in corpus]
+
+    if args.model:
+        from langchain.embeddings import HuggingFaceEmbeddings
+        embeddings = HuggingFaceEmbeddings(model_name=args.model)
+    else:
+        embeddings = HashingEmbeddings()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        start = time.perf_counter()
+        vectordb = Chroma.from_documents(documents, embeddings, persist_directory=tmp_dir)
+        dense_build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        bm25 = BM25Index().build(documents)
+        bm25_build = time.perf_counter() - start
+
+        print(f"📚 {len(documents)} parça, {len(queries)} sorgu")
+        print(f"⏱️ Chroma kurulum: {dense_build:.2f} sn, BM25 kurulum: {bm25_build * 1000:.1f} ms\n")
+
+        hybrid = HybridRetriever(vectorstore=vectordb, bm25=bm25, k=args.k,
+                                 dense_k=args.candidates, sparse_k=args.candidates)
+        evaluate("dense", lambda q: vectordb.similarity_search(q, k=args.k), queries, args.k)
+        evaluate("bm25", lambda q: [bm25.get_document(i) for i, _ in bm25.search(q, k=args.k)],
+                 queries, args.k)
+        evaluate("hybrid", hybrid.get_relevant_documents, queries, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+GEMINI_STUB.PY - GEMINI REST UÇ NOKTALARININ YEREL TAKLİDİ
+
+gemini_async.AsyncGeminiClient'ın kullandığı üç uç noktayı taklit eden
+aiohttp sunucusu; ağ ve API key gerektirmeden async API'yi test etmek içindir:
+
+    POST /v1beta/{model}:embedContent         -> {"embedding": {"values": [...]}}
+    POST /v1beta/{model}:batchEmbedContents   -> {"embeddings": [{"values": [...]}, ...]}
+    POST /v1beta/{model}:generateContent      -> {"candidates": [{"content": {"parts": [{"text": ...}]}}]}
+    GET  /stats                               -> uç nokta başına istek sayıları
+
+Vektörler WordHashingEmbeddings ile, cevaplar fake_answer_tokens ile
+deterministik üretilir. Gecikme, rastgele 503 hatası (--failure-rate) ve
+eşzamanlılık sınırı aşılınca Retry-After'lı 429 (--max-concurrent) ayarlanabilir.
+
+Kullanım:
+    python benchmarks/gemini_stub.py --port 8787 --latency-ms 150
+    GEMINI_API_BASE_URL=http://127.0.0.1:8787 python ...
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+from collections import Counter
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_data import WordHashingEmbeddings, fake_answer_tokens  # noqa: E402
+
+
+class GeminiStub:
+    """
+    Aynı event loop'ta çalıştırılabilen taklit sunucu:
+
+        async with GeminiStub(latency_ms=100) as stub:
+            client = AsyncGeminiClient(..., base_url=stub.base_url)
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=100.0, generate_latency_ms=None,
+                 failure_rate=0.0, max_concurrent=0, dim=128, n_tokens=32, seed=0):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.generate_latency_ms = latency_ms if generate_latency_ms is None else generate_latency_ms
+        self.failure_rate = failure_rate
+        self.max_concurrent = max_concurrent
+        self.embeddings = WordHashingEmbeddings(dim=dim)
+        self.n_tokens = n_tokens
+        self.rng = random.Random(seed)
+        self.requests = Counter()  # (uç nokta, durum kodu) -> sayı
+        self.active = 0
+        self.peak_active = 0
+        self._runner = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def _app(self):
+        app = web.Application()
+        app.router.add_post("/v1beta/{model:.+}:embedContent", self._handler("embed", self._embed))
+        app.router.add_post("/v1beta/{model:.+}:batchEmbedContents", self._handler("batch_embed", self._batch_embed))
+        app.router.add_post("/v1beta/{model:.+}:generateContent", self._handler("generate", self._generate))
+        app.router.add_get("/stats", self._stats)
+        return app
+
+    def _handler(self, endpoint, respond):
+        async def handle(request):
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            try:
+                if self.max_concurrent and self.active > self.max_concurrent:
+                    self.requests[(endpoint, 429)] += 1
+                    return web.json_response({"error": {"message": "Quota exceeded"}}, status=429,
+                                             headers={"Retry-After": "0.05"})
+                latency = self.generate_latency_ms if endpoint == "generate" else self.latency_ms
+                await asyncio.sleep(latency / 1000)
+                if self.rng.random() < self.failure_rate:
+                    self.requests[(endpoint, 503)] += 1
+                    return web.json_response({"error": {"message": "Service unavailable"}}, status=503)
+                body = await request.json()
+                self.requests[(endpoint, 200)] += 1
+                return web.json_response(respond(body))
+            finally:
+                self.active -= 1
+        return handle
+
+    def _embed(self, body):
+        return {"embedding": {"values": self.embeddings.embed_query(body["content"]["parts"][0]["text"])}}
+
+    def _batch_embed(self, body):
+        texts = [item["content"]["parts"][0]["text"] for item in body["requests"]]
+        return {"embeddings": [{"values": vector} for vector in self.embeddings.embed_documents(texts)]}
+
+    def _generate(self, body):
+        prompt = "".join(part["text"] for part in body["contents"][-1]["parts"])
+        text = " ".join(fake_answer_tokens(prompt, self.n_tokens))
+        return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+    async def _stats(self, request):
+        return web.json_response({
+            "requests": {f"{endpoint}:{status}": count for (endpoint, status), count in self.requests.items()},
+            "peak_active": self.peak_active,
+        })
+
+    def count(self, endpoint, status=200):
+        return self.requests[(endpoint, status)]
+
+    async def start(self):
+        self._runner = web.AppRunner(self._app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # port=0 ise işletim sisteminin verdiği portu oku
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+
+async def serve_forever(args):
+    stub = GeminiStub(host=args.host, port=args.port, latency_ms=args.latency_ms,
+                      failure_rate=args.failure_rate, max_concurrent=args.max_concurrent, dim=args.dim)
+    async with stub:
+        print(f"🧪 Gemini taklidi çalışıyor: {stub.base_url} (GEMINI_API_BASE_URL olarak verin)")
+        await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrent", type=int, default=0, help="0: sınırsız; aşılınca 429 döner")
+    parser.add_argument("--dim", type=int, default=128)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve_forever(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
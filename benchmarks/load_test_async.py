@@ -0,0 +1,138 @@
+"""
+LOAD_TEST_ASYNC.PY - ASYNC API YÜK TESTİ (YEREL GEMINI TAKLİDİNE KARŞI)
+
+SupplyChainChatbot'un async API'sini (aingest, aask) benchmarks/gemini_stub.py
+taklidine karşı çalıştırır ve raporlar:
+
+    aingest        : Sentetik dataset'in eşzamanlı batch embed ile indekslenmesi
+    sıralı         : Sorular tek tek await edilir (eski senkron davranış gibi)
+    eşzamanlı      : --clients istemci aynı anda soru sorar; throughput ve p50/p95
+    aynı soru      : Aynı soru eşzamanlı sorulur; taklide giden üretim çağrısı sayısı
+                     (birleştirme / coalescing sayesinde 1 olmalı)
+    hata enjeksiyonu: İsteklerin --failure-rate'i 503 döner; tüm sorular
+                     jitter'lı tekrar denemeyle yine cevaplanmalı
+
+Taklidin gördüğü en yüksek eşzamanlı istek sayısı ASYNC_MAX_CONCURRENCY'yi aşmamalı.
+
+Kullanım:
+    python benchmarks/load_test_async.py --clients 32 --latency-ms 150
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chain  # noqa: E402
+from benchmarks.bench_end_to_end import make_queries  # noqa: E402
+from benchmarks.eval_hybrid_retrieval import percentile  # noqa: E402
+from benchmarks.gemini_stub import GeminiStub  # noqa: E402
+from benchmarks.synthetic_data import FakeChatModel, WordHashingEmbeddings, make_dataset  # noqa: E402
+from data_loader import TutkuSupplyChainLoader  # noqa: E402
+from gemini_async import AsyncGeminiClient  # noqa: E402
+from metrics import METRICS  # noqa: E402
+
+
+class StubGeminiChat(FakeChatModel):
+    """Gemini modelinin adını taşıyan sahte sohbet modeli: aask üretimi async istemciyle taklide gider"""
+
+    model: str = chain.MODEL_NAME
+
+
+async def timed_questions(chatbot, questions, concurrent):
+    """(toplam süre sn, soru başına gecikmeler ms)"""
+    latencies = []
+
+    async def one(question):
+        start = time.perf_counter()
+        await chatbot.aask(question)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    if concurrent:
+        await asyncio.gather(*(one(question) for question in questions))
+    else:
+        for question in questions:
+            await one(question)
+    return time.perf_counter() - start, latencies
+
+
+def report(name, elapsed, latencies):
+    print(f"{name:<12} {len(latencies) / elapsed:8.1f} soru/sn   p50: {statistics.median(latencies):7.1f} ms   "
+          f"p95: {percentile(latencies, 95):7.1f} ms")
+
+
+async def run(args, persist_directory):
+    chain.VECTOR_DB_PATH = persist_directory
+    chain.RERANKING = False
+    chain.EMBEDDING_CACHE_DIR = ""
+    chain.METRICS_PORT = 0
+
+    loader = TutkuSupplyChainLoader()
+    loader.dataset = make_dataset(n_pdfs=20, n_zips=2, n_txts=5)
+
+    async with GeminiStub(latency_ms=args.latency_ms, dim=args.dim) as stub:
+        client = AsyncGeminiClient(
+            api_key="stub", model=chain.MODEL_NAME, embedding_model=chain.GEMINI_EMBEDDING_MODEL,
+            base_url=stub.base_url, max_concurrency=args.concurrency, pool_size=args.concurrency,
+            retry_base_seconds=0.05, retry_max_seconds=0.5,
+        )
+        # Taklitle aynı vektörleri üreten yerel embedder; Gemini modelinin adını taşır ki
+        # aingest/aask embedding'leri (Gemini ile kurulmuş indeksteki gibi) async istemciyle taklide gitsin
+        embeddings = WordHashingEmbeddings(dim=args.dim)
+        embeddings.model_name = chain.GEMINI_EMBEDDING_MODEL
+        chatbot = chain.SupplyChainChatbot(
+            embeddings=embeddings, llm=StubGeminiChat(), loader=loader, async_client=client
+        )
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            chunks = await asyncio.to_thread(chatbot.load_and_process_data)
+            await chatbot.aingest(chunks)
+        print(f"aingest      {len(chunks)} parça, {time.perf_counter() - start:.2f} sn, "
+              f"{stub.count('batch_embed')} batch isteği")
+
+        questions = make_queries(args.clients)
+        report("sıralı", *await timed_questions(chatbot, questions[:max(4, args.clients // 4)], concurrent=False))
+        report("eşzamanlı", *await timed_questions(chatbot, questions, concurrent=True))
+        print(f"             taklidin gördüğü en yüksek eşzamanlılık: {stub.peak_active} "
+              f"(sınır {args.concurrency})")
+
+        before = stub.count("generate")
+        await asyncio.gather(*(chatbot.aask("Kanban nedir?") for _ in range(args.clients)))
+        print(f"aynı soru    {args.clients} eşzamanlı istek -> {stub.count('generate') - before} üretim çağrısı "
+              f"({chatbot._coalescer.coalesced} istek birleştirildi)")
+
+        stub.failure_rate = args.failure_rate
+        elapsed, latencies = await timed_questions(chatbot, make_queries(args.clients, seed=11), concurrent=True)
+        failures = sum(stub.count(endpoint, 503) for endpoint in ("embed", "generate"))
+        retries = sum(value for name, value in METRICS.snapshot()["counters"].items()
+                      if name.startswith("chatbot_gemini_retries_total"))
+        report("hata enj.", elapsed, latencies)
+        print(f"             %{args.failure_rate * 100:.0f} hata: {failures} adet 503, {retries:.0f} tekrar deneme, "
+              f"{len(latencies)}/{args.clients} soru cevaplandı")
+        await chatbot.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8, help="ASYNC_MAX_CONCURRENCY")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Taklidin istek başına gecikmesi")
+    parser.add_argument("--failure-rate", type=float, default=0.2)
+    parser.add_argument("--dim", type=int, default=128)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        asyncio.run(run(args, os.path.join(tmp_dir, "index")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+LOAD_TEST_BATCHING.PY - MİKRO-BATCH YÜK TESTİ
+
+Eşzamanlı istemcilerle tekil üretim, MicroBatcher ve MicroBatcher üzerinden
+akışlı üretimi (Gradio yolu) karşılaştırır; throughput ve p50/p95/p99
+gecikmeyi raporlar.
+
+Varsayılan olarak model yüklemeden, batch maliyeti
+"sabit ek yük + istek başına küçük maliyet" olan sahte bir üretici kullanılır.
+--model ile gerçek bir seq2seq model (ör. google/flan-t5-small) denenebilir.
+
+Kullanım:
+    python benchmarks/load_test_batching.py --clients 16 --requests 10
+    python benchmarks/load_test_batching.py --model google/flan-t5-small --max-new-tokens 32
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_generator import MicroBatcher, Seq2SeqBatchGenerator  # noqa: E402
+
+
+def fake_generate_batch(base_ms, per_item_ms):
+    """Batch boyutuyla alt-doğrusal büyüyen maliyeti taklit eden üretici"""
+    lock = threading.Lock()  # Tek bir model gibi: aynı anda tek batch çalışır
+
+    def generate(prompts):
+        with lock:
+            time.sleep((base_ms + per_item_ms * len(prompts)) / 1000)
+        return [f"cevap: {prompt}" for prompt in prompts]
+    return generate
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_load(call, clients, requests_per_client):
+    latencies = []
+    lock = threading.Lock()
+
+    def client(client_id):
+        for i in range(requests_per_client):
+            start = time.perf_counter()
+            call(f"Soru {client_id}-{i}: tedarik zinciri nedir?")
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, latencies
+
+
+def report(name, throughput, latencies):
+    ms = [latency * 1000 for latency in latencies]
+    print(f"{name:<10} throughput: {throughput:7.2f} istek/sn   p50: {percentile(ms, 50):7.1f} ms   "
+          f"p95: {percentile(ms, 95):7.1f} ms   p99: {percentile(ms, 99):7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=8, help="istemci başına istek")
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=15)
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--base-ms", type=float, default=80, help="sahte üretici batch ek yükü")
+    parser.add_argument("--per-item-ms", type=float, default=10, help="sahte üretici istek başı maliyet")
+    args = parser.parse_args()
+
+    if args.model:
+        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+        tokenizer = AutoTokenizer.from_pretrained(args.model)
+        model = AutoModelForSeq2SeqLM.from_pretrained(args.model)
+        generate_batch = Seq2SeqBatchGenerator(model, tokenizer, max_new_tokens=args.max_new_tokens)
+        single_lock = threading.Lock()
+
+        def single(prompt):
+            with single_lock:
+                return generate_batch([prompt])[0]
+    else:
+        generate_batch = fake_generate_batch(args.base_ms, args.per_item_ms)
+
+        def single(prompt):
+            return generate_batch([prompt])[0]
+
+    print(f"👥 {args.clients} istemci x {args.requests} istek")
+    report("tekil", *run_load(single, args.clients, args.requests))
+
+    batcher = MicroBatcher(generate_batch, args.max_batch_size, args.max_wait_ms)
+    report("mikro-batch", *run_load(batcher.generate, args.clients, args.requests))
+    sizes = batcher.batch_sizes
+    print(f"📦 Ortalama batch boyutu: {sum(sizes) / len(sizes):.2f} ({len(sizes)} batch)")
+    batcher.stop()
+
+    # Gradio'daki akışlı cevaplar da aynı batcher'dan geçer (istek başına TextStream)
+    batcher = MicroBatcher(generate_batch, args.max_batch_size, args.max_wait_ms)
+    report("akışlı", *run_load(lambda prompt: "".join(batcher.stream(prompt)), args.clients, args.requests))
+    sizes = batcher.batch_sizes
+    print(f"📦 Ortalama batch boyutu: {sum(sizes) / len(sizes):.2f} ({len(sizes)} batch)")
+    batcher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+SYNTHETIC_DATA.PY - BENCHMARKLAR İÇİN SENTETİK DATASET ÜRETİCİ
+
+Hugging Face'e bağlanmadan, dataset satırlarıyla aynı yapıda
+({'file_name': ..., 'content': bytes}) PDF, ZIP ve TXT dosyaları üretir.
+Ağ ve model indirmesi gerektirmeyen sahte embedder'lar ve LLM'ler de buradadır.
+"""
+
+import hashlib
+import io
+import math
+import random
+import time
+import zipfile
+import zlib
+from typing import Any, Iterator, List, Optional
+
+try:
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.language_models.llms import LLM
+    from langchain_core.messages import AIMessage, AIMessageChunk
+    from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult, GenerationChunk
+except ImportError:
+    from langchain.chat_models.base import BaseChatModel
+    from langchain.llms.base import LLM
+    from langchain.schema.messages import AIMessage, AIMessageChunk
+    from langchain.schema.output import ChatGeneration, ChatGenerationChunk, ChatResult, GenerationChunk
+
+WORDS = [
+    "tedarik", "zinciri", "lojistik", "envanter", "stok", "sipariş", "depo",
+    "üretim", "dağıtım", "talep", "tahmin", "maliyet", "kanban", "EOQ",
+    "satın", "alma", "tedarikçi", "müşteri", "taşıma", "planlama", "kapasite",
+]
+
+
+# (terim, tanım, terimi doğrudan içermeyen ek soru) üçlüleri
+GLOSSARY = [
+    ("EOQ", "Ekonomik sipariş miktarı; sipariş ve stok tutma maliyetlerinin toplamını en aza indiren sipariş büyüklüğüdür.", "toplam maliyeti en aza indiren sipariş büyüklüğü"),
+    ("Kanban", "Üretimi görsel kartlarla çekme esasına göre yöneten, Toyota kökenli bir stok kontrol yöntemidir.", "kartlarla çekme esaslı üretim kontrolü"),
+    ("Güvenlik Stoğu", "Talep ve tedarik süresindeki belirsizliklere karşı elde tutulan ek stok miktarıdır.", "belirsizliğe karşı tutulan ek envanter"),
+    ("Kamçı Etkisi", "Talepteki küçük dalgalanmaların tedarik zincirinin yukarısına doğru büyüyerek yansımasıdır.", "talep dalgalanmalarının yukarı doğru büyümesi"),
+    ("Cross-Docking", "Gelen ürünlerin depolanmadan doğrudan giden araçlara aktarıldığı dağıtım uygulamasıdır.", "ürünlerin depolanmadan aktarıldığı dağıtım"),
+    ("Tam Zamanında Üretim", "Malzemelerin tam ihtiyaç anında üretime ulaşmasını hedefleyen, stoksuz çalışma felsefesidir.", "ihtiyaç anında malzeme teslimi felsefesi"),
+    ("Tedarik Süresi", "Siparişin verilmesinden malzemenin teslim alınmasına kadar geçen süredir.", "sipariş ile teslim arasındaki süre"),
+    ("ABC Analizi", "Stok kalemlerini yıllık değerlerine göre A, B ve C sınıflarına ayıran sınıflandırma yöntemidir.", "stok kalemlerinin değere göre sınıflandırılması"),
+    ("Yeniden Sipariş Noktası", "Stok bu seviyeye düştüğünde yeni siparişin verilmesi gereken envanter düzeyidir.", "yeni siparişin tetiklendiği stok seviyesi"),
+    ("Üçüncü Parti Lojistik", "Lojistik faaliyetlerin dış bir hizmet sağlayıcıya devredilmesidir.", "lojistiğin dış firmaya devredilmesi"),
+    ("Tersine Lojistik", "İade edilen veya kullanım ömrü biten ürünlerin geri toplanması ve değerlendirilmesi sürecidir.", "iade ürünlerin geri toplanması"),
+    ("Stok Devir Hızı", "Satılan malların maliyetinin ortalama stok değerine oranıdır.", "satış maliyetinin ortalama stoğa oranı"),
+    ("MRP", "Malzeme ihtiyaç planlaması; ana üretim çizelgesinden bileşen ihtiyaçlarını hesaplayan sistemdir.", "bileşen ihtiyaçlarını hesaplayan planlama sistemi"),
+    ("Darboğaz", "Sistemin toplam çıktısını sınırlayan en düşük kapasiteli kaynaktır.", "çıktıyı sınırlayan en düşük kapasiteli kaynak"),
+    ("Dağıtım Merkezi", "Ürünlerin bölgesel olarak toplanıp müşterilere sevk edildiği tesistir.", "ürünlerin bölgesel sevk tesisi"),
+    ("Talep Tahmini", "Geçmiş veriler ve analitik yöntemlerle gelecekteki müşteri talebinin öngörülmesidir.", "gelecekteki müşteri talebinin öngörülmesi"),
+]
+
+
+def glossary_corpus(n_filler=200, seed=7):
+    """
+    Sözlük girdileri + dolgu parçalarından oluşan (metin, metadata) listesi
+    ve (sorgu, beklenen terim) değerlendirme çiftleri üret.
+    """
+    rng = random.Random(seed)
+    corpus = [
+        (f"Terim: {term}\nTanım: {definition}", {"source": f"glossary_{i}", "term": term})
+        for i, (term, definition, _) in enumerate(GLOSSARY)
+    ]
+    for i in range(n_filler):
+        corpus.append((random_text(rng, n_lines=4), {"source": f"filler_{i}"}))
+
+    queries = []
+    for term, _, paraphrase in GLOSSARY:
+        queries.append((f"{term} nedir?", term))
+        queries.append((f"{term.lower()} ne demek", term))
+        queries.append((paraphrase, term))
+    return corpus, queries
+
+
+class HashingEmbeddings:
+    """
+    Karakter trigram'larını sabit boyutlu vektöre hash'leyen deterministik,
+    ağ gerektirmeyen sahte embedder. Benchmarklarda gerçek modelin yerine geçer.
+    """
+
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.model_name = f"hashing-trigram-{dim}"
+
+    def _embed(self, text):
+        vector = [0.0] * self.dim
+        padded = f"  {text.lower()}  "
+        for i in range(len(padded) - 2):
+            bucket = int.from_bytes(hashlib.md5(padded[i:i + 3].encode("utf-8")).digest()[:4], "little")
+            vector[bucket % self.dim] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+class WordHashingEmbeddings:
+    """
+    Kelimeleri crc32 ile kovalara sayan, HashingEmbeddings'ten çok daha hızlı
+    sahte embedder. Büyük korpuslu (bellek/throughput) benchmarklar içindir;
+    arama kalitesi ölçümlerinde HashingEmbeddings kullanın.
+    """
+
+    def __init__(self, dim=64):
+        self.dim = dim
+        self.model_name = f"hashing-words-{dim}"
+
+    def _embed(self, text):
+        vector = [0.0] * self.dim
+        for word in text.lower().split():
+            vector[zlib.crc32(word.encode("utf-8")) % self.dim] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def fake_answer_tokens(prompt, n_tokens):
+    """
+    Prompt'un bağlam kısmından (\"Soru:\" öncesi) kelime seçerek deterministik
+    bir cevap üret: aynı prompt her zaman aynı cevabı verir.
+    """
+    words = prompt.split("Soru:")[0].split() or WORDS
+    rng = random.Random(zlib.crc32(prompt.encode("utf-8")))
+    return [rng.choice(words) for _ in range(n_tokens)]
+
+
+class FakeLLM(LLM):
+    """
+    Modelin yerine geçen deterministik LangChain LLM'i (app.py'deki flan-t5 yolu için).
+
+    Gecikme "ilk token süresi + token başına süre" olarak uyutmayla taklit edilir;
+    first_token_ms=0 ve token_ms=0 ile sadece pipeline'ın kendi maliyeti ölçülür.
+    """
+
+    n_tokens: int = 32
+    first_token_ms: float = 20.0
+    token_ms: float = 1.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake_deterministic"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        time.sleep((self.first_token_ms + self.token_ms * self.n_tokens) / 1000)
+        return " ".join(fake_answer_tokens(prompt, self.n_tokens))
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None,
+                **kwargs: Any) -> Iterator[GenerationChunk]:
+        time.sleep(self.first_token_ms / 1000)
+        for token in fake_answer_tokens(prompt, self.n_tokens):
+            chunk = GenerationChunk(text=token + " ")
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            time.sleep(self.token_ms / 1000)
+
+
+class FakeChatModel(BaseChatModel):
+    """FakeLLM'in sohbet modeli karşılığı (chain.py'deki Gemini yolu için)"""
+
+    n_tokens: int = 32
+    first_token_ms: float = 20.0
+    token_ms: float = 1.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake_deterministic_chat"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep((self.first_token_ms + self.token_ms * self.n_tokens) / 1000)
+        text = " ".join(fake_answer_tokens(messages[-1].content, self.n_tokens))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.first_token_ms / 1000)
+        for token in fake_answer_tokens(messages[-1].content, self.n_tokens):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token + " "))
+            if run_manager:
+                run_manager.on_llm_new_token(token + " ", chunk=chunk)
+            yield chunk
+            time.sleep(self.token_ms / 1000)
+
+
+def _escape_pdf_text(line):
+    """PDF metin operatörü için parantez ve ters bölü karakterlerini kaçır"""
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages):
+    """
+    Her eleman bir sayfa metni olacak şekilde minimal, geçerli bir PDF üret.
+    
+    Sadece ASCII dışı karakterleri olmayan metinler birebir geri okunur;
+    benchmark için bu yeterlidir.
+    """
+    objects = []
+    n_pages = len(pages)
+    font_id = 3
+    page_ids = [4 + 2 * i for i in range(n_pages)]
+    
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {n_pages} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    
+    for i, page_text in enumerate(pages):
+        lines = ["BT /F1 10 Tf 40 800 Td 12 TL"]
+        for line in page_text.splitlines() or [""]:
+            lines.append(f"({_escape_pdf_text(line)}) Tj T*")
+        lines.append("ET")
+        stream = "\n".join(lines).encode("latin-1", errors="replace")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> "
+            f"/Contents {page_ids[i] + 1} 0 R >>".encode()
+        )
+        objects.append(
+            f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream"
+        )
+    
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for obj_id, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{obj_id} 0 obj\n".encode() + body + b"\nendobj\n")
+    
+    xref_pos = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref_pos}\n%%EOF\n".encode()
+    )
+    return out.getvalue()
+
+
+def make_zip(members):
+    """{isim: bytes} sözlüğünden bellekte bir ZIP arşivi üret"""
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return out.getvalue()
+
+
+def random_text(rng, n_lines=40, words_per_line=12):
+    """Tedarik zinciri kelimelerinden rastgele, tekrarlanabilir metin üret"""
+    return "\n".join(
+        " ".join(rng.choice(WORDS) for _ in range(words_per_line))
+        for _ in range(n_lines)
+    )
+
+
+def make_dataset(n_pdfs=40, pages_per_pdf=5, n_zips=4, pdfs_per_zip=3, n_txts=10, seed=42):
+    """
+    HF dataset satırlarını taklit eden sentetik bir liste döndür.
+    
+    Returns:
+        list: {'file_name': str, 'content': bytes} sözlükleri
+    """
+    rng = random.Random(seed)
+    rows = []
+    
+    for i in range(n_pdfs):
+        pages = [random_text(rng) for _ in range(pages_per_pdf)]
+        rows.append({"file_name": f"doc_{i}.pdf", "content": make_pdf(pages)})
+    
+    for i in range(n_zips):
+        members = {
+            f"zipped_{i}_{j}.pdf": make_pdf([random_text(rng) for _ in range(pages_per_pdf)])
+            for j in range(pdfs_per_zip)
+        }
+        rows.append({"file_name": f"archive_{i}.zip", "content": make_zip(members)})
+    
+    for i in range(n_txts):
+        rows.append({"file_name": f"notes_{i}.txt", "content": random_text(rng).encode("utf-8")})
+    
+    rng.shuffle(rows)
+    return rows
@@ -6,18 +6,42 @@ RAG (Retrieval-Augmented Generation) mimarisi ile çalışır ve
 Tutku Özdeniz'in Hugging Face'teki supply chain dataset'ini kullanır.
 """
 
+import asyncio
 import os
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.vectorstores import Chroma
-from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
+import shutil
 from langchain.schema import Document
 from langchain.chains import RetrievalQA
+from langchain.prompts import PromptTemplate
+import time
 
-from config import GEMINI_API_KEY, CHUNK_SIZE, CHUNK_OVERLAP, MODEL_NAME, VECTOR_DB_PATH
+from config import (
+    GEMINI_API_KEY, GEMINI_API_BASE_URL, GEMINI_EMBEDDING_MODEL, CHUNK_SIZE, CHUNK_OVERLAP, MODEL_NAME, VECTOR_DB_PATH,
+    CHUNK_TOKENIZER, CHUNK_SIZE_TOKENS, CHUNK_OVERLAP_TOKENS,
+    INCREMENTAL_INDEXING, VECTOR_BACKEND, FAISS_INDEX_TYPE, FAISS_MMAP, FAISS_HNSW_M, FAISS_EF_SEARCH,
+    FAISS_IVF_NPROBE, DEDUPLICATION, DEDUP_THRESHOLD, DEDUP_NUM_PERM,
+    SHARDED_INDEX, SHARD_COUNT, SHARD_PARTITION, SHARD_BUILD_WORKERS,
+    STREAMING_INGESTION, INGEST_QUEUE_SIZE, EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_DTYPE, EMBEDDING_BATCH_SIZE,
+    EMBEDDING_QUERY_CACHE_SIZE,
+    RERANKING, RERANK_MODEL, RERANK_CANDIDATES, RERANK_BATCH_SIZE, RERANK_LATENCY_BUDGET_MS,
+    METRICS_PORT, METRICS_JSON_LOG, METRICS_LOG_INTERVAL_SECONDS,
+    ASYNC_MAX_CONCURRENCY, ASYNC_POOL_SIZE, ASYNC_MAX_RETRIES, ASYNC_RETRY_BASE_SECONDS,
+    ASYNC_RETRY_MAX_SECONDS, ASYNC_REQUEST_TIMEOUT_SECONDS
+)
+from vector_index import build_or_update_index, chunk_ids, embedding_name, load_manifest
+from vector_backends import settings_changed
+from embedding_cache import CachedEmbeddings, PrecomputedEmbeddings
+from gemini_async import AsyncGeminiClient, RequestCoalescer
+from dedup import ChunkDeduplicator, deduplicate_chunks
+from chunk_store import ChunkStore
+from chunk_splitter import ChunkSplitter
+from ingest_pipeline import stream_into_index
+from sharded_index import build_sharded_index, shard_ids
+from reranker import CrossEncoderReranker, RerankingRetriever
+from metrics import METRICS, InstrumentedEmbeddings, MetricsCallbackHandler, start_metrics_server, start_json_log
 
 # Data loader importu - hata yönetimi ile
 try:
-    from data_loader import load_tutku_supply_chain_data
+    from data_loader import load_tutku_supply_chain_data, TutkuSupplyChainLoader
     DATA_LOADER_AVAILABLE = True
 except ImportError as e:
     print(f"⚠️ data_loader import hatası: {e}")
@@ -29,42 +53,128 @@ except ImportError as e:
         print("❌ data_loader.py bulunamadı, demo veri kullanılıyor...")
         return []
 
+# Soru-cevap prompt'u - bağlam dışına çıkmaması için kısıtlı
+QA_PROMPT_TEMPLATE = """Sen tedarik zinciri yönetimi konusunda uzman bir asistansın.
+Aşağıdaki bağlamı kullanarak soruyu Türkçe, açık ve tam cümlelerle cevapla.
+Bağlamda cevap yoksa "Üzgünüm, bu konu hakkında mevcut bilgilerimde yeterli detay bulunmuyor." de, bilgi uydurma.
+
+Bağlam:
+{context}
+
+Soru: {question}
+Cevap:"""
+QA_PROMPT = PromptTemplate.from_template(QA_PROMPT_TEMPLATE)
+SEARCH_K = 4  # Bağlama konulacak parça sayısı
+LLM_TEMPERATURE = 0.3  # Yaratıcılık seviyesi (0-1 arası)
+LLM_MAX_TOKENS = 1000  # Maksimum cevap uzunluğu
+# VECTOR_BACKEND = "faiss" iken vector_backends.FaissVectorStore'a geçilen ayarlar
+FAISS_OPTIONS = {
+    "index_type": FAISS_INDEX_TYPE,
+    "mmap": FAISS_MMAP,
+    "hnsw_m": FAISS_HNSW_M,
+    "ef_search": FAISS_EF_SEARCH,
+    "nprobe": FAISS_IVF_NPROBE,
+}
+
 class SupplyChainChatbot:
-    def __init__(self):
-        """Chatbot'u başlat - tüm bileşenleri initialize eder"""
+    def __init__(self, embeddings=None, llm=None, loader=None, async_client=None):
+        """
+        Chatbot'u başlat - tüm bileşenleri initialize eder
         
-        # API key kontrolü
-        if not GEMINI_API_KEY:
+        Args:
+            embeddings: Gemini embedding modeli yerine kullanılacak model (ör. benchmark'larda sahte embedder)
+            llm: Gemini yerine kullanılacak LangChain sohbet modeli
+            loader: Dataset'i önceden yüklenmiş bir TutkuSupplyChainLoader; None ise HF'ten yüklenir
+            async_client: aask/aingest için AsyncGeminiClient; None ise ilk kullanımda config'le kurulur
+        """
+        
+        # API key kontrolü (iki model de dışarıdan verildiyse Gemini'ye gerek yok)
+        if not GEMINI_API_KEY and (embeddings is None or llm is None):
             raise ValueError(
                 "❌ GEMINI_API_KEY bulunamadı. "
                 "Lütfen .env dosyasına ekleyin veya app.py'de girin. "
                 "API key: https://aistudio.google.com/ adresinden alınabilir."
             )
+        if embeddings is None or llm is None:
+            from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
         
         # Embedding modelini başlat - metinleri vektörlere çevirir
-        self.embeddings = GoogleGenerativeAIEmbeddings(
-            model="models/embedding-001",
-            google_api_key=GEMINI_API_KEY
-        )
+        # (ölçüm sarmalayıcısı önbelleğin altında: sadece gerçek API çağrıları ölçülür)
+        if embeddings is None:
+            embeddings = GoogleGenerativeAIEmbeddings(
+                model=GEMINI_EMBEDDING_MODEL,
+                google_api_key=GEMINI_API_KEY
+            )
+        self.embeddings = InstrumentedEmbeddings(embeddings)
+        if EMBEDDING_CACHE_DIR:
+            # Aynı metin için tekrar (ücretli) API çağrısı yapılmasın
+            self.embeddings = CachedEmbeddings(
+                self.embeddings,
+                cache_dir=EMBEDDING_CACHE_DIR,
+                dtype=EMBEDDING_CACHE_DTYPE,
+                batch_size=EMBEDDING_BATCH_SIZE,
+                query_cache_size=EMBEDDING_QUERY_CACHE_SIZE
+            )
         
         # Dil modelini başlat - cevapları üretir
-        self.llm = ChatGoogleGenerativeAI(
-            model=MODEL_NAME,
-            google_api_key=GEMINI_API_KEY,
-            temperature=0.3,  # Yaratıcılık seviyesi (0-1 arası)
-            max_tokens=1000   # Maksimum cevap uzunluğu
-        )
+        self.llm = llm
+        if self.llm is None:
+            self.llm = ChatGoogleGenerativeAI(
+                model=MODEL_NAME,
+                google_api_key=GEMINI_API_KEY,
+                temperature=LLM_TEMPERATURE,
+                max_tokens=LLM_MAX_TOKENS
+            )
         
         # Diğer bileşenler
+        self.loader = loader      # Dataset yükleyici (None: HF'ten yüklenir)
+        self.async_client = async_client  # Async API'nin paylaşılan HTTP istemcisi
+        self._coalescer = RequestCoalescer()  # Uçuştaki aynı sorular tek çağrıyı paylaşır
         self.vector_store = None  # Vektör veritabanı
+        self.retriever = None     # Parça çekici
         self.qa_chain = None      # Soru-cevap zinciri
         
+        # Retriever ve LLM sürelerini ölçen LangChain callback'i
+        self.metrics_callback = MetricsCallbackHandler()
+        if METRICS_PORT:
+            start_metrics_server(METRICS_PORT)
+        if METRICS_JSON_LOG:
+            start_json_log(METRICS_JSON_LOG, METRICS_LOG_INTERVAL_SECONDS)
+        
+        # Cross-encoder ilk soruda (CPU'da) yüklenir
+        self.reranker = None
+        if RERANKING:
+            self.reranker = CrossEncoderReranker(
+                model_name=RERANK_MODEL,
+                batch_size=RERANK_BATCH_SIZE,
+                latency_budget_ms=RERANK_LATENCY_BUDGET_MS
+            )
+        
+    def _make_text_splitter(self):
+        """PDF'ler için optimize edilmiş metin bölücü - büyük dokümanları daha küçük parçalara böler"""
+        separators = ["\n\n", "\n", ". ", "! ", "? ", " ", ""]  # PDF metinleri için
+        if CHUNK_TOKENIZER:
+            # Parça boyutu embedder/LLM sınırlarıyla aynı birimde: tokenizer token'ı
+            return ChunkSplitter.from_tokenizer(
+                CHUNK_TOKENIZER,
+                chunk_size=CHUNK_SIZE_TOKENS,
+                chunk_overlap=CHUNK_OVERLAP_TOKENS,
+                separators=separators,
+                add_start_index=True
+            )
+        return ChunkSplitter(
+            chunk_size=CHUNK_SIZE,      # Her parçanın maksimum boyutu
+            chunk_overlap=CHUNK_OVERLAP, # Parçalar arası örtüşme
+            separators=separators,
+            add_start_index=True  # Parça ID'leri (artımlı indeksleme) için gerekli
+        )
+    
     def load_and_process_data(self):
         """
         TUTKU ÖZDENİZ DATASET'İNİ YÜKLE VE İŞLE
         
         Returns:
-            list: İşlenmiş metin parçaları (chunks)
+            ChunkStore: İşlenmiş metin parçaları (chunks), sütunsal depoda
         """
         print("📚 Tutku Özdeniz supply chain dataset'i yükleniyor...")
         
@@ -88,7 +198,10 @@ class SupplyChainChatbot:
             )]
         else:
             # ÖZEL: Tutku dataset'ini yükle
-            documents = load_tutku_supply_chain_data()
+            if self.loader is not None and self.loader.dataset is not None:
+                documents = self.loader.process_dataset_files()
+            else:
+                documents = load_tutku_supply_chain_data()
             
             if not documents:
                 print("❌ Hiç veri yüklenemedi, demo veri kullanılıyor...")
@@ -97,18 +210,363 @@ class SupplyChainChatbot:
                     metadata={"source": "demo_data", "filename": "fallback.txt"}
                 )]
         
-        # PDF'ler için optimize edilmiş metin bölücü
-        # Büyük dokümanları daha küçük parçalara böler
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=CHUNK_SIZE,      # Her parçanın maksimum boyutu
-            chunk_overlap=CHUNK_OVERLAP, # Parçalar arası örtüşme
-            separators=["\n\n", "\n", ". ", "! ", "? ", " ", ""]  # PDF metinleri için
-        )
-        chunks = text_splitter.split_documents(documents)
+        with METRICS.time("chatbot_stage_seconds", stage="split"):
+            chunks = self._make_text_splitter().split_documents(documents)
+        METRICS.inc("chatbot_chunks_total", len(chunks), help="Bölme sonrası parça sayısı")
         
         print(f"✅ {len(chunks)} metin parçası oluşturuldu")
-        return chunks
+        
+        if DEDUPLICATION:
+            # Aynı PDF'in ZIP ve yerel kopyalarından gelen parçalar tek sefer embed edilsin
+            with METRICS.time("chatbot_stage_seconds", stage="dedup"):
+                chunks, dedup_stats = deduplicate_chunks(
+                    chunks, threshold=DEDUP_THRESHOLD, num_perm=DEDUP_NUM_PERM
+                )
+            print(f"🧹 {dedup_stats['exact_duplicates']} birebir, {dedup_stats['near_duplicates']} "
+                  f"neredeyse aynı parça elendi ({dedup_stats['embeddings_saved']} embedding tasarrufu), "
+                  f"{dedup_stats['kept']} parça kaldı")
+        return ChunkStore.from_documents(chunks)
     
     def setup_vector_store(self, chunks):
         """
-        VEKTÖR VER
+        VEKTÖR VERİTABANINI KUR
+        
+        VECTOR_BACKEND'e göre Chroma veya yerel FAISS indeksi kullanılır.
+        INCREMENTAL_INDEXING açıksa VECTOR_DB_PATH'teki mevcut indeks
+        yeniden kullanılır; sadece yeni/değişen parçalar embed edilir ve
+        artık olmayan parçalar silinir. SHARDED_INDEX açıksa parçalar
+        SHARD_COUNT indekse bölünür ve shard'lar paralel kurulur.
+        
+        Args:
+            chunks: Metin parçaları (load_and_process_data çıktısı)
+        
+        Returns:
+            VectorStore: Kurulan vektör veritabanı (Chroma, FaissVectorStore veya ShardedVectorStore)
+        """
+        print(f"🗄️ Vektör veritabanı hazırlanıyor ({self._backend_description()})...")
+        
+        if not INCREMENTAL_INDEXING and os.path.exists(VECTOR_DB_PATH):
+            shutil.rmtree(VECTOR_DB_PATH)
+        with METRICS.time("chatbot_stage_seconds", stage="index"):
+            self.vector_store, counts = self._build_index(chunks, self.embeddings)
+        print(f"✅ Vektör veritabanı güncellendi: {counts['added']} eklendi, "
+              f"{counts['deleted']} silindi, {counts['kept']} yeniden kullanıldı")
+        if SHARDED_INDEX:
+            print(f"🧩 {SHARD_COUNT} shard: {counts['shards']} parça, {counts['moved']} parça yeniden dengelendi")
+        
+        return self.vector_store
+    
+    def _build_index(self, chunks, embeddings):
+        if SHARDED_INDEX:
+            return build_sharded_index(
+                chunks, embeddings, VECTOR_DB_PATH, SHARD_COUNT, partition=SHARD_PARTITION,
+                backend=VECTOR_BACKEND, backend_options=self._backend_options(), workers=SHARD_BUILD_WORKERS
+            )
+        return build_or_update_index(
+            chunks, embeddings, VECTOR_DB_PATH,
+            backend=VECTOR_BACKEND, backend_options=self._backend_options()
+        )
+    
+    def _backend_options(self):
+        return dict(FAISS_OPTIONS) if VECTOR_BACKEND == "faiss" else {}
+    
+    def _backend_description(self):
+        description = f"FAISS {FAISS_INDEX_TYPE}" if VECTOR_BACKEND == "faiss" else "Chroma"
+        if SHARDED_INDEX:
+            description += f", {SHARD_COUNT} shard"
+        return description
+    
+    def build_index_streaming(self):
+        """
+        DATASET'İ AKIŞ HALİNDE İNDEKSLE
+        
+        load_and_process_data + setup_vector_store ile aynı sonucu, tüm
+        dokümanları/parçaları bellekte biriktirmeden üretir: sayfa çıkarma,
+        bölme, tekrar eleme, embedding ve vektör veritabanına yazma sınırlı kuyruklarla
+        bağlı aşamalarda çalışır, embedding PDF ayrıştırmayla örtüşür.
+        Dataset yüklenemezse eski (toplu) akışa dönülür.
+        
+        Returns:
+            VectorStore: Kurulan vektör veritabanı
+        """
+        loader = self.loader
+        if loader is None and DATA_LOADER_AVAILABLE:
+            loader = TutkuSupplyChainLoader()
+        if loader is None or (loader.dataset is None and loader.load_dataset_from_hf() is None):
+            print("⚠️ Akış indeksleme kullanılamıyor, toplu yükleme yapılıyor...")
+            return self.setup_vector_store(self.load_and_process_data())
+        
+        print(f"🌊 Dataset akış halinde indeksleniyor ({self._backend_description()})...")
+        if not INCREMENTAL_INDEXING and os.path.exists(VECTOR_DB_PATH):
+            shutil.rmtree(VECTOR_DB_PATH)
+        deduplicator = None
+        if DEDUPLICATION:
+            deduplicator = ChunkDeduplicator(
+                threshold=DEDUP_THRESHOLD, num_perm=DEDUP_NUM_PERM, keep_metadata=False
+            )
+        
+        start_time = time.perf_counter()
+        with METRICS.time("chatbot_stage_seconds", stage="stream_index"):
+            self.vector_store, counts = stream_into_index(
+                loader.iter_page_documents(),
+                self._make_text_splitter(),
+                self.embeddings,
+                VECTOR_DB_PATH,
+                deduplicator=deduplicator,
+                batch_size=EMBEDDING_BATCH_SIZE,
+                queue_size=INGEST_QUEUE_SIZE,
+                backend=VECTOR_BACKEND,
+                backend_options=self._backend_options()
+            )
+        print(f"✅ Vektör veritabanı güncellendi ({time.perf_counter() - start_time:.1f} sn): "
+              f"{counts['added']} eklendi, {counts['deleted']} silindi, {counts['kept']} yeniden kullanıldı")
+        if deduplicator is not None:
+            print(f"🧹 {deduplicator.stats()['embeddings_saved']} tekrar eden parça embed edilmedi")
+        return self.vector_store
+    
+    def build_index(self):
+        """
+        Vektör veritabanını config'e göre akış halinde (STREAMING_INGESTION)
+        veya toplu olarak kur. Shard'lı indeks toplu kurulur (parçalar
+        shard'lara dağıtılmadan önce hepsi bilinmeli).
+        
+        Returns:
+            VectorStore: Kurulan vektör veritabanı
+        """
+        if STREAMING_INGESTION and not SHARDED_INDEX:
+            return self.build_index_streaming()
+        return self.setup_vector_store(self.load_and_process_data())
+    
+    def setup_qa_chain(self):
+        """
+        SORU-CEVAP ZİNCİRİNİ KUR
+        
+        Returns:
+            RetrievalQA: Vektör veritabanı + Gemini ile çalışan zincir
+        """
+        if self.vector_store is None:
+            raise ValueError("❌ Önce setup_vector_store() çağrılmalı")
+        
+        if self.reranker is not None:
+            # Çok aday çek, cross-encoder ile sadece en iyi SEARCH_K parçayı bağlama koy
+            self.retriever = RerankingRetriever(
+                base_retriever=self.vector_store.as_retriever(search_kwargs={"k": RERANK_CANDIDATES}),
+                reranker=self.reranker,
+                top_n=SEARCH_K
+            )
+        else:
+            self.retriever = self.vector_store.as_retriever(search_kwargs={"k": SEARCH_K})
+        self.qa_chain = RetrievalQA.from_chain_type(
+            llm=self.llm,
+            chain_type="stuff",
+            retriever=self.retriever,
+            return_source_documents=True,
+            chain_type_kwargs={"prompt": QA_PROMPT}
+        )
+        print("✅ Soru-cevap zinciri hazır")
+        return self.qa_chain
+    
+    def ask(self, question):
+        """
+        Soruyu cevapla
+        
+        Returns:
+            dict: {'answer': str, 'sources': list[Document]}
+        """
+        if self.qa_chain is None:
+            raise ValueError("❌ Önce setup_qa_chain() çağrılmalı")
+        
+        METRICS.inc("chatbot_questions_total", help="Cevaplanan sorular", mode="ask")
+        with METRICS.time("chatbot_answer_seconds", help="Sorunun uçtan uca cevaplanma süresi"):
+            # Callback retriever ve LLM alt çağrılarına da aktarılır
+            result = self.qa_chain({"query": question}, callbacks=[self.metrics_callback])
+        return {
+            "answer": result["result"].strip(),
+            "sources": result.get("source_documents", [])
+        }
+    
+    def stream_answer(self, question):
+        """
+        Soruyu akışlı cevapla - Gemini'nin streaming API'si ile
+        
+        Yields:
+            dict: Üretim sürerken {'delta': str}, en sonda
+                {'answer': str, 'sources': list[Document], 'ttft': float}
+        """
+        if self.qa_chain is None:
+            raise ValueError("❌ Önce setup_qa_chain() çağrılmalı")
+        
+        METRICS.inc("chatbot_questions_total", help="Cevaplanan sorular", mode="stream")
+        with METRICS.time("chatbot_retrieval_seconds"):
+            sources = self.retriever.get_relevant_documents(question)
+        with METRICS.time("chatbot_prompt_seconds", help="Bağlam + prompt hazırlama süresi"):
+            context = "\n\n".join(doc.page_content for doc in sources)
+            prompt = QA_PROMPT.format(context=context, question=question)
+        
+        start_time = time.perf_counter()
+        first_token_time = None
+        answer = ""
+        for chunk in self.llm.stream(prompt):
+            if first_token_time is None and chunk.content:
+                first_token_time = time.perf_counter() - start_time
+                METRICS.observe("chatbot_llm_ttft_seconds", first_token_time)
+                print(f"⏱️ İlk token süresi (TTFT): {first_token_time * 1000:.0f} ms")
+            answer += chunk.content
+            yield {"delta": chunk.content}
+        METRICS.observe("chatbot_llm_seconds", time.perf_counter() - start_time)
+        print(f"⏱️ Toplam üretim süresi: {time.perf_counter() - start_time:.2f} sn")
+        
+        yield {"answer": answer.strip(), "sources": sources, "ttft": first_token_time}
+    
+    # ------------------------------------------------------------------
+    # Asenkron API: uzak çağrılar event loop'u, CPU işleri thread'leri kullanır
+    # ------------------------------------------------------------------
+    def _get_async_client(self):
+        if self.async_client is None:
+            self.async_client = AsyncGeminiClient(
+                api_key=GEMINI_API_KEY,
+                model=MODEL_NAME,
+                embedding_model=GEMINI_EMBEDDING_MODEL,
+                base_url=GEMINI_API_BASE_URL,
+                max_concurrency=ASYNC_MAX_CONCURRENCY,
+                pool_size=ASYNC_POOL_SIZE,
+                max_retries=ASYNC_MAX_RETRIES,
+                retry_base_seconds=ASYNC_RETRY_BASE_SECONDS,
+                retry_max_seconds=ASYNC_RETRY_MAX_SECONDS,
+                timeout_seconds=ASYNC_REQUEST_TIMEOUT_SECONDS
+            )
+        return self.async_client
+    
+    async def aingest(self, chunks=None):
+        """
+        VEKTÖR VERİTABANINI ASENKRON KUR
+        
+        setup_vector_store'un async karşılığı: indekste ve embedding
+        önbelleğinde olmayan parçalar Gemini'ye eşzamanlı batch'ler halinde
+        gönderilir (ASYNC_MAX_CONCURRENCY sınırı içinde), sonra indeks aynı
+        artımlı yolla güncellenir. Dışarıdan verilen Gemini dışı bir embedding
+        modelinde vektörler o modelle (thread'de) hesaplanır.
+        
+        Args:
+            chunks: Metin parçaları; None ise load_and_process_data ile yüklenir
+        
+        Returns:
+            VectorStore: Kurulan vektör veritabanı
+        """
+        if chunks is None:
+            chunks = await asyncio.to_thread(self.load_and_process_data)
+        
+        print(f"🗄️ Vektör veritabanı asenkron hazırlanıyor ({self._backend_description()})...")
+        if not INCREMENTAL_INDEXING and os.path.exists(VECTOR_DB_PATH):
+            shutil.rmtree(VECTOR_DB_PATH)
+        
+        # Manifest'te (aynı embedding modeliyle) kayıtlı parçalar tekrar embed edilmez
+        manifest = load_manifest(VECTOR_DB_PATH) if os.path.exists(VECTOR_DB_PATH) else None
+        existing_ids = set()
+        if SHARDED_INDEX:
+            existing_ids = set(shard_ids(VECTOR_DB_PATH, embedding_name(self.embeddings)))
+        elif manifest is not None and manifest.get("embedding") == embedding_name(self.embeddings) \
+                and not settings_changed(VECTOR_BACKEND, VECTOR_DB_PATH, **self._backend_options()):
+            # Yapısal FAISS ayarları değiştiyse indeks açılınca boşaltılır, manifest'teki ID'ler geçersiz
+            existing_ids = set(manifest["ids"])
+        texts = list(dict.fromkeys(
+            chunk.page_content for chunk_id, chunk in zip(chunk_ids(chunks), chunks)
+            if chunk_id not in existing_ids
+        ))
+        
+        start_time = time.perf_counter()
+        with METRICS.time("chatbot_stage_seconds", stage="aingest"):
+            embeddings = self.embeddings
+            if self._embeds_with_gemini():
+                # Önbellekte vektörü olan parçalar tekrar (ücretli) API'ye gönderilmez
+                cache = self.embeddings if isinstance(self.embeddings, CachedEmbeddings) else None
+                if cache is not None:
+                    texts = cache.missing_documents(texts)
+                vectors = await self._get_async_client().embed_documents(texts, batch_size=EMBEDDING_BATCH_SIZE)
+                print(f"⚡ {len(texts)} parça eşzamanlı embed edildi ({time.perf_counter() - start_time:.1f} sn)")
+                if cache is not None:
+                    cache.store_documents(texts, vectors)
+                else:
+                    embeddings = PrecomputedEmbeddings(dict(zip(texts, vectors)), self.embeddings)
+            # Enjekte edilen (Gemini dışı) model parçaları indeks kurulurken thread'de embed eder
+            self.vector_store, counts = await asyncio.to_thread(self._build_index, chunks, embeddings)
+        print(f"✅ Vektör veritabanı güncellendi: {counts['added']} eklendi, "
+              f"{counts['deleted']} silindi, {counts['kept']} yeniden kullanıldı")
+        return self.vector_store
+    
+    async def aask(self, question):
+        """
+        Soruyu asenkron cevapla
+        
+        Sorgu embedding'i (indeks Gemini ile kurulduysa) ve üretim (dil modeli
+        Gemini ise) Gemini'ye asenkron gider; dışarıdan verilen modeller
+        kendi async arayüzleriyle çağrılır. Vektör araması
+        ve yeniden sıralama thread'de çalışır; yavaş bir uzak çağrı diğer
+        soruları bekletmez. Aynı soru (büyük/küçük harf ve boşluk farkı hariç)
+        zaten cevaplanıyorsa yeni çağrı yapılmaz, o cevap paylaşılır.
+        
+        Returns:
+            dict: {'answer': str, 'sources': list[Document]}
+        """
+        if self.vector_store is None:
+            raise ValueError("❌ Önce build_index() veya aingest() çağrılmalı")
+        key = " ".join(question.lower().split())
+        return await self._coalescer.run(key, lambda: self._aask(question))
+    
+    def _embeds_with_gemini(self):
+        """İndeksin embedding modeli, async istemcinin çağırdığı Gemini modeli mi"""
+        model = embedding_name(self.embeddings).split(":", 1)[1]
+        return model.split("/")[-1] == GEMINI_EMBEDDING_MODEL.split("/")[-1]
+    
+    def _generates_with_gemini(self):
+        """Dil modeli, async istemcinin çağırdığı Gemini modeli mi (dışarıdan verilen model değilse)"""
+        model = getattr(self.llm, "model", None) or getattr(self.llm, "model_name", None)
+        return isinstance(model, str) and model.split("/")[-1] == MODEL_NAME.split("/")[-1]
+    
+    async def _agenerate(self, prompt):
+        """Cevap üret: Gemini ise async REST istemcisiyle, değilse verilen dil modeliyle"""
+        if self._generates_with_gemini():
+            return await self._get_async_client().generate(
+                prompt, temperature=LLM_TEMPERATURE, max_output_tokens=LLM_MAX_TOKENS
+            )
+        result = await self.llm.ainvoke(prompt)
+        # Sohbet modelleri mesaj, düz LLM'ler metin döndürür
+        return getattr(result, "content", result)
+    
+    async def _aembed_query(self, question):
+        """
+        Sorgu vektörü: indeks Gemini ile kurulduysa async istemciden (önbellekte
+        yoksa), değilse indeksi kuran modelle (önbellek sarmalayıcısı üzerinden) thread'de
+        """
+        if not self._embeds_with_gemini():
+            return await asyncio.to_thread(self.embeddings.embed_query, question)
+        cache = self.embeddings if isinstance(self.embeddings, CachedEmbeddings) else None
+        query_vector = cache.cached_query(question) if cache is not None else None
+        if query_vector is None:
+            query_vector = await self._get_async_client().embed_query(question)
+            if cache is not None:
+                cache.store_query(question, query_vector)
+        return query_vector
+    
+    async def _aask(self, question):
+        METRICS.inc("chatbot_questions_total", help="Cevaplanan sorular", mode="aask")
+        with METRICS.time("chatbot_answer_seconds", help="Sorunun uçtan uca cevaplanma süresi"):
+            with METRICS.time("chatbot_retrieval_seconds"):
+                query_vector = await self._aembed_query(question)
+                candidate_k = RERANK_CANDIDATES if self.reranker is not None else SEARCH_K
+                sources = await asyncio.to_thread(
+                    self.vector_store.similarity_search_by_vector, query_vector, candidate_k
+                )
+                if self.reranker is not None:
+                    sources = await asyncio.to_thread(self.reranker.rerank, question, sources, SEARCH_K)
+            
+            context = "\n\n".join(doc.page_content for doc in sources)
+            prompt = QA_PROMPT.format(context=context, question=question)
+            with METRICS.time("chatbot_llm_seconds"):
+                answer = await self._agenerate(prompt)
+        return {"answer": answer.strip(), "sources": sources}
+    
+    async def aclose(self):
+        """Async istemcinin HTTP bağlantı havuzunu kapat"""
+        if self.async_client is not None:
+            await self.async_client.aclose()
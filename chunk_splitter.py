@@ -0,0 +1,280 @@
+"""
+CHUNK_SPLITTER.PY - TEK GEÇİŞLİ, TOKEN DUYARLI METİN BÖLÜCÜ
+
+langchain'in RecursiveCharacterTextSplitter'ı her özyineleme seviyesinde
+alt metinleri yeniden arar, re.split ile kopyalar, parçaları string olarak
+birleştirir ve uzunluğu parça başına ayrı bir length_function çağrısıyla
+ölçer. ChunkSplitter aynı algoritmayı metnin kopyaları yerine (başlangıç,
+bitiş) aralıkları üzerinde çalıştırır:
+
+    ayraçlar   : Metin bir kez UTF-32 kod noktası dizisine çevrilir, her
+                 ayracın tüm konumları tek vektörel karşılaştırmayla bulunur;
+                 bir aralıktaki kesim noktaları searchsorted ile dilimlenir
+                 (alt metin kopyalanmaz, tekrar aranmaz). "\n\n" gibi kendisiyle
+                 örtüşebilen ayraçlar önceden derlenmiş regex'le aralıkta taranır.
+    uzunluk    : Karakter modunda aralık farkı; token modunda bir seviyedeki
+                 tüm dokümanların parçaları tek batch'te tokenize edilir, aynı
+                 parça metni (kelimeler, tek karakterler) bir kez sayılır
+    birleştirme: Açgözlü birleştirme ve örtüşme geri sarması önek toplamları
+                 üzerinde bisect ile parça başına değil, çıkan parça başına yapılır
+
+Çıktı (parça metinleri ve start_index) aynı ayarlarla kurulmuş
+RecursiveCharacterTextSplitter(keep_separator=True, add_start_index=...) ile
+birebir aynıdır; bkz. benchmarks/bench_text_splitter.py. Farklar: ayraçlar
+regex değil düz metindir ve metadata derin değil sığ kopyalanır (bu repodaki
+metadata değerleri skalerdir).
+
+Token modu (from_tokenizer) chunk_size/chunk_overlap'i embedder'ın veya
+flan-t5'in tokenizer'ıyla ölçer; özel token'lar (</s>) sayılmaz.
+"""
+
+import bisect
+import re
+from functools import lru_cache
+from itertools import accumulate
+
+import numpy as np
+
+try:
+    from langchain_core.documents import Document
+except ImportError:
+    from langchain.schema import Document
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", " ", ""]
+TOKEN_BATCH_SIZE = 1024
+
+
+def _has_border(separator):
+    # "\n\n" gibi kendisiyle örtüşebilen ayraçların eşleşmeleri alt metinde farklı düşebilir
+    return any(separator[:k] == separator[-k:] for k in range(1, len(separator)))
+
+
+@lru_cache(maxsize=4)
+def load_tokenizer(name):
+    """HF tokenizer'ı yükle: transformers varsa AutoTokenizer, yoksa tokenizers.Tokenizer"""
+    try:
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(name)
+    except ImportError:
+        from tokenizers import Tokenizer
+        return Tokenizer.from_pretrained(name)
+
+
+def token_counter(tokenizer, batch_size=TOKEN_BATCH_SIZE):
+    """
+    Tokenizer'ı batch token sayacına çevir.
+
+    Returns:
+        Callable[[list], list]: Metin listesi -> token sayıları (özel token'lar hariç)
+    """
+    if hasattr(tokenizer, "encode_batch"):
+        # tokenizers.Tokenizer (Rust); transformers olmadan da kullanılabilir
+        def encode(texts):
+            return [len(encoding.ids) for encoding in tokenizer.encode_batch(texts, add_special_tokens=False)]
+    else:
+        def encode(texts):
+            return [len(ids) for ids in tokenizer(texts, add_special_tokens=False)["input_ids"]]
+
+    def count(texts):
+        counts = []
+        for start in range(0, len(texts), batch_size):
+            counts.extend(encode(texts[start:start + batch_size]))
+        return counts
+
+    return count
+
+
+class ChunkSplitter:
+    def __init__(self, chunk_size=4000, chunk_overlap=200, separators=None, add_start_index=False,
+                 batch_length_function=None):
+        """
+        Args:
+            chunk_size: Bir parçanın en fazla uzunluğu (karakter veya token)
+            chunk_overlap: Ardışık parçalar arasındaki en fazla örtüşme
+            separators: Öncelik sırasıyla düz metin ayraçları ("" = karakter karakter)
+            add_start_index: True ise parçanın metindeki konumu metadata["start_index"]'e yazılır
+            batch_length_function: Metin listesi -> uzunluk listesi; None ise karakter sayısı
+        """
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Parça örtüşmesi ({chunk_overlap}) parça boyutundan ({chunk_size}) büyük olamaz."
+            )
+        self._chunk_size = chunk_size
+        self._chunk_overlap = chunk_overlap
+        self._separators = list(DEFAULT_SEPARATORS if separators is None else separators)
+        self._patterns = [re.compile(re.escape(separator)) if separator else None for separator in self._separators]
+        self._borders = [_has_border(separator) for separator in self._separators]
+        self._codepoints = [[ord(char) for char in separator] for separator in self._separators]
+        self._add_start_index = add_start_index
+        self._batch_length = batch_length_function
+
+    @classmethod
+    def from_tokenizer(cls, tokenizer, batch_size=TOKEN_BATCH_SIZE, **kwargs):
+        """Uzunlukları tokenizer token'larıyla ölçen bölücü (tokenizer nesnesi veya HF model adı)"""
+        if isinstance(tokenizer, str):
+            tokenizer = load_tokenizer(tokenizer)
+        return cls(batch_length_function=token_counter(tokenizer, batch_size), **kwargs)
+
+    # --- Ayraç eşleşmeleri ---------------------------------------------------
+
+    def _cuts(self, text, matches, level, start, end):
+        """level ayracının [start, end) içindeki eşleşme başlangıçları"""
+        pattern = self._patterns[level]
+        if self._borders[level]:
+            return np.fromiter((m.start() for m in pattern.finditer(text, start, end)), dtype=np.int64)
+        positions = matches.get(level)
+        if positions is None:
+            positions = matches[level] = self._positions(text, matches, level)
+        width = len(self._separators[level])
+        return positions[np.searchsorted(positions, start):np.searchsorted(positions, end - width, side="right")]
+
+    def _positions(self, text, matches, level):
+        """Ayracın metindeki tüm geçişleri (örtüşemeyen ayraçta regex taramasıyla aynı)"""
+        codes = matches.get("codes")
+        if codes is None:
+            codes = matches["codes"] = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        separator = self._codepoints[level]
+        count = len(codes) - len(separator) + 1
+        if count <= 0:
+            return np.empty(0, dtype=np.int64)
+        hits = codes[:count] == separator[0]
+        for offset, codepoint in enumerate(separator[1:], start=1):
+            hits &= codes[offset:offset + count] == codepoint
+        return np.flatnonzero(hits)
+
+    def _pieces(self, text, matches, level, start, end):
+        """
+        Aralığı ilk bulunan ayraçtan böl (ayraç sonraki parçanın başında kalır).
+
+        Returns:
+            tuple: (başlangıçlar, bitişler, sonraki seviye veya None)
+        """
+        for index in range(level, len(self._separators)):
+            if not self._separators[index]:
+                starts = np.arange(start, end, dtype=np.int64)
+                return starts, starts + 1, None
+            cuts = self._cuts(text, matches, index, start, end)
+            if len(cuts):
+                bounds = np.concatenate(([start], cuts, [end]))
+                nonempty = np.diff(bounds) > 0
+                next_level = index + 1 if index + 1 < len(self._separators) else None
+                return bounds[:-1][nonempty], bounds[1:][nonempty], next_level
+        return np.array([start], dtype=np.int64), np.array([end], dtype=np.int64), None
+
+    # --- Birleştirme ---------------------------------------------------------
+
+    def _merge(self, starts, ends, lengths):
+        """
+        Ardışık küçük parçaları chunk_size'a kadar birleştir, chunk_overlap kadar geri sar.
+
+        TextSplitter._merge_splits ile aynı karar: ayraç boş olduğundan pencere
+        toplamı önek toplamlarının farkıdır.
+
+        Returns:
+            list: (başlangıç, bitiş, kırpılsın mı) aralıkları
+        """
+        size, overlap = self._chunk_size, self._chunk_overlap
+        prefix = [0, *accumulate(lengths)]
+        n = len(lengths)
+        spans, first = [], 0
+        while True:
+            # Eklenince pencereyi taşıran ilk parça
+            overflow = bisect.bisect_right(prefix, prefix[first] + size) - 1
+            if overflow >= n:
+                spans.append((starts[first], ends[n - 1], True))
+                return spans
+            spans.append((starts[first], ends[overflow - 1], True))
+            # Toplam örtüşmeye inene ve yeni parça sığana (veya pencere boşalana) kadar baştan at
+            fits = min(bisect.bisect_left(prefix, prefix[overflow + 1] - size),
+                       bisect.bisect_left(prefix, prefix[overflow]))
+            first = max(first, bisect.bisect_left(prefix, prefix[overflow] - overlap), fits)
+
+    # --- Bölme ---------------------------------------------------------------
+
+    def _split_spans(self, texts):
+        """Her metin için parça aralıkları (RecursiveCharacterTextSplitter._split_text sırasıyla)"""
+        matches = [{} for _ in texts]
+        known = {}  # Parça metni -> token sayısı (çağrı boyunca)
+        roots = [[] for _ in texts]
+        work = [(doc, 0, len(text), 0, roots[doc]) for doc, text in enumerate(texts) if text]
+        while work:
+            # Seviyedeki tüm aralıklar bölünür, uzunlukları tek seferde ölçülür
+            split = [self._pieces(texts[doc], matches[doc], level, start, end)
+                     for doc, start, end, level, _ in work]
+            if self._batch_length is None:
+                lengths = [(ends - starts).tolist() for starts, ends, _ in split]
+            else:
+                flat = [texts[item[0]][a:b] for item, (starts, ends, _) in zip(work, split)
+                        for a, b in zip(starts.tolist(), ends.tolist())]
+                missing = [piece for piece in dict.fromkeys(flat) if piece not in known]
+                if missing:
+                    known.update(zip(missing, self._batch_length(missing)))
+                counts = [known[piece] for piece in flat]
+                lengths, offset = [], 0
+                for starts, _, _ in split:
+                    lengths.append(counts[offset:offset + len(starts)])
+                    offset += len(starts)
+
+            next_work = []
+            for (doc, _, _, _, node), (starts, ends, next_level), item_lengths in zip(work, split, lengths):
+                starts, ends = starts.tolist(), ends.tolist()
+                run = 0
+                for index, length in enumerate(item_lengths):
+                    if length < self._chunk_size:
+                        continue
+                    if run < index:
+                        node.extend(self._merge(starts[run:index], ends[run:index], item_lengths[run:index]))
+                    if next_level is None:
+                        # Bölünemeyen uzun parça langchain'deki gibi kırpılmadan eklenir
+                        node.append((starts[index], ends[index], False))
+                    else:
+                        child = []
+                        node.append(child)
+                        next_work.append((doc, starts[index], ends[index], next_level, child))
+                    run = index + 1
+                if run < len(item_lengths):
+                    node.extend(self._merge(starts[run:], ends[run:], item_lengths[run:]))
+            work = next_work
+        return [list(_flatten(root)) for root in roots]
+
+    def _split_texts(self, texts):
+        for text, spans in zip(texts, self._split_spans(texts)):
+            chunks = []
+            for start, end, strip in spans:
+                chunk = text[start:end].strip() if strip else text[start:end]
+                if chunk:
+                    chunks.append(chunk)
+            yield chunks
+
+    def split_text(self, text):
+        return next(self._split_texts([text]))
+
+    def create_documents(self, texts, metadatas=None):
+        metadatas = metadatas or [{}] * len(texts)
+        documents = []
+        for text, metadata, chunks in zip(texts, metadatas, self._split_texts(texts)):
+            index = -1
+            for chunk in chunks:
+                chunk_metadata = dict(metadata)
+                if self._add_start_index:
+                    # langchain ile aynı: önceki parçanın başından sonraki ilk geçiş
+                    index = text.find(chunk, index + 1)
+                    chunk_metadata["start_index"] = index
+                documents.append(Document(page_content=chunk, metadata=chunk_metadata))
+        return documents
+
+    def split_documents(self, documents):
+        """Document'ları (veya ChunkStore parçalarını) böl; RecursiveCharacterTextSplitter yerine geçer"""
+        texts, metadatas = [], []
+        for document in documents:
+            texts.append(document.page_content)
+            metadatas.append(document.metadata)
+        return self.create_documents(texts, metadatas=metadatas)
+
+
+def _flatten(node):
+    for entry in node:
+        if isinstance(entry, list):
+            yield from _flatten(entry)
+        else:
+            yield entry
@@ -0,0 +1,304 @@
+"""
+CHUNK_STORE.PY - SÜTUNSAL, BELLEK EŞLEMELİ DOKÜMAN/PARÇA DEPOSU
+
+Her parçanın ayrı bir langchain Document'ı ve metadata sözlüğü olması büyük
+korpuslarda yüzlerce MB Python nesne yükü demektir. ChunkStore aynı veriyi
+sıkıştırılmış sütunlar halinde tutar:
+
+    metin     : Tek, bitişik UTF-8 tamponu + int64 bayt ofsetleri (n + 1)
+                ve int32 karakter uzunlukları
+    metadata  : Anahtar başına int32 kod dizisi; değerler tek bir havuzda
+                bir kez saklanır (intern), -1 = anahtar yok
+
+Depo bir Document listesi gibi davranır (len, indeks, iterasyon) ama
+elemanları __slots__'lu ChunkView'lardır: page_content ve metadata ancak
+okunduklarında tampondan üretilir, to_document() gerçek bir Document döndürür.
+View'ların metadata'sı her okumada yeni bir sözlüktür; kalıcı değişiklik için
+set_metadata kullanılır.
+
+save()/load() depoyu bir dizine yazar ve okur. mmap_mode=True ile metin tamponu ve
+kod dizileri işletim sisteminin sayfa önbelleğinden okunur; arayıcılar parça
+metnine korpusu heap'e almadan ulaşır. Yüklenen depoya ilk yazmada veri
+belleğe kopyalanır.
+"""
+
+import json
+import mmap
+import os
+from array import array
+
+import numpy as np
+
+try:
+    from langchain_core.documents import Document
+except ImportError:
+    from langchain.schema import Document
+
+STORE_FORMAT_VERSION = 1
+MANIFEST_FILENAME = "chunk_store.json"
+TEXT_FILENAME = "texts.bin"
+OFFSETS_FILENAME = "offsets.npy"
+LENGTHS_FILENAME = "lengths.npy"
+
+
+def _intern_key(value):
+    # True == 1 == 1.0 aynı hash'e düşer; tipleriyle ayrı tutulmalılar
+    return type(value), value
+
+
+class ChunkView:
+    """Depodaki bir parçaya hafif bakış; Document ile aynı okuma arayüzü"""
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    @property
+    def page_content(self):
+        return self._store.text(self._index)
+
+    @property
+    def metadata(self):
+        return self._store.metadata(self._index)
+
+    def to_document(self):
+        return Document(page_content=self.page_content, metadata=self.metadata)
+
+    def __repr__(self):
+        return f"ChunkView({self._index}, metadata={self.metadata!r})"
+
+
+class ChunkStore:
+    def __init__(self):
+        self._buffer = bytearray()
+        self._offsets = array("q", [0])
+        self._lengths = array("i")      # Karakter uzunlukları (istatistikler tamponu taramasın)
+        self._columns = {}      # anahtar -> array('i') kodlar
+        self._values = []       # kod -> değer
+        self._codes = {}        # (tip, değer) -> kod
+        self._readonly = False  # load(mmap=True) sonrası; ilk yazmada kopyalanır
+
+    @classmethod
+    def from_documents(cls, documents):
+        store = cls()
+        store.extend(documents)
+        return store
+
+    # --- Okuma ---------------------------------------------------------------
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ChunkView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ChunkStore indeksi aralık dışında")
+        return ChunkView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield ChunkView(self, index)
+
+    def text(self, index):
+        start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+        return self._buffer[start:end].decode("utf-8")
+
+    def metadata(self, index):
+        metadata = {}
+        for key, codes in self._columns.items():
+            code = int(codes[index])
+            if code >= 0:
+                metadata[key] = self._values[code]
+        return metadata
+
+    def get(self, index, key, default=None):
+        """Tek bir metadata değeri (sözlük kurmadan)"""
+        codes = self._columns.get(key)
+        code = int(codes[index]) if codes is not None else -1
+        return self._values[code] if code >= 0 else default
+
+    @property
+    def keys(self):
+        return list(self._columns)
+
+    def codes(self, key):
+        """Anahtarın int32 kod dizisi; anahtar hiç yoksa hepsi -1"""
+        codes = self._columns.get(key)
+        if codes is None:
+            return np.full(len(self), -1, dtype=np.int32)
+        # Bellek eşlemeli dizi kopyalanmaz; büyüyebilen array kopyalanır (dışa verilen tampon yeniden boyutlanamaz)
+        return codes if isinstance(codes, np.ndarray) else np.array(codes, dtype=np.int32)
+
+    def value(self, code):
+        return self._values[code] if code >= 0 else None
+
+    def text_bytes(self):
+        """Metin tamponunun toplam bayt sayısı"""
+        return int(self._offsets[-1])
+
+    def char_count(self):
+        """Toplam karakter sayısı"""
+        return int(np.asarray(self._lengths, dtype=np.int64).sum())
+
+    def distinct(self, keys):
+        """keys sütunlarının farklı kod kombinasyonları (satır başına bir kombinasyon)"""
+        if not len(self):
+            return np.empty((0, len(keys)), dtype=np.int32)
+        # Kodlar (değer sayısı + 1) tabanında tek int64 anahtara paketlenir; np.unique(axis=0)'dan çok hızlı
+        radix = len(self._values) + 1
+        if radix ** len(keys) >= 2 ** 63:
+            return np.unique(np.stack([self.codes(key) for key in keys], axis=1), axis=0)
+        packed = np.zeros(len(self), dtype=np.int64)
+        for key in keys:
+            packed = packed * radix + (self.codes(key).astype(np.int64) + 1)
+        packed = np.unique(packed)
+        rows = np.empty((len(packed), len(keys)), dtype=np.int32)
+        for position in range(len(keys) - 1, -1, -1):
+            packed, digits = np.divmod(packed, radix)
+            rows[:, position] = digits - 1
+        return rows
+
+    # --- Yazma ---------------------------------------------------------------
+
+    def _make_writable(self):
+        if not self._readonly:
+            return
+        self._buffer = bytearray(self._buffer[:self.text_bytes()])
+        self._offsets = array("q", np.asarray(self._offsets, dtype=np.int64).tobytes())
+        self._lengths = array("i", np.asarray(self._lengths, dtype=np.int32).tobytes())
+        self._columns = {key: array("i", np.asarray(codes, dtype=np.int32).tobytes())
+                         for key, codes in self._columns.items()}
+        self._readonly = False
+
+    def _intern(self, value):
+        key = _intern_key(value)
+        code = self._codes.get(key)
+        if code is None:
+            code = self._codes[key] = len(self._values)
+            self._values.append(value)
+        return code
+
+    def add(self, text, metadata=None):
+        """Metin + metadata'yı sona ekle"""
+        self._make_writable()
+        index = len(self)
+        self._buffer += text.encode("utf-8")
+        self._offsets.append(len(self._buffer))
+        self._lengths.append(len(text))
+        for key, value in (metadata or {}).items():
+            codes = self._columns.get(key)
+            if codes is None:
+                codes = self._columns[key] = array("i", [-1]) * index
+            codes.append(self._intern(value))
+        for codes in self._columns.values():
+            if len(codes) == index:
+                codes.append(-1)
+
+    def append(self, document):
+        self.add(document.page_content, document.metadata)
+
+    def extend(self, documents):
+        for document in documents:
+            self.add(document.page_content, document.metadata)
+
+    def set_metadata(self, index, key, value):
+        """Bir parçanın metadata değerini kalıcı olarak değiştir"""
+        self._make_writable()
+        codes = self._columns.get(key)
+        if codes is None:
+            codes = self._columns[key] = array("i", [-1]) * len(self)
+        codes[index] = self._intern(value)
+
+    # --- Disk ----------------------------------------------------------------
+
+    def _column_filename(self, position):
+        return f"meta_{position}.npy"
+
+    def save(self, directory):
+        """Depoyu dizine yaz; manifest en son yazılır (yarım kalan kayıt okunmaz)"""
+        os.makedirs(directory, exist_ok=True)
+        # Eski manifest yeni dosyalarla eşleşmesin: yazma yarıda kalırsa depo okunamaz olur
+        if os.path.exists(os.path.join(directory, MANIFEST_FILENAME)):
+            os.remove(os.path.join(directory, MANIFEST_FILENAME))
+
+        def write(filename, writer):
+            path = os.path.join(directory, filename)
+            with open(path + ".tmp", "wb") as f:
+                writer(f)
+            os.replace(path + ".tmp", path)
+
+        write(TEXT_FILENAME, lambda f: f.write(self._buffer[:self.text_bytes()]))
+        write(OFFSETS_FILENAME, lambda f: np.save(f, np.asarray(self._offsets, dtype=np.int64)))
+        write(LENGTHS_FILENAME, lambda f: np.save(f, np.asarray(self._lengths, dtype=np.int32)))
+        keys = list(self._columns)
+        for position, key in enumerate(keys):
+            write(self._column_filename(position), lambda f, key=key: np.save(f, self.codes(key)))
+        manifest = {"version": STORE_FORMAT_VERSION, "count": len(self), "keys": keys, "values": self._values}
+        write(MANIFEST_FILENAME, lambda f: f.write(json.dumps(manifest, ensure_ascii=False).encode("utf-8")))
+
+    @classmethod
+    def load(cls, directory, mmap_mode=True):
+        """
+        save() ile yazılmış depoyu oku.
+
+        Args:
+            mmap_mode: True ise metin ve kodlar bellek eşlemeli açılır (heap'e kopyalanmaz)
+
+        Returns:
+            ChunkStore | None: Depo yoksa, eksikse veya sürümü farklıysa None
+        """
+        try:
+            with open(os.path.join(directory, MANIFEST_FILENAME), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") != STORE_FORMAT_VERSION:
+                return None
+            store = cls()
+            with open(os.path.join(directory, TEXT_FILENAME), "rb") as f:
+                if mmap_mode and os.fstat(f.fileno()).st_size:
+                    store._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    store._buffer = bytearray(f.read())
+
+            def load_array(filename):
+                # memmap alt sınıfı eleman erişiminde yavaş; aynı eşlemeye düz ndarray olarak bak
+                path = os.path.join(directory, filename)
+                return np.load(path, mmap_mode="r" if mmap_mode else None).view(np.ndarray)
+
+            store._offsets = load_array(OFFSETS_FILENAME)
+            store._lengths = load_array(LENGTHS_FILENAME)
+            store._columns = {
+                key: load_array(store._column_filename(position)) for position, key in enumerate(manifest["keys"])
+            }
+        except (OSError, ValueError, KeyError):
+            return None
+        if len(store._offsets) != manifest["count"] + 1:
+            return None
+        store._values = manifest["values"]
+        store._codes = {_intern_key(value): code for code, value in enumerate(store._values)}
+        store._readonly = True
+        return store
+
+    def __getstate__(self):
+        # mmap ve memmap pickle edilemez; process'ler arası kopya için düz baytlara çevir
+        self._make_writable()
+        return {
+            "buffer": bytes(self._buffer),
+            "offsets": self._offsets.tobytes(),
+            "lengths": self._lengths.tobytes(),
+            "columns": {key: codes.tobytes() for key, codes in self._columns.items()},
+            "values": self._values,
+        }
+
+    def __setstate__(self, state):
+        self.__init__()
+        self._buffer = bytearray(state["buffer"])
+        self._offsets = array("q", state["offsets"])
+        self._lengths = array("i", state["lengths"])
+        self._columns = {key: array("i", codes) for key, codes in state["columns"].items()}
+        self._values = state["values"]
+        self._codes = {_intern_key(value): code for code, value in enumerate(self._values)}
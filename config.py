@@ -12,11 +12,88 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 HF_DATASET_NAME = "tutkuozdeniz/supply-chain-management"
 HF_SPLIT = "train"
 
+# HF DATASET ANLIK GÖRÜNTÜSÜ (bkz. dataset_snapshot.py)
+DATASET_SNAPSHOT = True      # Dataset'i sürümlü yerel dizine sabitle, satırları Arrow dosyasından bellek eşlemeli oku
+DATASET_SNAPSHOT_DIR = ".cache/datasets"
+DATASET_SNAPSHOT_KEEP = 2    # Saklanan anlık görüntü sayısı (satır karşılaştırması için önceki de tutulur)
+HF_REVISION = ""             # Commit, branch veya tag; boşsa son commit çözülüp sabitlenir
+HF_OFFLINE = os.getenv("HF_HUB_OFFLINE", "0") == "1"  # True ise Hub'a hiç gidilmez, son yerel anlık görüntü kullanılır
+
 # PDF İŞLEME AYARLARI
 CHUNK_SIZE = 800    # PDF'ler için optimize edildi
 CHUNK_OVERLAP = 150
+CHUNK_TOKENIZER = ""         # Boş değilse parçalar bu HF tokenizer'ının token'larıyla ölçülür (örn. "google/flan-t5-large")
+CHUNK_SIZE_TOKENS = 256      # CHUNK_TOKENIZER ayarlıyken CHUNK_SIZE/CHUNK_OVERLAP yerine kullanılır
+CHUNK_OVERLAP_TOKENS = 48
 MODEL_NAME = "gemini-pro"
 VECTOR_DB_PATH = "vector_store"
+INCREMENTAL_INDEXING = True  # Sadece değişen parçaları embed et, her açılışta sıfırdan kurma
+
+# VEKTÖR VERİTABANI ARKA UCU
+VECTOR_BACKEND = "chroma"    # "chroma" veya "faiss" (isteğe bağlı yerel FAISS indeksi, bkz. vector_backends.py)
+FAISS_INDEX_TYPE = "hnsw"    # "flat" (birebir), "hnsw" (en hızlı), "ivfpq" (sıkıştırılmış, en az bellek)
+FAISS_MMAP = True            # İndeksi bellek eşlemeli aç; vektörler süreç belleğine kopyalanmaz
+FAISS_HNSW_M = 32
+FAISS_EF_SEARCH = 64         # HNSW sorgu genişliği (büyüdükçe recall artar, gecikme artar)
+FAISS_IVF_NPROBE = 16        # IVF-PQ'da taranan küme sayısı
+
+# PARÇALANMIŞ (SHARDED) İNDEKS (bkz. sharded_index.py)
+SHARDED_INDEX = False        # Parçaları SHARD_COUNT yerel indekse böl; paralel kur, sorguları eşzamanlı dağıt
+SHARD_COUNT = 4              # Değiştirilince mevcut shard'lar yeniden dengelenir (~1/N parça taşınır)
+SHARD_PARTITION = "hash"     # "hash" (parça ID'si) veya "source" (aynı dosyanın parçaları aynı shard'da)
+SHARD_BUILD_WORKERS = os.cpu_count() or 1  # Aynı anda kurulan shard sayısı (process)
+
+# TEKRAR EDEN PARÇA ELEME (MinHash/LSH)
+DEDUPLICATION = True         # ZIP/yerel kopyalardan gelen aynı/neredeyse aynı parçaları indekslemeden önce ele
+DEDUP_THRESHOLD = 0.9        # Tahmini Jaccard benzerliği bu değerin üstündeyse parça elenir
+DEDUP_NUM_PERM = 128         # MinHash imza uzunluğu (büyüdükçe tahmin hassaslaşır, yavaşlar)
+
+# AKIŞ (STREAMING) İNDEKSLEME
+STREAMING_INGESTION = True   # Sayfa -> parça -> embed -> yazma aşamaları sınırlı kuyruklarla, bellek sabit kalır
+INGEST_QUEUE_SIZE = 4        # Aşamalar arasında bekleyebilecek batch sayısı (EMBEDDING_BATCH_SIZE parçalık)
+
+# ASENKRON GEMINI İSTEMCİSİ (SupplyChainChatbot.aask / aingest)
+GEMINI_API_BASE_URL = os.getenv("GEMINI_API_BASE_URL", "https://generativelanguage.googleapis.com")  # Yerel taklit için değiştirilebilir
+GEMINI_EMBEDDING_MODEL = "models/embedding-001"
+ASYNC_MAX_CONCURRENCY = 8          # Aynı anda uçuşta olabilecek Gemini isteği
+ASYNC_POOL_SIZE = 16               # Paylaşılan HTTP bağlantı havuzu boyutu
+ASYNC_MAX_RETRIES = 4              # 429/5xx ve bağlantı hatalarında tekrar deneme sayısı
+ASYNC_RETRY_BASE_SECONDS = 0.5     # Jitter'lı üstel geri çekilmenin taban süresi
+ASYNC_RETRY_MAX_SECONDS = 8.0
+ASYNC_REQUEST_TIMEOUT_SECONDS = 60
+
+# ÖLÇÜM (METRICS) AYARLARI
+METRICS_PORT = 9108                # /metrics (Prometheus) ve /metrics.json uç noktaları; 0 ile kapatılır
+METRICS_JSON_LOG = ""              # Boş değilse ölçümler periyodik olarak bu JSON Lines dosyasına eklenir
+METRICS_LOG_INTERVAL_SECONDS = 60
 
 # DOSYA TİPLERİ
 SUPPORTED_EXTENSIONS = ['.pdf', '.txt', '.zip']
+
+# PARALEL ÇIKARMA AYARLARI
+PARALLEL_EXTRACTION = True                     # PDF/ZIP/TXT çıkarma işlemini process havuzunda yap
+EXTRACTION_WORKERS = max(1, (os.cpu_count() or 1) - 1)  # Havuzdaki process sayısı (1 = seri)
+EXTRACTION_CHUNKSIZE = 4                       # Her process'e tek seferde gönderilen dosya sayısı
+
+# PDF ÇIKARMA ARKA UÇLARI (bkz. pdf_backends.py)
+PDF_BACKEND_ORDER = ["pymupdf", "pypdf", "pypdf2", "unstructured"]  # Sırayla denenir; yüklü olmayan/hata veren atlanır
+PDF_SPLIT_MIN_BYTES = 2 * 1024 * 1024   # Bundan büyük PDF'ler sayfa aralıklarına bölünüp havuzda paralel işlenir
+PDF_PAGES_PER_TASK = 16                 # Bir sayfa aralığı görevindeki en az sayfa sayısı
+
+
+# ÇIKARMA ÖNBELLEĞİ AYARLARI
+EXTRACTION_CACHE_ENABLED = True      # Değişmeyen dosyalar tekrar ayrıştırılmasın
+EXTRACTION_CACHE_DIR = ".cache/extraction"
+EXTRACTION_CACHE_MAX_MB = 512        # Sıkıştırılmış metin için disk sınırı (LRU ile tahliye)
+
+# EMBEDDING ÖNBELLEĞİ AYARLARI
+EMBEDDING_CACHE_DIR = ".cache/embeddings"  # Boş string ile kapatılabilir
+EMBEDDING_CACHE_DTYPE = "float32"          # "float16" yarı disk/bellek kullanır
+EMBEDDING_BATCH_SIZE = 100                 # Gemini batch embed sınırı 100 metin
+EMBEDDING_QUERY_CACHE_SIZE = 1024          # Bellekte (LRU) tutulan sorgu / cümle vektörü; diske yazılmaz
+# YENİDEN SIRALAMA (RERANKING) AYARLARI
+RERANKING = True                     # Çok aday çek, cross-encoder ile en iyilerini prompt'a koy
+RERANK_MODEL = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"  # Türkçe destekli, CPU'da hızlı
+RERANK_CANDIDATES = 30               # Vektör veritabanından çekilen aday sayısı
+RERANK_BATCH_SIZE = 16
+RERANK_LATENCY_BUDGET_MS = 400       # Aday puanlamaya ayrılan süre; aşılacaksa kalanlar puanlanmaz
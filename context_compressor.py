@@ -0,0 +1,181 @@
+"""
+CONTEXT_COMPRESSOR.PY - "STUFF" PROMPT'U İÇİN CÜMLE DÜZEYİNDE BAĞLAM SIKIŞTIRMA
+
+RetrievalQA'nın "stuff" zinciri k adet 800 karakterlik parçayı olduğu gibi
+prompt'a koyar. flan-t5'in 512 token'lık encoder'ı fazlasını sessizce keser:
+encode maliyeti yine ödenir, kesilen kısımdaki ilgili cümleler ise kaybolur.
+
+Bu modül çekilen parçaları cümlelere ayırır, her cümleyi soruya göre puanlar
+ve en iyi cümleleri gerçek tokenizer ile ölçülen bir token bütçesine sığdırır:
+
+    puan = (1 - chunk_weight) * cos(soru, cümle) + chunk_weight * cos(soru, parça)
+
+Soru ve parça vektörleri aramada kullanılan embedding modelinden gelir
+(CachedEmbeddings ile ikisi de zaten önbellektedir). Cümleler korpusun parçası
+olmadığından diskteki önbelleğe yazılmaz, bellek içi LRU'da tutulur
+(CachedEmbeddings.embed_documents_in_memory). Parça puanı, aynı
+benzerlikteki cümlelerden daha ilgili parçada olanı öne alır. Seçilen
+cümleler parça ve cümle sırası korunarak birleştirilir, hiç cümlesi
+seçilmeyen parça bağlamdan çıkar. Parçalar bütçeye zaten sığıyorsa hiçbir
+şey embed edilmez, parçalar aynen döner.
+"""
+
+import re
+import time
+
+import numpy as np
+
+try:
+    from langchain_core.callbacks import CallbackManagerForRetrieverRun
+    from langchain_core.documents import Document
+    from langchain_core.retrievers import BaseRetriever
+except ImportError:
+    from langchain.callbacks.manager import CallbackManagerForRetrieverRun
+    from langchain.schema import BaseRetriever, Document
+
+from metrics import METRICS
+
+# Cümle sonu noktalamasından sonraki boşluk veya boş satır cümle sınırıdır
+_SENTENCE_BOUNDARY_RE = re.compile(r"(?<=[.!?…])\s+|\n\s*\n")
+# "stuff" zincirinin parçalar arasına koyduğu ayırıcı
+DOCUMENT_SEPARATOR = "\n\n"
+
+
+def split_sentences(text, min_chars=25):
+    """
+    Metni cümlelere böl; min_chars'tan kısa parçalar (madde işaretleri, "Şekil 3."
+    gibi) bir önceki cümleye eklenir ki tek başına puanlanmasın.
+    """
+    sentences = []
+    for part in _SENTENCE_BOUNDARY_RE.split(text):
+        part = " ".join(part.split())
+        if not part:
+            continue
+        if sentences and (len(part) < min_chars or len(sentences[-1]) < min_chars):
+            sentences[-1] = f"{sentences[-1]} {part}"
+        else:
+            sentences.append(part)
+    return sentences
+
+
+def _normalize_rows(vectors):
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class ContextCompressor:
+    def __init__(self, embeddings, count_tokens, max_input_tokens=512, prompt=None,
+                 chunk_weight=0.3, min_sentence_chars=25):
+        """
+        Args:
+            embeddings: Arama ile aynı embedding modeli (soru/parça vektörleri önbellekten gelir)
+            count_tokens: Metnin LLM tokenizer'ındaki token sayısını döndüren fonksiyon
+            max_input_tokens: LLM'in girdi sınırı (flan-t5 için 512)
+            prompt: Bağlamın yerleştirildiği PromptTemplate; şablon ve soru token'ları
+                bütçeden düşülür (None ise bütçenin tamamı bağlama ayrılır)
+            chunk_weight: Parça benzerliğinin cümle puanındaki ağırlığı (0-1)
+            min_sentence_chars: Bundan kısa cümleler bir öncekine eklenir
+        """
+        self.embeddings = embeddings
+        self.count_tokens = count_tokens
+        self.max_input_tokens = max_input_tokens
+        self.prompt = prompt
+        self.chunk_weight = chunk_weight
+        self.min_sentence_chars = min_sentence_chars
+        self.last_stats = None  # Son çağrının {'tokens_before', 'tokens_after', 'sentences', 'kept', 'ms'} bilgisi
+
+    def context_budget(self, query):
+        """Bağlama kalan token sayısı: girdi sınırı - (şablon + soru)"""
+        if self.prompt is None:
+            return self.max_input_tokens
+        overhead = self.count_tokens(self.prompt.format(context="", question=query))
+        return max(0, self.max_input_tokens - overhead)
+
+    def _score(self, query, documents, sentences):
+        """Cümle puanları: soru-cümle ve soru-parça kosinüs benzerliklerinin karışımı"""
+        query_vector = _normalize_rows(self.embeddings.embed_query(query))
+        chunk_vectors = _normalize_rows(self.embeddings.embed_documents([doc.page_content for doc in documents]))
+        # Cümle vektörleri korpus önbelleğine (diske) eklenmez
+        embed_sentences = getattr(self.embeddings, "embed_documents_in_memory", self.embeddings.embed_documents)
+        sentence_vectors = _normalize_rows(embed_sentences([text for _, text in sentences]))
+        chunk_scores = chunk_vectors @ query_vector
+        sentence_scores = sentence_vectors @ query_vector
+        owners = np.array([doc_index for doc_index, _ in sentences])
+        return (1 - self.chunk_weight) * sentence_scores + self.chunk_weight * chunk_scores[owners]
+
+    def _assemble(self, documents, sentences, selected):
+        """Seçilen cümleleri parça ve cümle sırasını koruyarak yeni Document'lara koy"""
+        kept = {}
+        for index in sorted(selected):
+            doc_index, text = sentences[index]
+            kept.setdefault(doc_index, []).append(text)
+        return [
+            Document(page_content=" ".join(kept[doc_index]), metadata=dict(documents[doc_index].metadata))
+            for doc_index in sorted(kept)
+        ]
+
+    def compress(self, query, documents):
+        """
+        Parçaları soruya en ilgili cümlelere indir, bağlam bütçeye sığsın.
+
+        Returns:
+            list[Document]: Sıkıştırılmış parçalar (bütçeye zaten sığıyorsa girdinin aynısı)
+        """
+        if not documents:
+            return list(documents)
+        start = time.perf_counter()
+        budget = self.context_budget(query)
+        tokens_before = self.count_tokens(DOCUMENT_SEPARATOR.join(doc.page_content for doc in documents))
+        METRICS.inc("chatbot_context_tokens_total", tokens_before, help="Bağlama giren token sayısı", stage="retrieved")
+        if tokens_before <= budget:
+            METRICS.inc("chatbot_context_tokens_total", tokens_before, stage="compressed")
+            self.last_stats = {"tokens_before": tokens_before, "tokens_after": tokens_before,
+                               "sentences": None, "kept": None, "ms": (time.perf_counter() - start) * 1000}
+            return list(documents)
+
+        sentences = [
+            (doc_index, sentence)
+            for doc_index, doc in enumerate(documents)
+            for sentence in split_sentences(doc.page_content, self.min_sentence_chars)
+        ]
+        scores = self._score(query, documents, sentences)
+        lengths = [self.count_tokens(text) for _, text in sentences]
+
+        # En yüksek puanlıdan başlayarak sığan her cümleyi al (sığmayan atlanır, daha kısası denenir)
+        selected, used = [], 0
+        for index in np.argsort(-scores, kind="stable"):
+            if used + lengths[index] <= budget:
+                selected.append(int(index))
+                used += lengths[index]
+
+        # Ayırıcılar ve birleştirme token sayısını biraz değiştirebilir: gerçek sayıma göre en zayıfı çıkar
+        compressed = self._assemble(documents, sentences, selected)
+        tokens_after = self.count_tokens(DOCUMENT_SEPARATOR.join(doc.page_content for doc in compressed))
+        while selected and tokens_after > budget:
+            selected.pop()
+            compressed = self._assemble(documents, sentences, selected)
+            tokens_after = self.count_tokens(DOCUMENT_SEPARATOR.join(doc.page_content for doc in compressed))
+
+        elapsed = time.perf_counter() - start
+        METRICS.inc("chatbot_context_tokens_total", tokens_after, stage="compressed")
+        METRICS.observe("chatbot_context_compression_seconds", elapsed, help="Cümle puanlama ve paketleme süresi")
+        self.last_stats = {"tokens_before": tokens_before, "tokens_after": tokens_after,
+                           "sentences": len(sentences), "kept": len(selected), "ms": elapsed * 1000}
+        return compressed
+
+
+class CompressingRetriever(BaseRetriever):
+    """Alttaki arayıcının parçalarını ContextCompressor ile token bütçesine indiren retriever"""
+
+    base_retriever: object
+    compressor: object
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _get_relevant_documents(self, query, *, run_manager: CallbackManagerForRetrieverRun):
+        documents = self.base_retriever.get_relevant_documents(
+            query, callbacks=run_manager.get_child()
+        )
+        return self.compressor.compress(query, documents)
@@ -5,34 +5,93 @@ DATA_LOADER.PY - PDF & ZIP DESTEKLİ HUGGING FACE LOADER
 PDF ve ZIP dosyalarını işleyebilir.
 """
 
+import io
+import json
 import os
-import tempfile
 import zipfile
-from datasets import load_dataset
+from concurrent.futures import ProcessPoolExecutor
 from langchain.schema import Document
+import numpy as np
 import pandas as pd
-from config import HF_DATASET_NAME, HF_SPLIT
+from config import (
+    HF_DATASET_NAME, HF_SPLIT,
+    DATASET_SNAPSHOT, DATASET_SNAPSHOT_DIR, DATASET_SNAPSHOT_KEEP, HF_REVISION, HF_OFFLINE,
+    PARALLEL_EXTRACTION, EXTRACTION_WORKERS, EXTRACTION_CHUNKSIZE,
+    EXTRACTION_CACHE_ENABLED, EXTRACTION_CACHE_DIR, EXTRACTION_CACHE_MAX_MB,
+    PDF_BACKEND_ORDER, PDF_SPLIT_MIN_BYTES, PDF_PAGES_PER_TASK
+)
+from chunk_store import ChunkStore
+from dataset_snapshot import ensure_snapshot
+from extraction_cache import ExtractionCache
+from metrics import METRICS, timed
+from pdf_backends import backend_signature, extract_pdf_pages, installed_versions, page_count
 
-# PDF işleme kütüphaneleri
-try:
-    import PyPDF2
-    PDF_SUPPORT = True
-except ImportError:
-    PDF_SUPPORT = False
-    print("⚠️ PyPDF2 yüklü değil, PDF desteği kapalı")
+# PDF işleme kütüphaneleri (PyMuPDF, pypdf, PyPDF2, unstructured - bkz. pdf_backends.py)
+PDF_SUPPORT = bool(installed_versions(PDF_BACKEND_ORDER))
+if not PDF_SUPPORT:
+    print(f"⚠️ PDF arka uçlarından hiçbiri yüklü değil ({', '.join(PDF_BACKEND_ORDER)}), PDF desteği kapalı")
+
+# Çıkarma mantığı veya arka uçlar değiştiğinde değişir; eski önbellek kayıtları geçersiz olur
+EXTRACTOR_VERSION = f"pages-{backend_signature(PDF_BACKEND_ORDER)}-2"
+
+# İç içe ZIP arşivlerinde inilecek maksimum seviye (zip bomb koruması)
+MAX_ZIP_DEPTH = 3
+
+# Log satırlarında kullanılan dosya tipi etiketleri
+_TYPE_ICONS = {
+    'pdf': "📄 PDF",
+    'zip_content': "📦 ZIP içeriği",
+    'text': "📝 TXT",
+}
+
+class LocalFileDataset:
+    """
+    Yerel dosyaları HF dataset satırları gibi ({'file_name', 'content'})
+    sunan iterable; dosyalar ancak sırası gelince okunur.
+    """
+    
+    def __init__(self, paths):
+        self.paths = list(paths)
+    
+    def __len__(self):
+        return len(self.paths)
+    
+    def __iter__(self):
+        for path in self.paths:
+            with open(path, 'rb') as f:
+                yield {'file_name': path, 'content': f.read()}
 
 class TutkuSupplyChainLoader:
-    def __init__(self):
+    def __init__(self, cache=None):
         self.dataset = None
-        self.documents = []
+        self.documents = ChunkStore()  # Sayfa dokümanları sütunsal olarak tutulur, elemanlar ChunkView
+        self.cache = cache  # ExtractionCache; None ise config'e göre açılır
+        self.snapshot = None     # DatasetSnapshot (DATASET_SNAPSHOT açıksa)
+        self.row_changes = None  # Son işlenen anlık görüntüye göre satır değişiklikleri
     
+    @timed("chatbot_stage_seconds", help="Açılış/indeksleme aşama süreleri", stage="hf_load")
     def load_dataset_from_hf(self):
         """Tutku Özdeniz dataset'ini Hugging Face'ten yükle"""
         print("📥 Hugging Face'ten dataset yükleniyor: tutkuozdeniz/supply-chain-management")
         
         try:
-            # Dataset'i yükle
-            self.dataset = load_dataset(HF_DATASET_NAME, split=HF_SPLIT)
+            if DATASET_SNAPSHOT:
+                # Sabitlenmiş commit yerel Arrow dosyasından okunur; Hub'a sadece commit'i çözmek için gidilir
+                self.snapshot = ensure_snapshot(HF_DATASET_NAME, DATASET_SNAPSHOT_DIR, HF_REVISION,
+                                                offline=HF_OFFLINE, key_column='file_name',
+                                                keep=DATASET_SNAPSHOT_KEEP)
+                self.dataset = self.snapshot.split(HF_SPLIT)
+                self.row_changes = self.snapshot.changes(HF_SPLIT)
+                counts = {status: len(self.row_changes[status])
+                          for status in ('added', 'changed', 'unchanged', 'removed')}
+                for status, count in counts.items():
+                    METRICS.inc("chatbot_dataset_rows_total", count,
+                                help="Son işlenen anlık görüntüye göre dataset satırları", status=status)
+                print(f"📌 Anlık görüntü {self.snapshot.revision[:8]}: {counts['added']} yeni, "
+                      f"{counts['changed']} değişen, {counts['unchanged']} aynı, {counts['removed']} silinen satır")
+            else:
+                from datasets import load_dataset  # Anlık görüntü modunda hiç import edilmez (ağır)
+                self.dataset = load_dataset(HF_DATASET_NAME, split=HF_SPLIT)
             print(f"✅ Dataset yüklendi: {len(self.dataset)} dosya")
             return self.dataset
             
@@ -41,146 +100,466 @@ class TutkuSupplyChainLoader:
             return None
     
     def extract_text_from_pdf(self, pdf_content):
-        """PDF içeriğinden metin çıkar"""
+        """PDF içeriğinden metin çıkar (bytes veya memoryview, diske yazmadan)"""
         if not PDF_SUPPORT:
             return "PDF desteği yüklü değil"
         
         try:
-            # Geçici dosya oluştur
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                tmp_file.write(pdf_content)
-                tmp_path = tmp_file.name
-            
-            # PDF'den metin çıkar
-            with open(tmp_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            
-            # Geçici dosyayı temizle
-            os.unlink(tmp_path)
-            return text.strip()
+            # Sayfa metinleri listede toplanıp bir kez birleştirilir (+= ile kopyalama yok)
+            return "\n".join(self.iter_pdf_pages(pdf_content)).strip()
             
         except Exception as e:
             print(f"❌ PDF işleme hatası: {e}")
             return f"PDF işlenemedi: {str(e)}"
     
+    def iter_pdf_pages(self, pdf_content, page_range=None):
+        """PDF sayfalarının metnini sırayla döndür (PDF_BACKEND_ORDER'daki ilk çalışan arka uçla)"""
+        pages, _ = extract_pdf_pages(pdf_content, PDF_BACKEND_ORDER, page_range)
+        yield from pages
+    
     def process_zip_file(self, zip_content):
         """ZIP dosyasını işle ve içindeki dosyaları çıkar"""
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as tmp_file:
-                tmp_file.write(zip_content)
-                tmp_path = tmp_file.name
-            
             extracted_texts = []
-            with zipfile.ZipFile(tmp_path, 'r') as zip_ref:
-                for file_info in zip_ref.infolist():
-                    if file_info.filename.lower().endswith('.pdf'):
-                        with zip_ref.open(file_info) as pdf_file:
-                            pdf_content = pdf_file.read()
-                            text = self.extract_text_from_pdf(pdf_content)
-                            if text and "PDF işlenemedi" not in text:
-                                extracted_texts.append({
-                                    'filename': file_info.filename,
-                                    'content': text
-                                })
-            
-            os.unlink(tmp_path)
+            for member_name, pdf_content in self._iter_zip_pdfs(zip_content):
+                text = self.extract_text_from_pdf(pdf_content)
+                if text and "PDF işlenemedi" not in text:
+                    extracted_texts.append({
+                        'filename': member_name,
+                        'content': text
+                    })
             return extracted_texts
             
         except Exception as e:
             print(f"❌ ZIP işleme hatası: {e}")
             return []
     
-    def process_dataset_files(self):
-        """Dataset'teki tüm dosyaları işle ve metne çevir"""
-        if self.dataset is None:
-            print("❌ Önce dataset yükleyin")
-            return []
+    def _iter_zip_pdfs(self, zip_content, _depth=0):
+        """
+        ZIP içindeki PDF dosyalarını (isim, içerik) olarak sırayla döndür.
+        
+        Arşiv bellekten okunur ve üyeler tek tek açılır; aynı anda sadece
+        bir üyenin içeriği bellekte tutulur. İç içe ZIP'ler MAX_ZIP_DEPTH
+        seviyesine kadar açılır, isimleri "ic.zip/dosya.pdf" şeklinde döner.
+        """
+        with zipfile.ZipFile(_as_stream(zip_content), 'r') as zip_ref:
+            for file_info in zip_ref.infolist():
+                if file_info.is_dir():
+                    continue
+                
+                member_name = file_info.filename
+                lower_name = member_name.lower()
+                
+                if lower_name.endswith('.pdf'):
+                    with zip_ref.open(file_info) as pdf_file:
+                        yield member_name, pdf_file.read()
+                
+                elif lower_name.endswith('.zip'):
+                    if _depth >= MAX_ZIP_DEPTH:
+                        print(f"⚠️ İç içe ZIP çok derin, atlanıyor: {member_name}")
+                        continue
+                    with zip_ref.open(file_info) as inner_file:
+                        inner_content = inner_file.read()
+                    for inner_name, inner_pdf in self._iter_zip_pdfs(inner_content, _depth + 1):
+                        yield f"{member_name}/{inner_name}", inner_pdf
+    
+    def _iter_extraction_tasks(self, cache=None):
+        """
+        Dataset satırlarını (görev, sayfalar) çiftlerine çevir.
         
-        print("🔍 Dataset dosyaları işleniyor...")
+        Her görev (tip, satır no, dosya adı, içerik) demetidir. ZIP satırları
+        burada açılır ve içindeki her PDF ayrı bir görev olur, böylece büyük
+        ZIP'ler de process havuzuna dağıtılabilir. Sayfalar None ise görev
+        çıkarılmalıdır.
         
+        Anlık görüntüden okunan dataset'te son işlemeden beri değişmemiş
+        satırların sonuçları satır önbelleğinden gelir: içerikleri hiç
+        okunmaz (görevde None) ve sayfalar hazırdır.
+        """
+        unchanged = set(self.row_changes['unchanged']) if cache is not None and self.row_changes else ()
         for i, item in enumerate(self.dataset):
-            try:
-                # Dosya bilgilerini al
-                file_name = item.get('file_name', f'file_{i}')
-                content = item.get('content', b'')
-                
-                if not content:
+            if i in unchanged:
+                cached = cache.get(_row_key(self.dataset.digest(i)))
+                if cached is not None:
+                    for doc_type, file_name, text in json.loads(cached['text']):
+                        yield (doc_type, i, file_name, None), _split_pages(doc_type, text)
                     continue
+            
+            file_name = item.get('file_name', f'file_{i}')
+            content = item.get('content', b'')
+            
+            if not content:
+                continue
+            
+            lower_name = file_name.lower()
+            if lower_name.endswith('.pdf'):
+                yield ('pdf', i, file_name, content), None
+            
+            elif lower_name.endswith('.zip'):
+                try:
+                    for member_name, member_content in self._iter_zip_pdfs(content):
+                        yield ('zip_content', i, f"{file_name}/{member_name}", member_content), None
+                except Exception as e:
+                    print(f"❌ ZIP işleme hatası: {e}")
+            
+            elif lower_name.endswith('.txt'):
+                yield ('text', i, file_name, content), None
+    
+    def _save_rows(self, cache, results):
+        """
+        Çıkarılan satırların tüm dosyalarının sayfalarını satır önbelleğine yaz.
+        
+        Anahtar anlık görüntüdeki satır özetidir; satır değişmedikçe içeriği
+        bir daha okunmaz. Anlık görüntü dışındaki dataset'lerde bir şey yapılmaz.
+        
+        Args:
+            results: Aynı satırlara ait ((tip, satır no, dosya adı, içerik), sayfalar) çiftleri
+        """
+        digest = getattr(self.dataset, 'digest', None)
+        if cache is None or digest is None:
+            return
+        rows = {}
+        for (doc_type, index, file_name, _), pages in results:
+            rows.setdefault(index, []).append([doc_type, file_name, _join_pages(doc_type, pages)])
+        for index, files in rows.items():
+            cache.put(_row_key(digest(index)), json.dumps(files, ensure_ascii=False),
+                      {"type": "row", "extractor_version": EXTRACTOR_VERSION})
+    
+    def _mark_ingested(self):
+        """Anlık görüntüden okunan split'in işlendiğini kaydet (sonraki satır karşılaştırmasının tabanı)"""
+        if self.snapshot is not None and self.row_changes is not None:
+            self.snapshot.mark_ingested(HF_SPLIT)
+    
+    def extract_pages(self, doc_type, content, page_range=None):
+        """
+        Görev içeriğini sayfa metinlerine çevir (TXT dosyası tek sayfadır).
+        
+        PDF hiçbir arka uçla okunamazsa RuntimeError fırlatılır.
+        """
+        if doc_type == 'text':
+            if isinstance(content, (bytes, bytearray, memoryview)):
+                return [bytes(content).decode('utf-8')]
+            return [str(content)]
+        return list(self.iter_pdf_pages(content, page_range))
+    
+    def extract_text(self, doc_type, content):
+        """Görev içeriğinden metni çıkar (PDF okunamazsa None)"""
+        try:
+            pages = self.extract_pages(doc_type, content)
+        except RuntimeError:
+            return None
+        if doc_type == 'text':
+            return pages[0]
+        return "\n".join(pages).strip() or None
+    
+    def _page_ranges(self, doc_type, content, max_workers):
+        """
+        Büyük PDF'ler için (başlangıç, bitiş) sayfa aralıkları; diğerleri için [None].
+        
+        Aralık sayısı en fazla process sayısı kadardır (her aralık görevi
+        PDF baytlarının bir kopyasını process'e taşır).
+        """
+        if doc_type == 'text' or len(content) < PDF_SPLIT_MIN_BYTES:
+            return [None]
+        count = page_count(content, PDF_BACKEND_ORDER)
+        if not count or count <= PDF_PAGES_PER_TASK:
+            return [None]
+        per_task = max(PDF_PAGES_PER_TASK, -(-count // max_workers))
+        return [(start, min(start + per_task, count)) for start in range(0, count, per_task)]
+    
+    def make_document(self, doc_type, index, file_name, text):
+        """Çıkarılmış metinden dataset metadata'sı ile Document oluştur"""
+        if doc_type == 'text':
+            source = f"txt_{index}"
+        elif doc_type == 'zip_content':
+            source = f"zip_{index}"
+        else:
+            source = f"pdf_{index}"
+        
+        return Document(
+            page_content=text,
+            metadata={
+                "source": source,
+                "filename": file_name,
+                "type": doc_type
+            }
+        )
+    
+    def make_page_documents(self, doc_type, index, file_name, pages):
+        """
+        Sayfa metinlerinden Document'lar oluştur.
+        
+        PDF'lerde her boş olmayan sayfa ayrı bir Document olur ve metadata'da
+        0 tabanlı 'page' numarasını taşır (parçalar sayfa düzeyinde kaynak
+        gösterebilsin). TXT dosyaları tek Document'tır.
+        """
+        if doc_type == 'text':
+            return [self.make_document(doc_type, index, file_name, pages[0])]
+        
+        documents = []
+        for page_number, page_text in enumerate(pages):
+            page_text = page_text.strip()
+            if page_text:
+                doc = self.make_document(doc_type, index, file_name, page_text)
+                doc.metadata["page"] = page_number
+                documents.append(doc)
+        return documents
+    
+    def iter_page_documents(self, use_cache=True):
+        """
+        Dataset'i sayfa sayfa Document olarak akışla döndür (streaming ingest için).
+        
+        process_dataset_files ile aynı sayfa düzeyindeki Document'ları üretir
+        ama sonuçları listede biriktirmez. Önbellekte sayfalar form feed
+        karakteriyle ayrılmış tek metin olarak tutulur.
+        """
+        if self.dataset is None:
+            print("❌ Önce dataset yükleyin")
+            return
+        
+        cache = self._get_cache() if use_cache else None
+        row_files = []  # Satır önbelleğine yazılacak, aynı satırdan çıkarılan dosyalar
+        for task, pages in self._iter_extraction_tasks(cache):
+            doc_type, index, file_name, content = task
+            if doc_type != 'text' and not PDF_SUPPORT:
+                continue
+            
+            if pages is None:
+                if row_files and row_files[0][0][1] != index:
+                    self._save_rows(cache, row_files)
+                    row_files = []
                 
-                # Dosya tipine göre işle
-                if file_name.lower().endswith('.pdf'):
-                    print(f"   📄 PDF işleniyor: {file_name}")
-                    text = self.extract_text_from_pdf(content)
-                    if text and "PDF işlenemedi" not in text:
-                        doc = Document(
-                            page_content=text,
-                            metadata={
-                                "source": f"pdf_{i}",
-                                "filename": file_name,
-                                "type": "pdf"
-                            }
-                        )
-                        self.documents.append(doc)
-                
-                elif file_name.lower().endswith('.zip'):
-                    print(f"   📦 ZIP işleniyor: {file_name}")
-                    extracted_files = self.process_zip_file(content)
-                    for extracted in extracted_files:
-                        doc = Document(
-                            page_content=extracted['content'],
-                            metadata={
-                                "source": f"zip_{i}",
-                                "filename": f"{file_name}/{extracted['filename']}",
-                                "type": "zip_content"
-                            }
-                        )
-                        self.documents.append(doc)
+                key = None
+                if cache is not None:
+                    key = cache.make_key(content, _cache_kind(doc_type), EXTRACTOR_VERSION)
+                    cached = cache.get(key)
+                    if cached is not None:
+                        pages = _split_pages(doc_type, cached['text'])
                 
-                elif file_name.lower().endswith('.txt'):
-                    print(f"   📝 TXT işleniyor: {file_name}")
-                    text = content.decode('utf-8') if isinstance(content, bytes) else str(content)
-                    doc = Document(
-                        page_content=text,
-                        metadata={
-                            "source": f"txt_{i}",
-                            "filename": file_name,
-                            "type": "text"
-                        }
-                    )
-                    self.documents.append(doc)
-                    
-            except Exception as e:
-                print(f"❌ {file_name} işlenirken hata: {e}")
+                if pages is None:
+                    try:
+                        with METRICS.time("chatbot_pdf_parse_seconds", help="Tek PDF'in ayrıştırma süresi"):
+                            pages = self.extract_pages(doc_type, content)
+                    except (RuntimeError, UnicodeDecodeError) as e:
+                        print(f"❌ {file_name} işlenirken hata: {e}")
+                        METRICS.inc("chatbot_extraction_errors_total", help="Metni çıkarılamayan dosyalar")
+                        pages = []
+                    if cache is not None:
+                        cache.put(key, _join_pages(doc_type, pages), {"type": doc_type, "extractor_version": EXTRACTOR_VERSION})
+                row_files.append((task, pages))
+            
+            for doc in self.make_page_documents(doc_type, index, file_name, pages) if pages else []:
+                METRICS.inc("chatbot_documents_total", help="Çıkarılan doküman (PDF'te sayfa) sayısı",
+                            type=doc_type)
+                yield doc
+        
+        self._save_rows(cache, row_files)
+        if cache is not None:
+            cache.flush()
+        self._mark_ingested()
+    
+    def _get_cache(self):
+        """Çıkarma önbelleğini döndür, gerekirse config ayarlarıyla aç"""
+        if self.cache is None and EXTRACTION_CACHE_ENABLED:
+            self.cache = ExtractionCache(
+                EXTRACTION_CACHE_DIR, EXTRACTION_CACHE_MAX_MB * 1024 * 1024
+            )
+        return self.cache
+    
+    @timed("chatbot_stage_seconds", help="Açılış/indeksleme aşama süreleri", stage="extract")
+    def process_dataset_files(self, parallel=None, max_workers=None, use_cache=True):
+        """
+        Dataset'teki tüm dosyaları işle ve metne çevir
+        
+        Args:
+            parallel: True ise PDF/ZIP/TXT çıkarma process havuzunda yapılır.
+                None ise config.PARALLEL_EXTRACTION kullanılır.
+            max_workers: Havuzdaki process sayısı (varsayılan: config.EXTRACTION_WORKERS)
+            use_cache: False ise çıkarma önbelleği atlanır ve her dosya yeniden işlenir
+        
+        Returns:
+            ChunkStore: Dataset sırasını koruyan doküman deposu; PDF'lerde her
+                sayfa ayrı bir dokümandır (metadata'da 0 tabanlı 'page')
+        """
+        if self.dataset is None:
+            print("❌ Önce dataset yükleyin")
+            return []
+        
+        if parallel is None:
+            parallel = PARALLEL_EXTRACTION
+        if max_workers is None:
+            max_workers = EXTRACTION_WORKERS
+        cache = self._get_cache() if use_cache else None
+        split_pdfs = parallel and max_workers > 1
+        
+        # Önbellekte olan dosyalar hemen Document'a çevrilir, sadece
+        # değişmiş/yeni dosyalar çıkarma görevine gönderilir. Büyük PDF'ler
+        # sayfa aralıklarına bölünür ve aralıklar farklı process'lerde çıkarılır.
+        files = []  # dosya başına {'task', 'pages', 'error', 'key', 'row_cached'}
+        jobs = []   # (dosya sırası, (tip, içerik, sayfa aralığı))
+        for task, pages in self._iter_extraction_tasks(cache):
+            doc_type, index, file_name, content = task
+            if doc_type != 'text' and not PDF_SUPPORT:
                 continue
+            entry = {'task': task, 'pages': [], 'error': None, 'key': None, 'row_cached': pages is not None}
+            if pages is not None:
+                # Satır son işlemeden beri değişmedi; içeriği okunmadı
+                entry['pages'] = pages
+                files.append(entry)
+                continue
+            if cache is not None:
+                entry['key'] = cache.make_key(content, _cache_kind(doc_type), EXTRACTOR_VERSION)
+                cached = cache.get(entry['key'])
+                if cached is not None:
+                    entry['pages'] = _split_pages(doc_type, cached['text'])
+                    entry['key'] = None  # Tekrar yazılmasın
+                    files.append(entry)
+                    continue
+            
+            if split_pdfs and isinstance(content, memoryview):
+                # Anlık görüntü dilimleri pickle edilemez; process'e gidecek içerik burada bir kez kopyalanır
+                content = content.tobytes()
+            page_ranges = self._page_ranges(doc_type, content, max_workers) if split_pdfs else [None]
+            for page_range in page_ranges:
+                jobs.append((len(files), (doc_type, content, page_range)))
+            files.append(entry)
         
-        print(f"✅ {len(self.documents)} adet doküman işlendi")
+        tasks = [job for _, job in jobs]
+        if parallel and max_workers > 1 and len(tasks) > 1:
+            print(f"🔍 Dataset dosyaları işleniyor ({max_workers} process)...")
+            # Sayfa aralığı görevleri büyük; aynı process'e toplu gönderilmesinler
+            chunksize = 1 if len(tasks) > len(files) else EXTRACTION_CHUNKSIZE
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                # map() sonuçları görev sırasıyla döndürür, sayfa ve doküman sırası korunur
+                extracted = list(executor.map(_run_extraction_task, tasks, chunksize=chunksize))
+        else:
+            print("🔍 Dataset dosyaları işleniyor...")
+            extracted = [_run_extraction_task(task, self) for task in tasks]
+        
+        for (pos, _), (pages, error) in zip(jobs, extracted):
+            entry = files[pos]
+            if error is not None:
+                entry['error'] = entry['error'] or error
+            else:
+                entry['pages'].extend(pages)
+        
+        results = []
+        for entry in files:
+            doc_type, index, file_name, content = entry['task']
+            pages = [] if entry['error'] is not None else entry['pages']
+            if entry['key'] is not None:
+                # Okunamayan dosyalar da (metinsiz olarak) saklanır, her seferinde yeniden denenmez
+                cache.put(entry['key'], _join_pages(doc_type, pages),
+                          {"type": doc_type, "extractor_version": EXTRACTOR_VERSION})
+            documents = self.make_page_documents(doc_type, index, file_name, pages) if pages else []
+            results.append(((doc_type, file_name), documents, entry['error']))
+        
+        self._save_rows(cache, [(entry['task'], [] if entry['error'] is not None else entry['pages'])
+                                for entry in files if not entry['row_cached']])
+        self._collect_results(results)
+        
+        if cache is not None:
+            cache.flush()
+            cache_stats = cache.stats()
+            print(f"💾 Çıkarma önbelleği: {cache_stats['hits']} isabet, {cache_stats['misses']} ıskalama")
+        
+        self._mark_ingested()
+        print(f"✅ {len(self.documents)} adet doküman (PDF'lerde sayfa) işlendi")
         return self.documents
     
+    def _collect_results(self, results):
+        """Dosya sonuçlarını sırayla self.documents'a ekle, hataları raporla"""
+        for (doc_type, file_name), documents, error in results:
+            print(f"   {_TYPE_ICONS[doc_type]} işleniyor: {file_name}")
+            if error is not None:
+                print(f"❌ {file_name} işlenirken hata: {error}")
+                METRICS.inc("chatbot_extraction_errors_total", help="Metni çıkarılamayan dosyalar")
+            elif documents:
+                self.documents.extend(documents)
+                METRICS.inc("chatbot_documents_total", len(documents),
+                            help="Çıkarılan doküman (PDF'te sayfa) sayısı", type=doc_type)
+    
     def get_dataset_stats(self):
         """Dataset istatistiklerini göster"""
         if not self.documents:
             return "❌ Henüz doküman işlenmemiş"
         
+        # PDF'ler sayfa sayfa Document olduğundan dosyalar (tip, kaynak, dosya adı) ile sayılır;
+        # sayımlar metadata kod sütunları ve metin tamponu üzerinde tek geçişte yapılır
+        files = self.documents.distinct(('type', 'source', 'filename'))
+        type_codes, file_counts = np.unique(files[:, 0], return_counts=True)
+        counts = {self.documents.value(code): int(count) for code, count in zip(type_codes, file_counts)}
         stats = {
             'total_documents': len(self.documents),
-            'pdf_count': len([d for d in self.documents if d.metadata.get('type') == 'pdf']),
-            'zip_content_count': len([d for d in self.documents if d.metadata.get('type') == 'zip_content']),
-            'text_count': len([d for d in self.documents if d.metadata.get('type') == 'text']),
-            'total_text_length': sum(len(d.page_content) for d in self.documents)
+            'pdf_count': counts.get('pdf', 0),
+            'zip_content_count': counts.get('zip_content', 0),
+            'text_count': counts.get('text', 0),
+            'total_text_length': self.documents.char_count()
         }
         
+        # Aşama süreleri ve sayaçlar (HF indirme, çıkarma, bölme, embedding, ...)
+        metric_lines = "".join(f"\n        - {line}" for line in METRICS.summary_lines())
+        
         return f"""
         📊 Dataset İstatistikleri:
-        - Toplam doküman: {stats['total_documents']}
+        - Toplam doküman (PDF'lerde sayfa): {stats['total_documents']}
         - PDF dosyaları: {stats['pdf_count']}
         - ZIP içeriği: {stats['zip_content_count']}
         - Text dosyaları: {stats['text_count']}
         - Toplam metin: {stats['total_text_length']} karakter
+        
+        ⏱️ Ölçümler:{metric_lines or " henüz yok"}
         """
 
+def _as_stream(content):
+    """
+    bytes / bytearray / memoryview içeriği okunabilir bir stream'e çevir.
+    
+    bytes için io.BytesIO kopyalamadan aynı buffer'ı paylaşır; diğer buffer
+    tipleri bir kez kopyalanır. Geçici dosya kullanılmaz.
+    """
+    if isinstance(content, memoryview):
+        content = content.tobytes() if not content.contiguous else content
+    return io.BytesIO(content)
+
+def _cache_kind(doc_type):
+    """Önbellek anahtarındaki içerik türü; PDF'ler sayfa listesi olarak saklanır"""
+    return 'text' if doc_type == 'text' else 'pdf_pages'
+
+def _join_pages(doc_type, pages):
+    """Sayfaları önbellek metnine çevir (form feed ile ayrılmış); sayfa yoksa None"""
+    if not pages:
+        return None
+    return pages[0] if doc_type == 'text' else "\f".join(pages)
+
+def _row_key(digest):
+    """Anlık görüntü satırının (özetinin) satır önbelleği anahtarı"""
+    return ExtractionCache.make_key(digest, 'row', EXTRACTOR_VERSION)
+
+def _split_pages(doc_type, text):
+    """_join_pages'in tersi"""
+    if text is None:
+        return []
+    return [text] if doc_type == 'text' else text.split("\f")
+
+def _run_extraction_task(task, loader=None):
+    """
+    Tek bir çıkarma görevini (dosya veya PDF sayfa aralığı) çalıştır -
+    process havuzundan da çağrılabilir.
+    
+    Hata yukarı fırlatılmaz, ana process'te raporlanmak üzere döndürülür.
+    
+    Returns:
+        tuple: (sayfa metinleri veya None, hata mesajı veya None)
+    """
+    doc_type, content, page_range = task
+    if loader is None:
+        loader = TutkuSupplyChainLoader()
+    try:
+        return loader.extract_pages(doc_type, content, page_range), None
+    except Exception as e:
+        return None, str(e)
+
 # KOLAY KULLANIM FONKSİYONU
 def load_tutku_supply_chain_data():
     """Tutku Özdeniz supply chain verilerini yükle ve işle"""
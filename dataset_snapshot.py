@@ -0,0 +1,432 @@
+"""
+DATASET_SNAPSHOT.PY - SABİTLENMİŞ, ÇEVRİMDIŞI HF DATASET ANLIK GÖRÜNTÜSÜ
+
+load_dataset her açılışta Hub'a gidip son sürümü çözer ve satırları tam
+içerikli Python sözlükleri olarak döndürür. Bu modül dataset'in belirli bir
+commit'ini (revision) sürümlü bir yerel dizine sabitler:
+
+    <kök>/<dataset>/<commit>/<split>.arrow         Arrow IPC dosyası (sıkıştırmasız)
+    <kök>/<dataset>/<commit>/<split>.digests.npy   Satır başına 16 baytlık blake2b özeti
+    <kök>/<dataset>/<commit>/dataset.json          Manifest (split'ler, satır sayıları, önceki commit)
+    <kök>/<dataset>/CURRENT                        Son sabitlenen commit
+    <kök>/<dataset>/ingested.json                  Split başına son işlenen (indekslenen) commit
+
+Okuma tamamen çevrimdışıdır: Arrow dosyası bellek eşlemeli açılır, satırlar
+tembel SnapshotRow'lardır ve binary sütunlar (örn. 'content') ancak
+okunduklarında, kopyalanmadan memoryview olarak dilimlenir.
+
+Satır özetleri anahtar sütunuyla (örn. 'file_name') eşleştirilerek iki anlık
+görüntü karşılaştırılır (eklenen / değişen / aynı kalan / silinen satırlar);
+data_loader sadece eklenen ve değişen satırların içeriğini okuyup yeniden
+çıkarır.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from bisect import bisect_right
+from collections.abc import Mapping
+
+import numpy as np
+import pyarrow as pa
+
+DATASET_SNAPSHOT_VERSION = 1
+MANIFEST_FILENAME = "dataset.json"
+CURRENT_FILENAME = "CURRENT"
+INGESTED_FILENAME = "ingested.json"
+DIGEST_SIZE = 16
+ROW_BATCH_SIZE = 1024  # Arrow dosyasındaki kayıt batch'i boyutu
+
+_COMMIT_PATTERN = re.compile(r"^[0-9a-f]{40}$")
+
+
+def snapshot_root(base_directory, dataset_name):
+    """Dataset'in anlık görüntülerinin kök dizini ('kullanıcı/isim' -> 'kullanıcı__isim')"""
+    return os.path.join(base_directory, dataset_name.replace("/", "__"))
+
+
+def _read_text(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _write_text(path, text):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(path + ".tmp", path)
+
+
+def _is_binary(data_type):
+    return pa.types.is_binary(data_type) or pa.types.is_large_binary(data_type)
+
+
+def _binary_slices(array):
+    """
+    Binary sütun parçasının satırlarını kopyalamadan döndüren fonksiyon.
+
+    Değerler, Arrow veri tamponunun (bellek eşlemeli dosyanın) memoryview dilimleridir.
+    """
+    _, offsets, data = array.buffers()[:3]
+    dtype = np.int64 if pa.types.is_large_binary(array.type) else np.int32
+    offsets = np.frombuffer(offsets, dtype=dtype)[array.offset:array.offset + len(array) + 1] if offsets else None
+    data = memoryview(data) if data is not None else memoryview(b"")
+    nulls = array.null_count
+
+    def value(index):
+        if nulls and not array[index].is_valid:
+            return None
+        return data[int(offsets[index]):int(offsets[index + 1])]
+
+    return value
+
+
+def _row_digests(table):
+    """Tüm sütunların değerlerinden satır başına 16 baytlık özet (n x 16 uint8)"""
+    digests = bytearray()
+    for batch in table.to_batches():
+        columns = []
+        for column in batch.columns:
+            if _is_binary(column.type):
+                columns.append(_binary_slices(column))
+            else:
+                values = column.to_pylist()
+                columns.append(lambda index, values=values: json.dumps(
+                    values[index], ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+        for index in range(batch.num_rows):
+            digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+            for value in columns:
+                part = value(index)
+                part = b"\xff" if part is None else part
+                # Uzunluk öneki: sütun sınırları kayınca aynı özet çıkmasın
+                digest.update(len(part).to_bytes(8, "little"))
+                digest.update(part)
+            digests += digest.digest()
+    return np.frombuffer(bytes(digests), dtype=np.uint8).reshape(-1, DIGEST_SIZE)
+
+
+class SnapshotRow(Mapping):
+    """Tek satıra tembel bakış; sütunlar ancak okunduklarında üretilir (binary: memoryview)"""
+
+    __slots__ = ("_split", "_batch", "_index")
+
+    def __init__(self, split, batch, index):
+        self._split = split
+        self._batch = batch
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._split._value(self._batch, key, self._index)
+
+    def __iter__(self):
+        return iter(self._split.column_names)
+
+    def __len__(self):
+        return len(self._split.column_names)
+
+    def __repr__(self):
+        return f"SnapshotRow({self._split._batch_starts[self._batch] + self._index})"
+
+
+class SnapshotSplit:
+    """Bellek eşlemeli Arrow dosyasından okunan split; HF Dataset gibi indekslenir ve gezilir"""
+
+    def __init__(self, directory, name, key_column=None):
+        self.name = name
+        self.key_column = key_column
+        self._source = pa.memory_map(os.path.join(directory, f"{name}.arrow"), "r")
+        reader = pa.ipc.open_file(self._source)
+        # Batch'ler dosyanın eşlenmiş baytlarına bakar; okuma veri kopyalamaz
+        self._batches = [reader.get_batch(i) for i in range(reader.num_record_batches)]
+        self.schema = reader.schema
+        self.column_names = list(self.schema.names)
+        self._batch_starts = [0]
+        for batch in self._batches:
+            self._batch_starts.append(self._batch_starts[-1] + batch.num_rows)
+        self.digests = np.load(os.path.join(directory, f"{name}.digests.npy"), mmap_mode="r")
+        self._columns = {}  # (batch, sütun) -> değer fonksiyonu; binary dışındakiler batch başına bir kez listelenir
+
+    def __len__(self):
+        return self._batch_starts[-1]
+
+    def _value(self, batch, key, index):
+        accessor = self._columns.get((batch, key))
+        if accessor is None:
+            if key not in self.column_names:
+                raise KeyError(key)
+            column = self._batches[batch].column(key)
+            accessor = _binary_slices(column) if _is_binary(column.type) else column.to_pylist().__getitem__
+            self._columns[(batch, key)] = accessor
+        return accessor(index)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("SnapshotSplit indeksi aralık dışında")
+        batch = bisect_right(self._batch_starts, index) - 1
+        return SnapshotRow(self, batch, index - self._batch_starts[batch])
+
+    def __iter__(self):
+        for batch, rows in enumerate(self._batches):
+            for index in range(rows.num_rows):
+                yield SnapshotRow(self, batch, index)
+
+    def digest(self, index):
+        """Satırın içerik özeti (bytes)"""
+        return bytes(self.digests[index])
+
+    def keys(self):
+        """Satır anahtarları: anahtar sütunu varsa değerleri, yoksa satır özetleri"""
+        if self.key_column in self.column_names:
+            return [value for batch in self._batches for value in batch.column(self.key_column).to_pylist()]
+        return [bytes(digest) for digest in self.digests]
+
+    def diff(self, previous):
+        """
+        Önceki anlık görüntünün aynı split'ine göre satır değişiklikleri.
+
+        Args:
+            previous: SnapshotSplit veya None (hepsi eklenmiş sayılır)
+
+        Returns:
+            dict: {'added', 'changed', 'unchanged'} bu split'teki satır numaraları,
+                'removed' önceki split'te olup bu split'te olmayan satır anahtarları
+        """
+        before = {}
+        if previous is not None:
+            for key, digest in zip(previous.keys(), previous.digests):
+                before[key] = bytes(digest)
+        changes = {"added": [], "changed": [], "unchanged": [], "removed": []}
+        for index, (key, digest) in enumerate(zip(self.keys(), self.digests)):
+            old = before.pop(key, None)
+            status = "added" if old is None else "unchanged" if old == bytes(digest) else "changed"
+            changes[status].append(index)
+        changes["removed"] = list(before)
+        return changes
+
+    def close(self):
+        self._columns.clear()
+        self._batches = []
+        self._source.close()
+
+
+class DatasetSnapshot:
+    def __init__(self, root, revision):
+        """
+        Args:
+            root: snapshot_root() dizini
+            revision: Sabitlenmiş commit (alt dizin adı)
+        """
+        self.root = root
+        self.revision = revision
+        self.directory = os.path.join(root, revision)
+        with open(os.path.join(self.directory, MANIFEST_FILENAME), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != DATASET_SNAPSHOT_VERSION:
+            raise ValueError(f"Desteklenmeyen anlık görüntü sürümü: {self.manifest.get('version')}")
+        self._splits = {}
+
+    @property
+    def splits(self):
+        return list(self.manifest["splits"])
+
+    def split(self, name):
+        if name not in self.manifest["splits"]:
+            raise KeyError(f"'{name}' split'i anlık görüntüde yok (mevcut: {self.splits})")
+        if name not in self._splits:
+            self._splits[name] = SnapshotSplit(self.directory, name, self.manifest["splits"][name]["key_column"])
+        return self._splits[name]
+
+    def ingested_revision(self, split):
+        """Bu split'in en son işlendiği commit (hiç işlenmediyse None)"""
+        try:
+            with open(os.path.join(self.root, INGESTED_FILENAME), "r", encoding="utf-8") as f:
+                return json.load(f).get(split)
+        except (OSError, ValueError):
+            return None
+
+    def changes(self, split):
+        """
+        Split'in son işlenen anlık görüntüye göre satır değişiklikleri.
+
+        Hiç işlenmemişse manifest'teki önceki commit, o da yoksa boş karşılaştırma esas alınır.
+        """
+        base = self.ingested_revision(split) or self.manifest.get("previous")
+        previous = None
+        if base == self.revision:
+            previous = self.split(split)
+        elif base is not None:
+            try:
+                previous = DatasetSnapshot(self.root, base).split(split)
+            except (OSError, ValueError, KeyError):
+                previous = None
+        changes = self.split(split).diff(previous)
+        changes["base"] = base if previous is not None else None
+        return changes
+
+    def mark_ingested(self, split):
+        """Split'in bu commit'ten işlendiğini kaydet (sonraki karşılaştırmaların tabanı)"""
+        path = os.path.join(self.root, INGESTED_FILENAME)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                ingested = json.load(f)
+        except (OSError, ValueError):
+            ingested = {}
+        ingested[split] = self.revision
+        _write_text(path, json.dumps(ingested))
+
+
+def open_snapshot(root, revision=None):
+    """
+    Yerel anlık görüntüyü aç (Hub'a gidilmez).
+
+    Args:
+        revision: Commit; None ise CURRENT'taki son sabitlenen commit
+
+    Returns:
+        DatasetSnapshot | None: Yoksa, eksikse veya sürümü farklıysa None
+    """
+    revision = revision or _read_text(os.path.join(root, CURRENT_FILENAME))
+    if revision is None:
+        return None
+    try:
+        return DatasetSnapshot(root, revision)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_snapshot(root, revision, splits, key_column=None, keep=2):
+    """
+    Split'leri (HF Dataset veya pyarrow Table) root/revision altına atomik olarak yaz ve CURRENT yap.
+
+    Args:
+        splits: {split adı: Dataset | pyarrow.Table}
+        key_column: Satırları anlık görüntüler arasında eşleştiren sütun (None: satır özeti)
+        keep: Saklanan anlık görüntü sayısı; CURRENT'ın öncekisi ve son işlenen commit silinmez
+
+    Returns:
+        DatasetSnapshot
+    """
+    os.makedirs(root, exist_ok=True)
+    previous = _read_text(os.path.join(root, CURRENT_FILENAME))
+    temporary = os.path.join(root, f".tmp-{revision}-{os.getpid()}")
+    shutil.rmtree(temporary, ignore_errors=True)
+    os.makedirs(temporary)
+
+    manifest_splits = {}
+    for name, data in splits.items():
+        if not isinstance(data, pa.Table):
+            # Seçim/karıştırma sonrası indeks eşlemesi varsa satırlar sırasıyla yazılsın
+            data = (data.flatten_indices() if getattr(data, "_indices", None) is not None else data).data.table
+        with pa.OSFile(os.path.join(temporary, f"{name}.arrow"), "wb") as sink:
+            with pa.ipc.new_file(sink, data.schema) as writer:
+                writer.write_table(data, max_chunksize=ROW_BATCH_SIZE)
+        np.save(os.path.join(temporary, f"{name}.digests.npy"), _row_digests(data))
+        manifest_splits[name] = {
+            "rows": data.num_rows,
+            "key_column": key_column if key_column in data.column_names else None,
+        }
+
+    with open(os.path.join(temporary, MANIFEST_FILENAME), "w", encoding="utf-8") as f:
+        json.dump({
+            "version": DATASET_SNAPSHOT_VERSION,
+            "revision": revision,
+            "previous": previous if previous != revision else None,
+            "created_at": time.time(),
+            "splits": manifest_splits,
+        }, f, ensure_ascii=False, indent=2)
+
+    target = os.path.join(root, revision)
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(temporary, target)
+    _write_text(os.path.join(root, CURRENT_FILENAME), revision)
+
+    snapshot = DatasetSnapshot(root, revision)
+    _prune(root, keep, protected={revision, previous, *_ingested_revisions(root)})
+    return snapshot
+
+
+def _ingested_revisions(root):
+    try:
+        with open(os.path.join(root, INGESTED_FILENAME), "r", encoding="utf-8") as f:
+            return set(json.load(f).values())
+    except (OSError, ValueError):
+        return set()
+
+
+def _prune(root, keep, protected):
+    """En yeni `keep` anlık görüntü ve korunanlar dışındakileri sil"""
+    snapshots = []
+    for name in os.listdir(root):
+        manifest_path = os.path.join(root, name, MANIFEST_FILENAME)
+        if os.path.isfile(manifest_path):
+            snapshots.append((os.path.getmtime(manifest_path), name))
+    for _, name in sorted(snapshots, reverse=True)[keep:]:
+        if name not in protected:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def resolve_revision(dataset_name, revision=None):
+    """Branch/tag/kısa commit'i Hub'da tam commit'e çöz (ağ gerekir)"""
+    from huggingface_hub import HfApi
+
+    return HfApi().dataset_info(dataset_name, revision=revision or None).sha
+
+
+def ensure_snapshot(dataset_name, base_directory, revision="", offline=False, key_column=None, keep=2):
+    """
+    Dataset'in sabitlenmiş yerel anlık görüntüsünü döndür, gerekirse indirip oluştur.
+
+    Tam commit verildiyse ve yerelde varsa Hub'a hiç gidilmez. Çevrimdışıysa
+    veya Hub'a ulaşılamazsa verilen (ya da son sabitlenen) yerel anlık görüntü
+    kullanılır.
+
+    Args:
+        dataset_name: HF dataset adı
+        base_directory: Anlık görüntülerin kök dizini
+        revision: Commit, branch veya tag ("" = varsayılan branch'in son commit'i)
+        offline: True ise Hub'a hiç gidilmez
+        key_column: Satırları sürümler arasında eşleştiren sütun (örn. 'file_name')
+        keep: Saklanan anlık görüntü sayısı
+
+    Returns:
+        DatasetSnapshot
+
+    Raises:
+        RuntimeError: Hub'a ulaşılamıyor ve yerel anlık görüntü yoksa
+    """
+    root = snapshot_root(base_directory, dataset_name)
+    if offline or _COMMIT_PATTERN.match(revision or ""):
+        snapshot = open_snapshot(root, revision or None)
+        if snapshot is not None or offline:
+            if snapshot is None:
+                raise RuntimeError(f"'{dataset_name}' için yerel anlık görüntü yok (çevrimdışı mod)")
+            return snapshot
+
+    try:
+        commit = resolve_revision(dataset_name, revision)
+    except Exception as e:
+        # Ağ yoksa sabitlenmiş commit (veya son anlık görüntü) ile devam edilir
+        snapshot = open_snapshot(root, revision if _COMMIT_PATTERN.match(revision or "") else None)
+        if snapshot is None:
+            raise RuntimeError(f"'{dataset_name}' çözülemedi ve yerel anlık görüntü yok: {e}") from e
+        print(f"⚠️ Hub'a ulaşılamadı ({type(e).__name__}), yerel anlık görüntü kullanılıyor: {snapshot.revision[:8]}")
+        return snapshot
+
+    snapshot = open_snapshot(root, commit)
+    if snapshot is not None:
+        if _read_text(os.path.join(root, CURRENT_FILENAME)) != commit:
+            _write_text(os.path.join(root, CURRENT_FILENAME), commit)
+        return snapshot
+
+    from datasets import load_dataset
+
+    print(f"📥 {dataset_name}@{commit[:8]} indiriliyor ve yerel anlık görüntüye yazılıyor...")
+    dataset = load_dataset(dataset_name, revision=commit)
+    return write_snapshot(root, commit, dict(dataset), key_column=key_column, keep=keep)
@@ -0,0 +1,234 @@
+"""
+DEDUP.PY - MINHASH/LSH İLE NEREDEYSE-AYNI PARÇA ELEME
+
+HF veri setindeki PDF'ler, aynı PDF'leri tekrar içeren ZIP'ler ve
+/content/**/*.pdf altındaki yerel kopyalar bölündükten sonra çok sayıda
+birebir veya neredeyse aynı parça üretir. Bunlar embedding süresini ve
+indeks belleğini boşa harcar, top-k sonuçlarını da aynı içerikle doldurur.
+
+Bu modül split_documents ile indeksleme arasında çalışır:
+- Birebir aynı metinler (boşluk/büyük-küçük harf farkı dahil) hash ile elenir
+- Kalanlar için karakter shingle'larından MinHash imzası çıkarılır, LSH
+  bantlarıyla aday çiftler bulunur ve tahmini Jaccard benzerliği eşiği
+  geçen parça ilk görülen (tutulan) parçayla birleştirilir
+- Elenen parçaların kaynakları tutulan parçanın metadata'sında saklanır
+"""
+
+import hashlib
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+from turkish_text import fold
+
+_SHIFT = np.uint64(32)
+_LOW_BITS = np.uint64(0xFFFF)
+_CHANCE_AGREEMENT = 2 ** -16
+_SIGNATURE_BLOCK = 4096
+_WHITESPACE_RE = re.compile(r"\s+")
+SOURCE_SEPARATOR = " | "
+
+
+def normalize_text(text):
+    """Karşılaştırma için metni katla ve boşlukları tek boşluğa indir"""
+    return _WHITESPACE_RE.sub(" ", fold(text)).strip()
+
+
+def optimal_bands(num_perm, threshold):
+    """
+    b * r = num_perm olan (bant, satır) çiftlerinden, S-eğrisinin eşiği
+    (1/b)^(1/r) istenen eşiğin altında kalan en yakınını seç. Eşiğin biraz
+    altında aday üretmek kaçırmayı azaltır; yanlış adaylar imza
+    karşılaştırmasıyla zaten elenir.
+    """
+    best = (num_perm, 1)
+    best_gap = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        curve_threshold = (1 / bands) ** (1 / rows)
+        if curve_threshold > threshold:
+            continue
+        gap = threshold - curve_threshold
+        if best_gap is None or gap < best_gap:
+            best, best_gap = (bands, rows), gap
+    return best
+
+
+class MinHasher:
+    def __init__(self, num_perm=128, shingle_size=5, seed=1):
+        """
+        Args:
+            num_perm: İmza uzunluğu (permütasyon sayısı)
+            shingle_size: Karakter shingle uzunluğu
+            seed: Permütasyon katsayıları için tohum (aynı tohum = karşılaştırılabilir imzalar)
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        # Çarp-kaydır (multiply-shift) hash ailesi: (a * h + b) mod 2^64'ün üst 32 biti.
+        # Mod alma uint64 taşmasıyla bedavaya gelir; a tek sayı olmalı.
+        self._a = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64) << np.uint64(1) | np.uint64(1)
+        self._b = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, normalized_text):
+        """Normalize edilmiş metnin MinHash imzası (uint64 dizisi)"""
+        k = self.shingle_size
+        shingles = {normalized_text[i:i + k] for i in range(max(1, len(normalized_text) - k + 1))}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+            dtype=np.uint64, count=len(shingles),
+        )
+        # Yerinde işlemler geçici dizi oluşturmaz; kaydırma monoton olduğu için min'den sonra yapılır
+        permuted = np.outer(self._a, hashes)
+        permuted += self._b[:, None]
+        return permuted.min(axis=1) >> _SHIFT
+
+
+def _merge_sources(merge, own_source, duplicate):
+    """Elenen parçanın kaynağını tutulan parçanın birleştirme kaydına ekle"""
+    sources = [s for s in merge.get("duplicate_sources", "").split(SOURCE_SEPARATOR) if s]
+    duplicate_source = str(duplicate.metadata.get("source", ""))
+    if duplicate_source and duplicate_source != own_source and duplicate_source not in sources:
+        sources.append(duplicate_source)
+    # Chroma metadata'sı sadece skaler değer kabul ettiği için kaynaklar tek metinde tutulur
+    merge["duplicate_sources"] = SOURCE_SEPARATOR.join(sources)
+    merge["duplicate_count"] = merge.get("duplicate_count", 0) + 1
+
+
+class ChunkDeduplicator:
+    """
+    Parçaları tek tek (akış halinde) alan tekrar eleyici.
+
+    Parça metinleri saklanmaz. Tutulan her parça için 16 bitlik (b-bit)
+    MinHash imzası, bant hash'leri ve kaynak adı tutulur; parça başına
+    ~1 KB. Elenen parçaların kaynakları `merges` içinde birikir;
+    keep_metadata=True ise tutulan Document'ın metadata'sına da işlenir.
+    Streaming ingest'te parça önceden yazılmış olabileceği için merges
+    sonradan indekse ayrıca uygulanır.
+    """
+
+    def __init__(self, threshold=0.9, num_perm=128, shingle_size=5, keep_metadata=True):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self.bands, self.rows = optimal_bands(num_perm, threshold)
+        self.merges = {}            # tutulan parça no -> {'duplicate_sources', 'duplicate_count'}
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+        self._metadata = [] if keep_metadata else None
+        self._sources = []
+        self._buckets = [{} for _ in range(self.bands)]   # bant hash'i -> parça no (çakışmada liste)
+        self._exact_index = {}
+        self._blocks = []           # (_SIGNATURE_BLOCK x num_perm) uint16 imza blokları
+        self._count = 0
+
+    def _signature_at(self, position):
+        return self._blocks[position // _SIGNATURE_BLOCK][position % _SIGNATURE_BLOCK]
+
+    def _store_signature(self, signature):
+        if self._count % _SIGNATURE_BLOCK == 0:
+            self._blocks.append(np.empty((_SIGNATURE_BLOCK, self.hasher.num_perm), dtype=np.uint16))
+        self._blocks[-1][self._count % _SIGNATURE_BLOCK] = signature
+
+    def _candidates(self, band_keys):
+        candidates = set()
+        for band, key in enumerate(band_keys):
+            found = self._buckets[band].get(key)
+            if found is None:
+                continue
+            if isinstance(found, list):
+                candidates.update(found)
+            else:
+                candidates.add(found)
+        return candidates
+
+    def _add_to_buckets(self, band_keys, position):
+        for band, key in enumerate(band_keys):
+            bucket = self._buckets[band]
+            found = bucket.get(key)
+            if found is None:
+                bucket[key] = position
+            elif isinstance(found, list):
+                found.append(position)
+            else:
+                bucket[key] = [found, position]
+
+    def add(self, chunk):
+        """
+        Parçayı değerlendir.
+
+        Returns:
+            Document | None: Yeni ise metadata'sı kopyalanmış parça, tekrar ise None
+        """
+        normalized = normalize_text(chunk.page_content)
+        exact_key = int.from_bytes(hashlib.sha1(normalized.encode("utf-8")).digest()[:8], "little")
+        if exact_key in self._exact_index:
+            self._merge(self._exact_index[exact_key], chunk)
+            self.exact_duplicates += 1
+            return None
+
+        signature = self.hasher.signature(normalized)
+        band_keys = [hash(signature[i * self.rows:(i + 1) * self.rows].tobytes()) for i in range(self.bands)]
+        # Karşılaştırma için sadece alt 16 bit saklanır; rastgele eşleşme olasılığı 2^-16 düzeltilir
+        short_signature = (signature & _LOW_BITS).astype(np.uint16)
+
+        match = None
+        best_similarity = self.threshold
+        for position in self._candidates(band_keys):
+            agreement = float(np.mean(self._signature_at(position) == short_signature))
+            similarity = (agreement - _CHANCE_AGREEMENT) / (1 - _CHANCE_AGREEMENT)
+            if similarity >= best_similarity:
+                match, best_similarity = position, similarity
+        if match is not None:
+            self._merge(match, chunk)
+            self.near_duplicates += 1
+            return None
+
+        position = self._count
+        # Metadata'sı güncellenecek; girdi listesindeki Document'ı değiştirmemek için kopyala
+        kept = type(chunk)(page_content=chunk.page_content, metadata=dict(chunk.metadata))
+        if self._metadata is not None:
+            self._metadata.append(kept.metadata)
+        self._sources.append(str(kept.metadata.get("source", "")))
+        self._store_signature(short_signature)
+        self._exact_index[exact_key] = position
+        self._add_to_buckets(band_keys, position)
+        self._count += 1
+        return kept
+
+    def _merge(self, position, duplicate):
+        merge = self.merges.setdefault(position, {})
+        _merge_sources(merge, self._sources[position], duplicate)
+        if self._metadata is not None:
+            self._metadata[position].update(merge)
+
+    def stats(self):
+        return {
+            "input": self._count + self.exact_duplicates + self.near_duplicates,
+            "kept": self._count,
+            "exact_duplicates": self.exact_duplicates,
+            "near_duplicates": self.near_duplicates,
+            "embeddings_saved": self.exact_duplicates + self.near_duplicates,
+        }
+
+
+def deduplicate_chunks(chunks, threshold=0.9, num_perm=128, shingle_size=5):
+    """
+    Birebir ve neredeyse aynı parçaları ele.
+
+    Args:
+        chunks: Parçalanmış Document listesi (sıra korunur, ilk görülen tutulur)
+        threshold: Tahmini Jaccard benzerliği bu değere eşit veya büyükse parça elenir
+        num_perm: MinHash imza uzunluğu
+        shingle_size: Karakter shingle uzunluğu
+
+    Returns:
+        tuple: (tutulan parçalar, {'input', 'kept', 'exact_duplicates',
+                'near_duplicates', 'embeddings_saved'})
+    """
+    deduplicator = ChunkDeduplicator(threshold=threshold, num_perm=num_perm, shingle_size=shingle_size)
+    kept = [chunk for chunk in map(deduplicator.add, chunks) if chunk is not None]
+    return kept, deduplicator.stats()
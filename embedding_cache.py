@@ -0,0 +1,348 @@
+"""
+EMBEDDING_CACHE.PY - KALICI EMBEDDING ÖNBELLEĞİ
+
+Herhangi bir LangChain embedding nesnesini (HuggingFaceEmbeddings,
+GoogleGenerativeAIEmbeddings veya test için yerel bir stub) sarar.
+Her metnin vektörü model adı + metin hash'i ile anahtarlanır ve diskte
+memory-mapped bir float32 (isteğe bağlı float16) dosyasında tutulur.
+Sadece önbellekte olmayan metinler, büyük batch'ler halinde modele gönderilir;
+Gemini tarafında bu doğrudan ücretli API çağrısı tasarrufu demektir.
+
+Sorgu vektörleri ve korpus dışı metinler (ör. bağlam sıkıştırmadaki cümleler,
+embed_documents_in_memory) korpus dosyasına yazılmaz (her yeni soru dosyayı
+sınırsız büyütürdü); bellekte, boyutu sınırlı bir LRU'da tutulur.
+
+Dosya düzeni (model başına bir dizin):
+    vectors.bin  - satır satır vektörler (dtype x boyut)
+    keys.txt     - her satırda bir anahtar, vectors.bin satırlarıyla aynı sırada
+    meta.json    - model adı, dtype ve vektör boyutu
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from metrics import METRICS
+
+try:
+    from langchain_core.embeddings import Embeddings
+except ImportError:
+    from langchain.schema.embeddings import Embeddings
+
+
+def _model_name(embeddings):
+    """Embedding nesnesinin model adını bul (model_name veya model alanı)"""
+    return (
+        getattr(embeddings, "model_name", None)
+        or getattr(embeddings, "model", None)
+        or type(embeddings).__name__
+    )
+
+
+class LazyEmbeddings(Embeddings):
+    """
+    Asıl embedding modelini ilk kullanımda yükleyen sarmalayıcı.
+
+    Sıcak açılışta (warm snapshot) tüm parça vektörleri önbellekte olduğundan
+    model (ve torch) hiç yüklenmeden indeks açılabilir; model ancak ilk yeni
+    metin veya sorgu geldiğinde yüklenir.
+    """
+
+    def __init__(self, factory, model_name, class_name):
+        """
+        Args:
+            factory: Çağrıldığında asıl embedding nesnesini döndüren fonksiyon
+            model_name: Model adı (önbellek anahtarları ve indeks manifest'i için)
+            class_name: Asıl sınıfın adı (indeks manifest'i için)
+        """
+        self.factory = factory
+        self.model_name = model_name
+        self.class_name = class_name
+        self._embeddings = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._embeddings is not None
+
+    def load(self):
+        """Modeli (henüz yüklenmediyse) yükle ve döndür"""
+        if self._embeddings is None:
+            with self._lock:
+                if self._embeddings is None:
+                    self._embeddings = self.factory()
+        return self._embeddings
+
+    def embed_documents(self, texts):
+        return self.load().embed_documents(texts)
+
+    def embed_query(self, text):
+        return self.load().embed_query(text)
+
+
+class PrecomputedEmbeddings(Embeddings):
+    """
+    Vektörleri önceden (ör. asenkron istemciyle eşzamanlı) hesaplanmış
+    metinler için tablodan dönen sarmalayıcı; tabloda olmayan metinler asıl
+    embedding nesnesine gider. İndeks manifest'i asıl modelin adını görür.
+    """
+
+    def __init__(self, vectors, embeddings):
+        """
+        Args:
+            vectors: {metin: vektör} sözlüğü
+            embeddings: Tabloda olmayan metinler ve sorgular için asıl embedding nesnesi
+        """
+        self.vectors = vectors
+        self.embeddings = embeddings
+        self.model_name = _model_name(embeddings)
+
+    def embed_documents(self, texts):
+        missing = [text for text in dict.fromkeys(texts) if text not in self.vectors]
+        if missing:
+            self.vectors.update(zip(missing, self.embeddings.embed_documents(missing)))
+        return [list(self.vectors[text]) for text in texts]
+
+    def embed_query(self, text):
+        return self.embeddings.embed_query(text)
+
+
+class CachedEmbeddings(Embeddings):
+    def __init__(self, embeddings, cache_dir, model_name=None, dtype="float32", batch_size=64,
+                 query_cache_size=1024):
+        """
+        Args:
+            embeddings: Asıl embedding nesnesi (embed_documents / embed_query)
+            cache_dir: Önbellek kök dizini
+            model_name: Anahtarlarda kullanılacak model adı (varsayılan: nesneden okunur)
+            dtype: Diskte saklama tipi, "float32" veya "float16"
+            batch_size: Modele tek seferde gönderilecek maksimum metin sayısı
+            query_cache_size: Bellekte tutulan en fazla sorgu / korpus dışı metin vektörü (LRU; 0 ile kapalı)
+        """
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Desteklenmeyen dtype: {dtype}")
+
+        self.embeddings = embeddings
+        self.model_name = model_name or _model_name(embeddings)
+        self.dtype = np.dtype(dtype)
+        self.batch_size = batch_size
+        self.query_cache_size = query_cache_size
+        self.hits = 0
+        self.misses = 0
+
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", self.model_name)
+        self.cache_dir = os.path.join(cache_dir, f"{safe_name}-{dtype}")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._vectors_path = os.path.join(self.cache_dir, "vectors.bin")
+        self._keys_path = os.path.join(self.cache_dir, "keys.txt")
+        self._meta_path = os.path.join(self.cache_dir, "meta.json")
+
+        self._index = {}     # anahtar -> satır numarası
+        self._dim = None
+        self._mmap = None
+        self._queries = OrderedDict()  # sorgu / korpus dışı metin anahtarı -> vektör (LRU sırasıyla)
+        # Gradio istekleri farklı thread'lerden gelir; kilit sadece arama ve ekleme
+        # sırasında tutulur, model çağrıları kilit dışındadır
+        self._lock = threading.RLock()
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Disk düzeni
+    # ------------------------------------------------------------------
+    def _load(self):
+        """Anahtarları oku; yarım kalmış yazmaları (çökme sonrası) kırp"""
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self._dim = json.load(f)["dim"]
+
+        keys = []
+        if os.path.exists(self._keys_path):
+            with open(self._keys_path, "r", encoding="ascii") as f:
+                keys = [line.strip() for line in f if line.strip()]
+
+        rows = 0
+        if self._dim and os.path.exists(self._vectors_path):
+            rows = os.path.getsize(self._vectors_path) // (self._dim * self.dtype.itemsize)
+
+        valid = min(rows, len(keys))
+        if valid != len(keys) or valid != rows:
+            self._truncate(valid, keys[:valid])
+        self._index = {key: row for row, key in enumerate(keys[:valid])}
+
+    def _truncate(self, rows, keys):
+        if self._dim and os.path.exists(self._vectors_path):
+            with open(self._vectors_path, "r+b") as f:
+                f.truncate(rows * self._dim * self.dtype.itemsize)
+        with open(self._keys_path, "w", encoding="ascii") as f:
+            f.writelines(f"{key}\n" for key in keys)
+
+    def _vectors(self):
+        """Tüm vektörleri memory-mapped (salt okunur) dizi olarak döndür"""
+        if self._mmap is None or self._mmap.shape[0] != len(self._index):
+            self._mmap = np.memmap(
+                self._vectors_path, dtype=self.dtype, mode="r",
+                shape=(len(self._index), self._dim),
+            )
+        return self._mmap
+
+    def _append(self, keys, vectors):
+        """Yeni vektörleri dosyaların sonuna ekle (önce vektörler, sonra anahtarlar)"""
+        array = np.asarray(vectors, dtype=np.float32)
+        if self._dim is None:
+            self._dim = int(array.shape[1])
+            with open(self._meta_path, "w", encoding="utf-8") as f:
+                json.dump({"model": self.model_name, "dtype": self.dtype.name, "dim": self._dim}, f)
+        elif array.shape[1] != self._dim:
+            raise ValueError(f"Vektör boyutu değişti: {array.shape[1]} != {self._dim}")
+
+        with open(self._vectors_path, "ab") as f:
+            f.write(array.astype(self.dtype).tobytes())
+        with open(self._keys_path, "a", encoding="ascii") as f:
+            f.writelines(f"{key}\n" for key in keys)
+
+        start = len(self._index)
+        for offset, key in enumerate(keys):
+            self._index[key] = start + offset
+        self._mmap = None
+
+    def _key(self, text, kind):
+        digest = hashlib.sha256(f"{self.model_name}\0{kind}\0{text}".encode("utf-8"))
+        return digest.hexdigest()
+
+    # ------------------------------------------------------------------
+    # Embeddings arayüzü
+    # ------------------------------------------------------------------
+    def embed_documents(self, texts):
+        """Metinleri embed et; sadece önbellekte olmayanlar modele gider"""
+        keys = [self._key(text, "doc") for text in texts]
+
+        # Aynı çağrıda tekrarlanan metinler de tek sefer embed edilir
+        missing = {}
+        with self._lock:
+            for key, text in zip(keys, texts):
+                if key in self._index:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+                    missing.setdefault(key, text)
+        METRICS.inc("chatbot_embedding_cache_total", len(keys) - len(missing), result="hit")
+        METRICS.inc("chatbot_embedding_cache_total", len(missing), result="miss")
+
+        pending = list(missing.items())
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            vectors = self.embeddings.embed_documents([text for _, text in batch])
+            self._store([key for key, _ in batch], vectors)
+
+        if not keys:
+            return []
+        with self._lock:
+            rows = [self._index[key] for key in keys]
+            vectors = self._vectors()
+        return vectors[rows].astype(np.float32).tolist()
+
+    def embed_query(self, text):
+        """Sorgu vektörü; bazı modeller sorguyu farklı embed ettiği için ayrı anahtarlanır"""
+        vector = self.cached_query(text)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.store_query(text, vector)
+        return list(vector)
+
+    def _store(self, keys, vectors):
+        with self._lock:
+            # Aynı metni eşzamanlı embed eden başka bir çağrı önce eklemiş olabilir
+            new = {key: vector for key, vector in zip(keys, vectors) if key not in self._index}
+            if new:
+                self._append(list(new), list(new.values()))
+
+    # ------------------------------------------------------------------
+    # Vektörleri başka yoldan (ör. async Gemini istemcisi) hesaplayanlar için
+    # ------------------------------------------------------------------
+    def missing_documents(self, texts):
+        """Önbellekte vektörü olmayan metinler (tekrarsız, ilk görülme sırasıyla)"""
+        with self._lock:
+            return [text for text in dict.fromkeys(texts) if self._key(text, "doc") not in self._index]
+
+    def store_documents(self, texts, vectors):
+        """Dışarıda hesaplanmış doküman vektörlerini önbelleğe ekle"""
+        self._store([self._key(text, "doc") for text in texts], vectors)
+
+    def cached_query(self, text):
+        """Bellekteki sorgu vektörü; yoksa None (isabet/ıskalama sayılır)"""
+        key = self._key(text, "query")
+        with self._lock:
+            vector = self._queries.get(key)
+            if vector is not None:
+                self._queries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        METRICS.inc("chatbot_embedding_cache_total", result="miss" if vector is None else "hit")
+        return vector
+
+    def store_query(self, text, vector):
+        """Sorgu vektörünü LRU'ya ekle; sınır aşılırsa en eski sorgu çıkarılır"""
+        key = self._key(text, "query")
+        with self._lock:
+            self._remember(key, vector)
+
+    def _remember(self, key, vector):
+        """Bellek içi LRU'ya ekle (kilit tutulurken çağrılır)"""
+        if self.query_cache_size <= 0:
+            return
+        self._queries[key] = vector
+        self._queries.move_to_end(key)
+        while len(self._queries) > self.query_cache_size:
+            self._queries.popitem(last=False)
+
+    def embed_documents_in_memory(self, texts):
+        """
+        Korpus dışı metinler (ör. bağlam sıkıştırmada puanlanan cümleler) için
+        embed_documents: korpusta olan metinler dosyadan, diğerleri bellek içi
+        LRU'dan gelir; yeni vektörler diske yazılmaz.
+        """
+        keys = [self._key(text, "doc") for text in texts]
+        found, missing = {}, {}
+        with self._lock:
+            vectors = self._vectors() if self._index else None
+            for key, text in zip(keys, texts):
+                if key in found or key in missing:
+                    continue
+                if key in self._index:
+                    found[key] = vectors[self._index[key]].astype(np.float32).tolist()
+                elif key in self._queries:
+                    self._queries.move_to_end(key)
+                    found[key] = self._queries[key]
+                else:
+                    missing[key] = text
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+        METRICS.inc("chatbot_embedding_cache_total", len(keys) - len(missing), result="hit")
+        METRICS.inc("chatbot_embedding_cache_total", len(missing), result="miss")
+
+        pending = list(missing.items())
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            vectors = self.embeddings.embed_documents([text for _, text in batch])
+            with self._lock:
+                for (key, _), vector in zip(batch, vectors):
+                    found[key] = vector
+                    self._remember(key, vector)
+        return [list(found[key]) for key in keys]
+
+    def stats(self):
+        """İsabet/ıskalama sayıları ve önbellekteki vektör sayısı"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "vectors": len(self._index),
+            "queries": len(self._queries),
+        }
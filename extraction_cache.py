@@ -0,0 +1,129 @@
+"""
+EXTRACTION_CACHE.PY - İÇERİK HASH'İ İLE ÇIKARMA ÖNBELLEĞİ
+
+Dataset'teki dosyaların çıkarılmış metinlerini diskte saklar.
+Anahtar, dosya baytlarının SHA-256 hash'i ve çıkarıcı sürümüdür; dosya
+değişmediği sürece PDF tekrar ayrıştırılmaz. Kayıtlar zlib ile sıkıştırılıp
+tek bir SQLite dosyasında tutulur ve toplam boyut sınırı aşıldığında en
+uzun süredir kullanılmayan (LRU) kayıtlar silinir.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+
+class ExtractionCache:
+    def __init__(self, cache_dir, max_bytes):
+        """
+        Args:
+            cache_dir: Önbellek dosyasının bulunduğu dizin
+            max_bytes: Sıkıştırılmış kayıtların toplam boyut sınırı
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "extraction_cache.sqlite")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        # Streaming ingest'te önbellek üretici thread'de kullanılır; aynı anda tek thread erişir
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " data BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_last_access ON entries(last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(content, kind, extractor_version):
+        """Dosya baytları + içerik türü + çıkarıcı sürümünden önbellek anahtarı üret"""
+        digest = hashlib.sha256()
+        digest.update(f"{extractor_version}\0{kind}\0".encode("utf-8"))
+        digest.update(content)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Kayıt varsa {'text': ..., 'metadata': ...} döndür, yoksa None.
+
+        Metin çıkarılamamış dosyalar için 'text' None olabilir; bu da bir
+        isabet sayılır, böylece bozuk PDF'ler her seferinde yeniden denenmez.
+        """
+        row = self._conn.execute(
+            "SELECT data FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._conn.execute(
+            "UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key)
+        )
+        return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def put(self, key, text, metadata=None):
+        """Çıkarılan metni ve metadata'yı sıkıştırarak kaydet"""
+        payload = json.dumps(
+            {"text": text, "metadata": metadata or {}}, ensure_ascii=False
+        ).encode("utf-8")
+        data = zlib.compress(payload, 6)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO entries (key, data, size, last_access) VALUES (?, ?, ?, ?)",
+            (key, data, len(data), time.time()),
+        )
+
+    def total_size(self):
+        """Önbellekteki sıkıştırılmış kayıtların toplam boyutu (bayt)"""
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def evict(self):
+        """Boyut sınırı aşıldıysa en eski erişilen kayıtları sil, silinen sayıyı döndür"""
+        excess = self.total_size() - self.max_bytes
+        if excess <= 0:
+            return 0
+
+        removed = 0
+        freed = 0
+        victims = self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_access ASC"
+        )
+        keys = []
+        for key, size in victims:
+            if freed >= excess:
+                break
+            keys.append((key,))
+            freed += size
+            removed += 1
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", keys)
+        return removed
+
+    def flush(self):
+        """Bekleyen yazmaları diske işle ve gerekirse LRU tahliyesi yap"""
+        evicted = self.evict()
+        self._conn.commit()
+        return evicted
+
+    def stats(self):
+        """İsabet/ıskalama sayılarını ve boyut bilgisini döndür"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0],
+            "size_bytes": self.total_size(),
+        }
+
+    def close(self):
+        self.flush()
+        self._conn.close()
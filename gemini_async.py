@@ -0,0 +1,224 @@
+"""
+GEMINI_ASYNC.PY - GEMINI REST API İÇİN ASENKRON İSTEMCİ
+
+SupplyChainChatbot'un async API'si (aask, aingest) bu istemciyi kullanır:
+
+- Tek bir aiohttp oturumu (paylaşılan bağlantı havuzu, keep-alive)
+- Semaphore ile eşzamanlı istek sınırı (kota aşımını ve kuyruk şişmesini önler)
+- 429/5xx ve bağlantı hatalarında jitter'lı üstel geri çekilme ile tekrar deneme
+  (Retry-After başlığı varsa ona uyulur)
+- RequestCoalescer: aynı anahtarla (ör. aynı soru) uçuştaki istekler tek çağrıyı paylaşır
+
+Uç nokta adresi GEMINI_API_BASE_URL ile değiştirilebilir; böylece
+benchmarks/gemini_stub.py gibi yerel bir HTTP taklidine karşı çalıştırılabilir.
+"""
+
+import asyncio
+import random
+import time
+
+import aiohttp
+
+from metrics import METRICS
+
+# Tekrar denenebilir HTTP durum kodları (kota aşımı ve geçici sunucu hataları)
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+EMBED_BATCH_SIZE = 100  # batchEmbedContents tek istekte en fazla 100 metin kabul eder
+
+
+class GeminiAPIError(Exception):
+    """Tekrar denenemeyen (veya denemeleri tükenen) Gemini API hatası"""
+
+    def __init__(self, status, message):
+        super().__init__(f"Gemini API hatası ({status}): {message}")
+        self.status = status
+
+
+def backoff_delay(attempt, base_seconds, max_seconds):
+    """Tam jitter'lı üstel geri çekilme: [0, min(max, base * 2^deneme)] aralığında rastgele"""
+    return random.uniform(0, min(max_seconds, base_seconds * 2 ** attempt))
+
+
+class AsyncGeminiClient:
+    """
+    Gemini embedding ve metin üretimi için asenkron REST istemcisi.
+
+    Oturum ilk istekte, çalışan event loop içinde açılır; iş bitince
+    aclose() çağrılmalı (veya 'async with' kullanılmalı).
+    """
+
+    def __init__(self, api_key, model, embedding_model, base_url,
+                 max_concurrency=8, pool_size=16, max_retries=4,
+                 retry_base_seconds=0.5, retry_max_seconds=8.0, timeout_seconds=60.0):
+        self.api_key = api_key
+        self.model = model if model.startswith("models/") else f"models/{model}"
+        self.embedding_model = embedding_model
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.timeout_seconds = timeout_seconds
+        self._session = None
+        self._semaphore = None
+        self._loop = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def _ensure_session(self):
+        """Oturumu ve semaphore'u çalışan loop'a bağlı olarak (gerekirse yeniden) oluştur"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            await self._release_session()
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout_seconds),
+                headers={"x-goog-api-key": self.api_key or ""},
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._session
+
+    async def _release_session(self):
+        """
+        Eski oturumu (ve semaphore'u) kapat.
+
+        Oturum başka bir thread'de hâlâ çalışan bir loop'a bağlıysa orada
+        kapatılır; o loop artık çalışmıyorsa (ör. önceki asyncio.run bitti)
+        connector oturumdan ayrılıp bu loop'tan kapatılır.
+        """
+        session, loop = self._session, self._loop
+        self._session = self._semaphore = self._loop = None
+        if session is None or session.closed:
+            return
+        current = asyncio.get_running_loop()
+        if loop is current:
+            await session.close()
+            return
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
+        connector = session.connector
+        session.detach()
+        try:
+            await connector.close()
+        except RuntimeError:
+            # Eski loop kapanmış; transport'ları o loop'la birlikte kullanılamaz hale gelmiştir
+            pass
+
+    async def aclose(self):
+        await self._release_session()
+
+    async def _post(self, endpoint, path, payload):
+        """Semaphore altında POST; geçici hatalarda jitter'lı geri çekilmeyle tekrar dener"""
+        session = await self._ensure_session()
+        url = f"{self.base_url}/v1beta/{path}"
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    start = time.perf_counter()
+                    async with session.post(url, json=payload) as response:
+                        METRICS.observe("chatbot_gemini_request_seconds", time.perf_counter() - start,
+                                        help="Gemini HTTP istek süresi", endpoint=endpoint)
+                        METRICS.inc("chatbot_gemini_requests_total", help="Gemini HTTP istekleri",
+                                    endpoint=endpoint, status=str(response.status))
+                        if response.status == 200:
+                            return await response.json()
+                        message = await response.text()
+                        if response.status not in RETRY_STATUSES:
+                            raise GeminiAPIError(response.status, message[:300])
+                        error = GeminiAPIError(response.status, message[:300])
+                        retry_after = response.headers.get("Retry-After")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                METRICS.inc("chatbot_gemini_requests_total", endpoint=endpoint, status="connection_error")
+                error = e
+
+            if attempt == self.max_retries:
+                raise error
+            delay = backoff_delay(attempt, self.retry_base_seconds, self.retry_max_seconds)
+            if retry_after is not None:
+                try:
+                    delay = max(delay, min(float(retry_after), self.retry_max_seconds))
+                except ValueError:
+                    pass
+            METRICS.inc("chatbot_gemini_retries_total", help="Tekrar denenen Gemini istekleri", endpoint=endpoint)
+            # Beklerken semaphore tutulmaz; diğer istekler devam eder
+            await asyncio.sleep(delay)
+
+    async def embed_query(self, text):
+        """Sorgu vektörü (task_type=RETRIEVAL_QUERY)"""
+        result = await self._post("embed", f"{self.embedding_model}:embedContent", {
+            "model": self.embedding_model,
+            "content": {"parts": [{"text": text}]},
+            "taskType": "RETRIEVAL_QUERY",
+        })
+        return result["embedding"]["values"]
+
+    async def _embed_batch(self, texts):
+        result = await self._post("batch_embed", f"{self.embedding_model}:batchEmbedContents", {
+            "requests": [
+                {
+                    "model": self.embedding_model,
+                    "content": {"parts": [{"text": text}]},
+                    "taskType": "RETRIEVAL_DOCUMENT",
+                }
+                for text in texts
+            ]
+        })
+        return [item["values"] for item in result["embeddings"]]
+
+    async def embed_documents(self, texts, batch_size=EMBED_BATCH_SIZE):
+        """Doküman vektörleri; batch'ler eşzamanlı gönderilir (semaphore sınırı içinde)"""
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        results = await asyncio.gather(*(self._embed_batch(batch) for batch in batches))
+        return [vector for batch in results for vector in batch]
+
+    async def generate(self, prompt, temperature=0.3, max_output_tokens=1000):
+        """Prompt'tan metin üret (generateContent)"""
+        result = await self._post("generate", f"{self.model}:generateContent", {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": {"temperature": temperature, "maxOutputTokens": max_output_tokens},
+        })
+        candidates = result.get("candidates") or []
+        if not candidates:
+            # Güvenlik filtresi vb. nedenlerle cevap dönmediyse
+            raise GeminiAPIError(200, f"Cevap üretilmedi: {result.get('promptFeedback')}")
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+
+class RequestCoalescer:
+    """
+    Aynı anahtarla eşzamanlı gelen istekleri tek çağrıda birleştir.
+
+    İlk istek çağrıyı başlatır; o bitene kadar gelen aynı anahtarlı istekler
+    aynı sonucu (veya hatayı) bekler. Çağrı bitince anahtar serbest kalır.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.coalesced = 0
+
+    async def run(self, key, factory):
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            METRICS.inc("chatbot_coalesced_requests_total", help="Uçuştaki aynı isteğe bağlanan istekler")
+            # shield: bekleyenlerden biri iptal edilirse ortak çağrı iptal olmasın
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(factory())
+        self._inflight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._inflight.pop(key, None)
+            else:
+                future.add_done_callback(lambda _: self._inflight.pop(key, None))
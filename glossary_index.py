@@ -0,0 +1,159 @@
+"""
+GLOSSARY_INDEX.PY - TERİM TANIMLARI İÇİN HIZLI YOL
+
+"EOQ nedir?", "kanban ne demek" gibi tanım sorularını embedding, arama ve
+LLM üretimine hiç gitmeden doğrudan sözlükteki tanımdan cevaplar.
+
+Terimler Türkçe'ye duyarlı şekilde normalize edilir (büyük/küçük harf,
+ç/ğ/ı/ö/ş/ü katlama). Birebir eşleşme yoksa eki kırpılmış biçim denenir,
+o da yoksa küçük yazım hataları bir BK-ağacında Levenshtein mesafesiyle
+aranır. Hiçbiri tutmazsa None döner ve çağıran normal RAG akışına devam eder.
+"""
+
+import re
+
+from turkish_text import normalize, stem
+
+# Soru sonundaki tanım kalıpları (katlanmış/ASCII biçimde)
+_QUESTION_SUFFIXES = [
+    "ne anlama gelmektedir", "ne anlama gelir", "ne demektir", "ne demek",
+    "neye denir", "nedir", "tanimi nedir", "tanimi", "kavrami nedir", "kavrami",
+    "anlami nedir", "anlami", "hakkinda bilgi",
+]
+_QUESTION_RE = re.compile(
+    r"^(?P<term>.+?)\s+(?:" + "|".join(re.escape(s) for s in _QUESTION_SUFFIXES) + r")$"
+)
+# Kesme işaretiyle ayrılan iyelik ekleri ("EOQ'nun tanımı" -> "eoq nun tanimi")
+_POSSESSIVE_TOKENS = {"in", "nin", "un", "nun", "dir", "dur", "tir", "tur"}
+
+
+def levenshtein(a, b):
+    """İki metin arasındaki düzenleme mesafesi"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        previous = current
+    return previous[-1]
+
+
+class BKTree:
+    """Levenshtein mesafesiyle yaklaşık arama için Burkhard-Keller ağacı"""
+
+    def __init__(self):
+        self.root = None
+
+    def add(self, word):
+        if self.root is None:
+            self.root = (word, {})
+            return
+        node = self.root
+        while True:
+            distance = levenshtein(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, word, max_distance):
+        """max_distance içindeki en yakın kelimeyi (mesafe, kelime) olarak döndür"""
+        best = None
+        stack = [self.root] if self.root else []
+        while stack:
+            node_word, children = stack.pop()
+            distance = levenshtein(word, node_word)
+            if distance <= max_distance and (best is None or distance < best[0]):
+                best = (distance, node_word)
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return best
+
+
+def _stem_key(normalized_term):
+    return " ".join(stem(token) for token in normalized_term.split())
+
+
+def _max_typos(term):
+    """Kısa terimlerde tek, uzunlarda iki harf hatasına izin ver"""
+    if len(term) <= 3:
+        return 0
+    return 1 if len(term) <= 7 else 2
+
+
+class GlossaryIndex:
+    def __init__(self, entries):
+        """
+        Args:
+            entries: (terim, tanım, kaynak) üçlüleri
+        """
+        self.entries = {}
+        self.stem_keys = {}
+        self.tree = BKTree()
+        self.hits = 0
+        self.misses = 0
+
+        for term, definition, source in entries:
+            key = normalize(term)
+            if not key or not definition or key in self.entries:
+                continue
+            self.entries[key] = {"term": term, "definition": definition, "source": source}
+            self.stem_keys.setdefault(_stem_key(key), key)
+            self.tree.add(key)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def extract_term(question):
+        """Tanım sorusundan terim kısmını çıkar (kalıba uymuyorsa tüm soru)"""
+        text = normalize(question)
+        match = _QUESTION_RE.match(text)
+        if match:
+            text = match.group("term")
+        tokens = text.split()
+        if len(tokens) > 1 and tokens[-1] in _POSSESSIVE_TOKENS:
+            tokens = tokens[:-1]
+        return " ".join(tokens)
+
+    def lookup(self, question):
+        """
+        Soruyu bir sözlük terimine çözümle.
+
+        Returns:
+            dict | None: {'term', 'definition', 'source'} veya bulunamazsa None
+        """
+        key = self.extract_term(question)
+        entry = None
+        if key:
+            canonical = key if key in self.entries else self.stem_keys.get(_stem_key(key))
+            if canonical is None:
+                match = self.tree.search(key, _max_typos(key))
+                canonical = match[1] if match else None
+            entry = self.entries.get(canonical) if canonical else None
+
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def stats(self):
+        """Hızlı yol isabet oranı metrikleri"""
+        total = self.hits + self.misses
+        return {
+            "terms": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,187 @@
+"""
+HYBRID_RETRIEVER.PY - BM25 + YOĞUN (DENSE) HİBRİT ARAMA
+
+Chroma'nın vektör araması "EOQ", "Kanban" gibi birebir terim aramalarını
+sık kaçırır. Bu modül Türkçe'ye duyarlı tokenizasyonla süreç içi bir
+ters indeks (inverted index) BM25 arayıcısı kurar ve sonuçlarını Chroma
+sonuçlarıyla Reciprocal Rank Fusion (RRF) ile birleştirir.
+
+BM25 indeksi ingest sırasında bir kez kurulur ve chroma_db dizininin
+yanına kaydedilir; parçalar değişmediyse sonraki açılışlarda diskten okunur.
+Parça metinleri indekste kopyalanmaz: sonuçlar parçaların ChunkStore'undan
+(sıcak açılışta bellek eşlemeli) okunur.
+"""
+
+import hashlib
+import math
+import os
+import pickle
+from collections import Counter
+
+try:
+    from langchain_core.callbacks import CallbackManagerForRetrieverRun
+    from langchain_core.retrievers import BaseRetriever
+except ImportError:
+    from langchain.callbacks.manager import CallbackManagerForRetrieverRun
+    from langchain.schema import BaseRetriever
+
+from chunk_store import ChunkStore
+from metrics import METRICS
+from turkish_text import tokenize
+
+BM25_FILENAME = "bm25_index.pkl"
+BM25_FORMAT_VERSION = 2
+
+
+def document_key(doc):
+    """Aynı parçayı farklı arayıcılardan gelse de tanımak için anahtar"""
+    text_hash = hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()
+    return (str(doc.metadata.get("source", "")), doc.metadata.get("start_index"), text_hash)
+
+
+class BM25Index:
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}      # terim -> [(doküman no, terim frekansı), ...]
+        self.idf = {}
+        self.doc_lengths = []
+        self.avg_doc_length = 0.0
+        self.store = ChunkStore()  # Parça metni ve metadata'sı; indeksle birlikte kaydedilmez
+        self.fingerprint = None
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    @staticmethod
+    def _as_store(documents):
+        return documents if isinstance(documents, ChunkStore) else ChunkStore.from_documents(documents)
+
+    @staticmethod
+    def corpus_fingerprint(documents):
+        """Parça kümesinin hash'i; değiştiyse kayıtlı indeks geçersizdir"""
+        digest = hashlib.sha256()
+        for doc in documents:
+            digest.update(repr(document_key(doc)).encode("utf-8"))
+        return digest.hexdigest()
+
+    def build(self, documents):
+        """Dokümanlardan ters indeksi kur"""
+        self.postings = {}
+        self.doc_lengths = []
+        self.store = self._as_store(documents)
+
+        for doc_id, doc in enumerate(self.store):
+            term_counts = Counter(tokenize(doc.page_content))
+            self.doc_lengths.append(sum(term_counts.values()))
+            for term, tf in term_counts.items():
+                self.postings.setdefault(term, []).append((doc_id, tf))
+
+        n_docs = len(self.doc_lengths)
+        self.avg_doc_length = (sum(self.doc_lengths) / n_docs) if n_docs else 0.0
+        self.idf = {
+            term: math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+        self.fingerprint = self.corpus_fingerprint(self.store)
+        return self
+
+    def search(self, query, k=10):
+        """Sorgu için en yüksek BM25 skorlu (doküman no, skor) listesini döndür"""
+        scores = {}
+        avg_len = self.avg_doc_length or 1.0
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf[term]
+            for doc_id, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def get_document(self, doc_id):
+        return self.store[doc_id].to_document()
+
+    def save(self, path):
+        index = {key: value for key, value in self.__dict__.items() if key != "store"}
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump({"version": BM25_FORMAT_VERSION, "index": index}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path):
+        """Kayıtlı indeksi oku; yoksa veya sürümü farklıysa None döndür"""
+        try:
+            with open(path, "rb") as f:
+                payload = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if payload.get("version") != BM25_FORMAT_VERSION:
+            return None
+        index = cls()
+        index.__dict__.update(payload["index"])
+        return index
+
+
+def load_or_build_bm25(documents, persist_directory):
+    """
+    persist_directory'deki BM25 indeksini kullan; parçalar değiştiyse yeniden kur.
+
+    Returns:
+        BM25Index
+    """
+    path = os.path.join(persist_directory, BM25_FILENAME)
+    documents = BM25Index._as_store(documents)
+    fingerprint = BM25Index.corpus_fingerprint(documents)
+    index = BM25Index.load(path)
+    if index is not None and index.fingerprint == fingerprint:
+        # Parmak izi aynı: parçalar aynı sırada, doküman numaraları bu depoya karşılık gelir
+        index.store = documents
+        return index
+
+    index = BM25Index().build(documents)
+    os.makedirs(persist_directory, exist_ok=True)
+    index.save(path)
+    return index
+
+
+def reciprocal_rank_fusion(result_lists, k, rrf_k=60):
+    """
+    Birden fazla sıralı doküman listesini RRF ile birleştir.
+
+    Her dokümanın skoru, göründüğü her listede 1 / (rrf_k + sıra) toplamıdır.
+    """
+    scores = {}
+    docs = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results, start=1):
+            key = document_key(doc)
+            docs.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+    ranked = sorted(scores, key=scores.get, reverse=True)[:k]
+    return [docs[key] for key in ranked]
+
+
+class HybridRetriever(BaseRetriever):
+    """Chroma (dense) ve BM25 (sparse) sonuçlarını RRF ile birleştiren retriever"""
+
+    vectorstore: object
+    bm25: object
+    k: int = 4
+    dense_k: int = 20
+    sparse_k: int = 20
+    rrf_k: int = 60
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _get_relevant_documents(self, query, *, run_manager: CallbackManagerForRetrieverRun):
+        # Soru embedding'i dense süresine dahildir (ayrıca chatbot_embedding_seconds'ta)
+        with METRICS.time("chatbot_search_seconds", help="Arayıcı başına arama süresi", retriever="dense"):
+            dense_docs = self.vectorstore.similarity_search(query, k=self.dense_k)
+        with METRICS.time("chatbot_search_seconds", help="Arayıcı başına arama süresi", retriever="bm25"):
+            sparse_docs = [self.bm25.get_document(doc_id)
+                           for doc_id, _ in self.bm25.search(query, k=self.sparse_k)]
+        return reciprocal_rank_fusion([dense_docs, sparse_docs], self.k, self.rrf_k)
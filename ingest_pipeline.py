@@ -0,0 +1,190 @@
+"""
+INGEST_PIPELINE.PY - SINIRLI BELLEKLİ AKIŞ (STREAMING) İNDEKSLEME
+
+Eski akışta tüm dokümanlar, tüm sayfa metinleri ve tüm parçalar embedding
+başlamadan önce aynı anda bellekte durur. Bu modül aynı işi birbirine
+generator'larla bağlı aşamalar halinde yapar:
+
+    sayfa çıkarma -> bölme -> tekrar eleme -> batch -> embed -> Chroma'ya upsert
+
+Aşamalar sınırlı kuyruklarla (queue.Queue(maxsize)) ayrı thread'lerde
+çalışır: PDF ayrıştırma bir sonraki batch'i hazırlarken önceki batch embed
+edilir ve yazılır. Kuyruklar dolunca üretici bekler, böylece bellekte en
+fazla birkaç batch kadar metin bulunur. Korpusla büyüyen tek durum parça
+ID'leri, tekrar eleyicinin imzaları (parça başına ~1 KB, metin tutulmaz)
+ve Chroma'nın kendi HNSW indeksidir.
+"""
+
+import queue
+import threading
+
+from vector_backends import backend_label, update_metadatas, upsert_vectors
+from vector_index import chunk_ids, embedding_name, open_index, save_manifest
+
+_DONE = object()
+
+
+class _StageError:
+    def __init__(self, error):
+        self.error = error
+
+
+def bounded(iterable, maxsize=4, name="ingest-stage"):
+    """
+    iterable'ı ayrı bir thread'de tüketip en fazla maxsize elemanlık bir
+    kuyruk üzerinden döndür. Üreticideki hata tüketicide yeniden fırlatılır;
+    tüketici erken durursa üretici thread'i de durur.
+    """
+    items = queue.Queue(maxsize=maxsize)
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as e:
+            put(_StageError(e))
+        finally:
+            # Üst aşama da bir generator ise onu da kapat (zincirdeki thread'ler takılı kalmasın)
+            close = getattr(iterable, "close", None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def iter_chunks(documents, text_splitter):
+    """Dokümanları (sayfaları) tek tek böl"""
+    for document in documents:
+        yield from text_splitter.split_documents([document])
+
+
+def iter_unique(chunks, deduplicator):
+    """Tekrar eden parçaları akış halinde ele"""
+    for chunk in chunks:
+        kept = deduplicator.add(chunk)
+        if kept is not None:
+            yield kept
+
+
+def iter_batches(items, batch_size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_embedded(batches, embedding, existing_ids):
+    """
+    Her batch'in ID'lerini üret ve sadece indekste olmayan parçaları embed et.
+
+    Yields:
+        tuple: (tüm ID'ler, yeni parçalar, yeni ID'ler, yeni vektörler)
+    """
+    for batch in batches:
+        ids = chunk_ids(batch)
+        new = [(chunk_id, chunk) for chunk_id, chunk in zip(ids, batch) if chunk_id not in existing_ids]
+        vectors = embedding.embed_documents([chunk.page_content for _, chunk in new]) if new else []
+        yield ids, [chunk for _, chunk in new], [chunk_id for chunk_id, _ in new], vectors
+
+
+def stream_into_index(documents, text_splitter, embedding, persist_directory,
+                      deduplicator=None, batch_size=100, queue_size=4, backend="chroma", backend_options=None):
+    """
+    Doküman akışını bölüp, tekrarları eleyip batch batch vektör veritabanına yaz.
+
+    Args:
+        documents: Document üreten iterable (ör. loader.iter_page_documents())
+        text_splitter: LangChain metin bölücü
+        embedding: LangChain embedding nesnesi
+        persist_directory: Vektör veritabanının kalıcı dizini
+        deduplicator: dedup.ChunkDeduplicator (None ise tekrar eleme yapılmaz);
+            bellek için keep_metadata=False ile oluşturulması önerilir
+        batch_size: Tek seferde embed edilip yazılan parça sayısı
+        queue_size: Aşamalar arası kuyrukta bekleyebilecek batch sayısı
+        backend: "chroma" veya "faiss"
+        backend_options: open_vector_store'a geçilen ayarlar
+
+    Returns:
+        tuple: (vektör veritabanı, {'added', 'deleted', 'kept', 'chunks'} sayıları)
+    """
+    vectordb, existing_ids = open_index(embedding, persist_directory, backend, backend_options)
+
+    chunks = iter_chunks(documents, text_splitter)
+    if deduplicator is not None:
+        chunks = iter_unique(chunks, deduplicator)
+    # Çıkarma + bölme + eleme bir thread'de, embedding bir başka thread'de, yazma burada
+    batches = bounded(iter_batches(chunks, batch_size), queue_size, name="ingest-parse")
+    embedded = bounded(iter_embedded(batches, embedding, existing_ids), queue_size, name="ingest-embed")
+
+    emitted_ids = []    # tekrar eleyicinin tuttuğu parça sırasıyla ID'ler
+    seen_ids = set()
+    added = 0
+    for ids, new_chunks, new_ids, vectors in embedded:
+        emitted_ids.extend(ids)
+        rows = [(chunk_id, chunk, vector) for chunk_id, chunk, vector in zip(new_ids, new_chunks, vectors)
+                if chunk_id not in seen_ids]
+        seen_ids.update(ids)
+        if rows:
+            upsert_vectors(
+                vectordb,
+                ids=[chunk_id for chunk_id, _, _ in rows],
+                texts=[chunk.page_content for _, chunk, _ in rows],
+                metadatas=[chunk.metadata for _, chunk, _ in rows],
+                vectors=[vector for _, _, vector in rows],
+            )
+            added += len(rows)
+
+    # Yazıldıktan sonra tekrar kaynağı eklenen parçaların metadata'sı güncellenir
+    # (sadece verilen metadata anahtarları değişir)
+    if deduplicator is not None and deduplicator.merges:
+        positions = sorted(deduplicator.merges)
+        for start in range(0, len(positions), batch_size):
+            part = positions[start:start + batch_size]
+            update_metadatas(
+                vectordb,
+                ids=[emitted_ids[position] for position in part],
+                metadatas=[deduplicator.merges[position] for position in part],
+            )
+
+    to_delete = [chunk_id for chunk_id in existing_ids if chunk_id not in seen_ids]
+    if to_delete:
+        vectordb.delete(ids=to_delete)
+
+    vectordb.persist()
+    save_manifest(persist_directory, seen_ids, embedding_name(embedding), backend_label(vectordb))
+
+    counts = {
+        "added": added,
+        "deleted": len(to_delete),
+        "kept": len(seen_ids) - added,
+        "chunks": len(seen_ids),
+    }
+    return vectordb, counts
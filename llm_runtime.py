@@ -0,0 +1,140 @@
+"""
+LLM_RUNTIME.PY - YEREL SEQ2SEQ MODEL (FLAN-T5) İÇİN ÇALIŞMA ZAMANLARI
+
+GPU'suz sunucularda flan-t5-large fp32 PyTorch ile uzun bir cevabı onlarca
+saniyede üretir. Bu modül aynı modeli dört çalışma zamanından biriyle yükler:
+
+    torch      : AutoModelForSeq2SeqLM, fp32 (GPU varsa GPU'ya taşınır)
+    torch-int8 : Linear katmanları dinamik int8'e çevrilmiş PyTorch modeli;
+                 dışa aktarma gerektirmez, açılışta saniyeler içinde hazırlanır
+    onnx       : optimum ile ONNX'e aktarılmış model, ONNX Runtime (CPU)
+    onnx-int8  : ONNX modeli + ONNX Runtime dinamik int8 kuantizasyonu
+
+Varsayılan "torch"tur (fp32, kuantizasyon yok); diğerleri isteğe bağlıdır ve
+cevap uyumu benchmarks/bench_llm_runtime.py ile kontrol edilmelidir. "auto"
+GPU varsa "torch", yoksa "torch-int8" seçer. ONNX dışa aktarımı
+(büyük model için dakikalar sürer) ONNX_EXPORT_DIR altında saklanır ve
+sonraki açılışlarda diskten okunur.
+
+Dönen model her çalışma zamanında aynı arayüzü sunar (generate(), device):
+HuggingFacePipeline, Seq2SeqBatchGenerator ve TextIteratorStreamer ile
+olduğu gibi kullanılır. Üretimde encoder çıktısı bir kez hesaplanır ve
+decoder geçmiş anahtar/değerleri (KV önbelleği) adımlar arasında taşınır;
+ONNX'te bunun için ayrı "decoder_with_past" grafiği aktarılır.
+
+Gerekenler: torch + transformers; ONNX için optimum[onnxruntime].
+"""
+
+import glob
+import os
+import shutil
+
+RUNTIMES = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+
+def resolve_runtime(runtime):
+    """'auto'yu makineye göre somut çalışma zamanına çevir"""
+    if runtime == "auto":
+        import torch
+        return "torch" if torch.cuda.is_available() else "torch-int8"
+    if runtime not in RUNTIMES:
+        raise ValueError(f"Bilinmeyen LLM çalışma zamanı: {runtime} (seçenekler: auto, {', '.join(RUNTIMES)})")
+    return runtime
+
+
+def _load_torch(model_name, runtime, num_threads):
+    import torch
+    from transformers import AutoModelForSeq2SeqLM
+
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+    model.eval()
+    model.config.use_cache = True
+    if runtime == "torch-int8":
+        # Ağırlıklar int8 saklanır, aktivasyonlar çağrı anında kuantize edilir (sadece CPU)
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if torch.cuda.is_available():
+        model.to("cuda")
+    return model
+
+
+def export_onnx(model_name, export_dir, quantize=False):
+    """
+    Modeli (gerekirse) ONNX'e aktar ve isteğe bağlı int8'e kuantize et.
+
+    Returns:
+        str: Aktarılmış modelin dizini (ORTModelForSeq2SeqLM.from_pretrained ile açılır)
+    """
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    base_dir = os.path.join(export_dir, model_name.replace("/", "--"))
+    fp32_dir = os.path.join(base_dir, "fp32")
+    if not os.path.exists(os.path.join(fp32_dir, "config.json")):
+        print(f"🔄 '{model_name}' ONNX'e aktarılıyor (ilk seferde birkaç dakika sürebilir)...")
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, use_cache=True)
+        model.save_pretrained(fp32_dir + ".tmp")
+        shutil.rmtree(fp32_dir, ignore_errors=True)
+        os.replace(fp32_dir + ".tmp", fp32_dir)
+    if not quantize:
+        return fp32_dir
+
+    int8_dir = os.path.join(base_dir, "int8")
+    if not os.path.exists(os.path.join(int8_dir, "config.json")):
+        from optimum.onnxruntime import ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+        print("🔄 ONNX modeli int8'e kuantize ediliyor...")
+        tmp_dir = int8_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        # avx2 yapılandırması AVX-512 olmayan sunucularda da çalışır
+        config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        for path in sorted(glob.glob(os.path.join(fp32_dir, "*.onnx"))):
+            quantizer = ORTQuantizer.from_pretrained(fp32_dir, file_name=os.path.basename(path))
+            quantizer.quantize(save_dir=tmp_dir, quantization_config=config, file_suffix="")
+        # Config dosyaları (config.json, generation_config.json) modelle aynı dizinde olmalı
+        for path in glob.glob(os.path.join(fp32_dir, "*.json")):
+            if not os.path.exists(os.path.join(tmp_dir, os.path.basename(path))):
+                shutil.copy(path, tmp_dir)
+        os.replace(tmp_dir, int8_dir)
+    return int8_dir
+
+
+def _load_onnx(model_name, runtime, num_threads, export_dir):
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    model_dir = export_onnx(model_name, export_dir, quantize=runtime == "onnx-int8")
+    session_options = onnxruntime.SessionOptions()
+    if num_threads:
+        session_options.intra_op_num_threads = num_threads
+    return ORTModelForSeq2SeqLM.from_pretrained(
+        model_dir, use_cache=True, provider="CPUExecutionProvider", session_options=session_options
+    )
+
+
+def load_seq2seq(model_name, runtime="torch", num_threads=None, export_dir=".cache/onnx"):
+    """
+    Tokenizer ve modeli seçilen çalışma zamanıyla yükle.
+
+    Args:
+        model_name: Hugging Face model adı (örn. "google/flan-t5-large")
+        runtime: "auto" veya RUNTIMES'tan biri
+        num_threads: CPU'da kullanılacak thread sayısı (None = kütüphane varsayılanı)
+        export_dir: ONNX dışa aktarımlarının saklandığı dizin
+
+    Returns:
+        tuple: (tokenizer, model, kullanılan çalışma zamanı)
+
+    Raises:
+        ImportError: Çalışma zamanının kütüphanesi (torch, optimum, onnxruntime) yüklü değilse
+    """
+    from transformers import AutoTokenizer
+
+    runtime = resolve_runtime(runtime)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    if runtime.startswith("onnx"):
+        model = _load_onnx(model_name, runtime, num_threads, export_dir)
+    else:
+        model = _load_torch(model_name, runtime, num_threads)
+    return tokenizer, model, runtime
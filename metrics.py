@@ -0,0 +1,384 @@
+"""
+METRICS.PY - HAFİF ÖLÇÜM KATMANI (SAYAÇ, ZAMANLAYICI, HİSTOGRAM)
+
+Yavaş bir cevabın süresinin nereye gittiğini (soru embedding'i, vektör
+araması, prompt hazırlama, üretim) ve açılışın hangi aşamada uzadığını (HF
+indirme, PDF ayrıştırma, bölme, embedding) görmek için süreç içi bir ölçüm
+kaydı. Dış bağımlılığı yoktur:
+
+- METRICS.inc(...) sayaç, METRICS.observe(...) histogram, METRICS.time(...)
+  ve @timed(...) süre ölçümü (saniye, histogram olarak) yapar
+- InstrumentedEmbeddings embedding modelini, MetricsCallbackHandler
+  LangChain retriever/LLM çağrılarını ölçer
+- start_metrics_server() Prometheus metin formatında /metrics ve JSON
+  olarak /metrics.json sunar; start_json_log() kaydı periyodik olarak
+  bir JSON Lines dosyasına ekler
+
+Histogramlar Prometheus kovalarının yanında son RECENT_SAMPLES gözlemi de
+tutar; özetlerdeki p50/p95 bu örneklerden hesaplanır.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    from langchain_core.callbacks import BaseCallbackHandler
+    from langchain_core.embeddings import Embeddings
+except ImportError:
+    from langchain.callbacks.base import BaseCallbackHandler
+    from langchain.schema.embeddings import Embeddings
+
+# Saniye cinsinden kova sınırları: milisaniyelik aramadan dakikalık indirmeye kadar
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+RECENT_SAMPLES = 1024
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)  # son eleman: +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, value):
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+
+    def quantile(self, q):
+        """Son gözlemlerden q (0-1) yüzdeliği; gözlem yoksa None"""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": self.max,
+        }
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in pairs
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}     # (isim, etiketler) -> değer
+        self._histograms = {}   # (isim, etiketler) -> Histogram
+        self._help = {}
+
+    def inc(self, name, value=1, help=None, **labels):
+        """Sayacı artır (Prometheus geleneğiyle isim '_total' ile biter)"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+            if help:
+                self._help.setdefault(name, help)
+
+    def observe(self, name, value, help=None, buckets=DEFAULT_BUCKETS, **labels):
+        """Histograma bir gözlem ekle"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+            if help:
+                self._help.setdefault(name, help)
+
+    @contextmanager
+    def time(self, name, help=None, **labels):
+        """Bloğun süresini saniye olarak histograma yaz (hata olsa da)"""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start_time, help=help, **labels)
+
+    def timed(self, name, help=None, **labels):
+        """Fonksiyonun süresini ölçen dekoratör"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(name, help=help, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def counter_value(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def histogram(self, name, **labels):
+        """Histogram özeti ({'count', 'sum', 'mean', 'p50', 'p95', 'max'}) veya None"""
+        with self._lock:
+            histogram = self._histograms.get((name, _label_key(labels)))
+            return histogram.summary() if histogram is not None else None
+
+    def snapshot(self):
+        """Tüm ölçümler, JSON'a yazılabilir sözlük olarak"""
+        with self._lock:
+            return {
+                "timestamp": time.time(),
+                "counters": {
+                    name + _format_labels(labels): value
+                    for (name, labels), value in sorted(self._counters.items())
+                },
+                "histograms": {
+                    name + _format_labels(labels): histogram.summary()
+                    for (name, labels), histogram in sorted(self._histograms.items())
+                },
+            }
+
+    def to_prometheus(self):
+        """Prometheus metin formatı (text/plain; version=0.0.4)"""
+        lines = []
+        with self._lock:
+            seen = set()
+            for (name, labels), value in sorted(self._counters.items()):
+                if name not in seen:
+                    seen.add(name)
+                    if name in self._help:
+                        lines.append(f"# HELP {name} {self._help[name]}")
+                    lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                if name not in seen:
+                    seen.add(name)
+                    if name in self._help:
+                        lines.append(f"# HELP {name} {self._help[name]}")
+                    lines.append(f"# TYPE {name} histogram")
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float("inf"),), histogram.bucket_counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(float(bound))
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram.total}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary_lines(self):
+        """İnsan okunur özet satırları (get_dataset_stats ve loglar için)"""
+        snapshot = self.snapshot()
+        lines = []
+        for name, summary in snapshot["histograms"].items():
+            lines.append(
+                f"{name}: {summary['count']} kez, toplam {summary['sum']:.2f} sn, "
+                f"p50 {summary['p50'] * 1000:.1f} ms, p95 {summary['p95'] * 1000:.1f} ms"
+            )
+        for name, value in snapshot["counters"].items():
+            lines.append(f"{name}: {value:g}")
+        return lines
+
+    def write_json(self, path):
+        """Anlık ölçümleri JSON Lines dosyasına bir satır olarak ekle"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.snapshot(), ensure_ascii=False) + "\n")
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+# Uygulama genelinde paylaşılan kayıt
+METRICS = MetricsRegistry()
+
+
+def timed(name, help=None, **labels):
+    """METRICS'e yazan süre ölçüm dekoratörü"""
+    return METRICS.timed(name, help=help, **labels)
+
+
+class InstrumentedEmbeddings(Embeddings):
+    """
+    Embedding modelini saran, çağrı sürelerini ve metin sayılarını ölçen
+    sarmalayıcı. Önbelleğin altına (asıl modelin etrafına) konursa sadece
+    gerçek model çağrıları ölçülür.
+    """
+
+    def __init__(self, embeddings, registry=METRICS):
+        self.embeddings = embeddings
+        self.registry = registry
+        # Önbellek anahtarları ve indeks manifest'i asıl modelin adını görmeli
+        self.model_name = (
+            getattr(embeddings, "model_name", None)
+            or getattr(embeddings, "model", None)
+            or type(embeddings).__name__
+        )
+
+    def embed_documents(self, texts):
+        with self.registry.time("chatbot_embedding_seconds", help="Embedding modeli çağrı süresi", kind="documents"):
+            vectors = self.embeddings.embed_documents(texts)
+        self.registry.inc("chatbot_embedded_texts_total", len(texts), help="Modele gönderilen metin sayısı",
+                          kind="documents")
+        return vectors
+
+    def embed_query(self, text):
+        with self.registry.time("chatbot_embedding_seconds", help="Embedding modeli çağrı süresi", kind="query"):
+            vector = self.embeddings.embed_query(text)
+        self.registry.inc("chatbot_embedded_texts_total", help="Modele gönderilen metin sayısı", kind="query")
+        return vector
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain çağrılarına bağlanıp retriever ve LLM sürelerini ölçer.
+
+    Zincir çağrısında callbacks=[handler] olarak verilir; alt çağrılara
+    (retriever, LLM) da aktarılır. İlk token süresi (TTFT) sadece streaming
+    destekleyen modellerde ölçülür.
+    """
+
+    def __init__(self, registry=METRICS):
+        self.registry = registry
+        self._started = {}      # run_id -> (tür, başlangıç zamanı)
+        self._first_token = set()
+        self._lock = threading.Lock()
+
+    def _start(self, run_id, kind):
+        with self._lock:
+            self._started[run_id] = (kind, time.perf_counter())
+
+    def _end(self, run_id, error=False):
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            self._first_token.discard(run_id)
+        if started is None:
+            return
+        kind, start_time = started
+        elapsed = time.perf_counter() - start_time
+        if kind == "retriever":
+            self.registry.observe("chatbot_retrieval_seconds", elapsed, help="Retriever (arama + yeniden sıralama) süresi")
+        else:
+            self.registry.observe("chatbot_llm_seconds", elapsed, help="LLM üretim süresi")
+        if error:
+            self.registry.inc("chatbot_errors_total", help="Hata ile biten çağrılar", stage=kind)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, "llm")
+        self.registry.inc("chatbot_prompt_chars_total", sum(len(prompt) for prompt in prompts),
+                          help="LLM'e gönderilen prompt uzunluğu (karakter)")
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, "llm")
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        with self._lock:
+            started = self._started.get(run_id)
+            if started is None or run_id in self._first_token:
+                return
+            self._first_token.add(run_id)
+        self.registry.observe("chatbot_llm_ttft_seconds", time.perf_counter() - started[1],
+                              help="İlk token süresi")
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=True)
+
+    def on_retriever_start(self, serialized, query, *, run_id, **kwargs):
+        self._start(run_id, "retriever")
+
+    def on_retriever_end(self, documents, *, run_id, **kwargs):
+        self._end(run_id)
+        self.registry.observe("chatbot_retrieved_documents", len(documents), help="Bağlama giren parça sayısı",
+                              buckets=(1, 2, 4, 8, 16, 32, 64))
+
+    def on_retriever_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=True)
+
+
+_servers = {}
+
+
+def start_metrics_server(port, host="127.0.0.1", registry=METRICS):
+    """
+    /metrics (Prometheus) ve /metrics.json uç noktalarını arka plan
+    thread'inde sun. Aynı port için ikinci çağrı mevcut sunucuyu döndürür.
+
+    Returns:
+        ThreadingHTTPServer veya port kullanılamıyorsa None
+    """
+    if port in _servers:
+        return _servers[port]
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] == "/metrics":
+                body = registry.to_prometheus().encode("utf-8")
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            elif self.path.split("?")[0] == "/metrics.json":
+                body = json.dumps(registry.snapshot(), ensure_ascii=False).encode("utf-8")
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Her scrape isteği konsolu doldurmasın
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError as e:
+        print(f"⚠️ Ölçüm sunucusu başlatılamadı ({host}:{port}): {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    _servers[port] = server
+    print(f"📈 Ölçümler: http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def start_json_log(path, interval_seconds=60, registry=METRICS):
+    """Ölçümleri interval_seconds'ta bir JSON Lines dosyasına ekleyen daemon thread başlat"""
+    def run():
+        while True:
+            time.sleep(interval_seconds)
+            try:
+                registry.write_json(path)
+            except OSError as e:
+                print(f"⚠️ Ölçüm logu yazılamadı: {e}")
+
+    thread = threading.Thread(target=run, name="metrics-json-log", daemon=True)
+    thread.start()
+    return thread
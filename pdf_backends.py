@@ -0,0 +1,187 @@
+"""
+PDF_BACKENDS.PY - DEĞİŞTİRİLEBİLİR PDF METİN ÇIKARMA KATMANI
+
+Aynı arayüzü sunan dört arka uç, PDF_BACKEND_ORDER sırasıyla denenir:
+
+    pymupdf      : MuPDF (C) - açık ara en hızlısı, varsayılan
+    pypdf        : Saf Python, PyPDF2'nin bakımı süren devamı
+    pypdf2       : Eski çıkarıcı (geriye uyumluluk için)
+    unstructured : Düzen analizi yapan, en yavaş ama en toleranslı arka uç
+
+Yüklü olmayan arka uçlar atlanır; bir arka uç PDF'i açamaz veya ayrıştırırken
+hata verirse sıradakine geçilir. Sonuç her zaman sayfa başına bir metindir,
+böylece parçalar sayfa numarası taşıyabilir. page_range ile sadece bir sayfa
+aralığı çıkarılabilir; büyük PDF'ler bu sayede process havuzuna sayfa
+aralıkları halinde dağıtılır (bkz. data_loader.process_dataset_files).
+"""
+
+import io
+from importlib import metadata
+
+from metrics import METRICS
+
+
+def _as_bytes(content):
+    if isinstance(content, memoryview):
+        return content.tobytes()
+    return bytes(content) if isinstance(content, bytearray) else content
+
+
+def _select(pages, page_range):
+    start, stop = page_range or (0, None)
+    return range(start, stop if stop is not None else len(pages))
+
+
+class PyMuPDFBackend:
+    name = "pymupdf"
+    distribution = "PyMuPDF"
+
+    def __init__(self):
+        try:
+            import pymupdf as fitz
+        except ImportError:
+            import fitz  # pymupdf < 1.24
+        self.fitz = fitz
+        self.version = fitz.VersionBind
+
+    def page_count(self, content):
+        with self.fitz.open(stream=_as_bytes(content), filetype="pdf") as doc:
+            return doc.page_count
+
+    def extract_pages(self, content, page_range=None):
+        with self.fitz.open(stream=_as_bytes(content), filetype="pdf") as doc:
+            return [doc[number].get_text("text") for number in _select(doc, page_range)]
+
+
+class PypdfBackend:
+    name = "pypdf"
+    distribution = module = "pypdf"
+
+    def __init__(self):
+        self.lib = __import__(self.module)
+        self.version = self.lib.__version__
+
+    def _reader(self, content):
+        return self.lib.PdfReader(io.BytesIO(_as_bytes(content)))
+
+    def page_count(self, content):
+        return len(self._reader(content).pages)
+
+    def extract_pages(self, content, page_range=None):
+        pages = self._reader(content).pages
+        return [pages[number].extract_text() or "" for number in _select(pages, page_range)]
+
+
+class PyPDF2Backend(PypdfBackend):
+    name = "pypdf2"
+    distribution = module = "PyPDF2"
+
+
+class UnstructuredBackend:
+    name = distribution = "unstructured"
+
+    def __init__(self):
+        import unstructured
+        from unstructured.partition.pdf import partition_pdf
+        self.partition_pdf = partition_pdf
+        self.version = unstructured.__version__
+
+    def extract_pages(self, content, page_range=None):
+        # "fast" stratejisi OCR/düzen modeli çalıştırmadan metin katmanını okur
+        elements = self.partition_pdf(file=io.BytesIO(_as_bytes(content)), strategy="fast")
+        pages = {}
+        for element in elements:
+            number = (element.metadata.page_number or 1) - 1
+            pages.setdefault(number, []).append(str(element))
+        texts = ["\n".join(pages.get(number, [])) for number in range(max(pages, default=-1) + 1)]
+        return [texts[number] for number in _select(texts, page_range)]
+
+    def page_count(self, content):
+        return len(self.extract_pages(content))
+
+
+BACKEND_CLASSES = {
+    cls.name: cls for cls in (PyMuPDFBackend, PypdfBackend, PyPDF2Backend, UnstructuredBackend)
+}
+_loaded = {}
+
+
+def get_backend(name):
+    """Arka ucu (ilk kullanımda) yükle; kütüphane yüklü değilse None"""
+    if name not in _loaded:
+        try:
+            _loaded[name] = BACKEND_CLASSES[name]()
+        except ImportError:
+            _loaded[name] = None
+    return _loaded[name]
+
+
+def iter_backends(order):
+    """Sıradaki arka uçlardan yüklü olanlar; her biri ancak sırası gelince import edilir"""
+    for name in order:
+        backend = get_backend(name)
+        if backend is not None:
+            yield backend
+
+
+def installed_versions(order):
+    """
+    {arka uç adı: paket sürümü} - sadece kurulu olanlar.
+
+    Paketler import edilmeden (unstructured'ın import'u saniyeler sürer)
+    paket metadata'sından okunur.
+    """
+    versions = {}
+    for name in order:
+        try:
+            versions[name] = metadata.version(BACKEND_CLASSES[name].distribution)
+        except metadata.PackageNotFoundError:
+            continue
+    return versions
+
+
+def backend_signature(order):
+    """Kurulu arka uçlar + sürümleri; çıkarma önbelleği anahtarına girer"""
+    return "+".join(f"{name}-{version}" for name, version in installed_versions(order).items()) or "none"
+
+
+def page_count(content, order):
+    """PDF'in sayfa sayısı; hiçbir arka uç açamazsa None"""
+    for backend in iter_backends(order):
+        try:
+            return backend.page_count(content)
+        except Exception:
+            continue
+    return None
+
+
+def extract_pdf_pages(content, order, page_range=None):
+    """
+    PDF'i sayfa metinlerine çevir, hata veren arka uçtan sıradakine geç.
+
+    Args:
+        content: PDF baytları (bytes veya memoryview)
+        order: Denenecek arka uç adları, öncelik sırasıyla
+        page_range: (başlangıç, bitiş) sayfa aralığı; None ise tüm sayfalar
+
+    Returns:
+        tuple: (sayfa metinleri listesi, kullanılan arka uç adı)
+
+    Raises:
+        RuntimeError: Hiçbir arka uç yüklü değilse veya hepsi başarısız olduysa
+    """
+    errors = []
+    for backend in iter_backends(order):
+        try:
+            with METRICS.time("chatbot_pdf_backend_seconds", help="Arka uç başına PDF çıkarma süresi",
+                              backend=backend.name):
+                pages = backend.extract_pages(content, page_range)
+        except Exception as e:
+            METRICS.inc("chatbot_pdf_backend_failures_total", help="Sıradaki arka uca geçilen PDF'ler",
+                        backend=backend.name)
+            errors.append(f"{backend.name}: {e}")
+            continue
+        return pages, backend.name
+    if not errors:
+        raise RuntimeError(f"Yüklü PDF arka ucu yok (denenen: {', '.join(order)})")
+    raise RuntimeError("PDF hiçbir arka uçla okunamadı - " + "; ".join(errors))
@@ -0,0 +1,128 @@
+"""
+RERANKER.PY - CROSS-ENCODER İLE YENİDEN SIRALAMA (RETRIEVE-MANY, RERANK-FEW)
+
+SEARCH_K'yi büyütmek recall'u artırır ama "stuff" prompt'unu şişirip
+flan-t5/Gemini üretimini yavaşlatır. Bu modülde arayıcıdan ~30 aday çekilir,
+küçük çok dilli bir cross-encoder ile CPU'da batch'ler halinde puanlanır ve
+prompt'a sadece en iyi top_n parça konur.
+
+Kaç adayın puanlanacağına gecikme bütçesi karar verir: adaylar arayıcı
+sırasıyla batch batch puanlanır; bir sonraki batch'in (ölçülen çift başı
+süreye göre) bütçeyi aşacağı tahmin edilirse durulur. Puanlanmayan adaylar
+puanlananların arkasına, arayıcı sırasıyla eklenir.
+"""
+
+import threading
+import time
+
+try:
+    from langchain_core.callbacks import CallbackManagerForRetrieverRun
+    from langchain_core.retrievers import BaseRetriever
+except ImportError:
+    from langchain.callbacks.manager import CallbackManagerForRetrieverRun
+    from langchain.schema import BaseRetriever
+
+from metrics import METRICS
+
+# Türkçe dahil çok dilli, MiniLM tabanlı küçük cross-encoder (CPU'da çift başı birkaç ms)
+DEFAULT_RERANK_MODEL = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+
+
+class CrossEncoderReranker:
+    def __init__(self, model_name=DEFAULT_RERANK_MODEL, batch_size=16, max_length=256,
+                 latency_budget_ms=400, scorer=None):
+        """
+        Args:
+            model_name: sentence-transformers CrossEncoder model adı
+            batch_size: Modele tek seferde gönderilen (soru, parça) çifti sayısı
+            max_length: Çift başına maksimum token sayısı (uzun parçalar kırpılır)
+            latency_budget_ms: Bir sorgu için yeniden sıralamaya ayrılan süre (None = sınırsız)
+            scorer: (soru, metin) çifti listesi alıp puan listesi döndüren fonksiyon;
+                verilirse model yüklenmez (benchmark / yerel deneme için)
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.latency_budget_ms = latency_budget_ms
+        self.scorer = scorer
+        self.ms_per_pair = None     # Üstel ortalama (çağrılar arası taşınır)
+        self.last_stats = None      # Son çağrının {'candidates', 'scored', 'ms'} bilgisi
+        self._lock = threading.Lock()
+        self._unavailable = False
+
+    def load(self):
+        """Cross-encoder'ı (henüz yüklenmediyse) yükle; yüklenemezse None döndür"""
+        if self.scorer is None and not self._unavailable:
+            with self._lock:
+                if self.scorer is None and not self._unavailable:
+                    try:
+                        from sentence_transformers import CrossEncoder
+                        model = CrossEncoder(self.model_name, max_length=self.max_length, device="cpu")
+                        self.scorer = lambda pairs: model.predict(
+                            pairs, batch_size=self.batch_size, show_progress_bar=False
+                        )
+                    except Exception as e:
+                        print(f"⚠️ Cross-encoder yüklenemedi, yeniden sıralama kapalı: {e}")
+                        self._unavailable = True
+        return self.scorer
+
+    def _batch_fits(self, elapsed_ms, batch_len):
+        """Bir sonraki batch bütçeye sığar mı (ilk batch her zaman puanlanır)"""
+        if self.latency_budget_ms is None or elapsed_ms == 0 or self.ms_per_pair is None:
+            return True
+        return elapsed_ms + self.ms_per_pair * batch_len <= self.latency_budget_ms
+
+    def _update_cost(self, batch_ms, batch_len):
+        per_pair = batch_ms / batch_len
+        if self.ms_per_pair is None:
+            self.ms_per_pair = per_pair
+        else:
+            self.ms_per_pair = 0.8 * self.ms_per_pair + 0.2 * per_pair
+
+    def rerank(self, query, documents, top_n=4):
+        """
+        Adayları cross-encoder puanına göre sırala.
+
+        Returns:
+            list[Document]: En iyi top_n parça
+        """
+        scorer = self.load()
+        if scorer is None or len(documents) <= 1:
+            return list(documents[:top_n])
+
+        start = time.perf_counter()
+        elapsed_ms = 0.0
+        scores = []
+        while len(scores) < len(documents):
+            batch = documents[len(scores):len(scores) + self.batch_size]
+            if not self._batch_fits(elapsed_ms, len(batch)):
+                break
+            batch_start = time.perf_counter()
+            scores.extend(float(s) for s in scorer([(query, doc.page_content) for doc in batch]))
+            self._update_cost((time.perf_counter() - batch_start) * 1000, len(batch))
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+        scored = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+        order = scored + list(range(len(scores), len(documents)))
+        self.last_stats = {"candidates": len(documents), "scored": len(scores), "ms": elapsed_ms}
+        METRICS.observe("chatbot_rerank_seconds", elapsed_ms / 1000, help="Cross-encoder puanlama süresi")
+        METRICS.inc("chatbot_rerank_skipped_total", len(documents) - len(scores),
+                    help="Gecikme bütçesi yüzünden puanlanmayan adaylar")
+        return [documents[i] for i in order[:top_n]]
+
+
+class RerankingRetriever(BaseRetriever):
+    """Alttaki arayıcıdan çok aday çekip cross-encoder ile en iyi top_n'i döndüren retriever"""
+
+    base_retriever: object
+    reranker: object
+    top_n: int = 4
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _get_relevant_documents(self, query, *, run_manager: CallbackManagerForRetrieverRun):
+        candidates = self.base_retriever.get_relevant_documents(
+            query, callbacks=run_manager.get_child()
+        )
+        return self.reranker.rerank(query, candidates, self.top_n)
@@ -0,0 +1,342 @@
+"""
+SHARDED_INDEX.PY - PARÇALANMIŞ (SHARDED) VEKTÖR İNDEKSİ
+
+Tek bir Chroma koleksiyonu / FAISS indeksi büyüdükçe hem kurma süresi hem
+sorgu gecikmesi korpusla doğrusal artar. Bu modül parçaları N yerel indekse
+(shard) dağıtır:
+
+    bölme   : Parça ID'sine ("hash") veya kaynak dosyaya ("source") göre jump
+              consistent hash; shard sayısı N'den N+1'e çıkınca parçaların
+              sadece ~1/(N+1)'i yer değiştirir, kalanı yerinde kalır
+    kurma   : Embedding'ler ana process'te bir kez hesaplanır (önbellek
+              sayesinde taşınan parçalar yeniden embed edilmez); her shard
+              ayrı bir worker process'te build_or_update_index ile artımlı kurulur
+    arama   : Sorgu bir kez embed edilir, tüm shard'lara thread havuzundan
+              eşzamanlı gönderilir (FAISS ve SQLite aramada GIL'i bırakır),
+              her shard'ın top-k'sı benzerliğe göre birleştirilir
+
+Her shard persist dizini altında kendi manifest'iyle normal bir indekstir
+(shard_000, shard_001, ...); shard düzeni shards.json'da tutulur. Shard
+sayısı veya bölme şekli değişince aynı çağrı yeniden dengeler: parçalar yeni
+shard'larına eklenir, eskilerinden silinir, fazla shard dizinleri kaldırılır.
+
+ShardedVectorStore bir LangChain VectorStore'udur; as_retriever(),
+HybridRetriever ve RetrievalQA.from_chain_type ile olduğu gibi kullanılır.
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    from langchain_core.documents import Document
+    from langchain_core.vectorstores import VectorStore
+except ImportError:
+    from langchain.schema import Document
+    from langchain.schema.vectorstore import VectorStore
+
+from embedding_cache import LazyEmbeddings, PrecomputedEmbeddings
+from metrics import METRICS
+from vector_backends import FaissVectorStore, open_vector_store, settings_changed
+from vector_index import build_or_update_index, chunk_ids, embedding_name, load_manifest
+
+SHARD_MANIFEST_FILENAME = "shards.json"
+SHARD_MANIFEST_VERSION = 1
+PARTITIONS = ("hash", "source")
+
+
+def jump_hash(key, num_buckets):
+    """Jump consistent hash (Lamping & Veach): 64-bit anahtar -> [0, num_buckets)"""
+    bucket, candidate = -1, 0
+    while candidate < num_buckets:
+        bucket = candidate
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def shard_of(chunk_id, metadata, num_shards, partition="hash"):
+    """Parçanın shard'ı; "source" bölmede aynı dosyanın parçaları aynı shard'a düşer"""
+    key = str(metadata.get("source", "")) if partition == "source" else chunk_id
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return jump_hash(int.from_bytes(digest, "big"), num_shards)
+
+
+def shard_directory(persist_directory, shard):
+    return os.path.join(persist_directory, f"shard_{shard:03d}")
+
+
+def load_shard_manifest(persist_directory):
+    """shards.json'u oku, yoksa veya bozuksa None döndür"""
+    try:
+        with open(os.path.join(persist_directory, SHARD_MANIFEST_FILENAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != SHARD_MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def _save_shard_manifest(persist_directory, num_shards, partition, emb_name, backend):
+    path = os.path.join(persist_directory, SHARD_MANIFEST_FILENAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"version": SHARD_MANIFEST_VERSION, "num_shards": num_shards, "partition": partition,
+                   "embedding": emb_name, "backend": backend}, f)
+    os.replace(path + ".tmp", path)
+
+
+def _expected_backend_label(backend, backend_options):
+    # vector_backends.backend_label ile aynı; shard'ı açmadan manifest'le karşılaştırmak için
+    if backend == "faiss":
+        return f"faiss:{(backend_options or {}).get('index_type', 'hnsw')}"
+    return "chroma"
+
+
+def shard_ids(persist_directory, emb_name, backend_label=None):
+    """
+    Shard manifest'lerinde kayıtlı parça ID'leri.
+
+    Returns:
+        dict: {parça ID'si: shard}; embedding modeli (veya arka uç) farklı shard'lar boş sayılır
+    """
+    manifest = load_shard_manifest(persist_directory)
+    located = {}
+    if manifest is None:
+        return located
+    for shard in range(manifest["num_shards"]):
+        shard_manifest = load_manifest(shard_directory(persist_directory, shard))
+        if shard_manifest is None or shard_manifest.get("embedding") != emb_name:
+            continue
+        if backend_label is not None and shard_manifest.get("backend", "chroma") != backend_label:
+            continue
+        for chunk_id in shard_manifest["ids"]:
+            located[chunk_id] = shard
+    return located
+
+
+def _model_not_loaded():
+    raise RuntimeError("Shard worker'ı embedding modeli yüklemez; vektörler ana process'ten gelmeli")
+
+
+def _build_shard(directory, ids, chunks, texts, vectors, emb_name, backend, backend_options):
+    """Worker process: tek bir shard'ı önceden hesaplanmış vektörlerle artımlı kur"""
+    class_name, _, model_name = emb_name.partition(":")
+    # Manifest'e asıl modelin adı yazılsın; model bu process'te hiç yüklenmez
+    embedding = PrecomputedEmbeddings(
+        dict(zip(texts, vectors.tolist())), LazyEmbeddings(_model_not_loaded, model_name, class_name)
+    )
+    start_time = time.perf_counter()
+    _, counts = build_or_update_index(chunks, embedding, directory, backend=backend,
+                                      backend_options=dict(backend_options or {}), ids=ids)
+    counts["seconds"] = time.perf_counter() - start_time
+    counts["chunks"] = len(set(ids))
+    return counts
+
+
+def build_sharded_index(chunks, embedding, persist_directory, num_shards, partition="hash",
+                        backend="chroma", backend_options=None, workers=None):
+    """
+    Parçaları num_shards shard'a dağıtıp her shard'ı paralel ve artımlı kur.
+
+    Args:
+        chunks: İndekslenecek parçalar (Document listesi veya ChunkStore)
+        embedding: LangChain embedding nesnesi (sadece ana process'te kullanılır)
+        persist_directory: Shard dizinlerinin kök dizini
+        num_shards: Shard sayısı; öncekinden farklıysa parçalar yeniden dengelenir
+        partition: "hash" (parça ID'si) veya "source" (kaynak dosya)
+        backend: "chroma" veya "faiss"
+        backend_options: open_vector_store'a geçilen ayarlar
+        workers: Aynı anda kurulan shard sayısı (None = min(num_shards, CPU sayısı))
+
+    Returns:
+        tuple: (ShardedVectorStore, {'added', 'deleted', 'kept', 'moved', 'shards'} sayıları)
+    """
+    if partition not in PARTITIONS:
+        raise ValueError(f"Bilinmeyen shard bölme şekli: {partition} (seçenekler: {PARTITIONS})")
+    if num_shards < 1:
+        raise ValueError("num_shards en az 1 olmalı")
+    os.makedirs(persist_directory, exist_ok=True)
+    emb_name = embedding_name(embedding)
+    located = shard_ids(persist_directory, emb_name, _expected_backend_label(backend, backend_options))
+    # Yapısal ayarları değişen shard'lar worker'da açılınca boşaltılır; parçaları yeniden embed edilmeli
+    reset = {shard for shard in set(located.values())
+             if settings_changed(backend, shard_directory(persist_directory, shard), **dict(backend_options or {}))}
+    located = {chunk_id: shard for chunk_id, shard in located.items() if shard not in reset}
+    previous = load_shard_manifest(persist_directory)
+
+    assigned = [[] for _ in range(num_shards)]
+    for chunk_id, chunk in zip(chunk_ids(chunks), chunks):
+        # ChunkView'lar depoyu referansla tutar; worker'lara sadece kendi parçaları gitsin
+        document = Document(page_content=chunk.page_content, metadata=chunk.metadata)
+        assigned[shard_of(chunk_id, document.metadata, num_shards, partition)].append((chunk_id, document))
+
+    # Shard'ında zaten olmayan her parçanın vektörü gerekir (yeni veya başka shard'dan taşınan)
+    missing = [[doc.page_content for chunk_id, doc in shard_chunks if located.get(chunk_id) != shard]
+               for shard, shard_chunks in enumerate(assigned)]
+    texts = list(dict.fromkeys(text for shard_texts in missing for text in shard_texts))
+    moved = sum(1 for shard, shard_chunks in enumerate(assigned)
+                for chunk_id, _ in shard_chunks if located.get(chunk_id, shard) != shard)
+    vectors = dict(zip(texts, embedding.embed_documents(texts))) if texts else {}
+
+    tasks = []
+    for shard, (shard_chunks, shard_texts) in enumerate(zip(assigned, missing)):
+        shard_texts = list(dict.fromkeys(shard_texts))
+        shard_vectors = np.asarray([vectors[text] for text in shard_texts], dtype=np.float32)
+        # ID'ler korpus üzerinden hesaplandı; shard'ın alt kümesinde sıra numaraları farklı çıkardı
+        tasks.append((shard_directory(persist_directory, shard), [chunk_id for chunk_id, _ in shard_chunks],
+                      [doc for _, doc in shard_chunks],
+                      shard_texts, shard_vectors, emb_name, backend, backend_options))
+
+    workers = min(num_shards, workers or os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_build_shard, *zip(*tasks)))
+    else:
+        results = [_build_shard(*task) for task in tasks]
+    for shard, result in enumerate(results):
+        METRICS.observe("chatbot_shard_build_seconds", result["seconds"],
+                        help="Tek bir shard'ın kurulma süresi", shard=str(shard))
+
+    # Küçülmede artık kullanılmayan shard'ların parçaları yeni yerlerine eklendi; dizinler kaldırılır
+    for shard in range(num_shards, previous["num_shards"] if previous else 0):
+        shutil.rmtree(shard_directory(persist_directory, shard), ignore_errors=True)
+    _save_shard_manifest(persist_directory, num_shards, partition, emb_name,
+                         _expected_backend_label(backend, backend_options))
+
+    counts = {
+        "added": sum(result["added"] for result in results),
+        "deleted": sum(result["deleted"] for result in results),
+        "kept": sum(result["kept"] for result in results),
+        "moved": moved,
+        "shards": [result["chunks"] for result in results],
+    }
+    store = ShardedVectorStore(embedding, persist_directory, num_shards, partition=partition,
+                               backend=backend, backend_options=backend_options)
+    return store, counts
+
+
+class ShardedVectorStore(VectorStore):
+    def __init__(self, embedding, persist_directory, num_shards, partition="hash", backend="chroma",
+                 backend_options=None, query_threads=None):
+        """
+        Args:
+            embedding: Sorgular (ve add_texts) için LangChain embedding nesnesi
+            persist_directory: build_sharded_index'in kök dizini
+            num_shards: Shard sayısı
+            partition: "hash" veya "source" (add_texts'in yönlendirmesi için)
+            backend: "chroma" veya "faiss"
+            backend_options: open_vector_store'a geçilen ayarlar
+            query_threads: Eşzamanlı aranan shard sayısı (None = num_shards)
+        """
+        self._embedding = embedding
+        self.persist_directory = persist_directory
+        self.partition = partition
+        self.shards = [
+            open_vector_store(backend, embedding, shard_directory(persist_directory, shard),
+                              **dict(backend_options or {}))
+            for shard in range(num_shards)
+        ]
+        threads = query_threads or num_shards
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="shard") if threads > 1 else None
+
+    @property
+    def embeddings(self):
+        return self._embedding
+
+    # ------------------------------------------------------------------
+    # Arama
+    # ------------------------------------------------------------------
+    def _search_shard(self, shard, embedding, k, filter):
+        """(Document, benzerlik) çiftleri; Chroma mesafesi benzerliğe çevrilir (büyük = yakın)"""
+        start_time = time.perf_counter()
+        store = self.shards[shard]
+        if isinstance(store, FaissVectorStore):
+            results = store.similarity_search_with_score_by_vector(embedding, k=k, filter=filter)
+        elif store._collection.count():
+            results = [(doc, -distance) for doc, distance in
+                       store.similarity_search_by_vector_with_relevance_scores(embedding, k=k, filter=filter)]
+        else:
+            results = []
+        METRICS.observe("chatbot_shard_search_seconds", time.perf_counter() - start_time,
+                        help="Tek bir shard'daki arama süresi", shard=str(shard))
+        return results
+
+    def similarity_search_with_score_by_vector(self, embedding, k=4, filter=None, **kwargs):
+        """
+        Tüm shard'larda ara (dağıt), her shard'ın top-k'sını benzerliğe göre birleştir (topla).
+
+        Returns:
+            list: (Document, benzerlik) çiftleri, benzerliğe göre azalan
+        """
+        shards = range(len(self.shards))
+        if self._executor is None:
+            partials = [self._search_shard(shard, embedding, k, filter) for shard in shards]
+        else:
+            futures = [self._executor.submit(self._search_shard, shard, embedding, k, filter) for shard in shards]
+            partials = [future.result() for future in futures]
+        return heapq.nlargest(k, (pair for partial in partials for pair in partial), key=lambda pair: pair[1])
+
+    def similarity_search_with_score(self, query, k=4, filter=None, **kwargs):
+        return self.similarity_search_with_score_by_vector(self._embedding.embed_query(query), k=k, filter=filter)
+
+    def similarity_search_by_vector(self, embedding, k=4, filter=None, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k=k, filter=filter)]
+
+    def similarity_search(self, query, k=4, filter=None, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, filter=filter)]
+
+    def _select_relevance_score_fn(self):
+        if isinstance(self.shards[0], FaissVectorStore):
+            return self.shards[0]._select_relevance_score_fn()
+        # Chroma'nın L2 mesafesi birleştirmede negatiflenir: 1 - mesafe / sqrt(2)
+        return lambda similarity: 1.0 + similarity / 2 ** 0.5
+
+    # ------------------------------------------------------------------
+    # Yazma
+    # ------------------------------------------------------------------
+    def add_texts(self, texts, metadatas=None, ids=None, **kwargs):
+        """Metinleri bölme şekline göre shard'larına ekle (ID'ler verilmezse Document'tan üretilir)"""
+        texts = list(texts)
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+        if ids is None:
+            ids = chunk_ids([Document(page_content=text, metadata=metadata)
+                             for text, metadata in zip(texts, metadatas)])
+        groups = {}
+        for chunk_id, text, metadata in zip(ids, texts, metadatas):
+            shard = shard_of(chunk_id, metadata, len(self.shards), self.partition)
+            groups.setdefault(shard, ([], [], []))
+            for values, value in zip(groups[shard], (chunk_id, text, metadata)):
+                values.append(value)
+        for shard, (group_ids, group_texts, group_metadatas) in groups.items():
+            self.shards[shard].add_texts(group_texts, metadatas=group_metadatas, ids=group_ids)
+        return list(ids)
+
+    def delete(self, ids=None, **kwargs):
+        if not ids:
+            return False
+        for store in self.shards:
+            store.delete(ids=list(ids))
+        return True
+
+    def persist(self):
+        for store in self.shards:
+            store.persist()
+
+    def __len__(self):
+        return sum(len(store) if isinstance(store, FaissVectorStore) else store._collection.count()
+                   for store in self.shards)
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, ids=None, persist_directory="sharded_db",
+                   num_shards=2, **kwargs):
+        documents = [Document(page_content=text, metadata=metadata)
+                     for text, metadata in zip(texts, metadatas or [{} for _ in texts])]
+        store, _ = build_sharded_index(documents, embedding, persist_directory, num_shards, **kwargs)
+        return store
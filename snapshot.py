@@ -0,0 +1,81 @@
+"""
+SNAPSHOT.PY - SICAK AÇILIŞ (WARM SNAPSHOT) İÇİN KORPUS ANLIK GÖRÜNTÜSÜ
+
+Soğuk açılışta indirilen, ayrıştırılan ve parçalara bölünen korpusu
+(parçalar + sözlük girdileri) diske yazar. Sonraki açılışlarda, korpusu
+etkileyen ayarlar değişmediyse HF indirmesi, PDF ayrıştırma ve bölme
+adımları atlanır ve anlık görüntü saniyeler içinde okunur.
+
+Parçalar ChunkStore biçiminde (bitişik metin tamponu + sütunsal metadata)
+yazılır ve bellek eşlemeli okunur; sıcak açılışta korpus heap'e kopyalanmaz.
+"""
+
+import json
+import os
+import pickle
+import time
+
+from chunk_store import ChunkStore
+
+SNAPSHOT_FORMAT_VERSION = 2
+MANIFEST_FILENAME = "snapshot.json"
+CORPUS_FILENAME = "corpus.pkl"
+CHUNKS_DIRNAME = "chunks"
+
+
+def save_snapshot(directory, chunks, glossary_entries, settings):
+    """
+    Korpusu atomik olarak kaydet.
+
+    Args:
+        directory: Anlık görüntü dizini
+        chunks: Parçalar (ChunkStore veya Document listesi)
+        glossary_entries: (terim, tanım, kaynak) listesi
+        settings: Korpusu etkileyen ayarlar (değişirse anlık görüntü geçersiz olur)
+    """
+    os.makedirs(directory, exist_ok=True)
+    if not isinstance(chunks, ChunkStore):
+        chunks = ChunkStore.from_documents(chunks)
+    chunks.save(os.path.join(directory, CHUNKS_DIRNAME))
+    corpus_path = os.path.join(directory, CORPUS_FILENAME)
+    with open(corpus_path + ".tmp", "wb") as f:
+        pickle.dump({"glossary_entries": glossary_entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(corpus_path + ".tmp", corpus_path)
+
+    manifest_path = os.path.join(directory, MANIFEST_FILENAME)
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({
+            "version": SNAPSHOT_FORMAT_VERSION,
+            "created_at": time.time(),
+            "settings": settings,
+            "chunk_count": len(chunks),
+            "glossary_count": len(glossary_entries),
+        }, f, ensure_ascii=False, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+
+def load_snapshot(directory, settings):
+    """
+    Ayarlar eşleşiyorsa anlık görüntüyü oku.
+
+    Returns:
+        dict | None: {'chunks' (bellek eşlemeli ChunkStore), 'glossary_entries', 'created_at'} veya None
+    """
+    try:
+        with open(os.path.join(directory, MANIFEST_FILENAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != SNAPSHOT_FORMAT_VERSION or manifest.get("settings") != settings:
+        return None
+
+    try:
+        with open(os.path.join(directory, CORPUS_FILENAME), "rb") as f:
+            corpus = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    corpus["chunks"] = ChunkStore.load(os.path.join(directory, CHUNKS_DIRNAME))
+    if corpus["chunks"] is None or len(corpus["chunks"]) != manifest.get("chunk_count"):
+        return None
+    corpus["created_at"] = manifest["created_at"]
+    return corpus
@@ -0,0 +1,6 @@
+"""Testler depo kökündeki modülleri (ve benchmarks.synthetic_data'yı) doğrudan import eder."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,26 @@
+"""SemanticAnswerCache: embedding modeli (vektör boyutu) değişince eski kayıtlar sorguyu bozmamalı."""
+
+from answer_cache import SemanticAnswerCache
+
+
+def test_reopen_with_different_dimension_drops_stale_entries(tmp_path):
+    path = str(tmp_path / "answers.pkl")
+    cache = SemanticAnswerCache(path=path, threshold=0.9, index_version="v1")
+    cache.put("Kanban nedir?", [1.0, 0.0, 0.0], "Bir çekme sistemi.")
+    assert cache.lookup([1.0, 0.0, 0.0])["answer"] == "Bir çekme sistemi."
+
+    # Aynı index_version ile (ör. eski sürüm anahtarı) farklı boyutlu bir modelle yeniden açılış
+    reopened = SemanticAnswerCache(path=path, threshold=0.9, index_version="v1")
+    assert reopened.stats()["entries"] == 1
+    assert reopened.lookup([0.5, 0.5, 0.5, 0.5, 0.0]) is None
+    assert reopened.stats()["entries"] == 0
+
+    reopened.put("Kanban nedir?", [0.0, 1.0, 0.0, 0.0, 0.0], "Yeni cevap.")
+    assert reopened.lookup([0.0, 1.0, 0.0, 0.0, 0.0])["answer"] == "Yeni cevap."
+
+
+def test_index_version_change_resets_cache(tmp_path):
+    path = str(tmp_path / "answers.pkl")
+    SemanticAnswerCache(path=path, index_version="chunks:modelA:llm").put("Soru", [1.0, 0.0], "Cevap")
+    assert SemanticAnswerCache(path=path, index_version="chunks:modelA:llm").stats()["entries"] == 1
+    assert SemanticAnswerCache(path=path, index_version="chunks:modelB:llm").stats()["entries"] == 0
@@ -0,0 +1,56 @@
+"""MicroBatcher: hatalı üreticiler worker thread'ini öldürmemeli, bekleyen Future bırakmamalı."""
+
+import pytest
+
+from batch_generator import MicroBatcher
+
+
+def test_short_output_fails_all_requests_and_worker_survives():
+    calls = []
+
+    def generate(prompts):
+        calls.append(len(prompts))
+        if len(calls) == 1:
+            return [p.upper() for p in prompts][:-1]  # Bir çıktı eksik
+        return [p.upper() for p in prompts]
+
+    batcher = MicroBatcher(generate, max_batch_size=4, max_wait_ms=50)
+    futures = [batcher.submit(prompt) for prompt in ("a", "b", "c")]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+    assert batcher.generate("d", timeout=5) == "D"
+    batcher.stop()
+
+
+def test_failure_after_partial_results_keeps_worker_alive():
+    class BrokenStream:
+        """Cevap yazılırken hata veren akış (batch'teki ilk Future sonuçlandıktan sonra)"""
+
+        written = False
+
+        def put(self, text):
+            raise ValueError("akış kapandı")
+
+        def end(self):
+            pass
+
+    batcher = MicroBatcher(lambda prompts: list(prompts), max_batch_size=2, max_wait_ms=200)
+    first = batcher.submit("x")
+    second = batcher.submit("y", BrokenStream())
+    assert first.result(timeout=5) == "x"
+    with pytest.raises(ValueError):
+        second.result(timeout=5)
+    assert batcher.batch_sizes == [2]
+    assert batcher.generate("z", timeout=5) == "z"
+    batcher.stop()
+
+
+def test_stream_receives_error_instead_of_hanging():
+    def generate(prompts):
+        raise RuntimeError("model yok")
+
+    batcher = MicroBatcher(generate)
+    with pytest.raises(RuntimeError):
+        list(batcher.stream("soru"))
+    batcher.stop()
@@ -0,0 +1,63 @@
+"""
+ChunkSplitter'ın RecursiveCharacterTextSplitter ile birebir aynı parçaları
+(metin, start_index dahil metadata) ürettiğini doğrular. Korpus ve uç durumlar
+benchmarks/bench_text_splitter.py'dekilerle aynıdır; token modunda korpus
+üzerinde eğitilen küçük BPE tokenizer'ı kullanılır (ağ/transformers gerekmez).
+"""
+
+import pytest
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from benchmarks.bench_text_splitter import SEPARATOR_SETS, make_documents, train_fallback_tokenizer
+from chunk_splitter import ChunkSplitter, token_counter
+
+CHAR_SIZES = [(800, 150), (120, 30), (50, 0)]
+TOKEN_SIZES = [(256, 48), (32, 8)]
+
+
+@pytest.fixture(scope="module")
+def documents():
+    return make_documents(80)
+
+
+@pytest.fixture(scope="module")
+def count_tokens(documents):
+    return token_counter(train_fallback_tokenizer(documents, vocab_size=500))
+
+
+def splitter_kwargs(separators, size, overlap):
+    kwargs = {"chunk_size": size, "chunk_overlap": overlap, "add_start_index": True}
+    if separators is not None:
+        kwargs["separators"] = separators
+    return kwargs
+
+
+def assert_same_chunks(expected, actual):
+    assert [doc.page_content for doc in actual] == [doc.page_content for doc in expected]
+    assert [doc.metadata for doc in actual] == [doc.metadata for doc in expected]
+
+
+@pytest.mark.parametrize("separators", list(SEPARATOR_SETS.values()), ids=list(SEPARATOR_SETS))
+@pytest.mark.parametrize("size,overlap", CHAR_SIZES)
+def test_character_mode_matches_langchain(documents, separators, size, overlap):
+    kwargs = splitter_kwargs(separators, size, overlap)
+    expected = RecursiveCharacterTextSplitter(**kwargs).split_documents(documents)
+    actual = ChunkSplitter(**kwargs).split_documents(documents)
+    assert_same_chunks(expected, actual)
+
+
+@pytest.mark.parametrize("separators", list(SEPARATOR_SETS.values()), ids=list(SEPARATOR_SETS))
+@pytest.mark.parametrize("size,overlap", TOKEN_SIZES)
+def test_token_mode_matches_langchain(documents, count_tokens, separators, size, overlap):
+    kwargs = splitter_kwargs(separators, size, overlap)
+    expected = RecursiveCharacterTextSplitter(length_function=lambda text: count_tokens([text])[0],
+                                              **kwargs).split_documents(documents)
+    actual = ChunkSplitter(batch_length_function=count_tokens, **kwargs).split_documents(documents)
+    assert_same_chunks(expected, actual)
+
+
+def test_metadata_is_copied_per_chunk(documents):
+    chunks = ChunkSplitter(chunk_size=120, chunk_overlap=30, add_start_index=True).split_documents(documents[:3])
+    chunks[0].metadata["source"] = "değişti"
+    assert documents[0].metadata["source"] != "değişti"
+    assert all("start_index" not in doc.metadata for doc in documents)
@@ -0,0 +1,62 @@
+"""
+process_dataset_files'ın PDF/ZIP çıkarmayı tamamen bellekte yaptığını doğrular:
+geçici dosya API'leri hata fırlatacak şekilde yamalanır, geçici dizinin içeriği
+önce ve sonra karşılaştırılır ve dönüş sözleşmesi (sayfa başına Document,
+source/filename/type/page metadata'sı) kontrol edilir.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+from benchmarks.synthetic_data import make_pdf, make_zip
+from chunk_store import ChunkStore
+from data_loader import PDF_SUPPORT, TutkuSupplyChainLoader
+
+pytestmark = pytest.mark.skipif(not PDF_SUPPORT, reason="PDF arka ucu yüklü değil")
+
+PAGES = ["supplier lead time page one", "safety stock page two"]
+ZIP_PAGES = ["warehouse inventory zip page"]
+
+
+def _no_tempfiles(*args, **kwargs):
+    raise AssertionError("Çıkarma sırasında geçici dosya oluşturuldu")
+
+
+@pytest.fixture
+def forbid_tempfiles(monkeypatch):
+    for name in ("NamedTemporaryFile", "TemporaryFile", "SpooledTemporaryFile",
+                 "TemporaryDirectory", "mkstemp", "mkdtemp"):
+        monkeypatch.setattr(tempfile, name, _no_tempfiles)
+    before = set(os.listdir(tempfile.gettempdir()))
+    yield
+    assert set(os.listdir(tempfile.gettempdir())) - before == set()
+
+
+def test_nested_zip_pdf_extracted_without_tempfiles(forbid_tempfiles):
+    inner = make_zip({"docs/inner.pdf": make_pdf(ZIP_PAGES)})
+    outer = make_zip({"nested/inner.zip": inner, "readme.md": b"atlanir"})
+    loader = TutkuSupplyChainLoader()
+    loader.dataset = [
+        {"file_name": "rapor.pdf", "content": make_pdf(PAGES)},
+        {"file_name": "arsiv.zip", "content": outer},
+        {"file_name": "notlar.txt", "content": b"demand forecast note"},
+    ]
+
+    documents = loader.process_dataset_files(parallel=False, use_cache=False)
+
+    assert isinstance(documents, ChunkStore)
+    assert documents is loader.documents
+    metadata = [dict(doc.metadata) for doc in documents]
+    assert metadata == [
+        {"source": "pdf_0", "filename": "rapor.pdf", "type": "pdf", "page": 0},
+        {"source": "pdf_0", "filename": "rapor.pdf", "type": "pdf", "page": 1},
+        {"source": "zip_1", "filename": "arsiv.zip/nested/inner.zip/docs/inner.pdf",
+         "type": "zip_content", "page": 0},
+        {"source": "txt_2", "filename": "notlar.txt", "type": "text"},
+    ]
+    texts = [doc.page_content for doc in documents]
+    for text, expected in zip(texts, PAGES + ZIP_PAGES):
+        assert expected in text
+    assert texts[-1] == "demand forecast note"
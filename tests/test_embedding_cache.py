@@ -0,0 +1,57 @@
+"""CachedEmbeddings: sadece korpus metinleri diske yazılır; sorgu ve cümle vektörleri bellekte kalır."""
+
+import os
+
+from langchain.schema import Document
+
+from benchmarks.synthetic_data import HashingEmbeddings
+from context_compressor import ContextCompressor
+from embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(HashingEmbeddings):
+    def __init__(self):
+        super().__init__(dim=32)
+        self.embedded = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return super().embed_documents(texts)
+
+
+def persisted_rows(cache):
+    with open(os.path.join(cache.cache_dir, "keys.txt"), encoding="ascii") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def test_context_compression_does_not_persist_sentences(tmp_path):
+    model = CountingEmbeddings()
+    cache = CachedEmbeddings(model, str(tmp_path), query_cache_size=256)
+    documents = [
+        Document(page_content=" ".join(f"Cümle {d}-{s} tedarik zinciri stok seviyesi hakkında bilgi verir."
+                                       for s in range(12)), metadata={"source": f"doc_{d}"})
+        for d in range(3)
+    ]
+    cache.embed_documents([doc.page_content for doc in documents])  # İndeksleme: korpus diske yazılır
+    assert persisted_rows(cache) == 3
+
+    compressor = ContextCompressor(cache, lambda text: len(text.split()), max_input_tokens=40)
+    compressed = compressor.compress("stok seviyesi nedir?", documents)
+    assert compressor.last_stats["sentences"] > len(documents)
+    assert sum(len(doc.page_content.split()) for doc in compressed) <= 40
+    assert persisted_rows(cache) == 3
+
+    # Aynı cümleler ikinci soruda bellek içi LRU'dan gelir
+    embedded = model.embedded
+    compressor.compress("stok seviyesi nedir?", documents)
+    assert model.embedded == embedded
+    assert persisted_rows(cache) == 3
+
+
+def test_in_memory_vectors_match_model_and_lru_is_bounded(tmp_path):
+    model = CountingEmbeddings()
+    cache = CachedEmbeddings(model, str(tmp_path), query_cache_size=2)
+    texts = ["birinci cümle", "ikinci cümle", "üçüncü cümle"]
+    assert cache.embed_documents_in_memory(texts) == model.embed_documents(texts)
+    assert cache.stats()["queries"] == 2
+    assert not os.path.exists(os.path.join(cache.cache_dir, "vectors.bin"))
@@ -0,0 +1,139 @@
+"""
+AsyncGeminiClient ve RequestCoalescer'ın benchmarks/gemini_stub.py taklidine
+karşı davranışı: 503'te tekrar deneme, 429'da Retry-After'a uyma, denemeler
+tükenince hata, uçuştaki aynı isteklerin birleştirilmesi ve event loop
+değişince eski oturumun kapatılması.
+"""
+
+import asyncio
+
+import pytest
+
+import gemini_async
+from benchmarks.gemini_stub import GeminiStub
+from gemini_async import AsyncGeminiClient, GeminiAPIError, RequestCoalescer
+
+
+def make_client(stub, **kwargs):
+    options = {"max_concurrency": 4, "pool_size": 4, "retry_base_seconds": 0.001, "retry_max_seconds": 0.5}
+    options.update(kwargs)
+    return AsyncGeminiClient(api_key="stub", model="gemini-pro", embedding_model="models/embedding-001",
+                             base_url=stub.base_url, **options)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """asyncio.sleep beklemelerini kaydet (taklidin gecikmesi ve aiohttp'nin sleep(0)'ları dahil)"""
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def recording_sleep(delay, *args, **kwargs):
+        delays.append(delay)
+        return await real_sleep(delay, *args, **kwargs)
+
+    monkeypatch.setattr(gemini_async.asyncio, "sleep", recording_sleep)
+    return delays
+
+
+def test_retries_transient_503():
+    async def run():
+        async with GeminiStub(latency_ms=1, failure_rate=0.4, dim=8, seed=3) as stub:
+            async with make_client(stub, max_retries=8) as client:
+                answers = await asyncio.gather(*(client.generate(f"soru {i}") for i in range(20)))
+            return stub, answers
+
+    stub, answers = asyncio.run(run())
+    assert all(answers)
+    assert stub.count("generate", 503) > 0
+    assert stub.count("generate") == 20
+
+
+def test_gives_up_after_max_retries():
+    async def run():
+        async with GeminiStub(latency_ms=1, failure_rate=1.0, dim=8) as stub:
+            async with make_client(stub, max_retries=2) as client:
+                with pytest.raises(GeminiAPIError) as error:
+                    await client.embed_query("kanban")
+            return stub, error.value
+
+    stub, error = asyncio.run(run())
+    assert error.status == 503
+    assert stub.count("embed", 503) == 3
+
+
+def test_honours_retry_after_on_429(sleeps):
+    async def run():
+        # Taklit aynı anda tek isteğe izin verir, fazlasına Retry-After: 0.05 ile 429 döner
+        async with GeminiStub(latency_ms=20, max_concurrent=1, dim=8) as stub:
+            async with make_client(stub, max_retries=50) as client:
+                vectors = await asyncio.gather(*(client.embed_query(f"metin {i}") for i in range(4)))
+            return stub, vectors
+
+    stub, vectors = asyncio.run(run())
+    assert len(vectors) == 4 and all(len(vector) == 8 for vector in vectors)
+    assert stub.count("embed", 429) > 0
+    backoffs = [delay for delay in sleeps if delay and delay != 0.02]  # Taklidin gecikmesi ve sleep(0) hariç
+    assert backoffs and all(delay >= 0.05 for delay in backoffs)
+
+
+def test_batch_embeddings_keep_order():
+    async def run():
+        async with GeminiStub(latency_ms=1, dim=8) as stub:
+            async with make_client(stub) as client:
+                texts = [f"envanter {i}" for i in range(7)]
+                return stub, texts, await client.embed_documents(texts, batch_size=3)
+
+    stub, texts, vectors = asyncio.run(run())
+    assert vectors == stub.embeddings.embed_documents(texts)
+    assert stub.count("batch_embed") == 3
+
+
+def test_coalescer_shares_inflight_calls():
+    async def run():
+        async with GeminiStub(latency_ms=50, dim=8) as stub:
+            async with make_client(stub) as client:
+                coalescer = RequestCoalescer()
+                answers = await asyncio.gather(*(
+                    coalescer.run("kanban nedir?", lambda: client.generate("Kanban nedir?")) for _ in range(10)
+                ))
+                # Çağrı bitince anahtar serbest kalır; sonraki istek yeni çağrı yapar
+                await coalescer.run("kanban nedir?", lambda: client.generate("Kanban nedir?"))
+            return stub, coalescer, answers
+
+    stub, coalescer, answers = asyncio.run(run())
+    assert len(set(answers)) == 1
+    assert coalescer.coalesced == 9
+    assert stub.count("generate") == 2
+
+
+def test_coalescer_propagates_errors_to_all_waiters():
+    async def run():
+        coalescer = RequestCoalescer()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(*(coalescer.run("k", failing) for _ in range(3)), return_exceptions=True)
+        return coalescer, results
+
+    coalescer, results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert coalescer._inflight == {}
+
+
+def test_new_event_loop_closes_previous_session():
+    client = make_client(GeminiStub())
+
+    async def ask():
+        async with GeminiStub(latency_ms=1, dim=8) as stub:
+            client.base_url = stub.base_url
+            await client.embed_query("kanban")
+            return client._session
+
+    first = asyncio.run(ask())
+    second = asyncio.run(ask())
+    assert first is not second
+    assert first.closed
+    asyncio.run(client.aclose())
+    assert second.closed
@@ -0,0 +1,35 @@
+"""FaissVectorStore: seçici metadata filtreleri de eşleşen parçaları bulmalı (Chroma'daki ön filtreleme gibi)."""
+
+import pytest
+
+from benchmarks.synthetic_data import HashingEmbeddings
+from vector_backends import FaissVectorStore
+
+
+@pytest.fixture
+def embeddings():
+    return HashingEmbeddings(dim=32)
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw"])
+def test_selective_filter_finds_matching_chunk(tmp_path, embeddings, index_type):
+    texts = [f"Parça {i}: tedarik zinciri ve stok yönetimi notu" for i in range(500)]
+    store = FaissVectorStore.from_texts(
+        texts, embeddings, metadatas=[{"i": i} for i in range(500)],
+        persist_directory=str(tmp_path), index_type=index_type,
+    )
+
+    results = store.similarity_search("Parça 3: tedarik zinciri", k=1, filter={"i": 450})
+    assert [doc.metadata["i"] for doc in results] == [450]
+
+    results = store.similarity_search("Parça 3: tedarik zinciri", k=4, filter={"i": 450})
+    assert [doc.metadata["i"] for doc in results] == [450]
+
+
+def test_filter_without_matches_returns_empty(tmp_path, embeddings):
+    store = FaissVectorStore.from_texts(
+        ["stok seviyesi", "teslimat süresi"], embeddings, metadatas=[{"i": 0}, {"i": 1}],
+        persist_directory=str(tmp_path), index_type="flat",
+    )
+    assert store.similarity_search("stok", k=2, filter={"i": 7}) == []
+    assert len(store.similarity_search("stok", k=2)) == 2
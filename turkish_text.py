@@ -0,0 +1,63 @@
+"""
+TURKISH_TEXT.PY - TÜRKÇE METİN NORMALİZASYONU VE TOKENİZASYON
+
+Arama ve eşleştirme için ortak yardımcılar:
+- Türkçe'ye uygun küçük harf çevirimi (I -> ı, İ -> i)
+- Aksan katlama (ç->c, ğ->g, ı->i, ö->o, ş->s, ü->u), böylece "sipariş" ile
+  "siparis" aynı terime düşer
+- Hafif ek (suffix) kırpma: çoğul, hal ve iyelik eklerinin en yaygınları
+"""
+
+import re
+
+_UPPER_MAP = str.maketrans({"I": "ı", "İ": "i"})
+_FOLD_MAP = str.maketrans({
+    "ç": "c", "ğ": "g", "ı": "i", "ö": "o", "ş": "s", "ü": "u",
+    "â": "a", "î": "i", "û": "u",
+})
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+# Katlanmış (ASCII) biçimde, uzundan kısaya sıralı ekler
+_SUFFIXES = sorted({
+    "lari", "leri", "larin", "lerin", "lar", "ler",
+    "nin", "nun", "dan", "den", "tan", "ten", "nda", "nde",
+    "da", "de", "ta", "te", "in", "un", "yi", "yu", "ya", "ye",
+    "si", "su", "i", "u", "a", "e",
+}, key=len, reverse=True)
+MIN_STEM_LENGTH = 3
+MAX_SUFFIX_STRIPS = 2
+
+
+def turkish_lower(text):
+    """Türkçe kurallarıyla küçük harfe çevir (I -> ı, İ -> i)"""
+    return text.translate(_UPPER_MAP).lower()
+
+
+def fold(text):
+    """Küçük harf + Türkçe karakterleri ASCII karşılıklarına katla"""
+    return turkish_lower(text).translate(_FOLD_MAP)
+
+
+def stem(token):
+    """En fazla iki yaygın eki kırp; kök MIN_STEM_LENGTH'ten kısa kalmaz"""
+    for _ in range(MAX_SUFFIX_STRIPS):
+        for suffix in _SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM_LENGTH:
+                token = token[:-len(suffix)]
+                break
+        else:
+            break
+    return token
+
+
+def tokenize(text, stemming=True):
+    """Metni normalize edilmiş (ve isteğe bağlı olarak eki kırpılmış) token'lara böl"""
+    tokens = _TOKEN_RE.findall(fold(text))
+    if stemming:
+        return [stem(token) for token in tokens]
+    return tokens
+
+
+def normalize(text):
+    """Boşlukları tekilleştirilmiş, katlanmış ve noktalaması atılmış metin"""
+    return " ".join(_TOKEN_RE.findall(fold(text)))
@@ -0,0 +1,535 @@
+"""
+VECTOR_BACKENDS.PY - DEĞİŞTİRİLEBİLİR VEKTÖR VERİTABANI (CHROMA / FAISS)
+
+Tüm arama Chroma'nın varsayılan ayarlarıyla yapılıyordu. Bu modül aynı
+LangChain VectorStore arayüzünü sunan ikinci bir arka uç ekler: yerel
+FAISS indeksi. Üç indeks tipi desteklenir:
+
+    flat  : Birebir (exact) iç çarpım araması; küçük korpuslar için
+    hnsw  : Graf tabanlı yaklaşık arama; büyük korpuslarda en düşük gecikme
+    ivfpq : Ters dosya + ürün nicemleme (PQ); vektör başına pq_m bayt,
+            en az bellek. Eğitim için yeterli vektör birikene kadar
+            parçalar birebir (flat) aranır.
+
+Vektörler normalize edilip iç çarpımla (kosinüs) aranır. İndeks dosyası
+persist dizinine yazılır ve açılışta bellek eşlemeli (mmap, salt okunur)
+okunur; vektörler süreç belleğine kopyalanmaz. Ekleme/silme gerektiğinde
+indeks yazılabilir olarak yeniden okunur. Parça metni ve metadata'sı
+indeksin yanındaki bir SQLite dosyasında tutulur; sadece dönen top-k
+parça okunur.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+
+import numpy as np
+
+try:
+    from langchain_core.documents import Document
+    from langchain_core.vectorstores import VectorStore
+except ImportError:
+    from langchain.schema import Document
+    from langchain.schema.vectorstore import VectorStore
+
+try:
+    from langchain_community.vectorstores import Chroma
+except ImportError:
+    from langchain.vectorstores import Chroma
+
+VECTOR_BACKENDS = ("chroma", "faiss")
+FAISS_INDEX_TYPES = ("flat", "hnsw", "ivfpq")
+DEFAULT_FAISS_OPTIONS = {
+    "hnsw_m": 32,            # HNSW graf derecesi (büyüdükçe recall ve bellek artar)
+    "ef_construction": 80,
+    "ef_search": 64,         # Sorgu sırasında gezilen aday sayısı
+    "nlist": 256,            # IVF küme sayısı (üst sınır; korpus küçükse azaltılır)
+    "nprobe": 16,            # Sorguda taranan küme sayısı
+    "pq_m": 48,              # PQ alt vektör sayısı = vektör başına bayt
+    "pq_bits": 8,
+}
+# İndeksin yapısını belirleyen ayarlar; ef_search/nprobe sorgu anında uygulanır, değişince yeniden kurma gerekmez
+STRUCTURAL_OPTIONS = ("hnsw_m", "ef_construction", "nlist", "pq_m", "pq_bits")
+HNSW_COMPACT_RATIO = 0.25    # Silinmiş (mezar taşı) vektör oranı bunu geçince HNSW yeniden kurulur
+FILTER_OVERSAMPLE = 4
+SQLITE_PARAM_BATCH = 900      # Tek sorgudaki "IN (...)" parametre sayısı (SQLite sınırı 999)
+
+
+def _faiss():
+    # faiss-cpu sadece FAISS arka ucu seçildiğinde gerekir
+    import faiss
+    return faiss
+
+
+def _normalized(vectors):
+    array = np.ascontiguousarray(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(array, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return array / norms
+
+
+def _settings_key(index_type, options):
+    options = {**DEFAULT_FAISS_OPTIONS, **(options or {})}
+    return json.dumps({"index_type": index_type, **{key: options[key] for key in STRUCTURAL_OPTIONS}},
+                      sort_keys=True)
+
+
+def _largest_divisor(dim, limit):
+    """dim'i bölen, limit'i aşmayan en büyük sayı (PQ alt vektör sayısı için)"""
+    for candidate in range(min(dim, limit), 0, -1):
+        if dim % candidate == 0:
+            return candidate
+    return 1
+
+
+class FaissVectorStore(VectorStore):
+    def __init__(self, embedding, persist_directory, index_type="hnsw", options=None, mmap=True):
+        """
+        Args:
+            embedding: LangChain embedding nesnesi
+            persist_directory: İndeks ve metadata dosyalarının dizini
+            index_type: "flat", "hnsw" veya "ivfpq"
+            options: DEFAULT_FAISS_OPTIONS'taki ayarların üzerine yazılacak değerler
+            mmap: Diskteki indeksi bellek eşlemeli aç (sorgu belleği için)
+        """
+        if index_type not in FAISS_INDEX_TYPES:
+            raise ValueError(f"Bilinmeyen FAISS indeks tipi: {index_type} (seçenekler: {FAISS_INDEX_TYPES})")
+        self._embedding = embedding
+        self.persist_directory = persist_directory
+        self.index_type = index_type
+        self.options = {**DEFAULT_FAISS_OPTIONS, **(options or {})}
+        self.mmap = mmap
+        self.index = None
+        self._read_only = False
+        self._dirty = False
+        self.reset = False  # Yapısal ayarlar değiştiği için indeks bu açılışta boşaltıldıysa True
+        self._next_id = 0
+        self._lock = threading.RLock()
+
+        os.makedirs(persist_directory, exist_ok=True)
+        self.index_path = os.path.join(persist_directory, f"faiss_{index_type}.index")
+        # Gradio istekleri farklı thread'lerden gelir; bağlantı kilitle korunur
+        self._conn = sqlite3.connect(
+            os.path.join(persist_directory, f"faiss_{index_type}.sqlite"), check_same_thread=False
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " faiss_id INTEGER PRIMARY KEY,"
+            " chunk_id TEXT UNIQUE NOT NULL,"
+            " text TEXT NOT NULL,"
+            " metadata TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+        self._load()
+
+    @property
+    def embeddings(self):
+        return self._embedding
+
+    # ------------------------------------------------------------------
+    # İndeks dosyası
+    # ------------------------------------------------------------------
+    def _settings_key(self):
+        return _settings_key(self.index_type, self.options)
+
+    def _load(self):
+        faiss = _faiss()
+        row = self._conn.execute("SELECT value FROM settings WHERE key = 'options'").fetchone()
+        if row is not None and row[0] != self._settings_key():
+            # Farklı ayarlarla kurulmuş indeks kullanılamaz; boşaltılır, parçalar yeniden eklenir
+            print(f"⚠️ FAISS indeks ayarları değişti, '{self.index_path}' yeniden kurulacak")
+            self._conn.execute("DELETE FROM chunks")
+            self.reset = True
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO settings (key, value) VALUES ('options', ?)", (self._settings_key(),)
+        )
+        self._conn.commit()
+
+        if os.path.exists(self.index_path):
+            self._open_index_file(mmap=self.mmap)
+            ids = self._index_ids()
+            # Yarıda kalmış bir yazmadan kalan (metadata'sız) vektörlerin ID'leri tekrar kullanılmasın
+            self._next_id = int(ids.max()) + 1 if len(ids) else 0
+        elif self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]:
+            # İndeks dosyası yazılamadan kesilmiş bir çalıştırma: metadata'sız vektör olamaz
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.commit()
+        max_row = self._conn.execute("SELECT MAX(faiss_id) FROM chunks").fetchone()[0]
+        if max_row is not None:
+            self._next_id = max(self._next_id, max_row + 1)
+
+    def _open_index_file(self, mmap):
+        faiss = _faiss()
+        flags = 0
+        if mmap:
+            # IO_FLAG_MMAP sadece IVF ters listelerini eşler; flat/HNSW vektörleri için
+            # IO_FLAG_MMAP_IFC gerekir (faiss >= 1.11), ikisi birlikte kullanılamaz
+            if self.index_type == "ivfpq" or not hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+                flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+            else:
+                flags = faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+        self.index = faiss.read_index(self.index_path, flags)
+        self._read_only = mmap
+        self._configure_search()
+
+    def _configure_search(self):
+        faiss = _faiss()
+        if isinstance(self.index, faiss.IndexIVF):
+            self.index.nprobe = self.options["nprobe"]
+        elif self.index_type == "hnsw":
+            faiss.downcast_index(self.index.index).hnsw.efSearch = self.options["ef_search"]
+
+    def _index_ids(self):
+        """İndeksteki tüm vektör ID'leri"""
+        faiss = _faiss()
+        if not isinstance(self.index, faiss.IndexIVF):
+            return faiss.vector_to_array(self.index.id_map)
+        # IVF ID'leri ters listelerde kendi tutar, diğer tipler IndexIDMap2 ile sarılıdır
+        invlists = self.index.invlists
+        ids = [
+            np.array(faiss.rev_swig_ptr(invlists.get_ids(list_no), invlists.list_size(list_no)))
+            for list_no in range(self.index.nlist)
+            if invlists.list_size(list_no)
+        ]
+        return np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
+
+    def _new_index(self, dim):
+        faiss = _faiss()
+        if self.index_type == "hnsw":
+            base = faiss.IndexHNSWFlat(dim, self.options["hnsw_m"], faiss.METRIC_INNER_PRODUCT)
+            base.hnsw.efConstruction = self.options["ef_construction"]
+        else:
+            # ivfpq de eğitilene kadar birebir indekste bekler
+            base = faiss.IndexFlatIP(dim)
+        return faiss.IndexIDMap2(base)
+
+    def _writable(self):
+        """Bellek eşlemeli (salt okunur) indeksi değiştirmeden önce belleğe oku"""
+        if self._read_only:
+            self._open_index_file(mmap=False)
+
+    def _ivfpq_training_size(self):
+        # PQ kod kitapları için küme başına ~39 eğitim noktası önerilir
+        return (2 ** self.options["pq_bits"]) * 39
+
+    def _maybe_train_ivfpq(self):
+        """Yeterli vektör biriktiyse birebir indeksi IVF-PQ'ya dönüştür"""
+        faiss = _faiss()
+        if self.index_type != "ivfpq" or isinstance(self.index, faiss.IndexIVF):
+            return
+        count = self.index.ntotal
+        if count < self._ivfpq_training_size():
+            return
+        dim = self.index.d
+        vectors = faiss.downcast_index(self.index.index).reconstruct_n(0, count)
+        ids = faiss.vector_to_array(self.index.id_map)
+        nlist = max(1, min(self.options["nlist"], count // 39))
+        pq_m = _largest_divisor(dim, self.options["pq_m"])
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, self.options["pq_bits"], faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+        index.add_with_ids(vectors, ids)
+        self.index = index
+        self._configure_search()
+        print(f"🧮 FAISS IVF-PQ eğitildi: {count} vektör, {nlist} küme, vektör başına {pq_m} bayt")
+
+    def _compact_hnsw(self):
+        """Silinmiş vektörler çoğaldıysa HNSW grafını canlı vektörlerle yeniden kur"""
+        faiss = _faiss()
+        live_ids = np.fromiter(
+            (row[0] for row in self._conn.execute("SELECT faiss_id FROM chunks")), dtype=np.int64
+        )
+        ids = faiss.vector_to_array(self.index.id_map)
+        vectors = faiss.downcast_index(self.index.index).reconstruct_n(0, self.index.ntotal)
+        keep = np.isin(ids, live_ids)
+        index = self._new_index(self.index.d)
+        if keep.any():
+            index.add_with_ids(vectors[keep], ids[keep])
+        self.index = index
+        self._configure_search()
+
+    def persist(self):
+        """İndeksi atomik olarak diske yaz, metadata'yı kaydet; mmap açıksa indeksi eşlemeli yeniden aç"""
+        with self._lock:
+            if self.index is not None and not self._read_only:
+                if self.index_type == "hnsw" and self.index.ntotal:
+                    tombstones = self.index.ntotal - self._count()
+                    if tombstones > self.index.ntotal * HNSW_COMPACT_RATIO:
+                        self._compact_hnsw()
+                if self._dirty or not os.path.exists(self.index_path):
+                    # Önce indeks, sonra metadata: yarıda kalırsa metadata'sı olmayan vektörler aramada atlanır
+                    tmp_path = self.index_path + ".tmp"
+                    _faiss().write_index(self.index, tmp_path)
+                    os.replace(tmp_path, self.index_path)
+                if self.mmap:
+                    self._open_index_file(mmap=True)
+            self._conn.commit()
+            self._dirty = False
+
+    # ------------------------------------------------------------------
+    # Yazma
+    # ------------------------------------------------------------------
+    def _count(self):
+        return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def _remove_vectors(self, faiss_ids):
+        if not faiss_ids or self.index is None:
+            return
+        # HNSW silmeyi desteklemez: vektör grafta kalır, metadata'sı olmadığı için aramada atlanır
+        if self.index_type != "hnsw":
+            self.index.remove_ids(_faiss().IDSelectorArray(np.asarray(faiss_ids, dtype=np.int64)))
+
+    def add_embeddings(self, ids, texts, embeddings, metadatas=None):
+        """
+        Önceden hesaplanmış vektörleri ekle; aynı ID varsa üzerine yazılır (upsert).
+
+        Returns:
+            list: Eklenen parça ID'leri
+        """
+        if not ids:
+            return []
+        metadatas = metadatas or [{} for _ in ids]
+        vectors = _normalized(embeddings)
+        with self._lock:
+            self._writable()
+            if self.index is None:
+                self.index = self._new_index(vectors.shape[1])
+                self._configure_search()
+            self._delete(ids)
+            faiss_ids = np.arange(self._next_id, self._next_id + len(ids), dtype=np.int64)
+            self._next_id += len(ids)
+            self.index.add_with_ids(vectors, faiss_ids)
+            self._conn.executemany(
+                "INSERT INTO chunks (faiss_id, chunk_id, text, metadata) VALUES (?, ?, ?, ?)",
+                [
+                    (int(faiss_id), chunk_id, text, json.dumps(metadata, ensure_ascii=False))
+                    for faiss_id, chunk_id, text, metadata in zip(faiss_ids, ids, texts, metadatas)
+                ],
+            )
+            self._maybe_train_ivfpq()
+            self._dirty = True
+        return list(ids)
+
+    def add_texts(self, texts, metadatas=None, ids=None, **kwargs):
+        texts = list(texts)
+        ids = list(ids) if ids is not None else [uuid.uuid4().hex for _ in texts]
+        metadatas = list(metadatas) if metadatas is not None else None
+        vectors = self._embedding.embed_documents(texts) if texts else []
+        return self.add_embeddings(ids, texts, vectors, metadatas)
+
+    def _delete(self, ids):
+        placeholders = ",".join("?" * len(ids))
+        rows = self._conn.execute(
+            f"SELECT faiss_id FROM chunks WHERE chunk_id IN ({placeholders})", list(ids)
+        ).fetchall()
+        if not rows:
+            return
+        self._conn.execute(f"DELETE FROM chunks WHERE chunk_id IN ({placeholders})", list(ids))
+        self._remove_vectors([row[0] for row in rows])
+        self._dirty = True
+
+    def delete(self, ids=None, **kwargs):
+        if not ids:
+            return False
+        with self._lock:
+            self._writable()
+            # SQLite'ın parametre sınırı için parça parça
+            for start in range(0, len(ids), 500):
+                self._delete(ids[start:start + 500])
+        return True
+
+    def update_metadatas(self, ids, metadatas):
+        """Verilen anahtarları mevcut metadata'ya ekle/güncelle (Chroma update gibi)"""
+        with self._lock:
+            for chunk_id, metadata in zip(ids, metadatas):
+                row = self._conn.execute("SELECT metadata FROM chunks WHERE chunk_id = ?", (chunk_id,)).fetchone()
+                if row is None:
+                    continue
+                merged = {**json.loads(row[0]), **metadata}
+                self._conn.execute(
+                    "UPDATE chunks SET metadata = ? WHERE chunk_id = ?",
+                    (json.dumps(merged, ensure_ascii=False), chunk_id),
+                )
+
+    def get_ids(self):
+        """İndeksteki tüm parça ID'leri"""
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT chunk_id FROM chunks")}
+
+    def __len__(self):
+        with self._lock:
+            return self._count()
+
+    # ------------------------------------------------------------------
+    # Arama
+    # ------------------------------------------------------------------
+    def similarity_search_with_score_by_vector(self, embedding, k=4, filter=None, **kwargs):
+        """
+        Returns:
+            list: (Document, kosinüs benzerliği) çiftleri, benzerliğe göre azalan
+        """
+        with self._lock:
+            if self.index is None or not self.index.ntotal:
+                return []
+            live = self._count()
+            # Silinmiş (HNSW) veya filtreyle elenecek sonuçlar için fazladan aday iste
+            fetch_k = k + (self.index.ntotal - live)
+            if filter:
+                fetch_k *= FILTER_OVERSAMPLE
+            query = _normalized([embedding])
+            while True:
+                fetch_k = min(fetch_k, self.index.ntotal)
+                scores, labels = self.index.search(query, fetch_k, params=self._search_params(fetch_k))
+                results = self._collect_results(scores[0], labels[0], k, filter)
+                # Seçici bir filtre adayların çoğunu eler: k sonuç bulunana veya indeks
+                # tükenene kadar aday sayısı ikiye katlanır (Chroma'daki ön filtrelemeyle aynı sonuç)
+                if not filter or len(results) == k or fetch_k >= self.index.ntotal:
+                    return results
+                fetch_k *= 2
+
+    def _search_params(self, fetch_k):
+        """
+        Aday sayısına göre sorgu ayarları: HNSW en fazla efSearch, IVF ise yalnızca nprobe
+        kümedeki sonuçları döndürür; genişletilmiş aramada bu sınırlar da büyütülür.
+        """
+        faiss = _faiss()
+        if isinstance(self.index, faiss.IndexIVF):
+            coverage = -(-self.index.nlist * fetch_k // self.index.ntotal)
+            return faiss.SearchParametersIVF(nprobe=min(self.index.nlist, max(self.options["nprobe"], coverage)))
+        if self.index_type == "hnsw":
+            return faiss.SearchParametersHNSW(efSearch=max(self.options["ef_search"], fetch_k))
+        return None
+
+    def _collect_results(self, scores, labels, k, filter):
+        """Arama sonuçlarını metin/metadata ile eşleştir ve filtrele (kilit tutulurken çağrılır)"""
+        found = [int(label) for label in labels if label >= 0]
+        if not found:
+            return []
+        rows = {}
+        # Genişletilmiş aramada aday sayısı SQLite'ın parametre sınırını aşabilir; parça parça sorgula
+        for start in range(0, len(found), SQLITE_PARAM_BATCH):
+            part = found[start:start + SQLITE_PARAM_BATCH]
+            for faiss_id, text, metadata in self._conn.execute(
+                f"SELECT faiss_id, text, metadata FROM chunks WHERE faiss_id IN ({','.join('?' * len(part))})",
+                part,
+            ):
+                rows[faiss_id] = (text, metadata)
+
+        results = []
+        for score, label in zip(scores, labels):
+            row = rows.get(int(label))
+            if row is None:
+                continue
+            metadata = json.loads(row[1])
+            if filter and any(metadata.get(key) != value for key, value in filter.items()):
+                continue
+            results.append((Document(page_content=row[0], metadata=metadata), float(score)))
+            if len(results) == k:
+                break
+        return results
+
+    def similarity_search_with_score(self, query, k=4, filter=None, **kwargs):
+        return self.similarity_search_with_score_by_vector(
+            self._embedding.embed_query(query), k=k, filter=filter
+        )
+
+    def similarity_search_by_vector(self, embedding, k=4, filter=None, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k=k, filter=filter)]
+
+    def similarity_search(self, query, k=4, filter=None, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, filter=filter)]
+
+    def _select_relevance_score_fn(self):
+        # Kosinüs benzerliği [-1, 1] -> [0, 1]
+        return lambda score: (score + 1) / 2
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, ids=None, persist_directory="faiss_db", **kwargs):
+        store = cls(embedding, persist_directory, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        store.persist()
+        return store
+
+
+def open_vector_store(backend, embedding, persist_directory, **options):
+    """
+    Seçilen arka ucun vektör veritabanını aç (yoksa boş oluştur).
+
+    Args:
+        backend: "chroma" veya "faiss"
+        embedding: LangChain embedding nesnesi
+        persist_directory: Kalıcı dizin
+        **options: FAISS için index_type, mmap ve DEFAULT_FAISS_OPTIONS anahtarları
+
+    Returns:
+        VectorStore: Chroma veya FaissVectorStore
+    """
+    if backend == "chroma":
+        return Chroma(persist_directory=persist_directory, embedding_function=embedding)
+    if backend == "faiss":
+        index_type = options.pop("index_type", "hnsw")
+        mmap = options.pop("mmap", True)
+        return FaissVectorStore(embedding, persist_directory, index_type=index_type, options=options, mmap=mmap)
+    raise ValueError(f"Bilinmeyen vektör arka ucu: {backend} (seçenekler: {VECTOR_BACKENDS})")
+
+
+def settings_changed(backend, persist_directory, **options):
+    """
+    Dizindeki FAISS indeksi farklı yapısal ayarlarla mı kurulmuş (açılınca boşaltılacak mı)?
+
+    İndeksi açmadan sadece SQLite'taki ayar kaydına bakar; Chroma'da hep False.
+    """
+    if backend != "faiss":
+        return False
+    index_type = options.pop("index_type", "hnsw")
+    path = os.path.join(persist_directory, f"faiss_{index_type}.sqlite")
+    if not os.path.exists(path):
+        return False
+    conn = sqlite3.connect(path)
+    try:
+        row = conn.execute("SELECT value FROM settings WHERE key = 'options'").fetchone()
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
+    return row is not None and row[0] != _settings_key(index_type, options)
+
+
+def backend_label(vectordb):
+    """Manifest'te saklanan arka uç adı; arka uç değişince manifest'teki ID'ler kullanılmaz"""
+    if isinstance(vectordb, FaissVectorStore):
+        return f"faiss:{vectordb.index_type}"
+    return "chroma"
+
+
+def stored_ids(vectordb):
+    """Vektör veritabanındaki gerçek parça ID'leri"""
+    if isinstance(vectordb, FaissVectorStore):
+        return vectordb.get_ids()
+    return set(vectordb.get(include=[])["ids"])
+
+
+def upsert_vectors(vectordb, ids, texts, metadatas, vectors):
+    """Önceden hesaplanmış vektörleri (yeniden embed etmeden) yaz"""
+    if isinstance(vectordb, FaissVectorStore):
+        vectordb.add_embeddings(ids, texts, vectors, metadatas)
+    else:
+        vectordb._collection.upsert(
+            ids=ids,
+            embeddings=[list(vector) for vector in vectors],
+            metadatas=metadatas,
+            documents=texts,
+        )
+
+
+def update_metadatas(vectordb, ids, metadatas):
+    """Sadece verilen metadata anahtarlarını güncelle"""
+    if isinstance(vectordb, FaissVectorStore):
+        vectordb.update_metadatas(ids, metadatas)
+    else:
+        vectordb._collection.update(ids=ids, metadatas=metadatas)
@@ -0,0 +1,180 @@
+"""
+VECTOR_INDEX.PY - ARTIMLI (INCREMENTAL) VEKTÖR İNDEKSLEME
+
+Her açılışta vektör veritabanını silip tüm parçaları yeniden embed etmek
+yerine, sadece yeni veya değişmiş parçaları ekler, artık var olmayan
+parçaları siler ve geri kalanını diskteki vektör veritabanından (Chroma
+veya FAISS, bkz. vector_backends.py) kullanır.
+
+Parça ID'si kaynak + start_index + içerik hash'inden üretilir; aynı parça
+her çalıştırmada aynı ID'yi alır. Son indekslenen ID'ler persist dizinindeki
+bir manifest dosyasında tutulur.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+from embedding_cache import CachedEmbeddings, LazyEmbeddings, PrecomputedEmbeddings
+from metrics import InstrumentedEmbeddings
+from vector_backends import backend_label, open_vector_store, stored_ids
+
+MANIFEST_FILENAME = "index_manifest.json"
+MANIFEST_VERSION = 1
+ADD_BATCH_SIZE = 256
+
+
+def content_hash(text):
+    """Parça metninin kısa SHA-256 hash'i"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def chunk_ids(chunks):
+    """
+    Her parça için kararlı bir ID üret.
+
+    start_index metadata'sı yoksa (add_start_index=False ile bölünmüş
+    dokümanlar) aynı kaynaktaki sıra numarası kullanılır.
+    """
+    ids = []
+    ordinals = {}
+    for chunk in chunks:
+        source = str(chunk.metadata.get("source", ""))
+        start = chunk.metadata.get("start_index")
+        if start is None:
+            start = f"#{ordinals.get(source, 0)}"
+            ordinals[source] = ordinals.get(source, 0) + 1
+        page = chunk.metadata.get("page")
+        if page is not None:
+            # Sayfa sayfa bölünen dokümanlarda start_index sayfa içindeki konumdur
+            start = f"{page}:{start}"
+        key = f"{source}\0{start}\0{content_hash(chunk.page_content)}"
+        ids.append(hashlib.sha1(key.encode("utf-8")).hexdigest())
+    return ids
+
+
+def index_fingerprint(chunks):
+    """Parça kümesinin hash'i; indeks içeriği değişince değişir (önbellek geçersizleştirme için)"""
+    digest = hashlib.sha256()
+    for chunk_id in sorted(set(chunk_ids(chunks))):
+        digest.update(chunk_id.encode("ascii"))
+    return digest.hexdigest()
+
+
+def load_manifest(persist_directory):
+    """Manifest dosyasını oku, yoksa veya bozuksa None döndür"""
+    path = os.path.join(persist_directory, MANIFEST_FILENAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_manifest(persist_directory, ids, embedding_name, backend="chroma"):
+    """Manifest'i atomik olarak yaz (önce geçici dosya, sonra rename)"""
+    path = os.path.join(persist_directory, MANIFEST_FILENAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"version": MANIFEST_VERSION, "embedding": embedding_name, "backend": backend, "ids": sorted(ids)},
+            f,
+        )
+    os.replace(tmp_path, path)
+
+
+def embedding_name(embedding):
+    """Embedding nesnesini tanımlayan isim (model değişince indeks yeniden kurulur)"""
+    # Önbellek ve ölçüm sarmalayıcıları vektörleri değiştirmez, asıl model esas alınır
+    while isinstance(embedding, (CachedEmbeddings, InstrumentedEmbeddings, PrecomputedEmbeddings)):
+        embedding = embedding.embeddings
+    # Tembel yüklenen model, yüklenmeden tanımlanabilmeli
+    if isinstance(embedding, LazyEmbeddings):
+        return f"{embedding.class_name}:{embedding.model_name}"
+    name = getattr(embedding, "model_name", None) or getattr(embedding, "model", None)
+    return f"{type(embedding).__name__}:{name}"
+
+
+def open_index(embedding, persist_directory, backend="chroma", backend_options=None):
+    """
+    Kalıcı vektör veritabanını aç ve içindeki parça ID'lerini döndür.
+
+    Embedding modeli manifest'tekinden farklıysa dizin silinip boş açılır.
+
+    Args:
+        backend: "chroma" veya "faiss"
+        backend_options: open_vector_store'a geçilen ayarlar (FAISS indeks tipi vb.)
+
+    Returns:
+        tuple: (vektör veritabanı, mevcut ID kümesi)
+    """
+    emb_name = embedding_name(embedding)
+    manifest = load_manifest(persist_directory) if os.path.exists(persist_directory) else None
+
+    # Embedding modeli değiştiyse eski vektörler kullanılamaz
+    if manifest is not None and manifest.get("embedding") != emb_name:
+        print(f"Embedding modeli değişti, '{persist_directory}' yeniden oluşturuluyor.")
+        shutil.rmtree(persist_directory)
+        manifest = None
+
+    vectordb = open_vector_store(backend, embedding, persist_directory, **(backend_options or {}))
+
+    # Yapısal ayarları değiştiği için boşaltılmış bir FAISS indeksinde manifest'teki ID'ler artık yok
+    if manifest is not None and manifest.get("backend", "chroma") == backend_label(vectordb) \
+            and not getattr(vectordb, "reset", False):
+        existing_ids = set(manifest["ids"])
+    else:
+        # Manifest yoksa (ilk çalıştırma, yarım kalmış çalıştırma veya arka uç
+        # değişmişse) veritabanındaki gerçek ID'ler esas alınır
+        existing_ids = stored_ids(vectordb)
+    return vectordb, existing_ids
+
+
+def build_or_update_index(chunks, embedding, persist_directory, batch_size=ADD_BATCH_SIZE,
+                          backend="chroma", backend_options=None, ids=None):
+    """
+    Vektör indeksini parçalarla artımlı olarak senkronize et.
+
+    Args:
+        chunks: İndekslenecek Document parçaları
+        embedding: LangChain embedding nesnesi
+        persist_directory: Vektör veritabanının kalıcı dizini
+        batch_size: Tek seferde embed edilip eklenen parça sayısı
+        backend: "chroma" veya "faiss"
+        backend_options: open_vector_store'a geçilen ayarlar
+        ids: Parçaların ID'leri (None = chunk_ids(chunks); parçalar bir korpusun alt kümesiyse
+            sıra numaraları kaymasın diye korpus üzerinden hesaplanmış ID'ler verilir)
+
+    Returns:
+        tuple: (vektör veritabanı, {'added', 'deleted', 'kept'} sayıları)
+    """
+    vectordb, existing_ids = open_index(embedding, persist_directory, backend, backend_options)
+
+    # Aynı ID'ye sahip (birebir aynı) parçalardan sadece ilki tutulur
+    new_chunks = {}
+    for chunk_id, chunk in zip(ids if ids is not None else chunk_ids(chunks), chunks):
+        new_chunks.setdefault(chunk_id, chunk)
+
+    to_delete = [chunk_id for chunk_id in existing_ids if chunk_id not in new_chunks]
+    to_add = [chunk_id for chunk_id in new_chunks if chunk_id not in existing_ids]
+
+    if to_delete:
+        vectordb.delete(ids=to_delete)
+
+    for start in range(0, len(to_add), batch_size):
+        batch_ids = to_add[start:start + batch_size]
+        vectordb.add_documents([new_chunks[chunk_id] for chunk_id in batch_ids], ids=batch_ids)
+
+    vectordb.persist()
+    save_manifest(persist_directory, new_chunks.keys(), embedding_name(embedding), backend_label(vectordb))
+
+    counts = {
+        "added": len(to_add),
+        "deleted": len(to_delete),
+        "kept": len(new_chunks) - len(to_add),
+    }
+    return vectordb, counts